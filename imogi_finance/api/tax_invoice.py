@@ -14,8 +14,8 @@ from imogi_finance.tax_invoice_ocr import (
 
 
 @frappe.whitelist()
-def run_ocr_for_upload(upload_name: str):
-    return run_ocr(upload_name, "Tax Invoice OCR Upload")
+def run_ocr_for_upload(upload_name: str, priority: str | None = None):
+    return run_ocr(upload_name, "Tax Invoice OCR Upload", priority=priority)
 
 
 @frappe.whitelist()
@@ -0,0 +1,373 @@
+"""Set-based budget availability engine.
+
+Computes allocated (Budget Account), actual (GL Entry) and reserved (Budget Control Entry)
+amounts for a whole (company, fiscal_year) scope with one grouped query per source.
+Results are joined in memory by (cost_center, account), so the number of queries does
+not grow with the number of Budget rows being reported on.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable
+
+import frappe
+
+from imogi_finance.budget_control import balance, dimension_cache, native_budget
+from imogi_finance.budget_control.utils import Dimensions, get_fiscal_year_dates
+
+BREAKDOWN_TYPES = ("reservation", "consumption", "reversal", "reclass", "supplement")
+
+
+def _empty_breakdown() -> dict[str, float]:
+    return {entry_type: 0.0 for entry_type in BREAKDOWN_TYPES}
+
+
+@dataclass
+class BudgetAvailability:
+    cost_center: str | None
+    account: str | None
+    budget: str | None = None
+    allocated: float = 0.0
+    actual: float = 0.0
+    reserved: float = 0.0
+    breakdown: dict[str, float] = field(default_factory=_empty_breakdown)
+
+    @property
+    def available(self) -> float:
+        return self.allocated - self.actual - self.reserved
+
+    def as_dict(self) -> dict:
+        return {
+            "allocated": self.allocated,
+            "actual": self.actual,
+            "reserved": self.reserved,
+            "available": self.available,
+        }
+
+
+def _load_budget_rows(company: str | None, fiscal_year: str | None) -> list[dict]:
+    """Return every Budget for the company/fiscal year joined with its Budget Account rows.
+
+    Budgets without account rows are kept (account is NULL) so the single-budget
+    fallback in ``native_budget._pick_budget`` sees the same candidates as before.
+    """
+    return dimension_cache.memoize(
+        dimension_cache.BUDGET_ROWS, (company, fiscal_year), lambda: _query_budget_rows(company, fiscal_year)
+    )
+
+
+def _query_budget_rows(company: str | None, fiscal_year: str | None) -> list[dict]:
+    try:
+        return frappe.db.sql(
+            """
+            select b.name as budget, b.cost_center, b.docstatus, ba.account, ba.budget_amount
+            from `tabBudget` b
+            left join `tabBudget Account` ba on ba.parent = b.name and ba.parenttype = 'Budget'
+            where b.company = %(company)s and b.fiscal_year = %(fiscal_year)s
+            order by b.name, ba.idx
+            """,
+            {"company": company, "fiscal_year": fiscal_year},
+            as_dict=True,
+        ) or []
+    except Exception:
+        return []
+
+
+def _resolve_date_window(
+    fiscal_year: str | None, from_date: date | None, to_date: date | None
+) -> tuple[date | None, date | None]:
+    if from_date and to_date:
+        return from_date, to_date
+
+    return get_fiscal_year_dates(fiscal_year)
+
+
+def _dimension_conditions(params: dict, *, cost_centers, accounts, project, branch) -> str:
+    conditions = []
+    if cost_centers:
+        conditions.append("and cost_center in %(cost_centers)s")
+        params["cost_centers"] = tuple(cost_centers)
+    if accounts:
+        conditions.append("and account in %(accounts)s")
+        params["accounts"] = tuple(accounts)
+    if branch:
+        conditions.append("and branch = %(branch)s")
+        params["branch"] = branch
+    if project:
+        conditions.append("and project = %(project)s")
+        params["project"] = project
+    return "\n".join(conditions)
+
+
+def _load_actuals(
+    company: str | None,
+    *,
+    window: tuple[date | None, date | None],
+    cost_centers,
+    accounts,
+    project,
+    branch,
+) -> dict[tuple, float]:
+    params: dict = {"company": company}
+    date_filter = ""
+    if window[0] and window[1]:
+        date_filter = "and posting_date between %(from_date)s and %(to_date)s"
+        params["from_date"], params["to_date"] = window
+
+    dimension_filter = _dimension_conditions(
+        params, cost_centers=cost_centers, accounts=accounts, project=project, branch=branch
+    )
+
+    try:
+        rows = frappe.db.sql(
+            f"""
+            select cost_center, account, coalesce(sum(debit) - sum(credit), 0) as balance
+            from `tabGL Entry`
+            where company = %(company)s
+              and is_cancelled = 0
+              {date_filter}
+              {dimension_filter}
+            group by cost_center, account
+            """,
+            params,
+            as_dict=True,
+        ) or []
+    except Exception:
+        rows = []
+
+    return {(row.get("cost_center"), row.get("account")): float(row.get("balance") or 0.0) for row in rows}
+
+
+def _load_control_totals(
+    company: str | None,
+    fiscal_year: str | None,
+    *,
+    from_date: date | None,
+    to_date: date | None,
+    cost_centers,
+    accounts,
+    project,
+    branch,
+) -> dict[tuple, list[dict]]:
+    params: dict = {"company": company, "fiscal_year": fiscal_year}
+    date_filter = ""
+    if from_date and to_date:
+        date_filter = "and posting_date between %(from_date)s and %(to_date)s"
+        params["from_date"] = from_date
+        params["to_date"] = to_date
+
+    dimension_filter = _dimension_conditions(
+        params, cost_centers=cost_centers, accounts=accounts, project=project, branch=branch
+    )
+
+    try:
+        rows = frappe.db.sql(
+            f"""
+            select cost_center, account, entry_type, direction, sum(amount) as amount
+            from `tabBudget Control Entry`
+            where company = %(company)s
+              and fiscal_year = %(fiscal_year)s
+              and docstatus = 1
+              {date_filter}
+              {dimension_filter}
+            group by cost_center, account, entry_type, direction
+            """,
+            params,
+            as_dict=True,
+        ) or []
+    except Exception:
+        rows = []
+
+    grouped: dict[tuple, list[dict]] = {}
+    for row in rows:
+        grouped.setdefault((row.get("cost_center"), row.get("account")), []).append(row)
+    return grouped
+
+
+def apply_control_totals(record: BudgetAvailability, rows: Iterable[dict]) -> None:
+    """Fold grouped Budget Control Entry totals into ``record``.
+
+    Reserved = RESERVATION(OUT) - RESERVATION(IN) - CONSUMPTION(IN) + REVERSAL(OUT).
+    Breakdown values are signed by direction (OUT positive, IN negative).
+    """
+    for row in rows or []:
+        entry_type = row.get("entry_type") or ""
+        direction = row.get("direction")
+        amount = float(row.get("amount") or 0.0)
+
+        if entry_type == "RESERVATION" and direction == "OUT":
+            record.reserved += amount
+        elif entry_type == "RESERVATION" and direction == "IN":
+            record.reserved -= amount
+        elif entry_type == "CONSUMPTION" and direction == "IN":
+            record.reserved -= amount
+        elif entry_type == "REVERSAL" and direction == "OUT":
+            record.reserved += amount
+
+        key = entry_type.lower()
+        if key in record.breakdown:
+            if direction == "OUT":
+                record.breakdown[key] += amount
+            elif direction == "IN":
+                record.breakdown[key] -= amount
+
+
+def _load_usage(
+    company: str | None,
+    fiscal_year: str | None,
+    *,
+    cost_centers,
+    accounts,
+    project,
+    branch,
+    from_date: date | None,
+    to_date: date | None,
+) -> tuple[dict[tuple, float], dict[tuple, list[dict]]]:
+    """GL actuals and Budget Control Entry totals per (cost_center, account), one grouped read each."""
+    window = _resolve_date_window(fiscal_year, from_date, to_date)
+    actuals = _load_actuals(
+        company, window=window, cost_centers=cost_centers, accounts=accounts, project=project, branch=branch
+    )
+    if not (from_date and to_date) and balance.is_enabled():
+        # Whole-fiscal-year scope: read the maintained running totals instead of raw entries.
+        control_totals = balance.get_control_totals(
+            company,
+            fiscal_year,
+            cost_centers=cost_centers,
+            accounts=accounts,
+            project=project,
+            branch=branch,
+        )
+    else:
+        control_totals = _load_control_totals(
+            company,
+            fiscal_year,
+            from_date=from_date,
+            to_date=to_date,
+            cost_centers=cost_centers,
+            accounts=accounts,
+            project=project,
+            branch=branch,
+        )
+    return actuals, control_totals
+
+
+def get_availability_map(
+    company: str | None,
+    fiscal_year: str | None,
+    *,
+    keys: Iterable[tuple] | None = None,
+    cost_center: str | None = None,
+    account: str | None = None,
+    project: str | None = None,
+    branch: str | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
+    submitted_only: bool = False,
+) -> dict[tuple, BudgetAvailability]:
+    """Compute availability for every (cost_center, account) in scope.
+
+    When ``keys`` is omitted the scope is every Budget Account row of the company/fiscal
+    year (optionally narrowed by ``cost_center``/``account`` and ``submitted_only``).
+    Allocation follows the same Budget selection rules as ``native_budget._find_budget_for_dims``.
+    """
+    budget_rows = _load_budget_rows(company, fiscal_year)
+
+    budgets: dict[str, dict] = {}
+    allocations: dict[tuple, float] = {}
+    for row in budget_rows:
+        name = row.get("budget")
+        budgets.setdefault(name, {"name": name, "cost_center": row.get("cost_center")})
+        if row.get("account"):
+            allocations.setdefault((name, row.get("account")), float(row.get("budget_amount") or 0.0))
+
+    if keys is None:
+        scoped_keys = []
+        for row in budget_rows:
+            if not row.get("account"):
+                continue
+            if submitted_only and row.get("docstatus") != 1:
+                continue
+            if cost_center and row.get("cost_center") != cost_center:
+                continue
+            if account and row.get("account") != account:
+                continue
+            scoped_keys.append((row.get("cost_center"), row.get("account")))
+        keys = scoped_keys
+
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    actuals, control_totals = _load_usage(
+        company,
+        fiscal_year,
+        cost_centers=sorted({key[0] for key in keys if key[0]}),
+        accounts=sorted({key[1] for key in keys if key[1]}),
+        project=project,
+        branch=branch,
+        from_date=from_date,
+        to_date=to_date,
+    )
+
+    candidates = list(budgets.values())
+    results: dict[tuple, BudgetAvailability] = {}
+    for key in keys:
+        key_cost_center, key_account = key
+        dims = Dimensions(
+            company=company,
+            fiscal_year=fiscal_year,
+            cost_center=key_cost_center,
+            account=key_account,
+            project=project,
+            branch=branch,
+        )
+        budget_name = native_budget._pick_budget(candidates, dims)
+        record = BudgetAvailability(
+            cost_center=key_cost_center,
+            account=key_account,
+            budget=budget_name,
+            allocated=allocations.get((budget_name, key_account), 0.0) if budget_name else 0.0,
+            actual=actuals.get(key, 0.0) if key_cost_center and key_account else 0.0,
+        )
+        apply_control_totals(record, control_totals.get(key))
+        results[key] = record
+
+    return results
+
+
+def get_availability_for_dims(
+    dims: Dimensions, from_date: date | None = None, to_date: date | None = None
+) -> BudgetAvailability:
+    """Availability of a single dimension.
+
+    Unlike ``get_availability_map`` this never loads the whole company/fiscal year: the
+    Budget is resolved for ``dims.cost_center`` only (same selection rules), and the
+    allocation, GL and Budget Control Entry reads are filtered to the dimension.
+    """
+    budget_name = native_budget._find_budget_for_dims(dims)
+    allocation = native_budget._load_budget_account_row(budget_name, dims.account) if budget_name else None
+
+    actuals, control_totals = _load_usage(
+        dims.company,
+        dims.fiscal_year,
+        cost_centers=[dims.cost_center] if dims.cost_center else [],
+        accounts=[dims.account] if dims.account else [],
+        project=dims.project,
+        branch=dims.branch,
+        from_date=from_date,
+        to_date=to_date,
+    )
+
+    key = (dims.cost_center, dims.account)
+    record = BudgetAvailability(
+        cost_center=dims.cost_center,
+        account=dims.account,
+        budget=budget_name,
+        allocated=float((allocation or {}).get("budget_amount") or 0.0),
+        actual=actuals.get(key, 0.0) if dims.cost_center and dims.account else 0.0,
+    )
+    apply_control_totals(record, control_totals.get(key))
+    return record
@@ -0,0 +1,290 @@
+"""Incrementally maintained Budget Control Entry balances.
+
+Each ``Budget Control Balance`` row holds the running totals of submitted Budget Control
+Entries for one (company, fiscal_year, cost_center, account, project, branch) dimension,
+split by entry type and direction. Rows are updated in the same transaction as the
+entry's submit/cancel, so availability checks read a handful of indexed rows instead
+of re-summing the full entry history.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+import frappe
+from frappe import _
+
+from imogi_finance import roles
+
+BALANCE_DOCTYPE = "Budget Control Balance"
+
+BALANCE_COLUMNS = {
+    ("RESERVATION", "OUT"): "reservation_out",
+    ("RESERVATION", "IN"): "reservation_in",
+    ("CONSUMPTION", "IN"): "consumption_in",
+    ("REVERSAL", "OUT"): "reversal_out",
+    ("RECLASS", "IN"): "reclass_in",
+    ("RECLASS", "OUT"): "reclass_out",
+    ("SUPPLEMENT", "IN"): "supplement_in",
+}
+
+DIMENSION_FIELDS = ("company", "fiscal_year", "cost_center", "account", "project", "branch")
+
+
+def balance_key(company, fiscal_year, cost_center, account, project=None, branch=None) -> str:
+    raw = "\x1f".join(str(value or "") for value in (company, fiscal_year, cost_center, account, project, branch))
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def is_enabled() -> bool:
+    """Balances are used once the DocType table exists (i.e. after migrate + rebuild patch)."""
+    db = getattr(frappe, "db", None)
+    table_exists = getattr(db, "table_exists", None)
+    if not callable(table_exists):
+        return False
+    try:
+        return bool(table_exists(BALANCE_DOCTYPE))
+    except Exception:
+        return False
+
+
+def apply_entry(entry, sign: int = 1) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) a Budget Control Entry from its balance row."""
+    column = BALANCE_COLUMNS.get((getattr(entry, "entry_type", None), getattr(entry, "direction", None)))
+    if not column or not is_enabled():
+        return
+
+    dims = {field: getattr(entry, field, None) or None for field in DIMENSION_FIELDS}
+    amount = sign * float(getattr(entry, "amount", 0) or 0.0)
+    name = balance_key(*(dims[field] for field in DIMENSION_FIELDS))
+
+    if not frappe.db.exists(BALANCE_DOCTYPE, name):
+        row = frappe.get_doc({"doctype": BALANCE_DOCTYPE, **dims, column: amount})
+        try:
+            row.insert(ignore_permissions=True)
+            return
+        except frappe.DuplicateEntryError:
+            # A concurrent transaction created the row first; fall through to the increment.
+            pass
+
+    # Increment in SQL so concurrent postings on the same dimension never lose updates.
+    frappe.db.sql(
+        f"""
+        update `tab{BALANCE_DOCTYPE}`
+        set `{column}` = `{column}` + %(amount)s, modified = %(modified)s
+        where name = %(name)s
+        """,
+        {"amount": amount, "modified": frappe.utils.now_datetime(), "name": name},
+    )
+
+
+def apply_entries(entries: Iterable, sign: int = 1) -> None:
+    """Apply many entries, folding same-dimension/same-column amounts into one update each."""
+    folded: dict[tuple, object] = {}
+    for entry in entries or []:
+        column = BALANCE_COLUMNS.get((getattr(entry, "entry_type", None), getattr(entry, "direction", None)))
+        if not column:
+            continue
+        key = (column, *(getattr(entry, field, None) or None for field in DIMENSION_FIELDS))
+        if key in folded:
+            folded[key].amount += float(getattr(entry, "amount", 0) or 0.0)
+        else:
+            folded[key] = frappe._dict(
+                entry_type=entry.entry_type,
+                direction=entry.direction,
+                amount=float(getattr(entry, "amount", 0) or 0.0),
+                **{field: getattr(entry, field, None) for field in DIMENSION_FIELDS},
+            )
+
+    for entry in folded.values():
+        apply_entry(entry, sign)
+
+
+def _scope_conditions(params: dict, *, cost_centers=None, accounts=None, project=None, branch=None) -> str:
+    conditions = []
+    if cost_centers:
+        conditions.append("and cost_center in %(cost_centers)s")
+        params["cost_centers"] = tuple(cost_centers)
+    if accounts:
+        conditions.append("and account in %(accounts)s")
+        params["accounts"] = tuple(accounts)
+    if project:
+        conditions.append("and project = %(project)s")
+        params["project"] = project
+    if branch:
+        conditions.append("and branch = %(branch)s")
+        params["branch"] = branch
+    return "\n".join(conditions)
+
+
+def get_control_totals(
+    company: str | None,
+    fiscal_year: str | None,
+    *,
+    cost_centers: Iterable[str] | None = None,
+    accounts: Iterable[str] | None = None,
+    project: str | None = None,
+    branch: str | None = None,
+) -> dict[tuple, list[dict]]:
+    """Return balances grouped by (cost_center, account) as entry_type/direction/amount rows.
+
+    The shape matches the grouped Budget Control Entry query so callers can fold it with
+    ``availability.apply_control_totals`` unchanged.
+    """
+    params: dict = {"company": company, "fiscal_year": fiscal_year}
+    scope = _scope_conditions(
+        params, cost_centers=cost_centers, accounts=accounts, project=project, branch=branch
+    )
+    sums = ", ".join(f"sum(`{column}`) as `{column}`" for column in BALANCE_COLUMNS.values())
+
+    try:
+        rows = frappe.db.sql(
+            f"""
+            select cost_center, account, {sums}
+            from `tab{BALANCE_DOCTYPE}`
+            where company = %(company)s
+              and fiscal_year = %(fiscal_year)s
+              {scope}
+            group by cost_center, account
+            """,
+            params,
+            as_dict=True,
+        ) or []
+    except Exception:
+        rows = []
+
+    grouped: dict[tuple, list[dict]] = {}
+    for row in rows:
+        grouped[(row.get("cost_center"), row.get("account"))] = [
+            {"entry_type": entry_type, "direction": direction, "amount": float(row.get(column) or 0.0)}
+            for (entry_type, direction), column in BALANCE_COLUMNS.items()
+        ]
+    return grouped
+
+
+def _entry_scope(company: str | None, fiscal_year: str | None) -> tuple[str, dict]:
+    params: dict = {}
+    conditions = []
+    if company:
+        conditions.append("and company = %(company)s")
+        params["company"] = company
+    if fiscal_year:
+        conditions.append("and fiscal_year = %(fiscal_year)s")
+        params["fiscal_year"] = fiscal_year
+    return "\n".join(conditions), params
+
+
+def compute_expected_balances(company: str | None = None, fiscal_year: str | None = None) -> dict[str, dict]:
+    """Recompute balances from raw submitted Budget Control Entries, keyed by balance name."""
+    scope, params = _entry_scope(company, fiscal_year)
+    rows = frappe.db.sql(
+        f"""
+        select company, fiscal_year, cost_center, account, project, branch,
+               entry_type, direction, sum(amount) as amount
+        from `tabBudget Control Entry`
+        where docstatus = 1
+          {scope}
+        group by company, fiscal_year, cost_center, account, project, branch, entry_type, direction
+        """,
+        params,
+        as_dict=True,
+    ) or []
+
+    expected: dict[str, dict] = {}
+    for row in rows:
+        column = BALANCE_COLUMNS.get((row.get("entry_type"), row.get("direction")))
+        if not column:
+            continue
+        dims = {field: row.get(field) or None for field in DIMENSION_FIELDS}
+        name = balance_key(*(dims[field] for field in DIMENSION_FIELDS))
+        record = expected.setdefault(name, {**dims, **{col: 0.0 for col in BALANCE_COLUMNS.values()}})
+        record[column] += float(row.get("amount") or 0.0)
+    return expected
+
+
+def _load_stored_balances(company: str | None, fiscal_year: str | None) -> dict[str, dict]:
+    scope, params = _entry_scope(company, fiscal_year)
+    columns = ", ".join(f"`{column}`" for column in BALANCE_COLUMNS.values())
+    rows = frappe.db.sql(
+        f"""
+        select name, {", ".join(DIMENSION_FIELDS)}, {columns}
+        from `tab{BALANCE_DOCTYPE}`
+        where 1 = 1
+          {scope}
+        """,
+        params,
+        as_dict=True,
+    ) or []
+    return {row.get("name"): row for row in rows}
+
+
+def verify_balances(company: str | None = None, fiscal_year: str | None = None, *, tolerance: float = 0.005) -> list[dict]:
+    """Diff stored balances against a full recompute; returns one dict per mismatching row."""
+    expected = compute_expected_balances(company, fiscal_year)
+    stored = _load_stored_balances(company, fiscal_year)
+
+    mismatches = []
+    for name in sorted(set(expected) | set(stored)):
+        want = expected.get(name) or {}
+        have = stored.get(name) or {}
+        diffs = {}
+        for column in BALANCE_COLUMNS.values():
+            expected_value = float(want.get(column) or 0.0)
+            stored_value = float(have.get(column) or 0.0)
+            if abs(expected_value - stored_value) > tolerance:
+                diffs[column] = {"expected": expected_value, "stored": stored_value}
+        if diffs:
+            source = want or have
+            mismatches.append(
+                {"name": name, **{field: source.get(field) for field in DIMENSION_FIELDS}, "differences": diffs}
+            )
+    return mismatches
+
+
+def rebuild_balances(company: str | None = None, fiscal_year: str | None = None) -> int:
+    """Replace stored balances in scope with a recompute from raw entries; returns rows written."""
+    expected = compute_expected_balances(company, fiscal_year)
+
+    filters = {}
+    if company:
+        filters["company"] = company
+    if fiscal_year:
+        filters["fiscal_year"] = fiscal_year
+    frappe.db.delete(BALANCE_DOCTYPE, filters)
+
+    if not expected:
+        return 0
+
+    now = frappe.utils.now_datetime()
+    user = getattr(getattr(frappe, "session", None), "user", None) or "Administrator"
+    fields = ["name", "creation", "modified", "owner", "modified_by", *DIMENSION_FIELDS, *BALANCE_COLUMNS.values()]
+    values = [
+        (name, now, now, user, user, *(record.get(field) for field in DIMENSION_FIELDS),
+         *(record.get(column) for column in BALANCE_COLUMNS.values()))
+        for name, record in expected.items()
+    ]
+    frappe.db.bulk_insert(BALANCE_DOCTYPE, fields=fields, values=values)
+    return len(values)
+
+
+@frappe.whitelist()
+def reconcile_balances(company: str | None = None, fiscal_year: str | None = None, rebuild: int | str = 0) -> dict:
+    """Verify (and optionally rebuild) Budget Control Balances against raw entries.
+
+    Usable from desk or ``bench execute imogi_finance.budget_control.balance.reconcile_balances``.
+    """
+    frappe.only_for((roles.SYSTEM_MANAGER, roles.ACCOUNTS_MANAGER))
+
+    mismatches = verify_balances(company, fiscal_year)
+    result = {"mismatches": len(mismatches), "details": mismatches[:100], "rebuilt": 0}
+
+    if frappe.utils.cint(rebuild) and mismatches:
+        result["rebuilt"] = rebuild_balances(company, fiscal_year)
+        frappe.logger().info(
+            _("Budget Control Balance rebuilt for {0}/{1}: {2} rows").format(
+                company or _("all companies"), fiscal_year or _("all fiscal years"), result["rebuilt"]
+            )
+        )
+
+    return result
@@ -0,0 +1,156 @@
+"""Memo cache for Budget / Fiscal Year / Cost Center resolution.
+
+Lookups are memoized in ``frappe.local.request_cache`` so they live exactly as long as
+the current request or background job. Namespaces marked ``shared`` can additionally be
+backed by Redis (``frappe.cache()``) when *Enable Shared Dimension Cache* is ticked in
+Budget Control Settings; Budget, Fiscal Year and Cost Center doc_events clear them.
+
+Hit/miss counters are kept per namespace for the request and for the worker process
+and are returned by ``get_cache_stats``.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Callable, Hashable
+
+import frappe
+
+from imogi_finance import roles
+
+REQUEST_KEY = "imogi_budget_dimension_cache"
+REDIS_PREFIX = "imogi_finance:budget_dims:"
+
+BUDGET = "budget"
+BUDGET_ROWS = "budget_rows"
+BUDGET_ACCOUNT = "budget_account"
+FISCAL_YEAR_DATES = "fiscal_year_dates"
+FISCAL_YEAR_RESOLUTION = "fiscal_year_resolution"
+COST_CENTER_COMPANY = "cost_center_company"
+
+# Namespaces that may be shared across requests through Redis. Fiscal year resolution
+# depends on user defaults and today's date, so it stays request-scoped.
+SHARED_NAMESPACES = {BUDGET, BUDGET_ROWS, BUDGET_ACCOUNT, FISCAL_YEAR_DATES, COST_CENTER_COMPANY}
+
+INVALIDATES = {
+    "Budget": (BUDGET, BUDGET_ROWS, BUDGET_ACCOUNT),
+    "Fiscal Year": (FISCAL_YEAR_DATES, FISCAL_YEAR_RESOLUTION, BUDGET, BUDGET_ROWS),
+    "Cost Center": (COST_CENTER_COMPANY, BUDGET, BUDGET_ROWS),
+}
+
+_process_stats: dict[str, dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def _request_store() -> dict | None:
+    local = getattr(frappe, "local", None)
+    request_cache = getattr(local, "request_cache", None) if local is not None else None
+    if request_cache is None:
+        return None
+
+    store = request_cache.get(REQUEST_KEY)
+    if store is None:
+        store = {"values": {}, "stats": defaultdict(lambda: {"hits": 0, "misses": 0}), "shared": None}
+        request_cache[REQUEST_KEY] = store
+    return store
+
+
+def _redis():
+    cache = getattr(frappe, "cache", None)
+    if not callable(cache):
+        return None
+    try:
+        return cache()
+    except Exception:
+        return None
+
+
+def _shared_enabled(store: dict) -> bool:
+    if store["shared"] is None:
+        from imogi_finance.budget_control.utils import get_settings
+
+        try:
+            store["shared"] = bool(get_settings().get("enable_shared_dimension_cache"))
+        except Exception:
+            store["shared"] = False
+    return store["shared"]
+
+
+def _count(store: dict, namespace: str, outcome: str) -> None:
+    store["stats"][namespace][outcome] += 1
+    _process_stats[namespace][outcome] += 1
+
+
+def memoize(namespace: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+    """Return the cached value for ``(namespace, key)``, calling ``loader`` on a miss.
+
+    Without a request context (tests, plain scripts) this is a pass-through. Exceptions
+    raised by ``loader`` propagate and are not cached.
+    """
+    store = _request_store()
+    if store is None:
+        return loader()
+
+    values = store["values"].setdefault(namespace, {})
+    if key in values:
+        _count(store, namespace, "hits")
+        return values[key]
+
+    use_redis = namespace in SHARED_NAMESPACES and _shared_enabled(store)
+    redis = _redis() if use_redis else None
+    field = repr(key)
+    if redis is not None:
+        try:
+            wrapped = redis.hget(REDIS_PREFIX + namespace, field)
+        except Exception:
+            wrapped = None
+        if isinstance(wrapped, dict) and "value" in wrapped:
+            _count(store, namespace, "hits")
+            values[key] = wrapped["value"]
+            return values[key]
+
+    _count(store, namespace, "misses")
+    value = loader()
+    values[key] = value
+    if redis is not None:
+        try:
+            redis.hset(REDIS_PREFIX + namespace, field, {"value": value})
+        except Exception:
+            pass
+    return value
+
+
+def clear(namespaces=None) -> None:
+    """Drop cached values for ``namespaces`` (all when omitted) locally and in Redis."""
+    targets = tuple(namespaces) if namespaces else tuple(SHARED_NAMESPACES | {FISCAL_YEAR_RESOLUTION})
+
+    store = _request_store()
+    if store is not None:
+        for namespace in targets:
+            store["values"].pop(namespace, None)
+
+    redis = _redis()
+    if redis is None:
+        return
+    for namespace in targets:
+        if namespace not in SHARED_NAMESPACES:
+            continue
+        try:
+            redis.delete_value(REDIS_PREFIX + namespace)
+        except Exception:
+            pass
+
+
+def invalidate_dimension_cache(doc, method=None) -> None:
+    """doc_events hook for Budget, Fiscal Year and Cost Center changes."""
+    clear(INVALIDATES.get(getattr(doc, "doctype", None)))
+
+
+@frappe.whitelist()
+def get_cache_stats() -> dict:
+    """Hit/miss counters per namespace for this request and this worker process."""
+    frappe.only_for((roles.SYSTEM_MANAGER,))
+
+    store = _request_store()
+    request_stats = {namespace: dict(counts) for namespace, counts in (store["stats"] if store else {}).items()}
+    process_stats = {namespace: dict(counts) for namespace, counts in _process_stats.items()}
+    return {"request": request_stats, "process": process_stats}
@@ -9,14 +9,17 @@
 
 from __future__ import annotations
 
+from collections import defaultdict
 from datetime import date
 
 import frappe
 from frappe import _
 
-from imogi_finance.budget_control import native_budget
+from imogi_finance.budget_control import availability, balance, native_budget
 from imogi_finance.budget_control.utils import Dimensions, get_settings
 
+ENTRY_DOCTYPE = "Budget Control Entry"
+
 
 def _entry_filters(dims: Dimensions, entry_types: list[str]):
     filters = {
@@ -36,6 +39,26 @@ def _entry_filters(dims: Dimensions, entry_types: list[str]):
     return filters
 
 
+def _load_reserved_rows(dims: Dimensions, from_date: date | None = None, to_date: date | None = None) -> list:
+    try:
+        rows = frappe.get_all(
+            "Budget Control Entry",
+            filters={
+                **_entry_filters(dims, ["RESERVATION", "CONSUMPTION", "REVERSAL"]),
+                **(
+                    {"posting_date": ["between", [from_date, to_date]]}
+                    if from_date and to_date
+                    else {}
+                ),
+            },
+            fields=["entry_type", "direction", "amount"],
+        )
+    except Exception:
+        rows = []
+
+    return rows or []
+
+
 def get_reserved_total(dims: Dimensions, from_date: date | None = None, to_date: date | None = None) -> float:
     """Calculate total reserved budget from Budget Control Entries.
     
@@ -53,21 +76,18 @@ def get_reserved_total(dims: Dimensions, from_date: date | None = None, to_date:
     - PI submit: CONSUMPTION IN +100 → Reserved = 100 - 100 = 0
     - PI cancel: REVERSAL OUT +100 → Reserved = 100 - 100 + 100 = 100
     """
-    try:
-        rows = frappe.get_all(
-            "Budget Control Entry",
-            filters={
-                **_entry_filters(dims, ["RESERVATION", "CONSUMPTION", "REVERSAL"]),
-                **(
-                    {"posting_date": ["between", [from_date, to_date]]}
-                    if from_date and to_date
-                    else {}
-                ),
-            },
-            fields=["entry_type", "direction", "amount"],
+    if not (from_date and to_date) and dims.cost_center and dims.account and balance.is_enabled():
+        totals = balance.get_control_totals(
+            dims.company,
+            dims.fiscal_year,
+            cost_centers=[dims.cost_center],
+            accounts=[dims.account],
+            project=dims.project,
+            branch=dims.branch,
         )
-    except Exception:
-        rows = []
+        rows = totals.get((dims.cost_center, dims.account)) or []
+    else:
+        rows = _load_reserved_rows(dims, from_date=from_date, to_date=to_date)
 
     total = 0.0
     for row in rows or []:
@@ -88,17 +108,8 @@ def get_reserved_total(dims: Dimensions, from_date: date | None = None, to_date:
 
 
 def get_availability(dims: Dimensions, from_date: date | None = None, to_date: date | None = None) -> dict:
-    allocated = native_budget.get_allocated_from_erpnext_budget(dims)
-    actual = native_budget.get_actual_spent(dims, from_date=from_date, to_date=to_date)
-    reserved = get_reserved_total(dims, from_date=from_date, to_date=to_date)
-    available = allocated - actual - reserved
-
-    return {
-        "allocated": allocated,
-        "actual": actual,
-        "reserved": reserved,
-        "available": available,
-    }
+    """Single-dimension view over the set-based engine in ``availability``."""
+    return availability.get_availability_for_dims(dims, from_date=from_date, to_date=to_date).as_dict()
 
 
 def check_budget_available(dims: Dimensions, amount: float, from_date: date | None = None, to_date: date | None = None) -> dict:
@@ -134,6 +145,82 @@ def check_budget_available(dims: Dimensions, amount: float, from_date: date | No
     return snapshot
 
 
+def check_budget_available_batch(
+    slices: list[tuple[Dimensions, float]], from_date: date | None = None, to_date: date | None = None
+) -> list[dict]:
+    """Check many (dims, amount) slices with one availability pass per scope.
+
+    Slices sharing a (cost_center, account) are validated against their combined amount,
+    so the result for each slice reflects everything the request wants from that budget line.
+    Results are returned in slice order with the same shape as ``check_budget_available``.
+    """
+    settings = get_settings()
+    if not settings.get("enable_budget_lock"):
+        return [
+            {"ok": True, "message": _("Budget lock disabled in settings."), "available": None} for _slice in slices
+        ]
+
+    scopes: dict[tuple, list[tuple]] = defaultdict(list)
+    requested: dict[tuple, float] = defaultdict(float)
+    for dims, amount in slices:
+        scope = (dims.company, dims.fiscal_year, dims.project, dims.branch)
+        key = (dims.cost_center, dims.account)
+        scopes[scope].append(key)
+        requested[(scope, key)] += float(amount or 0)
+
+    snapshots: dict[tuple, availability.BudgetAvailability] = {}
+    for scope, keys in scopes.items():
+        company, fiscal_year, project, branch = scope
+        rows = availability.get_availability_map(
+            company,
+            fiscal_year,
+            keys=keys,
+            project=project,
+            branch=branch,
+            from_date=from_date,
+            to_date=to_date,
+        )
+        for key, row in rows.items():
+            snapshots[(scope, key)] = row
+
+    results = []
+    for dims, _amount in slices:
+        scope = (dims.company, dims.fiscal_year, dims.project, dims.branch)
+        lookup = (scope, (dims.cost_center, dims.account))
+        row = snapshots.get(lookup)
+        if not row or not row.budget:
+            results.append(
+                {
+                    "ok": True,
+                    "message": _("No Budget configured for Cost Center {cc} - budget check bypassed.").format(
+                        cc=dims.cost_center or _("(unknown)")
+                    ),
+                    "available": None,
+                    "allocated": None,
+                    "actual": None,
+                    "reserved": None,
+                }
+            )
+            continue
+
+        total_requested = requested[lookup]
+        snapshot = row.as_dict()
+        ok = snapshot["available"] >= total_requested
+        message = (
+            _("Available budget is {available}, requested {amount}.").format(
+                available=snapshot["available"], amount=total_requested
+            )
+            if ok
+            else _("Insufficient budget. Available {available}, requested {amount}.").format(
+                available=snapshot["available"], amount=total_requested
+            )
+        )
+        snapshot.update({"ok": ok, "message": message})
+        results.append(snapshot)
+
+    return results
+
+
 def post_entry(
     entry_type: str,
     dims: Dimensions,
@@ -186,3 +273,81 @@ def post_entry(
         return entry.name
     except Exception:
         return None
+
+
+def _allocate_entry_names(count: int) -> list[str]:
+    """Next ``count`` names from the Budget Control Entry autoname series."""
+    from frappe.model.naming import make_autoname
+
+    autoname = frappe.get_meta(ENTRY_DOCTYPE).autoname
+    return [make_autoname(autoname, ENTRY_DOCTYPE) for _ in range(count)]
+
+
+def post_entries(
+    entry_type: str,
+    rows: list[tuple[Dimensions, float]],
+    direction: str,
+    *,
+    ref_doctype: str | None = None,
+    ref_name: str | None = None,
+    remarks: str | None = None,
+) -> list[str]:
+    """Insert many submitted Budget Control Entries with a single multi-row INSERT.
+
+    Applies the same settings gating as ``post_entry`` and the DocType's entry validation
+    (``validate_entry_values``); names come from the DocType's autoname series. The
+    balance store and metadata fields normally set by doc events are filled in directly.
+    """
+    settings = get_settings()
+    if entry_type in {"RESERVATION", "CONSUMPTION", "REVERSAL"} and not settings.get("enable_budget_lock"):
+        return []
+    if entry_type == "RECLASS" and not settings.get("enable_budget_reclass"):
+        return []
+    if entry_type == "SUPPLEMENT" and not settings.get("enable_additional_budget"):
+        return []
+
+    rows = [(dims, float(amount or 0.0)) for dims, amount in rows or []]
+    if not rows:
+        return []
+
+    from imogi_finance.imogi_finance.doctype.budget_control_entry.budget_control_entry import (
+        validate_entry_values,
+    )
+
+    for _dims, amount in rows:
+        validate_entry_values(entry_type, direction, amount, ref_doctype, ref_name)
+
+    names = _allocate_entry_names(len(rows))
+    now = frappe.utils.now_datetime()
+    user = getattr(getattr(frappe, "session", None), "user", None) or "Administrator"
+    today = date.today()
+
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by", "docstatus",
+        "entry_type", "direction", "company", "posting_date", "fiscal_year", "amount",
+        "cost_center", "account", "project", "branch", "ref_doctype", "ref_name", "remarks",
+        "created_by_user", "submit_on",
+    ]
+    values = []
+    entries = []
+    for name, (dims, amount) in zip(names, rows):
+        values.append(
+            (
+                name, now, now, user, user, 1,
+                entry_type, direction, dims.company, today, dims.fiscal_year, amount,
+                dims.cost_center, dims.account, dims.project, dims.branch, ref_doctype, ref_name, remarks,
+                user, now,
+            )
+        )
+        entries.append(
+            frappe._dict(
+                entry_type=entry_type,
+                direction=direction,
+                amount=amount,
+                **{field: getattr(dims, field, None) for field in balance.DIMENSION_FIELDS},
+            )
+        )
+
+    frappe.db.bulk_insert(ENTRY_DOCTYPE, fields=fields, values=values)
+    balance.apply_entries(entries)
+    return names
@@ -15,10 +15,19 @@ from typing import Iterable
 import frappe
 from frappe import _
 
-from imogi_finance.budget_control.utils import Dimensions
+from imogi_finance.budget_control import dimension_cache
+from imogi_finance.budget_control.utils import Dimensions, get_fiscal_year_dates
 
 
 def _find_budget_for_dims(dims: Dimensions) -> str | None:
+    return dimension_cache.memoize(
+        dimension_cache.BUDGET,
+        (dims.company, dims.fiscal_year, dims.cost_center),
+        lambda: _query_budget_for_dims(dims),
+    )
+
+
+def _query_budget_for_dims(dims: Dimensions) -> str | None:
     filters = {
         "company": dims.company,
         "fiscal_year": dims.fiscal_year,
@@ -43,6 +52,15 @@ def _find_budget_for_dims(dims: Dimensions) -> str | None:
         except Exception:
             budgets = []
 
+    return _pick_budget(budgets, dims)
+
+
+def _pick_budget(budgets: list[dict], dims: Dimensions) -> str | None:
+    """Select the Budget for ``dims`` from the company/fiscal year candidates.
+
+    A Budget scoped to the cost center wins; otherwise a single company-wide Budget is used.
+    Ambiguous matches raise instead of silently picking one.
+    """
     if not budgets:
         return None
 
@@ -72,6 +90,14 @@ def _load_budget_account_row(budget_name: str, account: str | None):
     if not budget_name or not account:
         return None
 
+    return dimension_cache.memoize(
+        dimension_cache.BUDGET_ACCOUNT,
+        (budget_name, account),
+        lambda: _query_budget_account_row(budget_name, account),
+    )
+
+
+def _query_budget_account_row(budget_name: str, account: str):
     try:
         rows = frappe.get_all(
             "Budget Account",
@@ -127,17 +153,11 @@ def get_actual_spent(dims: Dimensions, *, from_date: date | None = None, to_date
         params["from_date"] = from_date
         params["to_date"] = to_date
     elif dims.fiscal_year:
-        try:
-            fy_row = frappe.db.get_value(
-                "Fiscal Year", dims.fiscal_year, ["year_start_date", "year_end_date"], as_dict=True
-            )
-        except Exception:
-            fy_row = None
-
-        if fy_row and fy_row.get("year_start_date") and fy_row.get("year_end_date"):
+        year_start, year_end = get_fiscal_year_dates(dims.fiscal_year)
+        if year_start and year_end:
             date_filters = "and posting_date between %(year_start)s and %(year_end)s"
-            params["year_start"] = fy_row.get("year_start_date")
-            params["year_end"] = fy_row.get("year_end_date")
+            params["year_start"] = year_start
+            params["year_end"] = year_end
 
     branch_filter = ""
     project_filter = ""
@@ -74,6 +74,21 @@ def check_budget_available(
     )
 
 
+def check_budget_available_batch(
+    slices: list[tuple[utils.Dimensions, float]], *, from_date=None, to_date=None
+) -> list[BudgetCheckResult]:
+    results = ledger.check_budget_available_batch(slices, from_date=from_date, to_date=to_date)
+    return [
+        BudgetCheckResult(
+            ok=bool(result.get("ok")),
+            message=result.get("message", ""),
+            available=result.get("available"),
+            snapshot=result,
+        )
+        for result in results
+    ]
+
+
 def post_entry(
     entry_type: str,
     dims: utils.Dimensions,
@@ -15,6 +15,7 @@ from typing import Any
 
 import frappe
 from imogi_finance import roles
+from imogi_finance.budget_control import dimension_cache
 from frappe import _
 
 DEFAULT_SETTINGS = {
@@ -33,6 +34,7 @@ DEFAULT_SETTINGS = {
     "internal_charge_required_before_er_approval": 1,
     "internal_charge_posting_mode": "Auto JE on PI Submit",
     "dimension_mode": "Native (Cost Center + Account)",
+    "enable_shared_dimension_cache": 0,
 }
 
 
@@ -63,21 +65,16 @@ class Dimensions:
 
 
 def _get_settings_doc():
-    from imogi_finance.settings.utils import get_budget_control_settings
+    from imogi_finance.settings.snapshot import get_settings_snapshot
+    from imogi_finance.settings.utils import BUDGET_CONTROL_SETTINGS_DOCTYPE
     try:
-        return get_budget_control_settings()
+        return get_settings_snapshot(BUDGET_CONTROL_SETTINGS_DOCTYPE)
     except Exception:
         return None
 
 
-def get_settings():
+def _load_settings():
     settings = DEFAULT_SETTINGS.copy()
-    if not getattr(frappe, "db", None):
-        return settings
-
-    if not frappe.db.exists("DocType", "Budget Control Settings"):
-        return settings
-
     record = _get_settings_doc()
     if not record:
         return settings
@@ -88,6 +85,17 @@ def get_settings():
     return settings
 
 
+def get_settings():
+    if not getattr(frappe, "db", None):
+        return DEFAULT_SETTINGS.copy()
+
+    from imogi_finance.settings.snapshot import memoize
+    from imogi_finance.settings.utils import BUDGET_CONTROL_SETTINGS_DOCTYPE
+
+    # The memoized dict is shared by the worker process; hand out a copy.
+    return dict(memoize(BUDGET_CONTROL_SETTINGS_DOCTYPE, "budget_settings", _load_settings))
+
+
 @frappe.whitelist()
 def get_settings_for_ui():
     """Whitelisted version of get_settings for browser console access."""
@@ -103,10 +111,32 @@ def resolve_company_from_cost_center(cost_center: str | None) -> str | None:
     if not cost_center or not getattr(frappe, "db", None):
         return None
 
-    try:
-        return frappe.db.get_value("Cost Center", cost_center, "company")
-    except Exception:
-        return None
+    def _load():
+        try:
+            return frappe.db.get_value("Cost Center", cost_center, "company")
+        except Exception:
+            return None
+
+    return dimension_cache.memoize(dimension_cache.COST_CENTER_COMPANY, cost_center, _load)
+
+
+def get_fiscal_year_dates(fiscal_year: str | None) -> tuple:
+    """Return ``(year_start_date, year_end_date)`` for a Fiscal Year, or ``(None, None)``."""
+    if not fiscal_year or not getattr(frappe, "db", None):
+        return None, None
+
+    def _load():
+        try:
+            row = frappe.db.get_value(
+                "Fiscal Year", fiscal_year, ["year_start_date", "year_end_date"], as_dict=True
+            )
+        except Exception:
+            row = None
+        if row and row.get("year_start_date") and row.get("year_end_date"):
+            return row.get("year_start_date"), row.get("year_end_date")
+        return None, None
+
+    return dimension_cache.memoize(dimension_cache.FISCAL_YEAR_DATES, fiscal_year, _load)
 
 
 def resolve_fiscal_year(fiscal_year: str | None, company: str | None = None) -> str | None:
@@ -125,6 +155,12 @@ def resolve_fiscal_year(fiscal_year: str | None, company: str | None = None) ->
     if fiscal_year:
         return fiscal_year
 
+    return dimension_cache.memoize(
+        dimension_cache.FISCAL_YEAR_RESOLUTION, company, lambda: _resolve_default_fiscal_year(company)
+    )
+
+
+def _resolve_default_fiscal_year(company: str | None) -> str | None:
     # Try user defaults
     defaults = getattr(frappe, "defaults", None)
     if defaults and hasattr(defaults, "get_user_default"):
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import json
+import time
 from collections import defaultdict
+from contextlib import contextmanager
 from datetime import date, datetime
 from typing import Iterable
 
@@ -24,6 +26,16 @@ BUDGET_WORKFLOW_STATES = (
 )
 
 
+@contextmanager
+def _timed(timings: dict[str, float], phase: str):
+    """Record the wall time of a block in milliseconds under ``phase``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = (time.perf_counter() - started) * 1000
+
+
 def _get_session_user() -> str | None:
     return getattr(getattr(frappe, "session", None), "user", None)
 
@@ -526,6 +538,7 @@ def reserve_budget_for_request(expense_request, *, trigger_action: str | None =
             )
             return
 
+    started = time.perf_counter()
     try:
         slices = _build_allocation_slices(expense_request, settings=settings, ic_doc=ic_doc)
     except Exception as e:
@@ -534,6 +547,7 @@ def reserve_budget_for_request(expense_request, *, trigger_action: str | None =
             _("Failed to build budget allocation slices. Please check expense items, accounts, and cost centers. Error: {0}").format(str(e)),
             title=_("Budget Allocation Failed")
         )
+    build_elapsed = (time.perf_counter() - started) * 1000
 
     if not slices:
         # Build detailed error message
@@ -574,6 +588,7 @@ def reserve_budget_for_request(expense_request, *, trigger_action: str | None =
         )
 
     frappe.logger().info(f"reserve_budget_for_request: Processing {len(slices)} slices for {getattr(expense_request, 'name', 'Unknown')}")
+    timings: dict[str, float] = {"build_slices": build_elapsed}
 
     controller_role = _require_budget_controller_role(settings)
     reviewer = _get_session_user() or controller_role
@@ -590,9 +605,9 @@ def reserve_budget_for_request(expense_request, *, trigger_action: str | None =
     # Reservation entry tetap ada, hanya di-offset oleh CONSUMPTION saat PI submit
 
     any_overrun = False
-    for dims, amount in slices:
+    with _timed(timings, "check"):
         try:
-            result = service.check_budget_available(dims, float(amount or 0), from_date=from_date, to_date=to_date)
+            results = service.check_budget_available_batch(slices, from_date=from_date, to_date=to_date)
         except Exception as e:
             frappe.logger().error(f"reserve_budget_for_request: Failed to check budget availability: {str(e)}")
             frappe.throw(
@@ -600,6 +615,8 @@ def reserve_budget_for_request(expense_request, *, trigger_action: str | None =
                 title=_("Budget Check Failed")
             )
 
+    # Validate every slice before writing anything so a late failure never leaves partial reservations.
+    for (dims, amount), result in zip(slices, results):
         frappe.logger().info(
             f"reserve_budget_for_request: Budget check for {dims.cost_center}/{dims.account}: "
             f"amount={amount}, available={result.available}, ok={result.ok}"
@@ -628,31 +645,29 @@ def reserve_budget_for_request(expense_request, *, trigger_action: str | None =
                 f"reserve_budget_for_request: Overrun allowed for {dims.cost_center}/{dims.account} by user with special role"
             )
 
-    entries_created = []
-    for dims, amount in slices:
+    with _timed(timings, "post"):
         try:
-            entry_name = ledger.post_entry(
+            entries_created = ledger.post_entries(
                 "RESERVATION",
-                dims,
-                float(amount or 0),
+                [(dims, float(amount or 0)) for dims, amount in slices],
                 "OUT",
                 ref_doctype=_er_ref_doctype,
                 ref_name=getattr(expense_request, "name", None),
                 remarks=_("Budget reservation for Expense Request"),
-            )
-            if entry_name:
-                entries_created.append(entry_name)
-                frappe.logger().info(f"reserve_budget_for_request: ✅ Created reservation {entry_name}")
-            else:
-                frappe.logger().warning(f"reserve_budget_for_request: ⚠️ No entry created for {dims.cost_center}/{dims.account}")
+            ) or []
         except Exception as e:
-            frappe.logger().error(f"reserve_budget_for_request: ❌ Failed to create reservation: {str(e)}")
+            frappe.logger().error(f"reserve_budget_for_request: ❌ Failed to create reservations: {str(e)}")
             frappe.log_error(
                 title=f"Budget Reservation Failed for {getattr(expense_request, 'name', None)}",
-                message=f"Error creating reservation entry: {str(e)}\n\n{frappe.get_traceback()}"
+                message=f"Error creating reservation entries: {str(e)}\n\n{frappe.get_traceback()}"
             )
             raise
 
+    if len(entries_created) != len(slices):
+        frappe.logger().warning(
+            f"reserve_budget_for_request: ⚠️ Created {len(entries_created)} entries for {len(slices)} slices"
+        )
+
     lock_status = "Overrun Allowed" if any_overrun else "Locked"
     if getattr(expense_request, "budget_lock_status", None) != lock_status:
         if hasattr(expense_request, "db_set"):
@@ -664,9 +679,12 @@ def reserve_budget_for_request(expense_request, *, trigger_action: str | None =
             reason=_("Budget {0} during reservation.").format("overrun allowed" if any_overrun else "locked"),
         )
 
+    timings["total"] = (time.perf_counter() - started) * 1000
     frappe.logger().info(
         f"reserve_budget_for_request: ✅ Completed for {getattr(expense_request, 'name', None)} "
-        f"with status {lock_status}. Created {len(entries_created)} entries: {', '.join(entries_created)}"
+        f"with status {lock_status}. Created {len(entries_created)} entries: {', '.join(entries_created)}. "
+        f"Timings (ms) for {len(slices)} slices: "
+        + ", ".join(f"{phase}={elapsed:.1f}" for phase, elapsed in timings.items())
     )
 
     # Show success message to user
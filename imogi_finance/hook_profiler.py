@@ -0,0 +1,286 @@
+"""Opt-in profiler for Imogi Finance doc_event handlers.
+
+When *Profile Doc Event Hooks* is ticked in Finance Control Settings, ``install`` (a
+``before_request`` / ``before_job`` hook) replaces every ``imogi_finance.*`` handler
+registered under ``doc_events`` with a wrapper, once per worker process. Frappe resolves
+handlers by dotted path on every call, so the wrappers take effect immediately.
+
+Each call records wall time, SQL queries and rows returned by those queries. Query
+counts come from a wrapper around ``Database.sql`` that only counts while a profiled
+handler is running; counts are inclusive of nested handlers (a handler that saves
+another document also pays for that document's hooks).
+
+Calls aggregate into hourly Redis hashes keyed ``doctype|event|handler`` holding call
+count, total/max time, queries, rows, a latency histogram (``BUCKETS_MS``) and the
+number of calls over the latency budget. Buckets older than *Profile Window (hours)*
+expire. Calls over *Hook Latency Budget (ms)* are logged to the
+``imogi_finance.hook_profiler`` logger. ``get_profile`` merges the window and ranks
+handlers by estimated p95; the *Doc Event Hook Profile* report shows it.
+
+Unticking the setting turns the installed wrappers into pass-throughs.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+from typing import Any, Callable
+
+import frappe
+from frappe.utils import cint
+
+PROFILE_PREFIX = "imogi_finance:hook_profile:"
+LOCAL_FRAMES = "imogi_hook_profile_frames"
+HANDLER_PREFIX = "imogi_finance."
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+DEFAULT_BUDGET_MS = 500
+DEFAULT_WINDOW_HOURS = 24
+SETTINGS_KEY = "hook_profiler"
+
+_installed = False
+
+
+def _load_settings() -> dict[str, Any]:
+    from imogi_finance.settings.snapshot import get_settings_snapshot
+    from imogi_finance.settings.utils import FINANCE_CONTROL_SETTINGS_DOCTYPE
+
+    snapshot = get_settings_snapshot(FINANCE_CONTROL_SETTINGS_DOCTYPE)
+    if not snapshot:
+        return {"enabled": False, "budget_ms": DEFAULT_BUDGET_MS, "window_hours": DEFAULT_WINDOW_HOURS}
+
+    budget = snapshot.get("hook_latency_budget_ms")
+    window = cint(snapshot.get("hook_profile_window_hours")) or DEFAULT_WINDOW_HOURS
+    return {
+        "enabled": bool(cint(snapshot.get("enable_hook_profiler"))),
+        "budget_ms": DEFAULT_BUDGET_MS if budget is None else cint(budget),
+        "window_hours": max(1, window),
+    }
+
+
+def get_settings() -> dict[str, Any]:
+    from imogi_finance.settings.snapshot import memoize
+    from imogi_finance.settings.utils import FINANCE_CONTROL_SETTINGS_DOCTYPE
+
+    try:
+        return memoize(FINANCE_CONTROL_SETTINGS_DOCTYPE, SETTINGS_KEY, _load_settings)
+    except Exception:
+        return {"enabled": False, "budget_ms": DEFAULT_BUDGET_MS, "window_hours": DEFAULT_WINDOW_HOURS}
+
+
+def install() -> None:
+    """before_request / before_job hook: wrap Imogi doc_event handlers once profiling is on."""
+    global _installed
+    if _installed or not get_settings()["enabled"]:
+        return
+
+    for path in _handler_paths(frappe.get_hooks("doc_events") or {}):
+        try:
+            _wrap(path)
+        except Exception:
+            frappe.logger("imogi_finance.hook_profiler").warning(f"Cannot profile {path}", exc_info=True)
+    _patch_sql()
+    _installed = True
+
+
+def _handler_paths(doc_events: dict) -> list[str]:
+    paths = []
+    for events in doc_events.values():
+        for handlers in (events or {}).values():
+            for path in handlers if isinstance(handlers, (list, tuple)) else [handlers]:
+                if isinstance(path, str) and path.startswith(HANDLER_PREFIX) and path not in paths:
+                    paths.append(path)
+    return paths
+
+
+def _wrap(path: str) -> None:
+    module_name, attr = path.rsplit(".", 1)
+    module = frappe.get_module(module_name)
+    handler = getattr(module, attr)
+    if getattr(handler, "_imogi_profiled", False):
+        return
+    setattr(module, attr, profiled(path, handler))
+
+
+def profiled(path: str, handler: Callable) -> Callable:
+    """Wrap a ``handler(doc, method)`` doc_event function so each call is recorded under ``path``."""
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        settings = get_settings()
+        if not settings["enabled"]:
+            return handler(*args, **kwargs)
+
+        doc = args[0] if args else kwargs.get("doc")
+        event = args[1] if len(args) > 1 else kwargs.get("method")
+        frame = [0, 0]
+        frames = _frames()
+        frames.append(frame)
+        started = time.perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            frames.pop()
+            try:
+                record(getattr(doc, "doctype", None) or "*", event or "", path, elapsed_ms, frame[0], frame[1], settings)
+            except Exception:
+                pass
+
+    wrapper._imogi_profiled = True
+    return wrapper
+
+
+def _frames() -> list:
+    frames = getattr(frappe.local, LOCAL_FRAMES, None)
+    if frames is None:
+        frames = []
+        setattr(frappe.local, LOCAL_FRAMES, frames)
+    return frames
+
+
+def count_query(result: Any) -> None:
+    """Add one query and its returned rows to every profiled handler currently running."""
+    frames = getattr(frappe.local, LOCAL_FRAMES, None)
+    if not frames:
+        return
+    rows = len(result) if isinstance(result, (list, tuple)) else 0
+    for frame in frames:
+        frame[0] += 1
+        frame[1] += rows
+
+
+def _patch_sql() -> None:
+    from frappe.database.database import Database
+
+    original = Database.sql
+    if getattr(original, "_imogi_profiled", False):
+        return
+
+    @functools.wraps(original)
+    def sql(self, *args, **kwargs):
+        result = original(self, *args, **kwargs)
+        count_query(result)
+        return result
+
+    sql._imogi_profiled = True
+    Database.sql = sql
+
+
+def _hour_key(timestamp: float) -> str:
+    return PROFILE_PREFIX + time.strftime("%Y%m%d%H", time.gmtime(timestamp))
+
+
+def _bucket_index(elapsed_ms: float) -> int:
+    for idx, bound in enumerate(BUCKETS_MS):
+        if elapsed_ms <= bound:
+            return idx
+    return len(BUCKETS_MS)
+
+
+def _empty_stats() -> dict[str, Any]:
+    return {
+        "calls": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "queries": 0,
+        "rows": 0,
+        "over_budget": 0,
+        "histogram": [0] * (len(BUCKETS_MS) + 1),
+    }
+
+
+def record(
+    doctype: str,
+    event: str,
+    handler: str,
+    elapsed_ms: float,
+    queries: int,
+    rows: int,
+    settings: dict | None = None,
+) -> None:
+    """Add one call to the current hour's histogram and log it if it is over budget."""
+    settings = settings or get_settings()
+    budget_ms = settings["budget_ms"]
+    over_budget = bool(budget_ms) and elapsed_ms > budget_ms
+    if over_budget:
+        frappe.logger("imogi_finance.hook_profiler").warning(
+            f"[HOOK BUDGET] {doctype}.{event} {handler} took {elapsed_ms:.1f} ms "
+            f"(budget {budget_ms} ms, {queries} queries, {rows} rows)"
+        )
+
+    cache = frappe.cache()
+    key = _hour_key(time.time())
+    field = f"{doctype}|{event}|{handler}"
+    stats = cache.hget(key, field) or _empty_stats()
+    stats["calls"] += 1
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    stats["queries"] += queries
+    stats["rows"] += rows
+    stats["over_budget"] += int(over_budget)
+    stats["histogram"][_bucket_index(elapsed_ms)] += 1
+    cache.hset(key, field, stats)
+    cache.expire(cache.make_key(key), (settings["window_hours"] + 1) * 3600)
+
+
+def _percentile_ms(histogram: list[int], max_ms: float, fraction: float) -> float:
+    """Upper bound of the histogram bucket holding the given fraction of calls."""
+    target = sum(histogram) * fraction
+    seen = 0
+    for idx, count in enumerate(histogram):
+        seen += count
+        if count and seen >= target:
+            return float(BUCKETS_MS[idx]) if idx < len(BUCKETS_MS) else max_ms
+    return 0.0
+
+
+def get_profile(hours: int | None = None, doctype: str | None = None) -> list[dict[str, Any]]:
+    """Per ``(doctype, event, handler)`` totals over the last ``hours``, slowest p95 first."""
+    hours = max(1, cint(hours) or get_settings()["window_hours"])
+    cache = frappe.cache()
+    now = time.time()
+    merged: dict[str, dict[str, Any]] = {}
+    for offset in range(hours):
+        for field, stats in (cache.hgetall(_hour_key(now - offset * 3600)) or {}).items():
+            total = merged.setdefault(field, _empty_stats())
+            for name in ("calls", "total_ms", "queries", "rows", "over_budget"):
+                total[name] += stats.get(name, 0)
+            total["max_ms"] = max(total["max_ms"], stats.get("max_ms", 0.0))
+            total["histogram"] = [a + b for a, b in zip(total["histogram"], stats.get("histogram") or [])]
+
+    rows = []
+    for field, stats in merged.items():
+        row_doctype, event, handler = field.split("|", 2)
+        if (doctype and row_doctype != doctype) or not stats["calls"]:
+            continue
+        calls = stats["calls"]
+        rows.append(
+            {
+                "doctype": row_doctype,
+                "event": event,
+                "handler": handler,
+                "calls": calls,
+                "avg_ms": round(stats["total_ms"] / calls, 2),
+                "p50_ms": _percentile_ms(stats["histogram"], stats["max_ms"], 0.5),
+                "p95_ms": _percentile_ms(stats["histogram"], stats["max_ms"], 0.95),
+                "max_ms": round(stats["max_ms"], 2),
+                "total_ms": round(stats["total_ms"], 2),
+                "avg_queries": round(stats["queries"] / calls, 2),
+                "avg_rows": round(stats["rows"] / calls, 2),
+                "over_budget": stats["over_budget"],
+            }
+        )
+    rows.sort(key=lambda row: (row["p95_ms"], row["avg_ms"]), reverse=True)
+    return rows
+
+
+@frappe.whitelist()
+def reset_profile() -> None:
+    """Drop all recorded hook timings."""
+    from imogi_finance import roles
+
+    frappe.only_for((roles.SYSTEM_MANAGER,))
+    cache = frappe.cache()
+    now = time.time()
+    for offset in range(max(get_settings()["window_hours"], DEFAULT_WINDOW_HOURS) + 1):
+        cache.delete_value(_hour_key(now - offset * 3600))
@@ -249,10 +249,18 @@ doc_events = {
             "imogi_finance.events.purchase_invoice.manage_direct_pi_ppn_variance",
         ],
         "before_submit": "imogi_finance.events.purchase_invoice.validate_before_submit",
-        "on_submit": "imogi_finance.events.purchase_invoice.on_submit",
+        "on_submit": [
+            "imogi_finance.events.purchase_invoice.on_submit",
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
+        ],
         "on_update_after_submit": "imogi_finance.events.purchase_invoice.sync_expense_request_status_from_pi",
         "before_cancel": "imogi_finance.events.purchase_invoice.before_cancel",
-        "on_cancel": "imogi_finance.events.purchase_invoice.on_cancel",
+        "on_cancel": [
+            "imogi_finance.events.purchase_invoice.on_cancel",
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
+        ],
         "before_delete": "imogi_finance.events.purchase_invoice.before_delete",
         "on_trash": "imogi_finance.events.purchase_invoice.on_trash",
     },
@@ -263,6 +271,14 @@ doc_events = {
             "imogi_finance.validators.finance_validator.validate_document_tax_fields",
         ],
         "on_update_after_submit": "imogi_finance.events.sales_invoice.on_update_after_submit",
+        "on_submit": [
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
+        ],
+        "on_cancel": [
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
+        ],
     },
     "Sales Order": {
         "validate": "imogi_finance.events.sales_order.compute_outstanding_amount",
@@ -270,7 +286,15 @@ doc_events = {
     },
     "Expense Claim": {
         "before_submit": "imogi_finance.expense_claim_integration.expense_claim_advances.set_approval_status",
-        "on_submit": "imogi_finance.expense_claim_integration.expense_claim_advances.link_employee_advances",
+        "on_submit": [
+            "imogi_finance.expense_claim_integration.expense_claim_advances.link_employee_advances",
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
+        ],
+        "on_cancel": [
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
+        ],
     },
     "Expense Request": {
         "validate": [
@@ -397,6 +421,8 @@ doc_events = {
             "imogi_finance.receipt_control.payment_entry_hooks.record_payment_entry",
             "imogi_finance.transfer_application.payment_entry_hooks.on_submit",
             "imogi_finance.events.sales_order.update_sales_order_outstanding_from_payment",
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
         ],
         "on_update_after_submit": [
             "imogi_finance.events.payment_entry.on_update_after_submit",
@@ -409,6 +435,8 @@ doc_events = {
             "imogi_finance.receipt_control.payment_entry_hooks.remove_payment_entry",
             "imogi_finance.transfer_application.payment_entry_hooks.on_cancel",
             "imogi_finance.events.sales_order.update_sales_order_outstanding_from_payment",
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
         ],
         "before_delete": "imogi_finance.events.payment_entry.before_delete",
         "on_trash": [
@@ -417,13 +445,66 @@ doc_events = {
     },
     "Bank Transaction": {
         "before_cancel": "imogi_finance.events.bank_transaction.before_cancel",
-        "on_submit": "imogi_finance.transfer_application.matching.handle_bank_transaction",
+        "on_update": "imogi_finance.reporting.checkpoints.invalidate_for_bank_transaction",
+        "on_submit": [
+            "imogi_finance.transfer_application.matching.handle_bank_transaction",
+            "imogi_finance.reporting.checkpoints.invalidate_for_bank_transaction",
+        ],
         "on_update_after_submit": [
             "imogi_finance.transfer_application.matching.handle_bank_transaction",
             "imogi_finance.events.bank_transaction.on_update_after_submit",
+            "imogi_finance.reporting.checkpoints.invalidate_for_bank_transaction",
+        ],
+        "on_cancel": "imogi_finance.reporting.checkpoints.invalidate_for_bank_transaction",
+        "on_trash": "imogi_finance.reporting.checkpoints.invalidate_for_bank_transaction",
+    },
+    "Journal Entry": {
+        "on_submit": [
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
+        ],
+        "on_cancel": [
+            "imogi_finance.tax_period_aggregates.invalidate_for_voucher",
+            "imogi_finance.reporting.checkpoints.invalidate_for_voucher",
         ],
     },
     "Payroll Entry": {},
+    "Budget": {
+        "on_update": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+        "on_submit": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+        "on_update_after_submit": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+        "on_cancel": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+        "on_trash": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+    },
+    "Fiscal Year": {
+        "on_update": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+        "on_trash": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+    },
+    "Cost Center": {
+        "on_update": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+        "on_trash": "imogi_finance.budget_control.dimension_cache.invalidate_dimension_cache",
+    },
+    "Finance Control Settings": {
+        "on_update": "imogi_finance.settings.snapshot.invalidate_settings_snapshot",
+    },
+    "Budget Control Settings": {
+        "on_update": "imogi_finance.settings.snapshot.invalidate_settings_snapshot",
+    },
+    "Tax Invoice OCR Settings": {
+        "on_update": "imogi_finance.settings.snapshot.invalidate_settings_snapshot",
+    },
+    "Transfer Application Settings": {
+        "on_update": "imogi_finance.settings.snapshot.invalidate_settings_snapshot",
+    },
+    "Receipt Control Settings": {
+        "on_update": "imogi_finance.settings.snapshot.invalidate_settings_snapshot",
+    },
+    "Expense Deferred Settings": {
+        "on_update": "imogi_finance.settings.snapshot.invalidate_settings_snapshot",
+    },
+    "Letter Template Settings": {
+        "on_update": "imogi_finance.settings.snapshot.invalidate_settings_snapshot",
+    },
 }
 
 if is_payroll_installed():
@@ -441,6 +522,7 @@ scheduler_events = {
     "daily": [
         "imogi_finance.reporting.tasks.run_daily_reporting",
         "imogi_finance.services.tax_invoice_service.sync_pending_tax_invoices",
+        "imogi_finance.ocr_cache.evict_ocr_cache",
     ],
     "monthly": [
         "imogi_finance.reporting.tasks.run_monthly_reconciliation",
@@ -449,7 +531,8 @@ scheduler_events = {
     # Runs every 15 minutes to handle worker crashes/restarts
     "cron": {
         "*/15 * * * *": [
-            "imogi_finance.tax_invoice_ocr.recover_stale_ocr_jobs"
+            "imogi_finance.tax_invoice_ocr.recover_stale_ocr_jobs",
+            "imogi_finance.reporting.tasks.top_up_daily_reporting",
         ]
     },
 }
@@ -497,12 +580,13 @@ override_whitelisted_methods = {
 
 # Request Events
 # ----------------
-# before_request = ["imogi_finance.utils.before_request"]
+# Installs the doc_event profiler when enabled in Finance Control Settings
+before_request = ["imogi_finance.hook_profiler.install"]
 # after_request = ["imogi_finance.utils.after_request"]
 
 # Job Events
 # ----------
-# before_job = ["imogi_finance.utils.before_job"]
+before_job = ["imogi_finance.hook_profiler.install"]
 # after_job = ["imogi_finance.utils.after_job"]
 
 # User Data Protection
@@ -0,0 +1 @@
+"""Budget control balance doctype package."""
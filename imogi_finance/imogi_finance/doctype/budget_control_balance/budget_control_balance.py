@@ -0,0 +1,28 @@
+# Copyright (c) 2026, PT. Inovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+from __future__ import annotations
+
+try:
+    from frappe.model.document import Document
+except Exception:  # pragma: no cover - fallback for test stubs
+    class Document:  # type: ignore
+        def __init__(self, *args, **kwargs):
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+
+class BudgetControlBalance(Document):
+    """Materialized running totals of Budget Control Entries per dimension.
+
+    Rows are keyed by a deterministic name derived from the dimensions (see
+    ``imogi_finance.budget_control.balance.balance_key``) and are only written by
+    Budget Control Entry submit/cancel or the rebuild command.
+    """
+
+    def autoname(self):
+        from imogi_finance.budget_control.balance import balance_key
+
+        self.name = balance_key(
+            self.company, self.fiscal_year, self.cost_center, self.account, self.project, self.branch
+        )
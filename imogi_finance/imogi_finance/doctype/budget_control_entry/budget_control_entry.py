@@ -6,6 +6,8 @@ from __future__ import annotations
 import frappe
 from frappe import _
 
+from imogi_finance.budget_control import balance
+
 try:
     from frappe.model.document import Document
 except Exception:  # pragma: no cover - fallback for test stubs
@@ -52,33 +54,17 @@ Manual entry creation would corrupt budget tracking."""),
             )
 
     def validate(self):
-        if getattr(self, "amount", 0) is None or float(self.amount) <= 0:
-            frappe.throw(_("Amount must be greater than zero."))
-
-        if getattr(self, "entry_type", None) not in self.VALID_ENTRY_TYPES:
-            frappe.throw(_("Entry Type must be one of: {0}").format(", ".join(sorted(self.VALID_ENTRY_TYPES))))
-
-        if getattr(self, "direction", None) not in self.VALID_DIRECTIONS:
-            frappe.throw(_("Direction must be IN or OUT."))
-
-        # Validate ref_doctype and ref_name consistency
-        if getattr(self, "ref_doctype", None) and not getattr(self, "ref_name", None):
-            frappe.throw(_("Reference Name is required when Reference DocType is set"))
-
-        if getattr(self, "ref_name", None) and not getattr(self, "ref_doctype", None):
-            frappe.throw(_("Reference DocType is required when Reference Name is set"))
-
-        # Validate entry_type and direction combinations
-        entry_type = getattr(self, "entry_type", None)
-        direction = getattr(self, "direction", None)
-        if entry_type in self.VALID_COMBINATIONS:
-            if direction not in self.VALID_COMBINATIONS[entry_type]:
-                frappe.throw(
-                    _("Invalid combination: {0} must have direction {1}").format(
-                        entry_type,
-                        " or ".join(self.VALID_COMBINATIONS[entry_type])
-                    )
-                )
+        validate_entry_values(
+            getattr(self, "entry_type", None),
+            getattr(self, "direction", None),
+            getattr(self, "amount", 0),
+            getattr(self, "ref_doctype", None),
+            getattr(self, "ref_name", None),
+        )
+
+    def on_submit(self):
+        # Keep the per-dimension running totals in the same transaction as the entry.
+        balance.apply_entry(self, 1)
 
     def before_cancel(self):
         """Prevent manual cancellation of Budget Control Entries.
@@ -167,8 +153,39 @@ Manual cancellation would corrupt budget tracking."""),
         This is called when cancellation proceeds (either programmatically allowed
         or if before_cancel somehow didn't block it).
         """
+        balance.apply_entry(self, -1)
+
         if not self.flags.get("ignore_permissions") and not self.flags.get("from_parent_cancel"):
             frappe.log_error(
                 title="Unexpected Budget Control Entry Cancellation",
                 message=f"Budget Control Entry {self.name} was cancelled without proper flags! This may indicate a bug."
             )
+
+
+def validate_entry_values(entry_type, direction, amount, ref_doctype=None, ref_name=None) -> None:
+    """Entry checks shared by ``BudgetControlEntry.validate`` and ``ledger.post_entries``."""
+    if amount is None or float(amount) <= 0:
+        frappe.throw(_("Amount must be greater than zero."))
+
+    if entry_type not in BudgetControlEntry.VALID_ENTRY_TYPES:
+        frappe.throw(_("Entry Type must be one of: {0}").format(", ".join(sorted(BudgetControlEntry.VALID_ENTRY_TYPES))))
+
+    if direction not in BudgetControlEntry.VALID_DIRECTIONS:
+        frappe.throw(_("Direction must be IN or OUT."))
+
+    # Validate ref_doctype and ref_name consistency
+    if ref_doctype and not ref_name:
+        frappe.throw(_("Reference Name is required when Reference DocType is set"))
+
+    if ref_name and not ref_doctype:
+        frappe.throw(_("Reference DocType is required when Reference Name is set"))
+
+    # Validate entry_type and direction combinations
+    if entry_type in BudgetControlEntry.VALID_COMBINATIONS:
+        if direction not in BudgetControlEntry.VALID_COMBINATIONS[entry_type]:
+            frappe.throw(
+                _("Invalid combination: {0} must have direction {1}").format(
+                    entry_type,
+                    " or ".join(BudgetControlEntry.VALID_COMBINATIONS[entry_type])
+                )
+            )
@@ -0,0 +1,25 @@
+# Copyright (c) 2026, PT. Inovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+from __future__ import annotations
+
+try:
+    from frappe.model.document import Document
+except Exception:  # pragma: no cover - fallback for test stubs
+    class Document:  # type: ignore
+        def __init__(self, *args, **kwargs):
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+
+class CashBankBalanceCheckpoint(Document):
+    """Closing balance of one bank/cash account and branch at the end of a day.
+
+    Rows are keyed by ``imogi_finance.reporting.checkpoints.checkpoint_key`` and are
+    only written by Cash Bank Daily Report generation/submission.
+    """
+
+    def autoname(self):
+        from imogi_finance.reporting.checkpoints import checkpoint_key
+
+        self.name = checkpoint_key(self.account_doctype, self.account, self.branch, self.checkpoint_date)
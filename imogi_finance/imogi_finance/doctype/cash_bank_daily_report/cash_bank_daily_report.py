@@ -84,6 +84,27 @@ class CashBankDailyReport(Document):
             if self.report_date:
                 self.generate_snapshot()
 
+        # Also runs on insert and submit, so every generated/submitted report leaves
+        # an end-of-day checkpoint for the next report's opening balance.
+        self._write_balance_checkpoints()
+
+    def _write_balance_checkpoints(self):
+        if not self.report_date or not (self.bank_account or self.cash_account):
+            return
+
+        from imogi_finance.reporting.checkpoints import write_checkpoints
+
+        try:
+            write_checkpoints(
+                self.report_date,
+                bank_account=None if self.cash_account else self.bank_account,
+                cash_account=self.cash_account or None,
+                source_report=self.name,
+            )
+        except Exception as e:
+            # Checkpoints are an optimisation; never block the report itself
+            frappe.log_error(f"Error writing balance checkpoints for {self.name}: {e}", "Balance Checkpoint")
+
     def on_submit(self):
         """Called when report is submitted (transitioned to Printed state).
 
@@ -315,17 +336,29 @@ class CashBankDailyReport(Document):
         else:
             report_date_obj = self.report_date
 
+        # Opening balances prefer the nearest balance checkpoint (see load_daily_inputs)
+        from imogi_finance.reporting.checkpoints import get_latest_checkpoint_date
+
+        checkpoint_date = get_latest_checkpoint_date(
+            report_date_obj,
+            bank_account=None if self.cash_account else self.bank_account,
+            cash_account=self.cash_account or None,
+        )
+
+        # The previous-day report is only consulted without a checkpoint
         prev_balances = None
-        if self.bank_account:
+        if not checkpoint_date and self.bank_account:
             prev_balances = get_previous_report_closing_balances(
                 report_date_obj, bank_account=self.bank_account
             )
-        elif self.cash_account:
+        elif not checkpoint_date and self.cash_account:
             prev_balances = get_previous_report_closing_balances(
                 report_date_obj, cash_account=self.cash_account
             )
 
-        if prev_balances:
+        if checkpoint_date:
+            self.opening_source = "Balance Checkpoint"
+        elif prev_balances:
             self.opening_source = "Previous Report"
         else:
             self.opening_source = "Calculated from Transactions"
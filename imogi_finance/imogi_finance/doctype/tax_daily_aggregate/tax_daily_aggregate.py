@@ -0,0 +1,25 @@
+# Copyright (c) 2026, PT. Inovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+from __future__ import annotations
+
+try:
+    from frappe.model.document import Document
+except Exception:  # pragma: no cover - fallback for test stubs
+    class Document:  # type: ignore
+        def __init__(self, *args, **kwargs):
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+
+class TaxDailyAggregate(Document):
+    """Tax totals of one company, day and component (optionally per account).
+
+    Rows are keyed by ``imogi_finance.tax_period_aggregates.aggregate_key`` and are
+    only written by Tax Period Closing snapshot generation.
+    """
+
+    def autoname(self):
+        from imogi_finance.tax_period_aggregates import aggregate_key
+
+        self.name = aggregate_key(self.company, self.posting_date, self.component, self.account)
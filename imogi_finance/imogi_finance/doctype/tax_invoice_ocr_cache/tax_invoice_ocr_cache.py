@@ -0,0 +1,25 @@
+# Copyright (c) 2026, PT. Inovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+from __future__ import annotations
+
+try:
+    from frappe.model.document import Document
+except Exception:  # pragma: no cover - fallback for test stubs
+    class Document:  # type: ignore
+        def __init__(self, *args, **kwargs):
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+
+class TaxInvoiceOCRCache(Document):
+    """OCR provider output for one PDF content hash and OCR setting combination.
+
+    Rows are keyed by ``imogi_finance.ocr_cache.cache_key`` and are only written by
+    ``ocr_extract_text_from_pdf``.
+    """
+
+    def autoname(self):
+        from imogi_finance.ocr_cache import cache_key
+
+        self.name = cache_key(self.content_hash, self.provider, self.language, self.max_pages)
@@ -123,11 +123,51 @@ class TaxInvoiceOCRMonitoring(Document):
         self.verification_status = ocr_upload.get("verification_status")
         self.verification_notes = ocr_upload.get("verification_notes")
 
-        # Check if raw JSON exists
-        ocr_json = ocr_upload.get("ocr_raw_json")
-        if ocr_json:
+        # Check if raw JSON exists (loaded from its compressed attachment on demand)
+        from imogi_finance import ocr_raw_store
+
+        if ocr_raw_store.has_payload(ocr_upload, "Tax Invoice OCR Upload"):
             self.ocr_raw_json_present = 1
-            self.ocr_raw_json = ocr_json
+            self.ocr_raw_json = ocr_raw_store.load_text(ocr_upload, "Tax Invoice OCR Upload")
+
+    def _populate_pipeline(self):
+        """Fetch OCR pipeline state for the upload, pipeline throughput/latency and OCR cache usage"""
+        from imogi_finance import ocr_cache, ocr_pipeline
+
+        upload_name = self.upload_name or (
+            self.target_name if self.target_doctype == "Tax Invoice OCR Upload" else None
+        )
+        state = ocr_pipeline.get_doc_pipeline_state("Tax Invoice OCR Upload", upload_name) if upload_name else None
+        state = state or {}
+        self.pipeline_status = state.get("status")
+        self.pipeline_priority = state.get("priority")
+        self.pipeline_queue_seconds = state.get("queue_seconds")
+        self.pipeline_run_seconds = state.get("run_seconds")
+        pages = state.get("pages") or []
+        self.pipeline_failed_pages = sum(1 for page in pages if not page.get("ok"))
+        self.pipeline_page_timings = json.dumps(pages, indent=2) if pages else None
+
+        metrics = ocr_pipeline.get_pipeline_metrics()
+        self.pipeline_queue_depth = sum(metrics["queue_depth"].values())
+        self.pipeline_running_jobs = metrics["running_jobs"]
+        self.pipeline_throughput_per_minute = metrics["throughput_per_minute"]
+        self.pipeline_latency_p50_seconds = metrics["latency_p50_seconds"]
+        self.pipeline_latency_p95_seconds = metrics["latency_p95_seconds"]
+
+        cache_stats = ocr_cache.get_cache_stats()
+        self.ocr_cache_hit_rate = cache_stats["hit_rate"]
+        self.ocr_cache_entries = cache_stats["entries"]
+        self.ocr_cache_size_mb = cache_stats["size_mb"]
+        self.pipeline_metrics = json.dumps(
+            {
+                "queue": metrics["queue"],
+                "queue_depth": metrics["queue_depth"],
+                "counters": metrics["counters"],
+                "ocr_cache": cache_stats,
+            },
+            indent=2,
+            default=str,
+        )
 
     @frappe.whitelist()
     def refresh_status(self):
@@ -136,6 +176,10 @@ class TaxInvoiceOCRMonitoring(Document):
 
         # Use new populate logic for all supported doctypes
         self._populate_from_target()
+        try:
+            self._populate_pipeline()
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), "Tax Invoice OCR pipeline metrics failed")
         self.save(ignore_permissions=True)
         return {"success": True, "message": _("Data refreshed successfully")}
         doc_info = result.get("doc") or {}
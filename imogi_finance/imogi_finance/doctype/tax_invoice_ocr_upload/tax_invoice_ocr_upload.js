@@ -85,7 +85,7 @@ frappe.ui.form.on('Tax Invoice OCR Upload', {
 				frm.add_custom_button(__('Run OCR'), async () => {
 					await frappe.call({
 						method: 'imogi_finance.api.tax_invoice.run_ocr_for_upload',
-						args: { upload_name: frm.doc.name },
+						args: { upload_name: frm.doc.name, priority: 'high' },
 						freeze: true,
 						freeze_message: __('Queueing OCR...'),
 					});
@@ -97,7 +97,7 @@ frappe.ui.form.on('Tax Invoice OCR Upload', {
 				frm.add_custom_button(__('🔄 Re-Run OCR'), async () => {
 					await frappe.call({
 						method: 'imogi_finance.api.tax_invoice.run_ocr_for_upload',
-						args: { upload_name: frm.doc.name },
+						args: { upload_name: frm.doc.name, priority: 'high' },
 						freeze: true,
 						freeze_message: __('Queueing OCR...'),
 					});
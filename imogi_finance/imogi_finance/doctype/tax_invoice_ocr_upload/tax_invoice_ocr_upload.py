@@ -568,7 +568,7 @@ class TaxInvoiceOCRUpload(Document):
                 frappe.logger().info(f"[AFTER_INSERT] {self.name}: Scanned PDF detected, auto-queueing OCR")
 
                 from imogi_finance.api.tax_invoice import run_ocr_for_upload
-                run_ocr_for_upload(self.name)
+                run_ocr_for_upload(self.name, priority="low")
 
                 # Update status to show OCR is queued
                 frappe.db.set_value(
@@ -52,7 +52,7 @@ frappe.listview_settings["Tax Invoice OCR Upload"] = {
         listview,
         actionLabel: __("Run OCR"),
         method: "imogi_finance.api.tax_invoice.run_ocr_for_upload",
-        argsFactory: (name) => ({ upload_name: name }),
+        argsFactory: (name) => ({ upload_name: name, priority: "low" }),
         freezeMessage: __("Queueing OCR..."),
         successMessage: __("OCR queued."),
       });
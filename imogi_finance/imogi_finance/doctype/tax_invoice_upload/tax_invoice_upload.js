@@ -227,7 +227,7 @@ function start_bulk_creation(values, listview) {
 				
 				// Check if job was queued for background processing
 				if (result.queued) {
-					show_progress_dialog(result.job_id, listview);
+					show_progress_dialog(result.job_id, result.import_id, listview);
 				} else {
 					// Show immediate results
 					show_bulk_results(result, listview);
@@ -237,7 +237,7 @@ function start_bulk_creation(values, listview) {
 	});
 }
 
-function show_progress_dialog(job_id, listview) {
+function show_progress_dialog(job_id, import_id, listview) {
 	let progress_dialog = new frappe.ui.Dialog({
 		title: __('Processing Bulk Creation'),
 		indicator: 'blue',
@@ -267,7 +267,8 @@ function show_progress_dialog(job_id, listview) {
 		frappe.call({
 			method: 'imogi_finance.imogi_finance.doctype.tax_invoice_upload.tax_invoice_upload_api.get_bulk_job_status',
 			args: {
-				job_id: job_id
+				job_id: job_id,
+				import_id: import_id
 			},
 			callback: function(r) {
 				if (r.message) {
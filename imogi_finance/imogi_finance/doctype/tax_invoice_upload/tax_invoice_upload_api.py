@@ -3,7 +3,9 @@
 
 from __future__ import annotations
 
+import copy
 import csv
+import hashlib
 import io
 import os
 import re
@@ -16,6 +18,11 @@ from frappe.utils.file_manager import get_file_path, save_file
 
 from imogi_finance.services.tax_invoice_service import sync_tax_invoice_with_sales
 
+# Rows created/updated per database commit during bulk creation
+BULK_COMMIT_CHUNK_SIZE = 50
+BULK_PROGRESS_CACHE_PREFIX = "imogi_finance:bulk_tax_invoice_upload:"
+BULK_PROGRESS_TTL_SECONDS = 7 * 24 * 60 * 60
+
 
 def normalize_fp_number(fp_number: str) -> str:
 	"""Normalize FP number to 16 digits (remove punctuation).
@@ -43,13 +50,15 @@ def bulk_create_from_csv(
 	csv_url: str,
 	require_all_batch_invoices: int = 0,
 	require_all_csv_have_pdf: int = 0,
-	overwrite_existing: int = 0
+	overwrite_existing: int = 0,
+	chunk_size: int = BULK_COMMIT_CHUNK_SIZE
 ) -> dict[str, Any]:
 	"""Bulk create Tax Invoice Upload records from CSV + ZIP files.
 	
 	Phase 1: Validate CSV structure and content
-	Phase 2: Inspect ZIP contents and match PDFs
-	Phase 3: Create/update Tax Invoice Upload records
+	Phase 2: Index ZIP contents and match PDFs
+	Phase 3: Create/update Tax Invoice Upload records, committing every
+	``chunk_size`` rows
 	
 	Args:
 		batch_name: VAT OUT Batch name
@@ -58,10 +67,13 @@ def bulk_create_from_csv(
 		require_all_batch_invoices: Fail if batch invoices not in CSV
 		require_all_csv_have_pdf: Fail if CSV rows missing PDFs
 		overwrite_existing: Update existing records with PDFs
+		chunk_size: Rows per database commit
 		
 	Returns:
 		dict: Operation summary with counts and errors
 	"""
+	import_id = _bulk_import_id(batch_name, zip_url, csv_url)
+	
 	# Check if this should be a background job (>30 rows)
 	try:
 		csv_path = get_file_path(csv_url)
@@ -79,11 +91,13 @@ def bulk_create_from_csv(
 				csv_url=csv_url,
 				require_all_batch_invoices=require_all_batch_invoices,
 				require_all_csv_have_pdf=require_all_csv_have_pdf,
-				overwrite_existing=overwrite_existing
+				overwrite_existing=overwrite_existing,
+				chunk_size=chunk_size
 			)
 			return {
 				'queued': 1,
-				'job_id': job.name if hasattr(job, 'name') else str(job)
+				'job_id': job.name if hasattr(job, 'name') else str(job),
+				'import_id': import_id
 			}
 	except Exception as e:
 		frappe.log_error(f"Error checking CSV row count: {str(e)}")
@@ -92,7 +106,8 @@ def bulk_create_from_csv(
 	# Process synchronously
 	return _process_bulk_creation(
 		batch_name, zip_url, csv_url,
-		require_all_batch_invoices, require_all_csv_have_pdf, overwrite_existing
+		require_all_batch_invoices, require_all_csv_have_pdf, overwrite_existing,
+		chunk_size
 	)
 
 
@@ -102,16 +117,27 @@ def _process_bulk_creation(
 	csv_url: str,
 	require_all_batch_invoices: int = 0,
 	require_all_csv_have_pdf: int = 0,
-	overwrite_existing: int = 0
+	overwrite_existing: int = 0,
+	chunk_size: int = BULK_COMMIT_CHUNK_SIZE
 ) -> dict[str, Any]:
 	"""Internal processing function for bulk creation.
 	
+	Only the ZIP directory is held in memory; each PDF is read from the
+	archive when its CSV row is processed. Work is committed every
+	``chunk_size`` rows and the progress after each commit is stored under
+	the import id, so a failed or killed run started again with the same
+	batch, ZIP and CSV resumes after the last committed chunk.
+	
 	Returns:
 		dict: Operation summary
 	"""
+	import_id = _bulk_import_id(batch_name, zip_url, csv_url)
+	chunk_size = max(1, int(chunk_size or BULK_COMMIT_CHUNK_SIZE))
+	
 	# Phase 1: Validate CSV
 	csv_data, csv_errors = _validate_and_parse_csv(csv_url)
 	if csv_errors:
+		_clear_bulk_progress(import_id)
 		return {
 			'status': 'error',
 			'created': 0,
@@ -120,79 +146,142 @@ def _process_bulk_creation(
 			'row_errors': csv_errors
 		}
 	
-	# Phase 2: Inspect ZIP and match PDFs
-	pdf_map = _extract_zip_and_map_pdfs(zip_url)
-	csv_missing_pdf = []
-	pdf_unmatched = list(pdf_map.keys())
-	
-	for row in csv_data:
-		fp16 = row['fp16']
-		if fp16 in pdf_map:
-			row['pdf_content'] = pdf_map[fp16]
-			pdf_unmatched.remove(fp16)
-		else:
-			csv_missing_pdf.append(fp16)
-			row['pdf_content'] = None
-	
-	# Check strict requirements
-	if require_all_csv_have_pdf and csv_missing_pdf:
-		return {
-			'status': 'error',
-			'message': _('Strict mode: {0} CSV rows missing PDFs').format(len(csv_missing_pdf)),
-			'csv_missing_pdf': csv_missing_pdf,
-			'row_errors': []
-		}
-	
-	# Phase 3: Create/update records
-	created = 0
-	updated = 0
-	skipped = 0
-	row_errors = []
-	created_docs = []
+	try:
+		zip_ref = zipfile.ZipFile(get_file_path(zip_url), 'r')
+	except Exception as e:
+		frappe.throw(_('Error extracting ZIP file: {0}').format(str(e)))
 	
-	for row_idx, row_data in enumerate(csv_data, start=2):  # Start at 2 (header is row 1)
+	with zip_ref:
+		# Phase 2: Index ZIP and match PDFs
+		pdf_index = _index_zip_pdfs(zip_ref)
+		csv_fp16s = {row['fp16'] for row in csv_data}
+		csv_missing_pdf = [row['fp16'] for row in csv_data if row['fp16'] not in pdf_index]
+		pdf_unmatched = [fp16 for fp16 in pdf_index if fp16 not in csv_fp16s]
+		
+		# Check strict requirements
+		if require_all_csv_have_pdf and csv_missing_pdf:
+			_clear_bulk_progress(import_id)
+			return {
+				'status': 'error',
+				'message': _('Strict mode: {0} CSV rows missing PDFs').format(len(csv_missing_pdf)),
+				'csv_missing_pdf': csv_missing_pdf,
+				'row_errors': []
+			}
+		
+		# Phase 3: Create/update records
+		progress = _get_resumable_progress(import_id, len(csv_data))
+		progress['status'] = 'processing'
+		_set_bulk_progress(import_id, progress)
+		committed = copy.deepcopy(progress)
+		
 		try:
-			if not row_data['pdf_content']:
-				row_errors.append({
-					'row': row_idx,
-					'fp_number': row_data['fp_number'],
-					'reason': 'PDF not found in ZIP'
-				})
-				skipped += 1
-				continue
-			
-			result = _create_or_update_tax_invoice_upload(
-				row_data, batch_name, overwrite_existing
-			)
-			
-			if result['action'] == 'created':
-				created += 1
-				created_docs.append(result['doc_info'])
-			elif result['action'] == 'updated':
-				updated += 1
-				created_docs.append(result['doc_info'])
-			elif result['action'] == 'skipped':
-				skipped += 1
-			
-		except Exception as e:
-			row_errors.append({
-				'row': row_idx,
-				'fp_number': row_data.get('fp_number', 'unknown'),
-				'reason': str(e)
-			})
-			skipped += 1
+			for offset in range(progress['next_row'], len(csv_data)):
+				row_idx = offset + 2  # Header is row 1
+				row_data = csv_data[offset]
+				try:
+					info = pdf_index.get(row_data['fp16'])
+					if info is None:
+						progress['row_errors'].append({
+							'row': row_idx,
+							'fp_number': row_data['fp_number'],
+							'reason': 'PDF not found in ZIP'
+						})
+						progress['skipped'] += 1
+						continue
+					
+					row_data['pdf_content'] = zip_ref.read(info)
+					result = _create_or_update_tax_invoice_upload(
+						row_data, batch_name, overwrite_existing
+					)
+					
+					if result['action'] == 'created':
+						progress['created'] += 1
+						progress['created_docs'].append(result['doc_info'])
+					elif result['action'] == 'updated':
+						progress['updated'] += 1
+						progress['created_docs'].append(result['doc_info'])
+					elif result['action'] == 'skipped':
+						progress['skipped'] += 1
+					
+				except Exception as e:
+					progress['row_errors'].append({
+						'row': row_idx,
+						'fp_number': row_data.get('fp_number', 'unknown'),
+						'reason': str(e)
+					})
+					progress['skipped'] += 1
+				finally:
+					row_data.pop('pdf_content', None)
+					if (offset + 1) % chunk_size == 0:
+						frappe.db.commit()
+						progress['next_row'] = offset + 1
+						_set_bulk_progress(import_id, progress)
+						committed = copy.deepcopy(progress)
+		except Exception:
+			# Rows after the last commit are rolled back; keep only what was saved
+			committed['status'] = 'failed'
+			_set_bulk_progress(import_id, committed)
+			raise
 	
 	frappe.db.commit()
+	progress['next_row'] = len(csv_data)
+	progress['status'] = 'finished'
+	_set_bulk_progress(import_id, progress)
 	
 	return {
-		'status': 'success' if not row_errors else 'partial',
-		'created': created,
-		'updated': updated,
-		'skipped': skipped,
-		'row_errors': row_errors,
+		'status': 'success' if not progress['row_errors'] else 'partial',
+		'created': progress['created'],
+		'updated': progress['updated'],
+		'skipped': progress['skipped'],
+		'row_errors': progress['row_errors'],
 		'pdf_unmatched': pdf_unmatched,
 		'csv_missing_pdf': csv_missing_pdf,
-		'created_docs': created_docs
+		'created_docs': progress['created_docs']
+	}
+
+
+def _bulk_import_id(batch_name: str, zip_url: str, csv_url: str) -> str:
+	"""Stable id for one batch + ZIP + CSV import, used to key its progress."""
+	return hashlib.sha1(f"{batch_name}|{zip_url}|{csv_url}".encode()).hexdigest()
+
+
+def _bulk_progress_key(import_id: str) -> str:
+	return f"{BULK_PROGRESS_CACHE_PREFIX}{import_id}"
+
+
+def _get_bulk_progress(import_id: str) -> dict | None:
+	return frappe.cache().get_value(_bulk_progress_key(import_id))
+
+
+def _set_bulk_progress(import_id: str, progress: dict) -> None:
+	frappe.cache().set_value(
+		_bulk_progress_key(import_id), progress, expires_in_sec=BULK_PROGRESS_TTL_SECONDS
+	)
+
+
+def _clear_bulk_progress(import_id: str) -> None:
+	frappe.cache().delete_value(_bulk_progress_key(import_id))
+
+
+def _get_resumable_progress(import_id: str, total: int) -> dict:
+	"""Progress of an unfinished run of the same import, or a fresh record.
+	
+	A stored run is only resumed when it was over the same number of CSV rows
+	and did not finish; anything else starts again from the first row.
+	"""
+	progress = _get_bulk_progress(import_id)
+	if progress and progress.get('status') != 'finished' and progress.get('total') == total:
+		return progress
+	
+	return {
+		'status': 'processing',
+		'total': total,
+		'next_row': 0,
+		'created': 0,
+		'updated': 0,
+		'skipped': 0,
+		'row_errors': [],
+		'created_docs': []
 	}
 
 
@@ -299,47 +388,27 @@ def _validate_and_parse_csv(csv_url: str) -> tuple[list[dict], list[dict]]:
 	return csv_data, errors
 
 
-def _extract_zip_and_map_pdfs(zip_url: str) -> dict[str, bytes]:
-	"""Extract ZIP and create map of fp16 -> PDF content.
+def _index_zip_pdfs(zip_ref: zipfile.ZipFile) -> dict[str, zipfile.ZipInfo]:
+	"""Map fp16 -> ZIP member for every PDF named after its FP number.
+	
+	Only the archive's central directory is read; member contents are read
+	later, one at a time, with ``zip_ref.read(info)``.
 	
 	Returns:
-		dict: {fp16: pdf_content}
+		dict: {fp16: ZipInfo}
 	"""
-	pdf_map = {}
+	pdf_index = {}
 	
-	try:
-		zip_path = get_file_path(zip_url)
-		extract_dir = "/tmp/tax_invoice_upload_pdfs"
-		os.makedirs(extract_dir, exist_ok=True)
+	for info in zip_ref.infolist():
+		if info.is_dir() or not info.filename.lower().endswith('.pdf'):
+			continue
 		
-		with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-			# Only extract PDF files
-			pdf_files = [f for f in zip_ref.namelist() if f.lower().endswith('.pdf')]
-			
-			for pdf_file in pdf_files:
-				try:
-					# Extract FP number from filename
-					filename = os.path.basename(pdf_file)
-					fp16 = normalize_fp_number(filename)
-					
-					if fp16 and len(fp16) == 16:
-						# Read PDF content
-						pdf_content = zip_ref.read(pdf_file)
-						pdf_map[fp16] = pdf_content
-				except Exception as e:
-					frappe.log_error(f"Error processing {pdf_file}: {str(e)}")
-		
-		# Cleanup
-		try:
-			import shutil
-			shutil.rmtree(extract_dir)
-		except:
-			pass
-	
-	except Exception as e:
-		frappe.throw(_('Error extracting ZIP file: {0}').format(str(e)))
+		# Extract FP number from filename
+		fp16 = normalize_fp_number(os.path.basename(info.filename))
+		if fp16 and len(fp16) == 16:
+			pdf_index[fp16] = info
 	
-	return pdf_map
+	return pdf_index
 
 
 def _create_or_update_tax_invoice_upload(
@@ -451,11 +520,13 @@ def _create_or_update_tax_invoice_upload(
 
 
 @frappe.whitelist()
-def get_bulk_job_status(job_id: str) -> dict[str, Any]:
+def get_bulk_job_status(job_id: str, import_id: str | None = None) -> dict[str, Any]:
 	"""Get status of background bulk creation job.
 	
 	Args:
 		job_id: Job ID returned from bulk_create_from_csv
+		import_id: Import ID returned from bulk_create_from_csv, used to
+			report rows processed so far
 		
 	Returns:
 		dict: Job status and result
@@ -482,15 +553,32 @@ def get_bulk_job_status(job_id: str) -> dict[str, Any]:
 				'result': result
 			}
 		elif status == 'failed':
+			progress = _get_bulk_progress(import_id) if import_id else None
+			message = _('Job failed: {0}').format(str(job.exc_info))
+			if progress and progress.get('next_row'):
+				message += ' ' + _('{0} rows were saved; run the import again to resume.').format(
+					progress['next_row']
+				)
 			return {
 				'status': 'failed',
-				'message': _('Job failed: {0}').format(str(job.exc_info))
+				'message': message
 			}
 		else:
+			progress = _get_bulk_progress(import_id) if import_id else None
+			if not progress or not progress.get('total'):
+				return {
+					'status': 'processing',
+					'progress_pct': 0,
+					'message': _('Processing bulk creation...')
+				}
+			
+			committed = progress['next_row']
 			return {
 				'status': 'processing',
-				'progress_pct': 50,
-				'message': _('Processing bulk creation...')
+				'progress_pct': min(99, int(committed * 100 / progress['total'])),
+				'processed': committed,
+				'total': progress['total'],
+				'message': _('Processed {0} of {1} rows').format(committed, progress['total'])
 			}
 	
 	except Exception as e:
@@ -357,14 +357,10 @@ function generate_coretax_exports_dialog(frm) {
 					closing_name: frm.doc.name
 				},
 				freeze: true,
-				freeze_message: __('Generating CoreTax exports...'),
+				freeze_message: __('Queueing CoreTax exports...'),
 				callback: (r) => {
 					if (r.message) {
-						frappe.show_alert({
-							message: __('CoreTax exports generated successfully'),
-							indicator: 'green'
-						}, 5);
-						frm.reload_doc();
+						watch_coretax_exports(frm, r.message.queued || []);
 					}
 				}
 			});
@@ -374,6 +370,30 @@ function generate_coretax_exports_dialog(frm) {
 	d.show();
 }
 
+function watch_coretax_exports(frm, directions) {
+	frappe.show_alert({
+		message: __('Generating {0} CoreTax export(s) in the background. Progress is shown on this form.', [directions.length]),
+		indicator: 'blue'
+	}, 7);
+
+	let pending = directions.slice();
+	frappe.realtime.off('coretax_export_done');
+	frappe.realtime.on('coretax_export_done', (data) => {
+		if (!data || data.closing_name !== frm.doc.name) {
+			return;
+		}
+		pending = pending.filter((direction) => direction !== data.direction);
+		if (!pending.length) {
+			frappe.realtime.off('coretax_export_done');
+			frappe.show_alert({
+				message: __('CoreTax exports generated successfully'),
+				indicator: 'green'
+			}, 5);
+		}
+		frm.reload_doc();
+	});
+}
+
 function create_vat_netting_entry(frm) {
 	if (!frm.doc.name || frm.doc.__islocal) {
 		frappe.msgprint(__('Please save the document first'));
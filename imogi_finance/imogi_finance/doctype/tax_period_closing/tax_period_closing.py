@@ -428,25 +428,11 @@ class TaxPeriodClosing(Document):
         export_result = {}
 
         if self.coretax_settings_input:
-            self.coretax_input_export = generate_coretax_export(
-                company=self.company,
-                date_from=self.date_from,
-                date_to=self.date_to,
-                direction="Input",
-                settings_name=self.coretax_settings_input,
-                filename=f"coretax-input-{self.company}-{self.period_year}-{self.period_month}",
-            )
+            self.coretax_input_export = self.generate_export("Input")
             export_result["input_export"] = self.coretax_input_export
 
         if self.coretax_settings_output:
-            self.coretax_output_export = generate_coretax_export(
-                company=self.company,
-                date_from=self.date_from,
-                date_to=self.date_to,
-                direction="Output",
-                settings_name=self.coretax_settings_output,
-                filename=f"coretax-output-{self.company}-{self.period_year}-{self.period_month}",
-            )
+            self.coretax_output_export = self.generate_export("Output")
             export_result["output_export"] = self.coretax_output_export
 
         if save:
@@ -454,6 +440,27 @@ class TaxPeriodClosing(Document):
 
         return export_result
 
+    def generate_export(self, direction: str, progress_callback=None) -> str:
+        """Generate the CoreTax export file for one direction ("Input" or "Output").
+
+        Args:
+            direction: "Input" or "Output"
+            progress_callback: Optional callback(done, total) after each invoice chunk
+
+        Returns:
+            str: File URL
+        """
+        settings_name = self.coretax_settings_input if direction == "Input" else self.coretax_settings_output
+        return generate_coretax_export(
+            company=self.company,
+            date_from=self.date_from,
+            date_to=self.date_to,
+            direction=direction,
+            settings_name=settings_name,
+            filename=f"coretax-{direction.lower()}-{self.company}-{self.period_year}-{self.period_month}",
+            progress_callback=progress_callback,
+        )
+
     def _get_tax_profile_doc(self) -> Document:
         """Get cached Tax Profile document.
 
@@ -566,9 +573,36 @@ def refresh_tax_registers(closing_name: str) -> dict:
     return closing.generate_snapshot()
 
 
+@frappe.whitelist()
+def verify_tax_register_snapshot(closing_name: str) -> dict:
+    """Compare the incremental (daily aggregate) snapshot with a full recompute.
+
+    Permission: Accounts Manager, Tax Reviewer, System Manager
+
+    Args:
+        closing_name: Name of Tax Period Closing document
+
+    Returns:
+        dict: ``matches`` flag and per-key ``differences`` between both snapshots
+    """
+    from imogi_finance.tax_period_aggregates import verify_register_snapshot
+
+    frappe.only_for((roles.SYSTEM_MANAGER, roles.ACCOUNTS_MANAGER, roles.TAX_REVIEWER))
+
+    closing = frappe.get_doc("Tax Period Closing", closing_name)
+    closing.check_permission("read")
+
+    result = verify_register_snapshot(closing.company, closing.date_from, closing.date_to)
+    return {"matches": result["matches"], "differences": result["differences"]}
+
+
 @frappe.whitelist()
 def generate_coretax_exports(closing_name: str) -> dict:
-    """Generate CoreTax export files for a period closing.
+    """Queue CoreTax export generation for a period closing.
+
+    Each configured direction runs as its own background job, so input and output
+    exports are built in parallel. Jobs publish progress on the closing form and a
+    ``coretax_export_done`` realtime event when their file is attached.
 
     Permission: Accounts Manager, Tax Reviewer, System Manager
 
@@ -576,14 +610,62 @@ def generate_coretax_exports(closing_name: str) -> dict:
         closing_name: Name of Tax Period Closing document
 
     Returns:
-        dict: File URLs for input and output exports
+        dict: Queued directions and their job IDs
     """
     frappe.only_for((roles.SYSTEM_MANAGER, roles.ACCOUNTS_MANAGER, roles.TAX_REVIEWER))
 
     closing = frappe.get_doc("Tax Period Closing", closing_name)
     closing.check_permission("write")
 
-    return closing.generate_exports()
+    directions = []
+    if closing.coretax_settings_input:
+        directions.append("Input")
+    if closing.coretax_settings_output:
+        directions.append("Output")
+
+    if not directions:
+        frappe.throw(_("Please set CoreTax Export Settings for input or output VAT first."))
+
+    job_ids = {}
+    for direction in directions:
+        job = frappe.enqueue(
+            "imogi_finance.imogi_finance.doctype.tax_period_closing.tax_period_closing.run_coretax_export",
+            queue="long",
+            timeout=3600,
+            closing_name=closing_name,
+            direction=direction,
+        )
+        job_ids[direction] = job.name if hasattr(job, "name") else str(job)
+
+    return {"queued": directions, "job_ids": job_ids}
+
+
+def run_coretax_export(closing_name: str, direction: str) -> str:
+    """Background job: build one CoreTax export and attach it to the closing."""
+    closing = frappe.get_doc("Tax Period Closing", closing_name)
+    title = _("CoreTax {0} Export").format(_(direction))
+
+    def publish(done, total):
+        frappe.publish_progress(
+            done * 100 / total,
+            title=title,
+            doctype="Tax Period Closing",
+            docname=closing_name,
+            description=_("{0} of {1} invoices exported").format(done, total),
+        )
+
+    file_url = closing.generate_export(direction, progress_callback=publish)
+
+    # Set the single attach field so the parallel job for the other direction does not conflict.
+    fieldname = "coretax_input_export" if direction == "Input" else "coretax_output_export"
+    frappe.db.set_value("Tax Period Closing", closing_name, fieldname, file_url)
+    frappe.publish_realtime(
+        "coretax_export_done",
+        {"closing_name": closing_name, "direction": direction, "file_url": file_url},
+        doctype="Tax Period Closing",
+        docname=closing_name,
+    )
+    return file_url
 
 
 @frappe.whitelist()
@@ -89,7 +89,9 @@ function get_available_invoices(frm) {
 		freeze: true,
 		freeze_message: __('Auto-grouping invoices...'),
 		callback: function(r) {
-			if (r.message) {
+			if (r.message && r.message.queued) {
+				notify_grouping_queued(frm, r.message);
+			} else if (r.message) {
 				frm.reload_doc();
 				
 				// Show summary dialog
@@ -288,6 +290,26 @@ function add_instructions_html(frm) {
 	}
 }
 
+function notify_grouping_queued(frm, result) {
+	frappe.show_alert({
+		message: __('Grouping {0} invoices in the background. Progress is shown on this form.', [result.total_invoices]),
+		indicator: 'blue'
+	}, 7);
+	
+	frappe.realtime.off('vat_out_grouping_done');
+	frappe.realtime.on('vat_out_grouping_done', function(data) {
+		if (!data || data.batch_name !== frm.doc.name) {
+			return;
+		}
+		frappe.realtime.off('vat_out_grouping_done');
+		frm.reload_doc();
+		frappe.show_alert({
+			message: __('{0} invoices grouped into {1} groups', [data.total_invoices, data.total_groups]),
+			indicator: 'green'
+		}, 7);
+	});
+}
+
 function format_currency(value) {
 	return frappe.format(value, {fieldtype: 'Currency'});
 }
@@ -306,7 +328,9 @@ function rebuild_all_groups(frm) {
 				freeze: true,
 				freeze_message: __('Rebuilding all groups...'),
 				callback: function(r) {
-					if (r.message) {
+					if (r.message && r.message.queued) {
+						notify_grouping_queued(frm, r.message);
+					} else if (r.message) {
 						frm.reload_doc();
 						frappe.show_alert({
 							message: __('Groups rebuilt successfully'),
@@ -7,7 +7,12 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.model.naming import make_autoname
-from frappe.utils import now, nowdate, getdate
+from frappe.utils import cint, now, nowdate, getdate
+
+# Sales Invoices linked per UPDATE statement when assigning groups
+GROUP_ASSIGN_CHUNK_SIZE = 1000
+# Batches with more available invoices than this are grouped in a background job
+BACKGROUND_GROUPING_THRESHOLD = 2000
 
 
 class VATOUTBatch(Document):
@@ -63,15 +68,14 @@ class VATOUTBatch(Document):
 		"""Unlink all Sales Invoices from this batch but preserve FP numbers."""
 		invoices = self.get_batch_invoices()
 
-		for inv in invoices:
-			frappe.db.set_value(
-				"Sales Invoice",
-				inv.name,
-				{
-					"out_fp_batch": None,
-					"out_fp_group_id": None
-				},
-				update_modified=False
+		if invoices:
+			frappe.db.sql(
+				"""
+				update `tabSales Invoice`
+				set out_fp_batch = null, out_fp_group_id = null
+				where out_fp_batch = %(batch)s
+				""",
+				{"batch": self.name}
 			)
 
 		self._update_status()
@@ -95,11 +99,37 @@ class VATOUTBatch(Document):
 	def get_available_invoices(self, force_rebuild=False):
 		"""Get Sales Invoices available for this batch and auto-group them.
 
+		Batches above ``BACKGROUND_GROUPING_THRESHOLD`` invoices are grouped in a
+		background job that reports progress on the form.
+
 		Args:
 			force_rebuild: If True, reset all grouping. If False, preserve manual edits.
 		"""
-		# Query Sales Invoices with idempotent filter
-		invoices = frappe.db.get_all(
+		invoices = self._get_available_invoice_rows()
+
+		if not invoices:
+			frappe.msgprint(_("No available invoices found for selected date range."))
+			return []
+
+		if len(invoices) > BACKGROUND_GROUPING_THRESHOLD:
+			job = frappe.enqueue(
+				"imogi_finance.imogi_finance.doctype.vat_out_batch.vat_out_batch.run_group_assignment",
+				queue="long",
+				timeout=3600,
+				batch_name=self.name,
+				force_rebuild=cint(force_rebuild)
+			)
+			return {
+				"queued": 1,
+				"job_id": job.name if hasattr(job, "name") else str(job),
+				"total_invoices": len(invoices)
+			}
+
+		return self._group_and_link(invoices, force_rebuild=force_rebuild)
+
+	def _get_available_invoice_rows(self):
+		"""Query Sales Invoices with idempotent filter."""
+		return frappe.db.get_all(
 			"Sales Invoice",
 			filters={
 				"docstatus": 1,
@@ -128,15 +158,13 @@ class VATOUTBatch(Document):
 			order_by="posting_date, customer"
 		)
 
-		if not invoices:
-			frappe.msgprint(_("No available invoices found for selected date range."))
-			return []
-
+	def _group_and_link(self, invoices, force_rebuild=False, publish_progress=False):
+		"""Auto-group ``invoices`` and link them to this batch; returns the grouping summary."""
 		# Auto-group by customer and out_fp_combine flag
 		groups = self._auto_group_invoices(invoices)
 
 		# Assign group IDs and link to batch
-		self._assign_and_link_groups(groups, force_rebuild=force_rebuild)
+		self._assign_and_link_groups(groups, force_rebuild=force_rebuild, publish_progress=publish_progress)
 
 		return {
 			"total_invoices": len(invoices),
@@ -192,35 +220,43 @@ class VATOUTBatch(Document):
 
 		return groups
 
-	def _assign_and_link_groups(self, groups, force_rebuild=False):
+	def _assign_and_link_groups(self, groups, force_rebuild=False, publish_progress=False):
 		"""Assign sequential group IDs and link Sales Invoices to this batch.
 
+		Links are written with one UPDATE per ``GROUP_ASSIGN_CHUNK_SIZE`` invoices.
+
 		Args:
 			groups: List of group dictionaries with invoices
 			force_rebuild: If True, overwrite existing assignments. If False, preserve manual edits.
+			publish_progress: Report progress on the batch form after each chunk.
 		"""
+		assignments = []
 		for idx, group in enumerate(groups, start=1):
 			group_id = idx
 
-			# Update all invoices in group
 			for inv in group["invoices"]:
 				# Preserve manual edits unless force_rebuild
 				if not force_rebuild and inv.out_fp_batch == self.name and inv.out_fp_group_id:
 					continue
 
-				frappe.db.set_value(
-					"Sales Invoice",
-					inv.name,
-					{
-						"out_fp_batch": self.name,
-						"out_fp_group_id": group_id
-					},
-					update_modified=False
-				)
+				assignments.append((inv.name, group_id))
 
 			# Store group_id in return data
 			group["group_id"] = group_id
 
+		on_chunk = None
+		if publish_progress:
+			def on_chunk(done, total):
+				frappe.publish_progress(
+					done * 100 / total,
+					title=_("Assigning VAT OUT Groups"),
+					doctype=self.doctype,
+					docname=self.name,
+					description=_("{0} of {1} invoices linked").format(done, total)
+				)
+
+		bulk_assign_groups(self.name, assignments, on_chunk=on_chunk)
+
 	def get_batch_invoices(self):
 		"""Get all Sales Invoices linked to this batch."""
 		return frappe.db.get_all(
@@ -528,3 +564,65 @@ class VATOUTBatch(Document):
 			'total_invoices': len(invoices),
 			'missing_fp_count': missing_fp_count
 		}
+
+
+def bulk_assign_groups(batch_name, assignments, chunk_size=None, on_chunk=None):
+	"""Link Sales Invoices to ``batch_name`` with their group IDs.
+
+	Each chunk of ``(invoice_name, group_id)`` pairs is written with a single
+	UPDATE using a CASE on name, leaving ``modified`` untouched like
+	``set_value(..., update_modified=False)``.
+
+	Args:
+		batch_name: VAT OUT Batch name
+		assignments: List of (invoice_name, group_id) tuples
+		chunk_size: Invoices per UPDATE statement (default ``GROUP_ASSIGN_CHUNK_SIZE``)
+		on_chunk: Optional callback(done, total) after each chunk
+	"""
+	chunk_size = chunk_size or GROUP_ASSIGN_CHUNK_SIZE
+	total = len(assignments)
+	for start in range(0, total, chunk_size):
+		chunk = assignments[start:start + chunk_size]
+		values = {"batch": batch_name}
+		cases = []
+		names = []
+		for idx, (invoice_name, group_id) in enumerate(chunk):
+			values[f"n{idx}"] = invoice_name
+			values[f"g{idx}"] = group_id
+			cases.append(f"when %(n{idx})s then %(g{idx})s")
+			names.append(f"%(n{idx})s")
+
+		frappe.db.sql(
+			f"""
+			update `tabSales Invoice`
+			set out_fp_batch = %(batch)s,
+				out_fp_group_id = case name {" ".join(cases)} end
+			where name in ({", ".join(names)})
+			""",
+			values
+		)
+
+		if on_chunk:
+			on_chunk(start + len(chunk), total)
+
+
+def run_group_assignment(batch_name, force_rebuild=0):
+	"""Background job: auto-group and link available invoices for a large batch."""
+	batch = frappe.get_doc("VAT OUT Batch", batch_name)
+	invoices = batch._get_available_invoice_rows()
+	result = batch._group_and_link(invoices, force_rebuild=cint(force_rebuild), publish_progress=True)
+
+	frappe.publish_realtime(
+		"vat_out_grouping_done",
+		{
+			"batch_name": batch_name,
+			"total_invoices": result["total_invoices"],
+			"total_groups": result["total_groups"]
+		},
+		doctype="VAT OUT Batch",
+		docname=batch_name
+	)
+	return {
+		"total_invoices": result["total_invoices"],
+		"total_groups": result["total_groups"]
+	}
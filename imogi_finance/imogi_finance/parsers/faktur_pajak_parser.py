@@ -19,8 +19,11 @@ from typing import Dict, List, Tuple, Optional, Any
 
 import frappe
 
+from imogi_finance import ocr_pages
+
 # Import Vision JSON unwrapping helper
 from .vision_helpers import _resolve_full_text_annotation
+from .layout_index import ColumnIndex, cluster_rows
 
 _logger = logging.getLogger(__name__)
 try:
@@ -61,8 +64,14 @@ class Token:
 
 	Supports both PyMuPDF text-layer extraction and Google Vision OCR results.
 	Tracks page number for multi-page documents and OCR confidence for quality monitoring.
+	Uses ``__slots__``: dense Vision output yields thousands of tokens per document.
 	"""
 
+	__slots__ = (
+		"text", "x0", "y0", "x1", "y1", "x_mid", "y_mid",
+		"width", "height", "page_no", "confidence", "source",
+	)
+
 	def __init__(
 		self,
 		text: str,
@@ -337,37 +346,34 @@ def extract_text_with_bbox_from_bytes(pdf_bytes: bytes, source_name: str = "byte
 
 		page_count = len(doc)
 
-		# Process ALL pages
-		for page_index in range(page_count):
-			page_no = page_index + 1  # 1-based page numbering
-			page = doc[page_index]
-
-			# Extract text as dictionary with position info
-			text_dict = page.get_text("dict")
-
-			# Parse blocks -> lines -> spans
-			for block in text_dict.get("blocks", []):
-				if block.get("type") != 0:  # 0 = text block
-					continue
+		# Process ALL pages; in the OCR background job long documents are split across the
+		# page worker pool, request-time calls stay in-process
+		if page_count >= ocr_pages.TEXT_LAYER_PARALLEL_MIN_PAGES and ocr_pages.pool_enabled():
+			doc.close()
+			page_spans = []
+			for result in ocr_pages.text_layer_pages(pdf_bytes, page_count, source_name=source_name):
+				if not result["ok"]:
+					frappe.logger().warning(
+						f"[PyMuPDF] Skipped page {result['page']} of {source_name}: {result['error']}"
+					)
+				page_spans.append(result["value"] or [])
+		else:
+			page_spans = [ocr_pages.page_spans(doc[page_index]) for page_index in range(page_count)]
 
-				for line in block.get("lines", []):
-					for span in line.get("spans", []):
-						text = span.get("text", "").strip()
-						if not text:
-							continue
-
-						bbox = span.get("bbox")  # (x0, y0, x1, y1)
-						if bbox and len(bbox) == 4:
-							token = Token(
-								text=text,
-								x0=bbox[0],
-								y0=bbox[1],
-								x1=bbox[2],
-								y1=bbox[3],
-								page_no=page_no,
-								source="pymupdf"
-							)
-							tokens.append(token)
+		for page_index, spans in enumerate(page_spans):
+			page_no = page_index + 1  # 1-based page numbering
+			for text, bbox in spans:  # bbox = (x0, y0, x1, y1)
+				tokens.append(
+					Token(
+						text=text,
+						x0=bbox[0],
+						y0=bbox[1],
+						x1=bbox[2],
+						y1=bbox[3],
+						page_no=page_no,
+						source="pymupdf"
+					)
+				)
 
 		frappe.logger().info(
 			f"[PyMuPDF] Extracted {len(tokens)} tokens from {page_count} page(s): {source_name}"
@@ -1004,6 +1010,9 @@ def cluster_tokens_by_row(tokens: List[Token], y_tolerance: float = 3) -> List[T
 	"""
 	Group tokens into rows based on Y-coordinate clustering.
 
+	A token joins the current row while it is within ``y_tolerance`` of the row's
+	running mean Y (see ``layout_index.cluster_rows``).
+
 	Args:
 		tokens: List of Token objects
 		y_tolerance: Maximum Y-distance to consider same row
@@ -1011,32 +1020,11 @@ def cluster_tokens_by_row(tokens: List[Token], y_tolerance: float = 3) -> List[T
 	Returns:
 		List of (y_position, tokens_in_row) tuples, sorted by Y
 	"""
-	if not tokens:
-		return []
+	return cluster_rows(tokens, y_tolerance, _token_y_mid)
 
-	# Sort tokens by Y position
-	sorted_tokens = sorted(tokens, key=lambda t: t.y_mid)
-
-	rows = []
-	current_row = [sorted_tokens[0]]
-	current_y = sorted_tokens[0].y_mid
-
-	for token in sorted_tokens[1:]:
-		if abs(token.y_mid - current_y) <= y_tolerance:
-			# Same row
-			current_row.append(token)
-			current_y = sum(t.y_mid for t in current_row) / len(current_row)
-		else:
-			# New row
-			rows.append((current_y, current_row))
-			current_row = [token]
-			current_y = token.y_mid
-
-	# Add last row
-	if current_row:
-		rows.append((current_y, current_row))
 
-	return rows
+def _token_y_mid(token: Token) -> float:
+	return token.y_mid
 
 
 def assign_tokens_to_columns(
@@ -1058,9 +1046,9 @@ def assign_tokens_to_columns(
 	"""
 	assignments = {col_name: [] for col_name in column_ranges.keys()}
 
-	# Sort column ranges by X position to determine leftmost boundary
-	sorted_cols = sorted(column_ranges.values(), key=lambda c: c.x_min)
-	leftmost_numeric_col = sorted_cols[0].x_min if sorted_cols else float('inf')
+	# Leftmost boundary of the numeric columns
+	leftmost_numeric_col = min((c.x_min for c in column_ranges.values()), default=float('inf'))
+	column_index = ColumnIndex(column_ranges)
 
 	for token in row_tokens:
 		# Critical guard: Skip tokens that are clearly in description area
@@ -1068,15 +1056,13 @@ def assign_tokens_to_columns(
 		if token.x1 < leftmost_numeric_col * 0.9:  # 10% tolerance
 			continue
 
-		assigned = False
-		for col_name, col_range in column_ranges.items():
-			if col_range.contains(token):
-				assignments[col_name].append(token)
-				assigned = True
-				break  # Assign to first matching column only
+		# Assign to first matching column only (same rule as ColumnRange.contains)
+		col_name = column_index.assign(token.x0, token.x1)
+		if col_name is not None:
+			assignments[col_name].append(token)
 
 		# Log warning if numeric token wasn't assigned (potential data loss)
-		if not assigned and re.search(r'[\d\.,]+', token.text):
+		elif re.search(r'[\d\.,]+', token.text):
 			frappe.logger().debug(
 				f"Numeric token '{token.text}' at X={token.x0:.1f} not assigned to any column. "
 				f"This is expected for amounts in description."
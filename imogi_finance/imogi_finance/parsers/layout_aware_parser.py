@@ -40,6 +40,7 @@ from typing import Optional, Tuple, List, Dict, Any
 import frappe
 from frappe import _
 
+from .layout_index import LayoutIndex, cluster_rows
 from .normalization import parse_indonesian_currency
 from .vision_helpers import _resolve_full_text_annotation
 
@@ -48,7 +49,7 @@ from .vision_helpers import _resolve_full_text_annotation
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class BoundingBox:
     """
     Represents an OCR bounding box with utility methods.
@@ -143,7 +144,7 @@ class BoundingBox:
         return overlap / min_height
 
 
-@dataclass
+@dataclass(slots=True)
 class OCRToken:
     """
     A single word/token from OCR output with its spatial position.
@@ -180,6 +181,14 @@ class OCRToken:
         return bool(re.match(r"^\d[\d.,]*$", self.text.strip()))
 
 
+def _center_x(tok: OCRToken) -> float:
+    return tok.bbox.center_x
+
+
+def _center_y(tok: OCRToken) -> float:
+    return tok.bbox.center_y
+
+
 # =============================================================================
 # LABEL PATTERNS — ordered by specificity (most specific first)
 # =============================================================================
@@ -314,6 +323,7 @@ class LayoutAwareParser:
 
         # Build row groups and auto-detect value column
         self._rows: List[Tuple[float, List[OCRToken]]] = []
+        self._index: LayoutIndex = LayoutIndex([], _center_x)
         self._value_col_range: Tuple[float, float] = (
             self.DEFAULT_VALUE_COL_X_MIN,
             self.DEFAULT_VALUE_COL_X_MAX,
@@ -322,6 +332,7 @@ class LayoutAwareParser:
 
         if self.tokens:
             self._rows = self._group_tokens_by_row()
+            self._index = LayoutIndex(self._rows, _center_x)
             self._value_col_range = self._detect_value_column()
             self._full_text = self._reconstruct_full_text()
 
@@ -472,7 +483,8 @@ class LayoutAwareParser:
         Algorithm:
           1. Sort tokens by center_y.
           2. Walk through sorted list; if the gap to the current row's
-             average Y exceeds ``ROW_TOLERANCE``, start a new row.
+             running average Y exceeds ``ROW_TOLERANCE``, start a new row
+             (``layout_index.cluster_rows``).
           3. Within each row, sort tokens left-to-right by center_x.
 
         Returns:
@@ -481,36 +493,10 @@ class LayoutAwareParser:
         if not self.tokens:
             return []
 
-        sorted_tokens = sorted(self.tokens, key=lambda t: t.bbox.center_y)
-
-        rows: List[List[OCRToken]] = []
-        current_row: List[OCRToken] = [sorted_tokens[0]]
-        current_y_sum = sorted_tokens[0].bbox.center_y
-        current_y_count = 1
-
-        for tok in sorted_tokens[1:]:
-            avg_y = current_y_sum / current_y_count
-            if abs(tok.bbox.center_y - avg_y) <= self.ROW_TOLERANCE:
-                current_row.append(tok)
-                current_y_sum += tok.bbox.center_y
-                current_y_count += 1
-            else:
-                rows.append(current_row)
-                current_row = [tok]
-                current_y_sum = tok.bbox.center_y
-                current_y_count = 1
-
-        if current_row:
-            rows.append(current_row)
-
-        # Sort tokens within each row by x, compute row center_y
-        result: List[Tuple[float, List[OCRToken]]] = []
-        for row_tokens in rows:
-            row_tokens.sort(key=lambda t: t.bbox.center_x)
-            avg_y = sum(t.bbox.center_y for t in row_tokens) / len(row_tokens)
-            result.append((avg_y, row_tokens))
-
-        return result
+        return [
+            (row_y, sorted(row_tokens, key=_center_x))
+            for row_y, row_tokens in cluster_rows(self.tokens, self.ROW_TOLERANCE, _center_y)
+        ]
 
     def _reconstruct_full_text(self) -> str:
         """Reconstruct full text from rows (for fallback regex)."""
@@ -540,9 +526,9 @@ class LayoutAwareParser:
         """
         currency_xs: List[float] = []
 
-        for _, row_tokens in self._rows:
-            for tok in row_tokens:
-                # Only consider tokens in the lower portion of the page
+        # Only consider rows in the lower portion of the page
+        for idx in self._index.row_range(self.SUMMARY_Y_MIN - self.ROW_TOLERANCE, float("inf")):
+            for tok in self._index.rows[idx].tokens:
                 if tok.bbox.center_y < self.SUMMARY_Y_MIN:
                     continue
                 if tok.is_currency_value:
@@ -587,11 +573,7 @@ class LayoutAwareParser:
         Build an index of (row_y, concatenated_text, tokens) for fast
         label searching.
         """
-        index = []
-        for row_y, row_tokens in self._rows:
-            text = " ".join(t.text for t in row_tokens)
-            index.append((row_y, text, row_tokens))
-        return index
+        return [(row.y, row.text, row.tokens) for row in self._index.rows]
 
     def find_label_token(
         self,
@@ -616,21 +598,19 @@ class LayoutAwareParser:
             Tuple of ``(row_index, first_label_token, row_center_y)``
             or ``None`` if no match.
         """
-        row_index = self._build_row_text_index()
-
         for pattern in patterns:
             # 🔧 Iterate rows bottom-up so summary labels win over table headers
-            for idx in range(len(row_index) - 1, -1, -1):
-                row_y, row_text, row_tokens = row_index[idx]
-                if pattern.search(row_text):
-                    # Return the leftmost token in the matched row as the
-                    # label anchor (tokens are already sorted left→right)
-                    label_tok = row_tokens[0]
-                    self._logger.debug(
-                        f"[LayoutParser] Found label '{field_name}' "
-                        f"at row {idx} (y={row_y:.3f}): \"{row_text}\""
-                    )
-                    return (idx, label_tok, row_y)
+            idx = self._index.find_row(pattern, reverse=True)
+            if idx is not None:
+                row = self._index.rows[idx]
+                # Return the leftmost token in the matched row as the
+                # label anchor (tokens are already sorted left→right)
+                label_tok = row.tokens[0]
+                self._logger.debug(
+                    f"[LayoutParser] Found label '{field_name}' "
+                    f"at row {idx} (y={row.y:.3f}): \"{row.text}\""
+                )
+                return (idx, label_tok, row.y)
 
         return None
 
@@ -668,13 +648,8 @@ class LayoutAwareParser:
         col_min = value_col_x_min if value_col_x_min is not None else self._value_col_range[0]
         col_max = value_col_x_max if value_col_x_max is not None else self._value_col_range[1]
 
-        _, row_tokens = self._rows[row_index]
-
         # Collect tokens in the value column
-        value_tokens: List[OCRToken] = []
-        for tok in row_tokens:
-            if col_min <= tok.bbox.center_x <= col_max:
-                value_tokens.append(tok)
+        value_tokens: List[OCRToken] = self._index.rows[row_index].tokens_between_x(col_min, col_max)
 
         if not value_tokens:
             return None
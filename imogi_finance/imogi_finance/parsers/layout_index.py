@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Imogi Finance and contributors
+# For license information, please see license.txt
+
+"""
+Shared spatial index over OCR / text-layer tokens.
+
+Both the line-item parser (``faktur_pajak_parser``) and the summary parser
+(``layout_aware_parser``) group tokens into visual rows and then look up tokens
+by Y (which row?) and X (which column?). Dense multi-page Vision output carries
+thousands of tokens, so these lookups are done on an index built once per
+document instead of rescanning every row:
+
+- ``cluster_rows``: Y-clustering with a running mean, O(n log n) overall.
+- ``LayoutIndex``: rows in Y order with bisect lookups by Y, cached row text
+  and per-row X-sorted token views for column range queries.
+- ``ColumnIndex``: X-interval index that maps a token to the first column
+  range it overlaps.
+
+The module is coordinate-system agnostic: callers pass accessor functions for
+the token's Y/X centre, so it works for both ``Token`` (PDF points) and
+``OCRToken`` (normalized 0–1 coordinates).
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def cluster_rows(
+    tokens: Iterable[Any],
+    tolerance: float,
+    y_of: Callable[[Any], float],
+) -> List[Tuple[float, List[Any]]]:
+    """
+    Group tokens into rows by Y proximity.
+
+    Tokens are sorted by Y; a token joins the current row while its Y is within
+    ``tolerance`` of the row's running mean, otherwise it starts a new row.
+    Tokens keep their Y order inside a row.
+
+    Returns:
+        ``[(row_mean_y, [tokens…]), …]`` in Y order.
+    """
+    keyed = sorted(((y_of(tok), tok) for tok in tokens), key=lambda pair: pair[0])
+    if not keyed:
+        return []
+
+    rows: List[Tuple[float, List[Any]]] = []
+    first_y, first_tok = keyed[0]
+    current: List[Any] = [first_tok]
+    y_sum = first_y
+    mean_y = first_y
+
+    for y, tok in keyed[1:]:
+        if abs(y - mean_y) <= tolerance:
+            current.append(tok)
+            y_sum += y
+            mean_y = y_sum / len(current)
+        else:
+            rows.append((mean_y, current))
+            current = [tok]
+            y_sum = y
+            mean_y = y
+
+    rows.append((mean_y, current))
+    return rows
+
+
+class LayoutRow:
+    """One visual row: mean Y, tokens in row order, and an X-sorted view for range queries."""
+
+    __slots__ = ("y", "tokens", "by_x", "xs", "_text")
+
+    def __init__(self, y: float, tokens: List[Any], x_of: Callable[[Any], float]):
+        self.y = y
+        self.tokens = tokens
+        self.by_x = sorted(tokens, key=x_of)
+        self.xs = [x_of(tok) for tok in self.by_x]
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = " ".join(tok.text for tok in self.tokens)
+        return self._text
+
+    def tokens_between_x(self, x_min: float, x_max: float) -> List[Any]:
+        """Tokens whose X centre lies in ``[x_min, x_max]``, left to right."""
+        return self.by_x[bisect_left(self.xs, x_min):bisect_right(self.xs, x_max)]
+
+
+class LayoutIndex:
+    """
+    Rows of a token set in Y order, built once and queried many times.
+
+    Args:
+        rows: Output of ``cluster_rows`` (or an equivalent ``(y, tokens)`` list).
+        x_of: Accessor for a token's X centre.
+    """
+
+    __slots__ = ("rows", "row_ys")
+
+    def __init__(self, rows: Sequence[Tuple[float, List[Any]]], x_of: Callable[[Any], float]):
+        self.rows: List[LayoutRow] = [LayoutRow(y, row_tokens, x_of) for y, row_tokens in rows]
+        self.row_ys: List[float] = [row.y for row in self.rows]
+
+    @classmethod
+    def build(
+        cls,
+        tokens: Iterable[Any],
+        tolerance: float,
+        y_of: Callable[[Any], float],
+        x_of: Callable[[Any], float],
+    ) -> "LayoutIndex":
+        return cls(cluster_rows(tokens, tolerance, y_of), x_of)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def row_range(self, y_min: float, y_max: float) -> range:
+        """Indexes of rows whose mean Y lies in ``[y_min, y_max]``."""
+        return range(bisect_left(self.row_ys, y_min), bisect_right(self.row_ys, y_max))
+
+    def nearest_row(self, y: float) -> Optional[int]:
+        if not self.rows:
+            return None
+        pos = bisect_left(self.row_ys, y)
+        if pos == 0:
+            return 0
+        if pos == len(self.row_ys):
+            return pos - 1
+        return pos if self.row_ys[pos] - y < y - self.row_ys[pos - 1] else pos - 1
+
+    def find_row(self, pattern: Any, reverse: bool = False) -> Optional[int]:
+        """Index of the first (or, with ``reverse``, last) row whose text matches ``pattern.search``."""
+        indexes = range(len(self.rows) - 1, -1, -1) if reverse else range(len(self.rows))
+        for idx in indexes:
+            if pattern.search(self.rows[idx].text):
+                return idx
+        return None
+
+
+class ColumnIndex:
+    """
+    X-interval index over named column ranges.
+
+    ``assign`` returns the first column, in the caller's original order, that the
+    token overlaps by at least ``min_overlap`` of its width. This is the same rule
+    as checking every range in order, but only ranges whose X interval can
+    overlap the token are tested.
+
+    Args:
+        columns: Mapping of name → range object with ``x_min``/``x_max``.
+    """
+
+    __slots__ = ("_entries", "_starts", "_max_width")
+
+    def __init__(self, columns: Dict[str, Any]):
+        # (x_min, x_max, original_order, name), sorted by x_min
+        self._entries = sorted(
+            (col.x_min, col.x_max, order, name) for order, (name, col) in enumerate(columns.items())
+        )
+        self._starts = [entry[0] for entry in self._entries]
+        self._max_width = max((entry[1] - entry[0] for entry in self._entries), default=0.0)
+
+    def assign(self, x0: float, x1: float, min_overlap: float = 0.1) -> Optional[str]:
+        width = x1 - x0
+        if width <= 0:
+            return None
+        # Only ranges starting before x1 and not ending before x0 can overlap.
+        hi = bisect_left(self._starts, x1)
+        lo = bisect_left(self._starts, x0 - self._max_width)
+        best: Optional[Tuple[int, str]] = None
+        for col_min, col_max, order, name in self._entries[lo:hi]:
+            overlap = min(col_max, x1) - max(col_min, x0)
+            if overlap > 0 and overlap / width >= min_overlap and (best is None or order < best[0]):
+                best = (order, name)
+        return best[1] if best else None
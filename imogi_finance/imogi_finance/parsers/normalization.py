@@ -13,6 +13,8 @@ from typing import Optional, Tuple, List, Dict, Any
 
 import frappe
 
+from .text_index import TextIndex
+
 # ============================================================================
 # PRE-COMPILED REGEX PATTERNS (Performance Optimization)
 # ============================================================================
@@ -46,6 +48,10 @@ _COMPILED_PATTERNS = {
 		re.compile(r'PPnBM', re.IGNORECASE),
 	],
 	'indonesian_amount': re.compile(r'\d+(?:\.\d{3})*(?:,\d{1,2})?'),
+	'amount_after_label': re.compile(r'(\d[\d\.\,\s]*)'),
+	'amount_line_start': re.compile(r'^\s*(\d[\d\.\,\s]*)'),
+	'rp_prefix': re.compile(r'^Rp\s*', re.IGNORECASE),
+	'non_digit': re.compile(r'[^\d]'),
 }
 
 # ============================================================================
@@ -129,7 +135,7 @@ def parse_indonesian_currency(value_str: str) -> float:
 		return 0.0
 
 	# Remove "Rp" prefix (case-insensitive)
-	text = re.sub(r'^Rp\s*', '', text, flags=re.IGNORECASE)
+	text = _COMPILED_PATTERNS['rp_prefix'].sub('', text)
 
 	# Remove any remaining leading/trailing whitespace
 	text = text.strip()
@@ -153,8 +159,8 @@ def parse_indonesian_currency(value_str: str) -> float:
 		integer_part = integer_part.replace('.', '')
 
 		# Remove any non-digit characters
-		integer_part = re.sub(r'[^\d]', '', integer_part)
-		decimal_part = re.sub(r'[^\d]', '', decimal_part)
+		integer_part = _COMPILED_PATTERNS['non_digit'].sub('', integer_part)
+		decimal_part = _COMPILED_PATTERNS['non_digit'].sub('', decimal_part)
 
 		# Reconstruct number with dot as decimal separator
 		if decimal_part:
@@ -167,7 +173,7 @@ def parse_indonesian_currency(value_str: str) -> float:
 		text = text.replace('.', '')
 
 		# Remove any non-digit characters
-		text = re.sub(r'[^\d]', '', text)
+		text = _COMPILED_PATTERNS['non_digit'].sub('', text)
 
 	# Handle empty result
 	if not text:
@@ -442,8 +448,10 @@ def extract_summary_values(ocr_text: str) -> Dict[str, float]:
 	# so we can extract text from that point onwards.
 	# Go back ONLY 1-2 lines to catch summary "Harga Jual" (not item details).
 	
+	# The text is usually already indexed by parse_faktur_pajak_text; reuse its line split.
+	index = TextIndex.of(ocr_text)
 	summary_section = ocr_text
-	lines = ocr_text.split('\n')
+	lines = index.nl_lines
 	summary_start_line = 0
 	
 	# Find UNIQUE summary marker - use whichever appears first
@@ -454,9 +462,9 @@ def extract_summary_values(ocr_text: str) -> Dict[str, float]:
 	
 	for marker in summary_markers:
 		# Find this marker
-		marker_idx = ocr_text.find(marker)
+		marker_idx = index.find(marker)
 		if marker_idx > 0:
-			marker_line_num = ocr_text[:marker_idx].count('\n')
+			marker_line_num = index.nl_line_of(marker_idx)
 			# Go back ONLY 2 lines to catch "Harga Jual / Penggantian" summary line
 			# (not item details which are further up)
 			summary_start_line = max(0, marker_line_num - 2)
@@ -466,8 +474,9 @@ def extract_summary_values(ocr_text: str) -> Dict[str, float]:
 			)
 			break
 	
+	section_lines = lines[summary_start_line:]
 	if summary_start_line > 0:
-		summary_section = '\n'.join(lines[summary_start_line:])
+		summary_section = '\n'.join(section_lines)
 		logger.info(f"🔥 Extracted summary section ({len(lines) - summary_start_line} lines)")
 
 	# Use pre-compiled patterns (defined at module level for 30-40% performance boost)
@@ -480,20 +489,18 @@ def extract_summary_values(ocr_text: str) -> Dict[str, float]:
 		'ppnbm': _COMPILED_PATTERNS['ppnbm'],
 	}
 
-	def _find_value_after_label(text: str, patterns: list, field_name: str) -> float:
+	def _find_value_after_label(lines: List[str], patterns: list, field_name: str) -> float:
 		"""
 		Find currency value after a label pattern.
 
 		Args:
-			text: Text to search in
+			lines: Lines of the summary section
 			patterns: List of compiled regex patterns to try (in priority order)
 			field_name: Field name for logging
 
 		Returns:
 			Parsed float value or 0.0 if not found
 		"""
-		lines = text.split('\n')
-
 		for regex in patterns:
 			# Patterns are already compiled at module level (performance optimization)
 
@@ -510,7 +517,7 @@ def extract_summary_values(ocr_text: str) -> Dict[str, float]:
 
 				if text_after_label:
 					# Look for currency pattern
-					amount_match = re.search(r'(\d[\d\.\,\s]*)', text_after_label)
+					amount_match = _COMPILED_PATTERNS['amount_after_label'].search(text_after_label)
 					if amount_match:
 						amount_str = amount_match.group(1).strip()
 						value = parse_indonesian_currency(amount_str)
@@ -525,7 +532,7 @@ def extract_summary_values(ocr_text: str) -> Dict[str, float]:
 						continue
 
 					# Look for currency pattern at start of line
-					amount_match = re.match(r'^\s*(\d[\d\.\,\s]*)', next_line)
+					amount_match = _COMPILED_PATTERNS['amount_line_start'].match(next_line)
 					if amount_match:
 						amount_str = amount_match.group(1).strip()
 						value = parse_indonesian_currency(amount_str)
@@ -558,12 +565,12 @@ def extract_summary_values(ocr_text: str) -> Dict[str, float]:
 	# 🔥 FALLBACK: Standard label-based extraction from raw OCR text
 	# Extract all values FROM SUMMARY SECTION ONLY (not full text)
 	result = {
-		'harga_jual': _find_value_after_label(summary_section, field_patterns['harga_jual'], 'harga_jual'),
-		'potongan_harga': _find_value_after_label(summary_section, field_patterns['potongan_harga'], 'potongan_harga'),
-		'uang_muka': _find_value_after_label(summary_section, field_patterns['uang_muka'], 'uang_muka'),
-		'dpp': _find_value_after_label(summary_section, field_patterns['dpp'], 'dpp'),
-		'ppn': _find_value_after_label(summary_section, field_patterns['ppn'], 'ppn'),
-		'ppnbm': _find_value_after_label(summary_section, field_patterns['ppnbm'], 'ppnbm'),
+		'harga_jual': _find_value_after_label(section_lines, field_patterns['harga_jual'], 'harga_jual'),
+		'potongan_harga': _find_value_after_label(section_lines, field_patterns['potongan_harga'], 'potongan_harga'),
+		'uang_muka': _find_value_after_label(section_lines, field_patterns['uang_muka'], 'uang_muka'),
+		'dpp': _find_value_after_label(section_lines, field_patterns['dpp'], 'dpp'),
+		'ppn': _find_value_after_label(section_lines, field_patterns['ppn'], 'ppn'),
+		'ppnbm': _find_value_after_label(section_lines, field_patterns['ppnbm'], 'ppnbm'),
 	}
 
 	# 🔥 FALLBACK: If standard label-based extraction failed, use sequential matching
@@ -1199,7 +1206,7 @@ def normalize_indonesian_number(text: str) -> Optional[float]:
 	text = text.strip()
 
 	# Remove currency prefix if present
-	text = re.sub(r'^Rp\s*', '', text, flags=re.IGNORECASE)
+	text = _COMPILED_PATTERNS['rp_prefix'].sub('', text)
 	text = text.strip()
 
 	# Handle comma as decimal separator (Indonesian format)
@@ -1227,8 +1234,8 @@ def normalize_indonesian_number(text: str) -> Optional[float]:
 		decimal_part = re.sub(r'[Il]', '1', decimal_part)
 
 		# Remove any remaining non-numeric characters
-		integer_part = re.sub(r'[^\d]', '', integer_part)
-		decimal_part = re.sub(r'[^\d]', '', decimal_part)
+		integer_part = _COMPILED_PATTERNS['non_digit'].sub('', integer_part)
+		decimal_part = _COMPILED_PATTERNS['non_digit'].sub('', decimal_part)
 
 		# Reconstruct with dot as decimal separator
 		if decimal_part:
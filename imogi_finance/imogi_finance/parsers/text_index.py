@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Imogi Finance and contributors
+# For license information, please see license.txt
+
+"""
+Shared line index over faktur OCR text.
+
+``tax_invoice_ocr.parse_faktur_pajak_text`` runs a dozen extractors (label
+amounts, seller/buyer sections, signature block, bottom summary) and
+``normalization.extract_summary_values`` runs again on the same text. Each of
+them used to split and lowercase the whole text and rescan every line. A
+``TextIndex`` does that work once per text:
+
+- ``lines`` (``splitlines``) and ``nl_lines`` (``split("\\n")``, with the start
+  offset of every line) — both splits are kept because the extractors rely on
+  their different handling of ``\\r``.
+- ``lines_with(word)``: indexes of lines containing a word, case-insensitively,
+  built on first use and cached, so label searches only run their regex on
+  lines that can match.
+- ``find``/``lines_from``: cached marker offsets and the lines after them.
+- ``line_matches``: cached ``finditer`` results per (pattern, line).
+
+``TextIndex.of(text)`` keeps the most recently built index, so a second caller
+that only has the text string (``extract_summary_values``) reuses it.
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Characters Python's case-insensitive ``re`` matching treats as ASCII letters but
+# ``str.lower`` leaves alone; folded so ``lines_with`` never skips a line the label
+# regex would match.
+_REGEX_CASE_FOLD = str.maketrans({"ı": "i", "ſ": "s"})
+
+
+class TextIndex:
+    """Lines, lowered lines and cached lookups for one OCR text, built once and queried many times."""
+
+    __slots__ = (
+        "text",
+        "lower",
+        "lines",
+        "_lower_lines",
+        "_folded_lines",
+        "_word_lines",
+        "_nl_lines",
+        "_nl_starts",
+        "_finds",
+        "_lines_from",
+        "_matches",
+    )
+
+    _last: Optional["TextIndex"] = None
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.lower = self.text.lower()
+        self.lines: List[str] = self.text.splitlines()
+        self._lower_lines: Optional[List[str]] = None
+        self._folded_lines: Optional[List[str]] = None
+        self._word_lines: Dict[str, List[int]] = {}
+        self._nl_lines: Optional[List[str]] = None
+        self._nl_starts: Optional[List[int]] = None
+        self._finds: Dict[Tuple[str, bool], int] = {}
+        self._lines_from: Dict[int, List[str]] = {}
+        self._matches: Dict[Tuple[Any, int], list] = {}
+
+    @classmethod
+    def of(cls, text: str) -> "TextIndex":
+        """Index for ``text``, reusing the last one built when the text is unchanged."""
+        text = text or ""
+        last = cls._last
+        if last is not None and (last.text is text or last.text == text):
+            return last
+        index = cls(text)
+        cls._last = index
+        return index
+
+    @property
+    def lower_lines(self) -> List[str]:
+        if self._lower_lines is None:
+            self._lower_lines = [line.lower() for line in self.lines]
+        return self._lower_lines
+
+    @property
+    def folded_lines(self) -> List[str]:
+        if self._folded_lines is None:
+            if "ı" in self.lower or "ſ" in self.lower:
+                self._folded_lines = [line.translate(_REGEX_CASE_FOLD) for line in self.lower_lines]
+            else:
+                self._folded_lines = self.lower_lines
+        return self._folded_lines
+
+    @property
+    def nl_lines(self) -> List[str]:
+        """``text.split("\\n")``."""
+        if self._nl_lines is None:
+            self._nl_lines = self.text.split("\n")
+        return self._nl_lines
+
+    def nl_line_of(self, offset: int) -> int:
+        """Index in ``nl_lines`` of the line containing character ``offset``."""
+        if self._nl_starts is None:
+            starts = [0]
+            for line in self.nl_lines[:-1]:
+                starts.append(starts[-1] + len(line) + 1)
+            self._nl_starts = starts
+        return bisect_right(self._nl_starts, offset) - 1
+
+    def lines_with(self, word: str) -> List[int]:
+        """Indexes of ``lines`` containing ``word``, ignoring case."""
+        key = word.lower()
+        found = self._word_lines.get(key)
+        if found is None:
+            found = [idx for idx, line in enumerate(self.folded_lines) if key in line]
+            self._word_lines[key] = found
+        return found
+
+    def candidate_lines(self, label: str) -> Sequence[int]:
+        """Lines that can match a regex built from ``label``: those containing its first word, if it is plain letters."""
+        words = label.split()
+        if words and words[0].isalpha() and words[0].isascii():
+            return self.lines_with(words[0])
+        return range(len(self.lines))
+
+    def find(self, needle: str, ignore_case: bool = False) -> int:
+        """``text.find(needle)`` (or ``text.lower().find(needle.lower())``), cached."""
+        key = (needle, ignore_case)
+        pos = self._finds.get(key)
+        if pos is None:
+            pos = self.lower.find(needle.lower()) if ignore_case else self.text.find(needle)
+            self._finds[key] = pos
+        return pos
+
+    def lines_from(self, offset: int) -> List[str]:
+        """``text[offset:].split("\\n")``, cached per offset."""
+        lines = self._lines_from.get(offset)
+        if lines is None:
+            lines = self.text[offset:].split("\n")
+            self._lines_from[offset] = lines
+        return lines
+
+    def line_matches(self, pattern: Any, idx: int) -> list:
+        """``list(pattern.finditer(lines[idx]))``, cached."""
+        key = (pattern, idx)
+        found = self._matches.get(key)
+        if found is None:
+            found = list(pattern.finditer(self.lines[idx]))
+            self._matches[key] = found
+        return found
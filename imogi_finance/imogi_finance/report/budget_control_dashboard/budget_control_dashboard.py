@@ -33,7 +33,7 @@ This is the MAIN report that users should use - combines all budget tracking in
 
 import frappe
 from frappe import _
-from imogi_finance.budget_control import ledger, utils
+from imogi_finance.budget_control import availability
 
 
 def execute(filters=None):
@@ -241,51 +241,7 @@ def get_budget_control_breakdown(dims, from_date=None, to_date=None):
     
     Returns dict with keys: reservation, consumption, reversal, reclass, supplement
     """
-    filters = {
-        "company": dims.company,
-        "fiscal_year": dims.fiscal_year,
-        "cost_center": dims.cost_center,
-        "account": dims.account,
-        "docstatus": 1
-    }
-    
-    if dims.project:
-        filters["project"] = dims.project
-    if dims.branch:
-        filters["branch"] = dims.branch
-    if from_date and to_date:
-        filters["posting_date"] = ["between", [from_date, to_date]]
-    
-    try:
-        entries = frappe.get_all(
-            "Budget Control Entry",
-            filters=filters,
-            fields=["entry_type", "direction", "amount"]
-        )
-    except:
-        entries = []
-    
-    breakdown = {
-        "reservation": 0.0,
-        "consumption": 0.0,
-        "reversal": 0.0,
-        "reclass": 0.0,
-        "supplement": 0.0
-    }
-    
-    for entry in entries:
-        entry_type = entry.get("entry_type", "").lower()
-        direction = entry.get("direction")
-        amount = float(entry.get("amount") or 0.0)
-        
-        if entry_type in breakdown:
-            # Signed amount based on direction
-            if direction == "OUT":
-                breakdown[entry_type] += amount  # OUT = positive (reserve/restore)
-            elif direction == "IN":
-                breakdown[entry_type] -= amount  # IN = negative (consume)
-    
-    return breakdown
+    return availability.get_availability_for_dims(dims, from_date=from_date, to_date=to_date).breakdown
 
 
 def get_data(filters):
@@ -299,103 +255,70 @@ def get_data(filters):
     """
     company = filters.get("company")
     fiscal_year = filters.get("fiscal_year")
-    
-    # Get all budgets for company/fiscal year
-    budget_filters = {
-        "company": company,
-        "fiscal_year": fiscal_year,
-        "docstatus": 1
-    }
-    
-    if filters.get("cost_center"):
-        budget_filters["cost_center"] = filters.get("cost_center")
-    
-    budgets = frappe.get_all(
-        "Budget",
-        filters=budget_filters,
-        fields=["name", "cost_center"]
+
+    # One grouped query per source (Budget Account, GL Entry, Budget Control Entry),
+    # joined in memory by (cost_center, account).
+    rows = availability.get_availability_map(
+        company,
+        fiscal_year,
+        cost_center=filters.get("cost_center"),
+        account=filters.get("account"),
+        project=filters.get("project"),
+        branch=filters.get("branch"),
+        from_date=filters.get("from_date"),
+        to_date=filters.get("to_date"),
+        submitted_only=True,
     )
-    
-    if not budgets:
+
+    if not rows:
         frappe.msgprint(_("No Budget found for {0} - {1}").format(company, fiscal_year))
         return []
-    
+
     data = []
-    from_date = filters.get("from_date")
-    to_date = filters.get("to_date")
-    
-    for budget in budgets:
-        # Get budget accounts from native Budget
-        budget_accounts = frappe.get_all(
-            "Budget Account",
-            filters={"parent": budget.name},
-            fields=["account", "budget_amount"]
-        )
-        
-        for ba in budget_accounts:
-            # Apply filters
-            if filters.get("account") and ba.account != filters.get("account"):
-                continue
-            
-            # Build dimensions
-            dims = utils.Dimensions(
-                company=company,
-                fiscal_year=fiscal_year,
-                cost_center=budget.cost_center,
-                account=ba.account,
-                project=filters.get("project"),
-                branch=filters.get("branch")
-            )
-            
-            # Get availability data (combines all 3 sources)
-            availability = ledger.get_availability(dims, from_date=from_date, to_date=to_date)
-            
-            allocated = availability["allocated"]
-            actual = availability["actual"]
-            reserved = availability["reserved"]
-            available = availability["available"]
-            
-            # Get Budget Control Entry breakdown by entry_type
-            breakdown = get_budget_control_breakdown(dims, from_date=from_date, to_date=to_date)
-            
-            # Net reserved = RESERVATION(OUT-IN) - CONSUMPTION + REVERSAL
-            # Simplified flow: RESERVATION IN replaces RELEASE
-            # - RESERVATION OUT: +100 (locked for ER)
-            # - RESERVATION IN: -100 (released on ER reject/cancel)
-            # - CONSUMPTION IN: -100 (consumed by PI)
-            # - REVERSAL OUT: +100 (restored on PI cancel)
-            # Note: breakdown values are pre-signed (OUT=+, IN=-)
-            net_reserved = breakdown["reservation"] + breakdown["consumption"] + breakdown["reversal"]
-            
-            # Calculate committed = actual + net reserved
-            committed = actual + net_reserved
-            committed_pct = (committed / allocated * 100) if allocated > 0 else 0
-            
-            # Skip if no activity (optional filter)
-            if filters.get("hide_zero") and allocated == 0 and actual == 0 and net_reserved == 0:
-                continue
-            
-            # Determine status
-            status = get_status(allocated, actual, net_reserved, available)
-            
-            data.append({
-                "cost_center": budget.cost_center,
-                "account": ba.account,
-                "project": dims.project or "",
-                "branch": dims.branch or "",
-                "allocated": allocated or 0,
-                "actual": actual or 0,
-                "reservation": breakdown["reservation"] or 0,
-                "consumption": breakdown["consumption"] or 0,
-                "reversal": breakdown["reversal"] or 0,
-                "reclass": breakdown["reclass"] or 0,
-                "supplement": breakdown["supplement"] or 0,
-                "net_reserved": net_reserved or 0,
-                "committed": committed or 0,
-                "committed_pct": committed_pct or 0,
-                "available": available or 0,
-                "status": status
-            })
+    for row in rows.values():
+        allocated = row.allocated
+        actual = row.actual
+        available = row.available
+        breakdown = row.breakdown
+
+        # Net reserved = RESERVATION(OUT-IN) - CONSUMPTION + REVERSAL
+        # Simplified flow: RESERVATION IN replaces RELEASE
+        # - RESERVATION OUT: +100 (locked for ER)
+        # - RESERVATION IN: -100 (released on ER reject/cancel)
+        # - CONSUMPTION IN: -100 (consumed by PI)
+        # - REVERSAL OUT: +100 (restored on PI cancel)
+        # Note: breakdown values are pre-signed (OUT=+, IN=-)
+        net_reserved = breakdown["reservation"] + breakdown["consumption"] + breakdown["reversal"]
+
+        # Calculate committed = actual + net reserved
+        committed = actual + net_reserved
+        committed_pct = (committed / allocated * 100) if allocated > 0 else 0
+
+        # Skip if no activity (optional filter)
+        if filters.get("hide_zero") and allocated == 0 and actual == 0 and net_reserved == 0:
+            continue
+
+        # Determine status
+        status = get_status(allocated, actual, net_reserved, available)
+
+        data.append({
+            "cost_center": row.cost_center,
+            "account": row.account,
+            "project": filters.get("project") or "",
+            "branch": filters.get("branch") or "",
+            "allocated": allocated or 0,
+            "actual": actual or 0,
+            "reservation": breakdown["reservation"] or 0,
+            "consumption": breakdown["consumption"] or 0,
+            "reversal": breakdown["reversal"] or 0,
+            "reclass": breakdown["reclass"] or 0,
+            "supplement": breakdown["supplement"] or 0,
+            "net_reserved": net_reserved or 0,
+            "committed": committed or 0,
+            "committed_pct": committed_pct or 0,
+            "available": available or 0,
+            "status": status
+        })
     
     # Sort by allocated descending, then by committed percentage
     data.sort(key=lambda x: (x["allocated"], x["committed_pct"]), reverse=True)
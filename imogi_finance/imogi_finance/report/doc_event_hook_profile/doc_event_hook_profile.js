@@ -0,0 +1,40 @@
+// Copyright (c) 2026, PT. Inovasi Terbaik Bangsa and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Doc Event Hook Profile"] = {
+	"filters": [
+		{
+			"fieldname": "hours",
+			"label": __("Last Hours"),
+			"fieldtype": "Int",
+			"default": 24
+		},
+		{
+			"fieldname": "ref_doctype",
+			"label": __("Document Type"),
+			"fieldtype": "Link",
+			"options": "DocType"
+		}
+	],
+
+	onload: function(report) {
+		report.page.add_inner_button(__("Reset Profile"), function() {
+			frappe.confirm(__("Drop all recorded hook timings?"), function() {
+				frappe.call({
+					method: "imogi_finance.hook_profiler.reset_profile",
+					callback: function() {
+						report.refresh();
+					}
+				});
+			});
+		});
+	},
+
+	formatter: function(value, row, column, data, default_formatter) {
+		value = default_formatter(value, row, column, data);
+		if (column.fieldname === "over_budget" && data && data.over_budget > 0) {
+			value = `<span style="color: red; font-weight: bold;">${value}</span>`;
+		}
+		return value;
+	}
+};
@@ -0,0 +1,61 @@
+# Copyright (c) 2026, PT. Inovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from imogi_finance import hook_profiler
+
+
+def execute(filters=None):
+	"""
+	Doc Event Hook Profile
+
+	Ranks Imogi Finance doc_event handlers by estimated p95 latency over the last
+	hours, from the timings recorded by ``imogi_finance.hook_profiler``.
+	"""
+	filters = frappe._dict(filters or {})
+	settings = hook_profiler.get_settings()
+
+	columns = get_columns()
+	data = hook_profiler.get_profile(hours=cint(filters.hours), doctype=filters.ref_doctype)
+
+	message = None
+	if not settings["enabled"]:
+		message = _("Doc event profiling is off. Enable it in Finance Control Settings to record new timings.")
+
+	return columns, data, message, None, get_report_summary(data, settings)
+
+
+def get_columns():
+	"""Define report columns"""
+	return [
+		{"label": _("Document Type"), "fieldname": "doctype", "fieldtype": "Link", "options": "DocType", "width": 160},
+		{"label": _("Event"), "fieldname": "event", "fieldtype": "Data", "width": 150},
+		{"label": _("Handler"), "fieldname": "handler", "fieldtype": "Data", "width": 360},
+		{"label": _("Calls"), "fieldname": "calls", "fieldtype": "Int", "width": 80},
+		{"label": _("p95 (ms)"), "fieldname": "p95_ms", "fieldtype": "Float", "width": 90},
+		{"label": _("p50 (ms)"), "fieldname": "p50_ms", "fieldtype": "Float", "width": 90},
+		{"label": _("Avg (ms)"), "fieldname": "avg_ms", "fieldtype": "Float", "width": 90},
+		{"label": _("Max (ms)"), "fieldname": "max_ms", "fieldtype": "Float", "width": 90},
+		{"label": _("Total (ms)"), "fieldname": "total_ms", "fieldtype": "Float", "width": 110},
+		{"label": _("Avg Queries"), "fieldname": "avg_queries", "fieldtype": "Float", "width": 100},
+		{"label": _("Avg Rows Read"), "fieldname": "avg_rows", "fieldtype": "Float", "width": 110},
+		{"label": _("Over Budget"), "fieldname": "over_budget", "fieldtype": "Int", "width": 100},
+	]
+
+
+def get_report_summary(data, settings):
+	"""Summary cards: calls profiled, calls over budget and the latency budget"""
+	over_budget = sum(row["over_budget"] for row in data)
+	return [
+		{"value": sum(row["calls"] for row in data), "label": _("Calls Profiled"), "datatype": "Int"},
+		{
+			"value": over_budget,
+			"label": _("Calls Over Budget"),
+			"datatype": "Int",
+			"indicator": "Red" if over_budget else "Green",
+		},
+		{"value": settings["budget_ms"], "label": _("Latency Budget (ms)"), "datatype": "Int"},
+	]
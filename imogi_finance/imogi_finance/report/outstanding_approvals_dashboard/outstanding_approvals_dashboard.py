@@ -119,6 +119,9 @@ def get_columns():
 	]
 
 
+APPROVAL_LEVELS = (1, 2, 3)
+
+
 def get_data(filters):
 	"""
 	Query all approval doctypes and return pending approvals assigned to the filtered user.
@@ -169,7 +172,6 @@ def get_data(filters):
 		}
 	]
 
-	all_data = []
 	user = filters.get("user")
 	from_date = filters.get("from_date")
 	to_date = filters.get("to_date")
@@ -199,112 +201,179 @@ def get_data(filters):
 	cost_center_filter = filters.get("cost_center")
 	branch_filter = filters.get("branch")
 
-	for doctype_config in approval_doctypes:
-		doctype = doctype_config["doctype"]
+	selected_configs = [
+		config for config in approval_doctypes
+		if not doctype_filter or config["doctype"] in doctype_filter
+	]
+	level_fields_by_doctype = get_level_fields([config["doctype"] for config in selected_configs])
 
-		# Skip if doctype filter is applied and this doctype is not selected
-		if doctype_filter and doctype not in doctype_filter:
+	pending_rows = []
+	for doctype_config in selected_configs:
+		doctype = doctype_config["doctype"]
+		levels = [
+			level for level in level_fields_by_doctype.get(doctype, [])
+			if not approval_level_filter or level == approval_level_filter
+		]
+		if not levels:
 			continue
 
-		# Check if doctype exists
-		if not frappe.db.exists("DocType", doctype):
+		try:
+			# One query per doctype covering every approval level
+			pending_docs = get_pending_documents(
+				doctype_config,
+				levels,
+				user=user,
+				from_date=from_date,
+				to_date=to_date,
+				cost_center=cost_center_filter,
+				branch=branch_filter,
+			)
+		except Exception as e:
+			frappe.log_error(f"Error querying {doctype} for approval levels {levels}: {str(e)}")
 			continue
 
-		# Query for each approval level (1, 2, 3)
-		for level in [1, 2, 3]:
-			# Skip if approval level filter is applied and this level doesn't match
-			if approval_level_filter and level != approval_level_filter:
-				continue
-
-			level_user_field = f"level_{level}_user"
-
-			# Check if level field exists in doctype
-			if not frappe.db.exists("DocField", {"parent": doctype, "fieldname": level_user_field}):
-				continue
-
-			# Build filter conditions
-			filter_conditions = {
-				"workflow_state": ["in", doctype_config["pending_states"]],
-				"docstatus": 1,
-				"current_approval_level": level,
-				level_user_field: user
-			}
-
-			# Add date filters only if both are provided
-			if from_date and to_date:
-				filter_conditions["modified"] = ["between", [from_date, to_date]]
-			elif from_date:
-				filter_conditions["modified"] = [">=", from_date]
-			elif to_date:
-				filter_conditions["modified"] = ["<=", to_date]
-
-			# Add cost center filter if applicable
-			if cost_center_filter and doctype_config["cost_center_field"]:
-				filter_conditions[doctype_config["cost_center_field"]] = cost_center_filter
-
-			# Add branch filter if applicable
-			if branch_filter and doctype_config["branch_field"]:
-				filter_conditions[doctype_config["branch_field"]] = branch_filter
-
-			# Build fields list
-			fields = [
-				"name", "creation", "modified", "owner", "workflow_state",
-				"current_approval_level", level_user_field
-			]
+		pending_rows.extend((doctype_config, doc) for doc in pending_docs)
 
-			if doctype_config["amount_field"]:
-				fields.append(doctype_config["amount_field"])
-			if doctype_config["cost_center_field"]:
-				fields.append(doctype_config["cost_center_field"])
-			if doctype_config["branch_field"]:
-				fields.append(doctype_config["branch_field"])
-
-			try:
-				# Execute query
-				pending_docs = frappe.get_all(
-					doctype,
-					filters=filter_conditions,
-					fields=fields,
-					order_by="modified desc"
-				)
-
-				# Process results
-				for doc in pending_docs:
-					# Calculate days pending
-					days_pending = date_diff(getdate(), getdate(doc.modified))
-
-					# Determine aging category
-					aging_category = get_aging_category(days_pending)
-
-					# Get approver full name
-					approver_user = doc.get(level_user_field)
-					approver_name = frappe.db.get_value("User", approver_user, "full_name") or approver_user
-
-					# Build row data
-					row = {
-						"doctype": doctype,
-						"document": doc.name,
-						"creation": doc.creation,
-						"owner": doc.owner,
-						"workflow_state": doc.workflow_state,
-						"current_approval_level": doc.current_approval_level,
-						"amount": doc.get(doctype_config["amount_field"]) if doctype_config["amount_field"] else 0,
-						"cost_center": doc.get(doctype_config["cost_center_field"]) if doctype_config["cost_center_field"] else None,
-						"branch": doc.get(doctype_config["branch_field"]) if doctype_config["branch_field"] else None,
-						"days_pending": days_pending,
-						"aging_category": aging_category,
-						"approver": approver_name
-					}
-
-					all_data.append(row)
-
-			except Exception as e:
-				frappe.log_error(f"Error querying {doctype} for approval level {level}: {str(e)}")
-				continue
+	# Resolve every approver's full name with a single User query
+	approver_names = get_user_full_names({doc.get("approver_user") for _config, doc in pending_rows})
+	today = getdate()
+
+	all_data = []
+	for doctype_config, doc in pending_rows:
+		# Calculate days pending
+		days_pending = date_diff(today, getdate(doc.get("modified")))
+
+		approver_user = doc.get("approver_user")
+
+		all_data.append({
+			"doctype": doctype_config["doctype"],
+			"document": doc.get("name"),
+			"creation": doc.get("creation"),
+			"owner": doc.get("owner"),
+			"workflow_state": doc.get("workflow_state"),
+			"current_approval_level": doc.get("current_approval_level"),
+			"amount": doc.get("amount") if doctype_config["amount_field"] else 0,
+			"cost_center": doc.get("cost_center") if doctype_config["cost_center_field"] else None,
+			"branch": doc.get("branch") if doctype_config["branch_field"] else None,
+			"days_pending": days_pending,
+			"aging_category": get_aging_category(days_pending),
+			"approver": approver_names.get(approver_user) or approver_user
+		})
 
 	return all_data
 
 
+# ``frappe.local.request_cache`` key for {doctype: [levels with a level_N_user field]}.
+# Request-scoped, so a field added by migrate or customization is seen on the next request.
+LEVEL_FIELDS_CACHE_KEY = "outstanding_approvals_level_fields"
+
+
+def _level_fields_cache():
+	request_cache = getattr(getattr(frappe, "local", None), "request_cache", None)
+	if request_cache is None:
+		return {}
+	return request_cache.setdefault(LEVEL_FIELDS_CACHE_KEY, {})
+
+
+def get_level_fields(doctypes):
+	"""
+	Return the approval levels (1-3) that have a ``level_N_user`` field, per doctype.
+	Existing doctypes are resolved with one DocField query and cached for the request.
+	"""
+	cache = _level_fields_cache()
+	missing = [doctype for doctype in doctypes if doctype not in cache]
+	if missing:
+		level_fields = [f"level_{level}_user" for level in APPROVAL_LEVELS]
+		rows = frappe.get_all(
+			"DocField",
+			filters={"parent": ["in", missing], "fieldname": ["in", level_fields]},
+			fields=["parent", "fieldname"],
+		)
+		found = {}
+		for row in rows:
+			found.setdefault(row.get("parent"), set()).add(row.get("fieldname"))
+
+		for doctype in missing:
+			fields = found.get(doctype, set())
+			cache[doctype] = [
+				level for level in APPROVAL_LEVELS if f"level_{level}_user" in fields
+			]
+
+	return {doctype: cache.get(doctype, []) for doctype in doctypes}
+
+
+def get_pending_documents(doctype_config, levels, *, user, from_date=None, to_date=None, cost_center=None, branch=None):
+	"""
+	Fetch documents of one doctype pending on ``user`` at any of ``levels``.
+	The approver for each row is exposed as ``approver_user``.
+	"""
+	doctype = doctype_config["doctype"]
+	params = {"user": user, "pending_states": tuple(doctype_config["pending_states"])}
+
+	level_conditions = " or ".join(
+		f"(current_approval_level = {level} and `level_{level}_user` = %(user)s)" for level in levels
+	)
+	approver_case = " ".join(f"when {level} then `level_{level}_user`" for level in levels)
+
+	conditions = [
+		"docstatus = 1",
+		"workflow_state in %(pending_states)s",
+		f"({level_conditions})",
+	]
+
+	# Add date filters
+	if from_date and to_date:
+		conditions.append("modified between %(from_date)s and %(to_date)s")
+		params.update(from_date=from_date, to_date=to_date)
+	elif from_date:
+		conditions.append("modified >= %(from_date)s")
+		params["from_date"] = from_date
+	elif to_date:
+		conditions.append("modified <= %(to_date)s")
+		params["to_date"] = to_date
+
+	if cost_center and doctype_config["cost_center_field"]:
+		conditions.append(f"`{doctype_config['cost_center_field']}` = %(cost_center)s")
+		params["cost_center"] = cost_center
+	if branch and doctype_config["branch_field"]:
+		conditions.append(f"`{doctype_config['branch_field']}` = %(branch)s")
+		params["branch"] = branch
+
+	fields = [
+		"name", "creation", "modified", "owner", "workflow_state", "current_approval_level",
+		f"case current_approval_level {approver_case} end as approver_user",
+	]
+	if doctype_config["amount_field"]:
+		fields.append(f"`{doctype_config['amount_field']}` as amount")
+	if doctype_config["cost_center_field"]:
+		fields.append(f"`{doctype_config['cost_center_field']}` as cost_center")
+	if doctype_config["branch_field"]:
+		fields.append(f"`{doctype_config['branch_field']}` as branch")
+
+	return frappe.db.sql(
+		f"""
+		select {", ".join(fields)}
+		from `tab{doctype}`
+		where {" and ".join(conditions)}
+		order by modified desc
+		""",
+		params,
+		as_dict=True,
+	)
+
+
+def get_user_full_names(users):
+	"""
+	Map user IDs to full names with a single query.
+	"""
+	users = [user for user in users if user]
+	if not users:
+		return {}
+
+	rows = frappe.get_all("User", filters={"name": ["in", users]}, fields=["name", "full_name"])
+	return {row.get("name"): row.get("full_name") for row in rows}
+
+
 def get_aging_category(days):
 	"""
 	Categorize approval aging into buckets with color indicators.
@@ -12,15 +12,20 @@ from frappe import _
 from frappe.query_builder import DocType
 from frappe.query_builder.functions import Sum, Coalesce
 from frappe.utils import flt, getdate
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Iterator, List, Any, Tuple
 
 from imogi_finance.imogi_finance.utils.tax_report_utils import (
 	validate_vat_output_configuration,
 	build_date_conditions,
+	build_keyset_condition,
 	get_columns_with_width,
-	get_tax_amount_from_gl
+	get_invoice_tax_amounts,
+	get_invoice_register_totals
 )
 
+# Rows per page when the register is streamed with iter_data
+REGISTER_PAGE_SIZE = 500
+
 
 def execute(filters: Optional[Dict[str, Any]] = None) -> tuple[List[Dict], List[Dict]]:
 	"""
@@ -34,7 +39,15 @@ def execute(filters: Optional[Dict[str, Any]] = None) -> tuple[List[Dict], List[
 	"""
 	filters = filters or {}
 
-	# Validate configuration first
+	ppn_output_account = get_ppn_output_account(filters)
+	columns = get_columns()
+	data = get_data(filters, ppn_output_account)
+
+	return columns, data
+
+
+def get_ppn_output_account(filters: Dict[str, Any]) -> str:
+	"""Validate the VAT Output configuration and return the PPN Output account."""
 	validation = validate_vat_output_configuration(filters.get("company"))
 	if not validation.get("valid"):
 		frappe.msgprint(
@@ -44,11 +57,7 @@ def execute(filters: Optional[Dict[str, Any]] = None) -> tuple[List[Dict], List[
 			raise_exception=True
 		)
 
-	ppn_output_account = validation.get("account")
-	columns = get_columns()
-	data = get_data(filters, ppn_output_account)
-
-	return columns, data
+	return validation.get("account")
 
 
 def get_columns() -> List[Dict[str, Any]]:
@@ -128,10 +137,18 @@ def get_columns() -> List[Dict[str, Any]]:
 	return get_columns_with_width(columns)
 
 
-def get_data(filters: Dict[str, Any], ppn_output_account: str) -> List[Dict[str, Any]]:
+def get_data(
+	filters: Dict[str, Any],
+	ppn_output_account: str,
+	page_size: Optional[int] = None,
+	after: Optional[Tuple[Any, str]] = None
+) -> List[Dict[str, Any]]:
 	"""
 	Get VAT Output Register data using frappe.qb with GL Entry validation.
 	Only shows invoices that have been properly posted to the ledger.
+
+	With ``page_size`` only one page is returned; pass the (posting_date, name) of
+	the last row as ``after`` to fetch the next page (keyset pagination).
 	"""
 	SI = DocType("Sales Invoice")
 	GL = DocType("GL Entry")
@@ -179,30 +196,75 @@ def get_data(filters: Dict[str, Any], ppn_output_account: str) -> List[Dict[str,
 	if date_condition is not None:
 		query = query.where(date_condition)
 
+	# Keyset pagination: continue after the last row of the previous page
+	keyset_condition = build_keyset_condition(SI, after)
+	if keyset_condition is not None:
+		query = query.where(keyset_condition)
+
 	# Order by posting date
 	query = query.orderby(SI.posting_date).orderby(SI.name)
 
+	if page_size:
+		query = query.limit(page_size)
+
 	# Execute query
 	invoices = query.run(as_dict=True)
 
-	# Get GL-based tax amounts for each invoice
+	# Get actual tax amounts from GL Entry (most reliable source) in chunked batches
+	tax_amounts = get_invoice_tax_amounts(invoices, "Sales Invoice", ppn_output_account)
+
 	data = []
 	for invoice in invoices:
-		# Get actual tax amount from GL Entry (most reliable source)
-		tax_amount_gl = get_tax_amount_from_gl(
-			voucher_type="Sales Invoice",
-			voucher_no=invoice.name,
-			tax_account=ppn_output_account,
-			company=invoice.company
-		)
-
 		# Use out_buyer_tax_id as the buyer NPWP field
 		npwp = invoice.get("out_buyer_tax_id")
 
 		data.append({
 			**invoice,
 			"out_fp_customer_npwp": npwp,
-			"tax_amount_gl": tax_amount_gl
+			"tax_amount_gl": tax_amounts.get(invoice.name, 0.0)
 		})
 
 	return data
+
+
+def iter_data(
+	filters: Dict[str, Any],
+	page_size: int = REGISTER_PAGE_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+	"""
+	Yield the register in pages of ``page_size`` rows ordered by (posting_date, name).
+
+	Only one page is held in memory at a time, so large periods can be streamed.
+	"""
+	ppn_output_account = get_ppn_output_account(filters)
+	after = None
+
+	while True:
+		page = get_data(filters, ppn_output_account, page_size=page_size, after=after)
+		if not page:
+			return
+
+		yield page
+
+		if len(page) < page_size:
+			return
+		after = (page[-1]["posting_date"], page[-1]["name"])
+
+
+def get_totals(filters: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Get register totals (invoice count, DPP, GL PPN) aggregated in SQL.
+
+	Uses the same filters as ``get_data`` without loading any rows.
+	"""
+	ppn_output_account = get_ppn_output_account(filters)
+
+	return get_invoice_register_totals(
+		"Sales Invoice",
+		ppn_output_account,
+		filters,
+		party_field="customer",
+		dpp_field="out_fp_dpp",
+		status_field="out_fp_status",
+		absolute_tax=False
+	)
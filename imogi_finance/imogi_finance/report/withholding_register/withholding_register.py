@@ -10,17 +10,21 @@ from __future__ import annotations
 import frappe
 from frappe import _
 from frappe.query_builder import DocType
-from frappe.query_builder.functions import Sum, Coalesce
+from frappe.query_builder.functions import Count, Sum, Coalesce
 from frappe.utils import flt, getdate
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Iterator, List, Any, Tuple
 
 from imogi_finance.imogi_finance.utils.tax_report_utils import (
 	validate_withholding_configuration,
 	get_pph_accounts_for_company,
 	build_date_conditions,
+	build_keyset_condition,
 	get_columns_with_width
 )
 
+# Rows per page when the register is streamed with iter_data
+REGISTER_PAGE_SIZE = 500
+
 
 def execute(filters: Optional[Dict[str, Any]] = None) -> tuple[List[Dict], List[Dict]]:
 	"""
@@ -34,6 +38,15 @@ def execute(filters: Optional[Dict[str, Any]] = None) -> tuple[List[Dict], List[
 	"""
 	filters = filters or {}
 	
+	company, accounts = get_register_accounts(filters)
+	columns = get_columns()
+	data = get_data(filters, company, accounts)
+	
+	return columns, data
+
+
+def get_register_accounts(filters: Dict[str, Any]) -> Tuple[str, List[str]]:
+	"""Validate the Withholding configuration and return (company, PPh accounts)."""
 	# Company is required for this report
 	company = filters.get("company")
 	if not company:
@@ -59,11 +72,8 @@ def execute(filters: Optional[Dict[str, Any]] = None) -> tuple[List[Dict], List[
 	
 	if not accounts:
 		frappe.throw(_("No withholding tax accounts configured or selected"))
-	
-	columns = get_columns()
-	data = get_data(filters, company, accounts)
-	
-	return columns, data
+
+	return company, accounts
 
 
 def get_columns() -> List[Dict[str, Any]]:
@@ -137,10 +147,19 @@ def get_columns() -> List[Dict[str, Any]]:
 	return get_columns_with_width(columns)
 
 
-def get_data(filters: Dict[str, Any], company: str, accounts: List[str]) -> List[Dict[str, Any]]:
+def get_data(
+	filters: Dict[str, Any],
+	company: str,
+	accounts: List[str],
+	page_size: Optional[int] = None,
+	after: Optional[Tuple[Any, str]] = None
+) -> List[Dict[str, Any]]:
 	"""
 	Get Withholding Register data using frappe.qb.
 	Returns only valid, non-cancelled GL entries.
+
+	With ``page_size`` one page ordered by (posting_date, name) is returned; pass the
+	(posting_date, name) of the last row as ``after`` to fetch the next page.
 	"""
 	GL = DocType("GL Entry")
 	
@@ -148,6 +167,7 @@ def get_data(filters: Dict[str, Any], company: str, accounts: List[str]) -> List
 	query = (
 		frappe.qb.from_(GL)
 		.select(
+			GL.name,
 			GL.posting_date,
 			GL.account,
 			GL.party_type,
@@ -179,8 +199,15 @@ def get_data(filters: Dict[str, Any], company: str, accounts: List[str]) -> List
 	if filters.get("voucher_type"):
 		query = query.where(GL.voucher_type == filters.get("voucher_type"))
 	
-	# Order by posting date and account
-	query = query.orderby(GL.posting_date).orderby(GL.account).orderby(GL.voucher_no)
+	if page_size:
+		# Keyset pagination needs a unique, stable order
+		keyset_condition = build_keyset_condition(GL, after)
+		if keyset_condition is not None:
+			query = query.where(keyset_condition)
+		query = query.orderby(GL.posting_date).orderby(GL.name).limit(page_size)
+	else:
+		# Order by posting date and account
+		query = query.orderby(GL.posting_date).orderby(GL.account).orderby(GL.voucher_no)
 	
 	# Execute query
 	entries = query.run(as_dict=True)
@@ -190,3 +217,73 @@ def get_data(filters: Dict[str, Any], company: str, accounts: List[str]) -> List
 		entry["net_amount"] = flt(entry.get("credit", 0)) - flt(entry.get("debit", 0))
 	
 	return entries
+
+
+def iter_data(
+	filters: Dict[str, Any],
+	page_size: int = REGISTER_PAGE_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+	"""
+	Yield the register in pages of ``page_size`` rows ordered by (posting_date, name).
+
+	Only one page is held in memory at a time, so large periods can be streamed.
+	"""
+	company, accounts = get_register_accounts(filters)
+	after = None
+
+	while True:
+		page = get_data(filters, company, accounts, page_size=page_size, after=after)
+		if not page:
+			return
+
+		yield page
+
+		if len(page) < page_size:
+			return
+		after = (page[-1]["posting_date"], page[-1]["name"])
+
+
+def get_totals(filters: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Get withholding totals per account (credit - debit) and entry count aggregated in SQL.
+
+	Uses the same filters as ``get_data`` without loading any rows.
+	"""
+	company, accounts = get_register_accounts(filters)
+	GL = DocType("GL Entry")
+
+	query = (
+		frappe.qb.from_(GL)
+		.select(
+			GL.account,
+			Count(GL.name).as_("entry_count"),
+			Coalesce(Sum(GL.credit), 0).as_("total_credit"),
+			Coalesce(Sum(GL.debit), 0).as_("total_debit")
+		)
+		.where(GL.company == company)
+		.where(GL.is_cancelled == 0)
+		.where(GL.account.isin(accounts))
+		.groupby(GL.account)
+	)
+
+	date_condition = build_date_conditions(GL, filters, "posting_date")
+	if date_condition is not None:
+		query = query.where(date_condition)
+
+	if filters.get("party"):
+		query = query.where(GL.party == filters.get("party"))
+
+	if filters.get("voucher_type"):
+		query = query.where(GL.voucher_type == filters.get("voucher_type"))
+
+	totals_by_account = {}
+	entry_count = 0
+	for row in query.run(as_dict=True):
+		totals_by_account[row.account] = flt(row.total_credit) - flt(row.total_debit)
+		entry_count += int(row.entry_count or 0)
+
+	return {
+		"totals_by_account": totals_by_account,
+		"total_amount": sum(totals_by_account.values()),
+		"entry_count": entry_count
+	}
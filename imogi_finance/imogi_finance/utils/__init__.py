@@ -30,6 +30,7 @@ from __future__ import annotations
 
 # Re-export commonly used functions for convenience
 from .tax_report_utils import (
+    get_invoice_tax_amounts,
     get_tax_amount_from_gl,
     get_tax_amounts_batch,
     validate_tax_register_configuration,
@@ -92,6 +93,7 @@ def ensure_advances_allow_on_submit():
 
 
 __all__ = [
+    "get_invoice_tax_amounts",
     "get_tax_amount_from_gl",
     "get_tax_amounts_batch",
     "validate_tax_register_configuration",
@@ -18,6 +18,9 @@ from imogi_finance.settings.utils import (
 	get_tax_invoice_ocr_settings as _get_tax_invoice_ocr_settings_helper,
 )
 
+# Vouchers per grouped GL query in batch tax lookups; keeps IN lists and result sets bounded.
+GL_BATCH_SIZE = 1000
+
 
 def get_tax_profile(company: str) -> Optional[frappe._dict]:
 	"""
@@ -284,6 +287,186 @@ def build_date_conditions(qb_table, filters: Dict[str, Any], date_field: str = "
 	return criterion
 
 
+def build_keyset_condition(
+	qb_table,
+	after: Optional[Tuple[Any, str]],
+	date_field: str = "posting_date",
+	key_field: str = "name"
+) -> Optional[Criterion]:
+	"""
+	Build a keyset pagination condition: rows ordered after ``after``.
+
+	Args:
+		qb_table: Query Builder table object
+		after: (date, name) of the last row of the previous page, or None
+		date_field: Name of the date field the register is ordered by
+		key_field: Unique tie-breaker field
+
+	Returns:
+		Query Builder criterion or None for the first page
+	"""
+	if not after:
+		return None
+
+	after_date, after_key = after
+	after_date = getdate(after_date)
+	date_column = getattr(qb_table, date_field)
+
+	return (date_column > after_date) | (
+		(date_column == after_date) & (getattr(qb_table, key_field) > after_key)
+	)
+
+
+def get_invoice_register_totals(
+	doctype: str,
+	tax_account: str,
+	filters: Dict[str, Any],
+	party_field: str,
+	dpp_field: str,
+	status_field: str,
+	absolute_tax: bool = False
+) -> Dict[str, Any]:
+	"""
+	Aggregate a verified VAT register (invoice count, DPP, GL tax) in a single SQL query.
+
+	Applies the same rules as the register reports: submitted invoices with at least
+	one non-cancelled GL entry, the verification status filter (default "Verified"),
+	and the GL tax amount per invoice on ``tax_account``.
+
+	Args:
+		doctype: Purchase Invoice or Sales Invoice
+		tax_account: PPN account
+		filters: Report filters (company, party, verification_status, from_date, to_date)
+		party_field: Party filter field (supplier, customer)
+		dpp_field: Invoice DPP field
+		status_field: Invoice verification status field
+		absolute_tax: Sum absolute per-invoice tax amounts (Input VAT is always a credit)
+
+	Returns:
+		Dict with invoice_count, total_dpp and total_ppn
+	"""
+	result = _query_invoice_register_totals(
+		doctype, tax_account, filters, party_field, dpp_field, status_field, absolute_tax
+	)
+	totals = result[0] if result else {}
+
+	return {
+		"invoice_count": int(totals.get("invoice_count") or 0),
+		"total_dpp": flt(totals.get("total_dpp")),
+		"total_ppn": flt(totals.get("total_ppn"))
+	}
+
+
+def get_invoice_register_daily_totals(
+	doctype: str,
+	tax_account: str,
+	filters: Dict[str, Any],
+	party_field: str,
+	dpp_field: str,
+	status_field: str,
+	absolute_tax: bool = False
+) -> Dict[Any, Dict[str, Any]]:
+	"""
+	Same aggregation as ``get_invoice_register_totals``, grouped by posting date.
+
+	Returns:
+		Dict mapping posting_date to invoice_count, total_dpp and total_ppn
+	"""
+	result = _query_invoice_register_totals(
+		doctype, tax_account, filters, party_field, dpp_field, status_field, absolute_tax,
+		by_posting_date=True
+	)
+
+	return {
+		getdate(row.get("posting_date")): {
+			"invoice_count": int(row.get("invoice_count") or 0),
+			"total_dpp": flt(row.get("total_dpp")),
+			"total_ppn": flt(row.get("total_ppn"))
+		}
+		for row in result or []
+	}
+
+
+def _query_invoice_register_totals(
+	doctype: str,
+	tax_account: str,
+	filters: Dict[str, Any],
+	party_field: str,
+	dpp_field: str,
+	status_field: str,
+	absolute_tax: bool,
+	by_posting_date: bool = False
+) -> List[Dict[str, Any]]:
+	root_type = frappe.db.get_value("Account", tax_account, "root_type")
+	tax_expression = "gl.credit - gl.debit" if root_type == "Liability" else "gl.debit - gl.credit"
+
+	conditions = ["inv.docstatus = 1"]
+	params = {"voucher_type": doctype, "tax_account": tax_account}
+
+	if filters.get("company"):
+		conditions.append("inv.company = %(company)s")
+		params["company"] = filters.get("company")
+
+	if filters.get(party_field):
+		conditions.append(f"inv.`{party_field}` = %(party)s")
+		params["party"] = filters.get(party_field)
+
+	# Verification status filter - default to "Verified" if not specified
+	verification_status = filters.get("verification_status", "Verified")
+	if verification_status:
+		conditions.append(f"inv.`{status_field}` = %(verification_status)s")
+		params["verification_status"] = verification_status
+
+	if filters.get("from_date"):
+		conditions.append("inv.posting_date >= %(from_date)s")
+		params["from_date"] = getdate(filters.get("from_date"))
+
+	if filters.get("to_date"):
+		conditions.append("inv.posting_date <= %(to_date)s")
+		params["to_date"] = getdate(filters.get("to_date"))
+
+	tax_total = "abs(register.tax_amount)" if absolute_tax else "register.tax_amount"
+	date_column = "register.posting_date," if by_posting_date else ""
+	group_by = "group by register.posting_date" if by_posting_date else ""
+
+	return frappe.db.sql(
+		f"""
+		select
+			{date_column}
+			count(*) as invoice_count,
+			coalesce(sum(register.dpp), 0) as total_dpp,
+			coalesce(sum({tax_total}), 0) as total_ppn
+		from (
+			select
+				inv.posting_date,
+				inv.`{dpp_field}` as dpp,
+				(
+					select coalesce(sum({tax_expression}), 0)
+					from `tabGL Entry` gl
+					where gl.voucher_type = %(voucher_type)s
+						and gl.voucher_no = inv.name
+						and gl.account = %(tax_account)s
+						and gl.company = inv.company
+						and gl.is_cancelled = 0
+				) as tax_amount
+			from `tab{doctype}` inv
+			where {" and ".join(conditions)}
+				and exists (
+					select 1
+					from `tabGL Entry` posted
+					where posted.voucher_type = %(voucher_type)s
+						and posted.voucher_no = inv.name
+						and posted.company = inv.company
+						and posted.is_cancelled = 0
+				)
+		) register
+		{group_by}
+		""",
+		params,
+		as_dict=True
+	)
+
+
 def has_valid_gl_entries(voucher_type: str, voucher_no: str, company: str) -> bool:
 	"""
 	Check if a voucher has valid GL entries (properly posted to ledger).
@@ -373,16 +556,21 @@ def get_tax_amount_from_gl(
 def get_tax_amounts_batch(
 	voucher_list: List[Tuple[str, str]],
 	tax_account: str,
-	company: str
+	company: str,
+	chunk_size: int = GL_BATCH_SIZE
 ) -> Dict[Tuple[str, str], float]:
 	"""
-	Get tax amounts from GL Entry for multiple vouchers in a single query.
+	Get tax amounts from GL Entry for multiple vouchers with one grouped query per chunk.
 	This solves the N+1 query problem when processing many invoices.
 
+	Vouchers are read in chunks of ``chunk_size`` so the IN list (and each result set)
+	stays bounded for large periods.
+
 	Args:
 		voucher_list: List of (voucher_type, voucher_no) tuples
 		tax_account: Tax account name
 		company: Company name
+		chunk_size: Maximum vouchers per GL query
 
 	Returns:
 		Dict mapping (voucher_type, voucher_no) to tax amount
@@ -403,39 +591,37 @@ def get_tax_amounts_batch(
 	root_type = frappe.db.get_value("Account", tax_account, "root_type")
 	is_liability = root_type == "Liability"
 
-	# Build list of voucher_no values to filter
-	voucher_nos = [voucher_no for _, voucher_no in voucher_list]
-
-	# Single query to get all GL entries for these vouchers
-	query = (
-		frappe.qb.from_(GLEntry)
-		.select(
-			GLEntry.voucher_type,
-			GLEntry.voucher_no,
-			Coalesce(Sum(GLEntry.debit), 0).as_("total_debit"),
-			Coalesce(Sum(GLEntry.credit), 0).as_("total_credit")
+	amounts = {}
+	for chunk in _iter_chunks(voucher_list, chunk_size):
+		voucher_types = sorted({voucher_type for voucher_type, _voucher_no in chunk})
+		voucher_nos = [voucher_no for _voucher_type, voucher_no in chunk]
+
+		# One grouped query per chunk for all GL entries of these vouchers
+		query = (
+			frappe.qb.from_(GLEntry)
+			.select(
+				GLEntry.voucher_type,
+				GLEntry.voucher_no,
+				Coalesce(Sum(GLEntry.debit), 0).as_("total_debit"),
+				Coalesce(Sum(GLEntry.credit), 0).as_("total_credit")
+			)
+			.where(GLEntry.voucher_type.isin(voucher_types))
+			.where(GLEntry.voucher_no.isin(voucher_nos))
+			.where(GLEntry.account == tax_account)
+			.where(GLEntry.company == company)
+			.where(GLEntry.is_cancelled == 0)
+			.groupby(GLEntry.voucher_type, GLEntry.voucher_no)
 		)
-		.where(GLEntry.voucher_no.isin(voucher_nos))
-		.where(GLEntry.account == tax_account)
-		.where(GLEntry.company == company)
-		.where(GLEntry.is_cancelled == 0)
-		.groupby(GLEntry.voucher_type, GLEntry.voucher_no)
-	)
 
-	results = query.run(as_dict=True)
-
-	# Build result dictionary
-	amounts = {}
-	for row in results:
-		voucher_key = (row.voucher_type, row.voucher_no)
-		total_debit = flt(row.total_debit)
-		total_credit = flt(row.total_credit)
+		for row in query.run(as_dict=True):
+			total_debit = flt(row.total_debit)
+			total_credit = flt(row.total_credit)
 
-		# Calculate net amount based on root_type
-		if is_liability:
-			amounts[voucher_key] = total_credit - total_debit
-		else:
-			amounts[voucher_key] = total_debit - total_credit
+			# Calculate net amount based on root_type
+			if is_liability:
+				amounts[(row.voucher_type, row.voucher_no)] = total_credit - total_debit
+			else:
+				amounts[(row.voucher_type, row.voucher_no)] = total_debit - total_credit
 
 	# Ensure all requested vouchers have an entry (0.0 if not found)
 	for voucher_key in voucher_list:
@@ -445,6 +631,47 @@ def get_tax_amounts_batch(
 	return amounts
 
 
+def get_invoice_tax_amounts(
+	invoices: List[Dict[str, Any]],
+	voucher_type: str,
+	tax_account: str,
+	chunk_size: int = GL_BATCH_SIZE
+) -> Dict[str, float]:
+	"""
+	Get GL tax amounts for register rows, keyed by invoice name.
+
+	Rows are grouped by company and resolved with ``get_tax_amounts_batch``, so a
+	register costs one GL query per ``chunk_size`` invoices instead of one per invoice.
+
+	Args:
+		invoices: Register rows with ``name`` and ``company``
+		voucher_type: Voucher type of the rows (Purchase Invoice, Sales Invoice)
+		tax_account: Tax account name
+		chunk_size: Maximum vouchers per GL query
+
+	Returns:
+		Dict mapping invoice name to tax amount
+	"""
+	by_company: Dict[str, List[Tuple[str, str]]] = {}
+	for invoice in invoices:
+		by_company.setdefault(invoice.get("company"), []).append((voucher_type, invoice.get("name")))
+
+	amounts = {}
+	for company, vouchers in by_company.items():
+		batch = get_tax_amounts_batch(vouchers, tax_account, company, chunk_size=chunk_size)
+		for (_voucher_type, voucher_no), amount in batch.items():
+			amounts[voucher_no] = amount
+
+	return amounts
+
+
+def _iter_chunks(items: List[Any], size: int):
+	"""Yield consecutive slices of ``items`` with at most ``size`` elements."""
+	size = max(1, int(size or GL_BATCH_SIZE))
+	for start in range(0, len(items), size):
+		yield items[start:start + size]
+
+
 def get_columns_with_width(columns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 	"""
 	Ensure all columns have proper width settings for ERPNext v15+.
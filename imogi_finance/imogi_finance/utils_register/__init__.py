@@ -9,6 +9,7 @@ from .register_integration import (
 	get_vat_output_from_register,
 	get_withholding_from_register,
 	get_all_register_data,
+	iter_register_rows,
 	validate_register_configuration,
 	RegisterIntegrationError
 )
@@ -18,6 +19,7 @@ __all__ = [
 	"get_vat_output_from_register", 
 	"get_withholding_from_register",
 	"get_all_register_data",
+	"iter_register_rows",
 	"validate_register_configuration",
 	"RegisterIntegrationError"
 ]
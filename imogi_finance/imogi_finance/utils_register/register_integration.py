@@ -10,10 +10,17 @@ from __future__ import annotations
 import frappe
 from frappe import _
 from frappe.utils import flt, getdate
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import date
 
 
+REGISTER_REPORT_MODULES = {
+	"vat_input": "imogi_finance.imogi_finance.report.vat_input_register_verified.vat_input_register_verified",
+	"vat_output": "imogi_finance.imogi_finance.report.vat_output_register_verified.vat_output_register_verified",
+	"withholding": "imogi_finance.imogi_finance.report.withholding_register.withholding_register",
+}
+
+
 class RegisterIntegrationError(Exception):
 	"""Custom exception for register integration errors."""
 	pass
@@ -23,7 +30,8 @@ def get_vat_input_from_register(
 	company: str,
 	from_date: date | str,
 	to_date: date | str,
-	verification_status: Optional[str] = None
+	verification_status: Optional[str] = None,
+	aggregate_only: bool = False
 ) -> Dict[str, Any]:
 	"""
 	Get VAT Input totals from VAT Input Register Verified report.
@@ -33,6 +41,7 @@ def get_vat_input_from_register(
 		from_date: Period start date
 		to_date: Period end date
 		verification_status: Invoice verification status filter (default: "Verified")
+		aggregate_only: Compute totals in SQL without loading rows (invoices is empty)
 
 	Returns:
 		Dict with total_dpp, total_ppn, invoice_count, and invoices list
@@ -42,7 +51,10 @@ def get_vat_input_from_register(
 	"""
 	try:
 		# Import report module
-		from imogi_finance.imogi_finance.report.vat_input_register_verified.vat_input_register_verified import execute
+		from imogi_finance.imogi_finance.report.vat_input_register_verified.vat_input_register_verified import (
+			execute,
+			get_totals
+		)
 
 		# Prepare filters
 		filters = {
@@ -52,6 +64,9 @@ def get_vat_input_from_register(
 			"verification_status": verification_status
 		}
 
+		if aggregate_only:
+			return {**get_totals(filters), "invoices": [], "verification_status": verification_status}
+
 		# Execute report
 		columns, data = execute(filters)
 
@@ -88,7 +103,8 @@ def get_vat_output_from_register(
 	company: str,
 	from_date: date | str,
 	to_date: date | str,
-	verification_status: Optional[str] = None
+	verification_status: Optional[str] = None,
+	aggregate_only: bool = False
 ) -> Dict[str, Any]:
 	"""
 	Get VAT Output totals from VAT Output Register Verified report.
@@ -98,6 +114,7 @@ def get_vat_output_from_register(
 		from_date: Period start date
 		to_date: Period end date
 		verification_status: Invoice verification status filter (default: "Verified")
+		aggregate_only: Compute totals in SQL without loading rows (invoices is empty)
 
 	Returns:
 		Dict with total_dpp, total_ppn, invoice_count, and invoices list
@@ -107,7 +124,10 @@ def get_vat_output_from_register(
 	"""
 	try:
 		# Import report module
-		from imogi_finance.imogi_finance.report.vat_output_register_verified.vat_output_register_verified import execute
+		from imogi_finance.imogi_finance.report.vat_output_register_verified.vat_output_register_verified import (
+			execute,
+			get_totals
+		)
 
 		# Prepare filters
 		filters = {
@@ -117,6 +137,9 @@ def get_vat_output_from_register(
 			"verification_status": verification_status
 		}
 
+		if aggregate_only:
+			return {**get_totals(filters), "invoices": [], "verification_status": verification_status}
+
 		# Execute report
 		columns, data = execute(filters)
 
@@ -151,7 +174,8 @@ def get_withholding_from_register(
 	company: str,
 	from_date: date | str,
 	to_date: date | str,
-	accounts: Optional[List[str]] = None
+	accounts: Optional[List[str]] = None,
+	aggregate_only: bool = False
 ) -> Dict[str, Any]:
 	"""
 	Get Withholding Tax totals from Withholding Register report.
@@ -161,6 +185,7 @@ def get_withholding_from_register(
 		from_date: Period start date
 		to_date: Period end date
 		accounts: List of PPh account names to filter (optional, uses Tax Profile if None)
+		aggregate_only: Compute totals in SQL without loading rows (entries is empty)
 
 	Returns:
 		Dict with totals by account, total_amount, entry_count, and entries list
@@ -170,7 +195,10 @@ def get_withholding_from_register(
 	"""
 	try:
 		# Import report module
-		from imogi_finance.imogi_finance.report.withholding_register.withholding_register import execute
+		from imogi_finance.imogi_finance.report.withholding_register.withholding_register import (
+			execute,
+			get_totals
+		)
 
 		# Prepare filters
 		filters = {
@@ -182,6 +210,9 @@ def get_withholding_from_register(
 		if accounts:
 			filters["accounts"] = accounts
 
+		if aggregate_only:
+			return {**get_totals(filters), "entries": []}
+
 		# Execute report
 		columns, data = execute(filters)
 
@@ -219,7 +250,8 @@ def get_all_register_data(
 	from_date: date | str,
 	to_date: date | str,
 	verification_status: Optional[str] = None,
-	withholding_accounts: Optional[List[str]] = None
+	withholding_accounts: Optional[List[str]] = None,
+	aggregate_only: bool = False
 ) -> Dict[str, Any]:
 	"""
 	Get all tax register data in a single call for Tax Period Closing.
@@ -233,6 +265,7 @@ def get_all_register_data(
 		to_date: Period end date
 		verification_status: VAT verification status (default: "Verified")
 		withholding_accounts: PPh accounts list (uses Tax Profile if None)
+		aggregate_only: Push SUM/COUNT into SQL and skip loading register rows
 
 	Returns:
 		Dict with vat_input, vat_output, withholding, and summary sections
@@ -246,7 +279,8 @@ def get_all_register_data(
 			company=company,
 			from_date=from_date,
 			to_date=to_date,
-			verification_status=verification_status
+			verification_status=verification_status,
+			aggregate_only=aggregate_only
 		)
 
 		# Get VAT Output data
@@ -254,7 +288,8 @@ def get_all_register_data(
 			company=company,
 			from_date=from_date,
 			to_date=to_date,
-			verification_status=verification_status
+			verification_status=verification_status,
+			aggregate_only=aggregate_only
 		)
 
 		# Get Withholding data
@@ -262,7 +297,8 @@ def get_all_register_data(
 			company=company,
 			from_date=from_date,
 			to_date=to_date,
-			accounts=withholding_accounts
+			accounts=withholding_accounts,
+			aggregate_only=aggregate_only
 		)
 
 		# Calculate VAT netting
@@ -304,6 +340,57 @@ def get_all_register_data(
 		raise RegisterIntegrationError(error_msg) from e
 
 
+def iter_register_rows(
+	register: str,
+	company: str,
+	from_date: date | str,
+	to_date: date | str,
+	verification_status: Optional[str] = None,
+	accounts: Optional[List[str]] = None,
+	page_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+	"""
+	Stream a register in pages using keyset pagination on (posting_date, name).
+
+	Args:
+		register: "vat_input", "vat_output" or "withholding"
+		company: Company name
+		from_date: Period start date
+		to_date: Period end date
+		verification_status: VAT verification status (ignored for withholding)
+		accounts: PPh accounts list for withholding (uses Tax Profile if None)
+		page_size: Rows per page (default: the report's REGISTER_PAGE_SIZE)
+
+	Yields:
+		Lists of register rows, one page at a time
+
+	Raises:
+		RegisterIntegrationError: If the register is unknown or a page fails to load
+	"""
+	module_path = REGISTER_REPORT_MODULES.get(register)
+	if not module_path:
+		raise RegisterIntegrationError(_("Unknown register: {0}").format(register))
+
+	filters = {
+		"company": company,
+		"from_date": getdate(from_date),
+		"to_date": getdate(to_date)
+	}
+	if register == "withholding":
+		if accounts:
+			filters["accounts"] = accounts
+	else:
+		filters["verification_status"] = verification_status
+
+	try:
+		report = frappe.get_module(module_path)
+		yield from report.iter_data(filters, page_size or report.REGISTER_PAGE_SIZE)
+	except Exception as e:
+		error_msg = f"Failed to stream {register} register: {str(e)}"
+		frappe.log_error(error_msg, "Register Integration Error")
+		raise RegisterIntegrationError(error_msg) from e
+
+
 def validate_register_configuration(company: str) -> Dict[str, Any]:
 	"""
 	Validate that all required register configurations are in place.
@@ -0,0 +1,185 @@
+"""Content-addressed cache of OCR provider output.
+
+Entries are keyed by the SHA-256 of the PDF bytes plus the provider, language and
+max_pages settings that shape the provider's output, and hold the OCR text, the
+gzip-compressed raw JSON and the confidence. Parsing is not part of the key, so
+re-running OCR after a parser upgrade re-parses the cached output without calling
+the provider again. ``evict_ocr_cache`` (daily) drops entries unused for
+``ocr_cache_max_age_days`` and the least recently used ones beyond
+``ocr_cache_max_size_mb``.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import json
+from typing import Any
+
+import frappe
+from frappe.utils import add_days, cint, flt, now_datetime
+
+CACHE_DOCTYPE = "Tax Invoice OCR Cache"
+STATS_CACHE_KEY = "imogi_finance:ocr_cache:stats"
+DEFAULT_MAX_AGE_DAYS = 90
+DEFAULT_MAX_SIZE_MB = 512
+EVICTION_BATCH_SIZE = 500
+
+
+def is_enabled(settings) -> bool:
+    return bool(cint(settings.get("enable_ocr_cache", 1)))
+
+
+def cache_key(content_hash: str, provider: str, language: str | None, max_pages: int | None) -> str:
+    raw = "|".join([content_hash, provider or "", language or "", str(cint(max_pages))])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get(content_hash: str | None, provider: str, settings) -> tuple[str, dict[str, Any] | None, float] | None:
+    """Cached ``(text, raw_json, confidence)`` for this content and OCR settings, if any."""
+    if not content_hash or not is_enabled(settings):
+        return None
+
+    name = _key_for(content_hash, provider, settings)
+    try:
+        row = frappe.db.get_value(CACHE_DOCTYPE, name, ["ocr_text", "raw_json", "confidence"], as_dict=True)
+    except Exception:
+        frappe.logger().warning(f"[OCR CACHE] Lookup failed for {name}", exc_info=True)
+        return None
+
+    if not row:
+        _count("misses")
+        return None
+
+    frappe.db.sql(
+        """
+        update `tabTax Invoice OCR Cache`
+        set hit_count = hit_count + 1, last_used_at = %(now)s
+        where name = %(name)s
+        """,
+        {"name": name, "now": now_datetime()},
+    )
+    _count("hits")
+    return row.get("ocr_text") or "", _decompress_json(row.get("raw_json")), flt(row.get("confidence"))
+
+
+def put(content_hash: str | None, provider: str, settings, result: tuple) -> None:
+    """Store provider output; empty text is never cached so a later run retries the provider."""
+    text, raw_json, confidence = result
+    if not content_hash or not is_enabled(settings) or not (text or "").strip():
+        return
+
+    payload = _compress_json(raw_json)
+    name = _key_for(content_hash, provider, settings)
+    try:
+        frappe.get_doc(
+            {
+                "doctype": CACHE_DOCTYPE,
+                "name": name,
+                "content_hash": content_hash,
+                "provider": provider,
+                "language": settings.get("ocr_language"),
+                "max_pages": cint(settings.get("ocr_max_pages")),
+                "ocr_text": text,
+                "raw_json": payload,
+                "confidence": flt(confidence),
+                "size_bytes": len(text.encode()) + len(payload or ""),
+                "hit_count": 0,
+                "last_used_at": now_datetime(),
+            }
+        ).insert(ignore_permissions=True, ignore_if_duplicate=True)
+    except Exception:
+        # The cache must never fail an OCR run.
+        frappe.logger().warning(f"[OCR CACHE] Could not store {name}", exc_info=True)
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters since the last Redis flush plus current entry count and size."""
+    counters = frappe.cache().hgetall(STATS_CACHE_KEY) or {}
+    hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+    totals = frappe.get_all(
+        CACHE_DOCTYPE, fields=["count(name) as entries", "sum(size_bytes) as size_bytes"]
+    )
+    totals = totals[0] if totals else {}
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits * 100.0 / (hits + misses), 2) if hits + misses else None,
+        "entries": cint(totals.get("entries")),
+        "size_mb": round(flt(totals.get("size_bytes")) / (1024 * 1024), 2),
+    }
+
+
+def evict_ocr_cache() -> dict | None:
+    """Scheduled (daily): drop expired entries, then least recently used ones over the size budget."""
+    try:
+        from imogi_finance.tax_invoice_ocr import get_settings
+
+        settings = get_settings()
+        max_age_days = cint(settings.get("ocr_cache_max_age_days")) or DEFAULT_MAX_AGE_DAYS
+        max_bytes = (cint(settings.get("ocr_cache_max_size_mb")) or DEFAULT_MAX_SIZE_MB) * 1024 * 1024
+
+        cutoff = add_days(now_datetime(), -max_age_days)
+        expired = frappe.get_all(CACHE_DOCTYPE, filters={"last_used_at": ("<", cutoff)}, pluck="name")
+        if expired:
+            frappe.db.delete(CACHE_DOCTYPE, {"name": ("in", expired)})
+
+        evicted = _evict_over_budget(max_bytes)
+        frappe.db.commit()
+        if expired or evicted:
+            frappe.logger().info(f"[OCR CACHE] Evicted {len(expired)} expired and {evicted} least recently used entries")
+        return {"expired": len(expired), "evicted": evicted}
+    except Exception as e:
+        frappe.logger().error(f"OCR cache eviction failed: {e}", exc_info=True)
+        # Don't re-raise to avoid stopping scheduler
+        return None
+
+
+def _evict_over_budget(max_bytes: int) -> int:
+    totals = frappe.get_all(CACHE_DOCTYPE, fields=["sum(size_bytes) as size_bytes"])
+    excess = flt(totals[0].get("size_bytes") if totals else 0) - max_bytes
+    evicted = 0
+    while excess > 0:
+        rows = frappe.get_all(
+            CACHE_DOCTYPE,
+            fields=["name", "size_bytes"],
+            order_by="last_used_at asc",
+            limit=EVICTION_BATCH_SIZE,
+        )
+        if not rows:
+            break
+        names = []
+        for row in rows:
+            if excess <= 0:
+                break
+            names.append(row["name"])
+            excess -= flt(row["size_bytes"])
+        frappe.db.delete(CACHE_DOCTYPE, {"name": ("in", names)})
+        evicted += len(names)
+    return evicted
+
+
+def _key_for(content_hash: str, provider: str, settings) -> str:
+    return cache_key(content_hash, provider, settings.get("ocr_language"), settings.get("ocr_max_pages"))
+
+
+def _count(field: str) -> None:
+    try:
+        cache = frappe.cache()
+        cache.hset(STATS_CACHE_KEY, field, (cache.hget(STATS_CACHE_KEY, field) or 0) + 1)
+    except Exception:
+        pass
+
+
+def _compress_json(raw_json: dict[str, Any] | None) -> str | None:
+    if raw_json is None:
+        return None
+    data = json.dumps(raw_json, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.b64encode(gzip.compress(data)).decode()
+
+
+def _decompress_json(payload: str | None) -> dict[str, Any] | None:
+    if not payload:
+        return None
+    return json.loads(gzip.decompress(base64.b64decode(payload)))
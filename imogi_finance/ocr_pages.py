@@ -0,0 +1,345 @@
+"""Page-parallel OCR and text-layer extraction for multi-page faktur PDFs.
+
+Inside the OCR background job (``ocr_pipeline.run_job`` wraps it in ``page_pool()``)
+pages are processed on a bounded process pool (``ocr_page_workers``). Every worker
+receives the PDF bytes once, through the pool initializer, and then handles one
+page per task, so a long line-item table no longer runs as one sequential pass
+under a single timeout. Each page has its own ``ocr_page_timeout_seconds`` and is
+retried up to ``ocr_max_retry`` times; a page that overruns its timeout has its
+pool terminated and replaced, so retries and the remaining pages never queue
+behind the hung worker. A page that still fails is reported in the per-page stats
+and left out of the merged result, so one bad page does not fail the whole
+document. Results are always returned in page order.
+
+Outside ``page_pool()``, e.g. in request-time calls such as
+``TaxInvoiceOCRUpload.after_insert``, pages are processed in-process and no worker
+processes are forked from the web worker.
+
+Per-page timings of the last run are kept on ``frappe.flags`` and copied into
+the OCR pipeline state by ``ocr_pipeline.run_job``. The Tax Invoice OCR
+Monitoring record shows them from there.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable
+
+import frappe
+from frappe.utils import cint
+
+try:
+    import fitz  # PyMuPDF
+
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    fitz = None
+    PYMUPDF_AVAILABLE = False
+
+DEFAULT_PAGE_WORKERS = 4
+DEFAULT_PAGE_TIMEOUT_SECONDS = 60
+DEFAULT_PAGE_RETRIES = 1
+# Rendering resolution for Tesseract; 300 dpi is what Tesseract is tuned for.
+TESSERACT_RENDER_DPI = 300
+# Text-layer extraction takes milliseconds per page; below this many pages the pool
+# start-up costs more than it saves.
+TEXT_LAYER_PARALLEL_MIN_PAGES = 4
+PAGE_STATS_FLAG = "ocr_page_stats"
+PAGE_POOL_FLAG = "ocr_page_pool"
+
+# Set in each pool worker by ``_init_worker``.
+_worker_pdf_bytes: bytes | None = None
+_worker_doc = None
+
+
+def page_count(pdf_bytes: bytes) -> int:
+    doc = _open(pdf_bytes)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+@contextmanager
+def page_pool():
+    """Allow ``run_pages`` to use the process pool for the duration of the block (background jobs only)."""
+    flags = frappe.flags
+    previous = getattr(flags, PAGE_POOL_FLAG, None)
+    setattr(flags, PAGE_POOL_FLAG, True)
+    try:
+        yield
+    finally:
+        setattr(flags, PAGE_POOL_FLAG, previous)
+
+
+def pool_enabled() -> bool:
+    """Whether the caller runs inside ``page_pool()``."""
+    return bool(getattr(getattr(frappe, "flags", None), PAGE_POOL_FLAG, None))
+
+
+def page_workers(settings: dict | None = None) -> int:
+    settings = settings if settings is not None else _settings()
+    workers = cint(settings.get("ocr_page_workers") or DEFAULT_PAGE_WORKERS)
+    return max(min(workers, os.cpu_count() or 1), 1)
+
+
+def tesseract_pages(
+    pdf_bytes: bytes, command: str, language: str, settings: dict | None = None, source_name: str = "bytes"
+) -> list[dict[str, Any]]:
+    """Render every page and run ``command`` on it; returns one result dict per page in page order."""
+    settings = settings if settings is not None else _settings()
+    timeout = _page_timeout(settings)
+    return run_pages(
+        _tesseract_worker,
+        pdf_bytes,
+        page_count(pdf_bytes),
+        (command, language, timeout),
+        settings,
+        source_name=source_name,
+    )
+
+
+def text_layer_pages(
+    pdf_bytes: bytes, total_pages: int, settings: dict | None = None, source_name: str = "bytes"
+) -> list[dict[str, Any]]:
+    """Text-layer spans ``(text, (x0, y0, x1, y1))`` of every page, one result dict per page in page order."""
+    return run_pages(_text_layer_worker, pdf_bytes, total_pages, (), settings, source_name=source_name)
+
+
+def page_spans(page) -> list[tuple[str, tuple[float, float, float, float]]]:
+    """Non-empty text spans of a PyMuPDF page with their bounding boxes."""
+    spans = []
+    for block in page.get_text("dict").get("blocks", []):
+        if block.get("type") != 0:  # 0 = text block
+            continue
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                text = (span.get("text") or "").strip()
+                bbox = span.get("bbox")
+                if text and bbox and len(bbox) == 4:
+                    spans.append((text, tuple(bbox)))
+    return spans
+
+
+def run_pages(
+    worker: Callable[..., Any],
+    pdf_bytes: bytes,
+    total_pages: int,
+    worker_args: tuple,
+    settings: dict | None = None,
+    source_name: str = "bytes",
+) -> list[dict[str, Any]]:
+    """Run ``worker(page_index, *worker_args)`` for every page.
+
+    Returns ``{"page", "ok", "value", "error", "attempts", "seconds"}`` per page in
+    page order. Pages are processed in-process outside ``page_pool()``, and for
+    single-page documents or runs with one worker, where the pool start-up costs
+    more than it saves.
+    """
+    settings = settings if settings is not None else _settings()
+    timeout = _page_timeout(settings)
+    retries = max(cint(settings.get("ocr_max_retry", DEFAULT_PAGE_RETRIES)), 0)
+    workers = min(page_workers(settings), total_pages) if pool_enabled() else 1
+
+    started = time.monotonic()
+    if workers <= 1:
+        results = _run_inline(worker, pdf_bytes, total_pages, worker_args, retries)
+    else:
+        results = _run_pool(worker, pdf_bytes, total_pages, worker_args, workers, timeout, retries)
+
+    _record_stats(results)
+    failed = [result["page"] for result in results if not result["ok"]]
+    frappe.logger().info(
+        f"[OCR PAGES] {source_name}: {total_pages} page(s) on {workers} worker(s) in "
+        f"{time.monotonic() - started:.2f}s" + (f", failed pages {failed}" if failed else "")
+    )
+    return results
+
+
+def pop_page_stats() -> list[dict[str, Any]] | None:
+    """Per-page stats of the last ``run_pages`` in this job, cleared after reading."""
+    flags = getattr(frappe, "flags", None)
+    if flags is None:
+        return None
+    stats = getattr(flags, PAGE_STATS_FLAG, None)
+    setattr(flags, PAGE_STATS_FLAG, None)
+    return stats
+
+
+def _run_inline(worker, pdf_bytes, total_pages, worker_args, retries) -> list[dict[str, Any]]:
+    global _worker_doc, _worker_pdf_bytes
+
+    _init_worker(pdf_bytes)
+    try:
+        results = []
+        for page_index in range(total_pages):
+            result = _new_result(page_index)
+            while not result["ok"] and result["attempts"] <= retries:
+                attempt_started = time.monotonic()
+                result["attempts"] += 1
+                try:
+                    result["value"] = worker(page_index, *worker_args)
+                    result["ok"], result["error"] = True, None
+                except Exception as exc:
+                    result["error"] = _describe(exc)
+                result["seconds"] = round(result["seconds"] + time.monotonic() - attempt_started, 3)
+            results.append(result)
+        return results
+    finally:
+        if _worker_doc is not None:
+            _worker_doc.close()
+        _worker_doc, _worker_pdf_bytes = None, None
+
+
+def _run_pool(worker, pdf_bytes, total_pages, worker_args, workers, timeout, retries) -> list[dict[str, Any]]:
+    results = [_new_result(page_index) for page_index in range(total_pages)]
+    pending = list(range(total_pages))
+    in_flight: dict = {}
+    pool = _new_pool(pdf_bytes, workers)
+    try:
+        while pending or in_flight:
+            # At most ``workers`` pages are in flight, so each one starts as soon as it is submitted
+            # and its timeout can be measured from submission.
+            while pending and len(in_flight) < workers:
+                page_index = pending.pop(0)
+                results[page_index]["attempts"] += 1
+                future = pool.submit(worker, page_index, *worker_args)
+                in_flight[future] = (page_index, time.monotonic())
+
+            next_deadline = min(submitted + timeout for _, submitted in in_flight.values())
+            done, _ = wait(in_flight, timeout=max(next_deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            timed_out = False
+            for future in list(in_flight):
+                page_index, submitted = in_flight[future]
+                if future in done:
+                    error = future.exception()
+                elif now - submitted >= timeout:
+                    timed_out = True
+                    error = TimeoutError(f"page timed out after {timeout}s")
+                else:
+                    continue
+
+                del in_flight[future]
+                result = results[page_index]
+                result["seconds"] = round(result["seconds"] + now - submitted, 3)
+                if error is None:
+                    result["value"], result["ok"], result["error"] = future.result(), True, None
+                    continue
+                result["error"] = _describe(error)
+                if result["attempts"] <= retries:
+                    pending.insert(0, page_index)
+
+            if timed_out:
+                # A hung page keeps its worker busy until it returns; replace the whole pool instead of
+                # queueing its retry behind it. Pages interrupted with it are resubmitted without
+                # using up an attempt.
+                interrupted = sorted(page_index for page_index, _ in in_flight.values())
+                for page_index in interrupted:
+                    results[page_index]["attempts"] -= 1
+                pending[:0] = interrupted
+                in_flight.clear()
+                _terminate(pool)
+                pool = _new_pool(pdf_bytes, workers)
+    finally:
+        _terminate(pool)
+    return results
+
+
+def _new_pool(pdf_bytes: bytes, workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pdf_bytes,))
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    """Shut ``pool`` down without waiting, killing workers still busy with a page."""
+    # ``shutdown`` has no way to stop a running task, so the worker processes are terminated directly.
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(1)
+
+
+def _new_result(page_index: int) -> dict[str, Any]:
+    return {"page": page_index + 1, "ok": False, "value": None, "error": None, "attempts": 0, "seconds": 0.0}
+
+
+def _record_stats(results: list[dict[str, Any]]) -> None:
+    flags = getattr(frappe, "flags", None)
+    if flags is None:
+        return
+    setattr(flags, PAGE_STATS_FLAG, [{key: value for key, value in result.items() if key != "value"} for result in results])
+
+
+def _describe(exc: BaseException) -> str:
+    if isinstance(exc, subprocess.CalledProcessError):
+        return ((exc.stderr or "").strip() or str(exc))[:500]
+    return (str(exc) or exc.__class__.__name__)[:500]
+
+
+def _page_timeout(settings: dict) -> int:
+    return max(cint(settings.get("ocr_page_timeout_seconds") or DEFAULT_PAGE_TIMEOUT_SECONDS), 1)
+
+
+def _settings() -> dict:
+    from imogi_finance.tax_invoice_ocr import get_settings
+
+    return get_settings()
+
+
+def _open(pdf_bytes: bytes):
+    if not PYMUPDF_AVAILABLE:
+        raise RuntimeError("PyMuPDF is required to split PDFs into pages.")
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    if doc.is_encrypted and not doc.authenticate(""):
+        doc.close()
+        raise ValueError("PDF is encrypted and requires password")
+    return doc
+
+
+def _init_worker(pdf_bytes: bytes) -> None:
+    global _worker_doc, _worker_pdf_bytes
+
+    _worker_pdf_bytes = pdf_bytes
+    _worker_doc = None
+
+
+def _worker_page(page_index: int):
+    global _worker_doc
+
+    if _worker_doc is None:
+        _worker_doc = _open(_worker_pdf_bytes)
+    return _worker_doc[page_index]
+
+
+def _text_layer_worker(page_index: int) -> list[tuple[str, tuple[float, float, float, float]]]:
+    return page_spans(_worker_page(page_index))
+
+
+def _tesseract_worker(page_index: int, command: str, language: str, timeout: int) -> str:
+    image = _worker_page(page_index).get_pixmap(dpi=TESSERACT_RENDER_DPI).tobytes("png")
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png", prefix=f"ocr_p{page_index + 1}_")
+    try:
+        tmp.write(image)
+        tmp.close()
+        result = subprocess.run(
+            [command, tmp.name, "stdout", "-l", language],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        return (result.stdout or "").strip()
+    finally:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
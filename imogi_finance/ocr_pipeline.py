@@ -0,0 +1,478 @@
+"""Background pipeline for Tax Invoice OCR jobs.
+
+Documents are queued in Redis by priority and dispatched onto a dedicated
+``imogi_ocr`` queue while fewer than ``ocr_max_concurrent_jobs`` OCR jobs are
+running; each finished job, successful or not, dispatches the next pending
+document. Provider calls go through a per-provider token bucket and are retried
+with exponential backoff when the provider answers 429/5xx. A document whose PDF content hash is already
+being processed waits for that job, so it is served from the OCR cache
+(``imogi_finance.ocr_cache``) instead of calling the provider a second time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import time
+from typing import Any, Callable
+
+import frappe
+from frappe.exceptions import ValidationError
+from frappe.utils import cint, flt
+
+
+# Declare the queue under "workers" in common_site_config.json to isolate OCR from
+# other long jobs. Falls back to "long" when it is not configured.
+OCR_QUEUE = "imogi_ocr"
+FALLBACK_QUEUE = "long"
+CACHE_PREFIX = "imogi_finance:ocr_pipeline:"
+STATE_TTL_SECONDS = 7 * 24 * 3600
+JOB_TIMEOUT_SECONDS = 900
+# Running slots not released for this long are treated as lost (e.g. worker restart).
+STALE_AFTER_SECONDS = 2 * JOB_TIMEOUT_SECONDS
+
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+DEFAULT_RATE_PER_MINUTE = {"Google Vision": 60, "Tesseract": 30}
+RATE_SETTING_FIELDS = {
+    "Google Vision": "ocr_google_vision_rate_per_minute",
+    "Tesseract": "ocr_tesseract_rate_per_minute",
+}
+# Bucket capacity in seconds of refill, i.e. how large a burst is admitted at once.
+BUCKET_BURST_SECONDS = 10
+DEFAULT_BACKOFF_SECONDS = 2.0
+MAX_BACKOFF_SECONDS = 60.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+METRIC_WINDOW_SECONDS = 15 * 60
+MAX_METRIC_SAMPLES = 500
+
+
+class OCRProviderBusyError(ValidationError):
+    """The OCR provider is rate limiting, failing (5xx) or unreachable; retry later."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_retryable_status(status_code: int | None) -> bool:
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+def submit(doctype: str, name: str, provider: str, file_url: str | None, priority: str | None = None) -> dict:
+    """Queue one document for OCR and dispatch it if a slot is free.
+
+    Returns the pending entry. Re-submitting a document supersedes its earlier
+    pending entry, which is skipped when it reaches the head of the queue.
+    """
+    priority = priority if priority in PRIORITIES else PRIORITY_NORMAL
+    key = _job_key(doctype, name)
+    entry = {
+        "doctype": doctype,
+        "name": name,
+        "provider": provider,
+        "priority": priority,
+        "content_hash": compute_content_hash(file_url),
+        "enqueued_at": time.time(),
+    }
+    _update_doc_state(
+        key,
+        status="queued",
+        priority=priority,
+        provider=provider,
+        content_hash=entry["content_hash"],
+        enqueued_at=entry["enqueued_at"],
+        started_at=None,
+        queue_seconds=None,
+        run_seconds=None,
+        shared_from=None,
+        error=None,
+    )
+    cache = frappe.cache()
+    cache.rpush(_pending_key(priority), json.dumps(entry))
+    cache.expire(cache.make_key(_pending_key(priority)), STATE_TTL_SECONDS)
+    _increment_counter("submitted")
+
+    dispatch()
+    return entry
+
+
+def dispatch(*, after_commit: bool = True) -> int:
+    """Enqueue pending documents while running slots are free; returns how many were enqueued.
+
+    With ``after_commit`` the jobs are enqueued when the caller's transaction commits, and
+    a rollback puts the claimed entries back at the head of the queue. ``run_job`` enqueues
+    directly, because a failing OCR job's transaction is rolled back.
+    """
+    from imogi_finance.tax_invoice_ocr import get_settings
+
+    limit = _max_concurrent_jobs(get_settings())
+    dispatched = 0
+    while _running_count() < limit:
+        entry = _pop_next()
+        if not entry:
+            break
+        if _is_superseded(entry) or _park_duplicate(entry):
+            continue
+        _claim_slot(entry)
+        _enqueue_job(entry, after_commit=after_commit)
+        dispatched += 1
+    return dispatched
+
+
+def run_job(
+    doctype: str,
+    name: str,
+    provider: str,
+    content_hash: str | None = None,
+    enqueued_at: float | None = None,
+    priority: str | None = None,
+) -> None:
+    """Background job: run OCR for one document, then release its slot and dispatch the next."""
+    from imogi_finance import ocr_pages
+    from imogi_finance.tax_invoice_ocr import _run_ocr_job
+
+    key = _job_key(doctype, name)
+    started = time.time()
+    queue_seconds = round(started - (enqueued_at or started), 3)
+    _update_doc_state(key, status="running", started_at=started, queue_seconds=queue_seconds)
+
+    ok = False
+    try:
+        with ocr_pages.page_pool():
+            _run_ocr_job(name, doctype, provider, content_hash=content_hash)
+        ok = True
+    except Exception as exc:
+        _update_doc_state(key, error=str(exc)[:500])
+        raise
+    finally:
+        run_seconds = round(time.time() - started, 3)
+        _update_doc_state(
+            key, status="done" if ok else "failed", run_seconds=run_seconds, pages=ocr_pages.pop_page_stats()
+        )
+        _release_slot(key, content_hash)
+        _record_sample(provider, queue_seconds, run_seconds, ok)
+        dispatch(after_commit=False)
+
+
+def call_provider(provider: str, func: Callable[[], Any], settings: dict | None = None):
+    """Call ``func`` under the provider's rate limit, retrying 429/5xx with exponential backoff.
+
+    ``ocr_max_retry`` bounds the number of retries; the delay doubles from
+    ``ocr_retry_backoff_seconds`` up to ``MAX_BACKOFF_SECONDS`` with a little jitter so
+    parallel workers do not retry in lockstep.
+    """
+    settings = settings or {}
+    max_retry = max(0, cint(settings.get("ocr_max_retry", 1)))
+    base_delay = flt(settings.get("ocr_retry_backoff_seconds")) or DEFAULT_BACKOFF_SECONDS
+    attempt = 0
+    while True:
+        acquire_token(provider, settings)
+        attempt += 1
+        try:
+            return func()
+        except OCRProviderBusyError as exc:
+            if attempt > max_retry:
+                raise
+            delay = backoff_delay(attempt, base_delay)
+            _increment_counter("retries")
+            frappe.logger().warning(
+                f"[OCR PIPELINE] {provider} busy (status {exc.status_code}); retry {attempt}/{max_retry} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+def backoff_delay(attempt: int, base_delay: float = DEFAULT_BACKOFF_SECONDS) -> float:
+    delay = min(MAX_BACKOFF_SECONDS, base_delay * (2 ** (attempt - 1)))
+    return delay + random.uniform(0, base_delay / 2)
+
+
+def acquire_token(provider: str, settings: dict | None = None) -> float:
+    """Block until the provider's token bucket admits one call; returns the seconds waited."""
+    rate = rate_per_minute(provider, settings or {})
+    if rate <= 0:
+        return 0.0
+
+    waited = 0.0
+    while True:
+        wait = _take_token(provider, rate)
+        if wait <= 0:
+            if waited:
+                _increment_counter("throttled_seconds", round(waited, 3))
+            return waited
+        time.sleep(wait)
+        waited += wait
+
+
+def rate_per_minute(provider: str, settings: dict) -> float:
+    fieldname = RATE_SETTING_FIELDS.get(provider)
+    if not fieldname:
+        return 0.0
+    value = settings.get(fieldname)
+    return max(0.0, flt(DEFAULT_RATE_PER_MINUTE.get(provider, 0) if value is None else value))
+
+
+def refill_bucket(state: dict | None, now: float, rate: float) -> tuple[dict, float]:
+    """Take one token from ``state``; returns the new state and the wait before a token is available."""
+    capacity = max(1.0, rate * BUCKET_BURST_SECONDS / 60.0)
+    state = state or {"tokens": capacity, "updated_at": now}
+    elapsed = max(0.0, now - state["updated_at"])
+    tokens = min(capacity, state["tokens"] + elapsed * rate / 60.0)
+    if tokens >= 1:
+        return {"tokens": tokens - 1, "updated_at": now}, 0.0
+    return {"tokens": tokens, "updated_at": now}, (1 - tokens) * 60.0 / rate
+
+
+def compute_content_hash(file_url: str | None) -> str | None:
+    """SHA-256 of the attached PDF's bytes, or None when the file cannot be read."""
+    if not file_url:
+        return None
+    try:
+        from imogi_finance.tax_invoice_ocr import _get_file_doc_by_url
+
+        content = _get_file_doc_by_url(file_url).get_content()
+    except Exception:
+        frappe.logger().warning(f"[OCR PIPELINE] Could not hash {file_url}; duplicate detection skipped")
+        return None
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content or b"").hexdigest()
+
+
+def get_doc_pipeline_state(doctype: str, name: str) -> dict | None:
+    return _get_doc_state(_job_key(doctype, name))
+
+
+def get_pipeline_metrics() -> dict:
+    """Queue depth, running jobs, throughput and latency over the last ``METRIC_WINDOW_SECONDS``."""
+    cache = frappe.cache()
+    now = time.time()
+    samples = [
+        sample
+        for sample in (_decode(raw) for raw in cache.lrange(_samples_key(), 0, -1) or [])
+        if sample and now - sample["finished_at"] <= METRIC_WINDOW_SECONDS
+    ]
+    latencies = sorted(sample["queue_seconds"] + sample["run_seconds"] for sample in samples)
+    completed = [sample for sample in samples if sample["ok"]]
+    return {
+        "queue": _ocr_queue(),
+        "queue_depth": {priority: cache.llen(_pending_key(priority)) or 0 for priority in PRIORITIES},
+        "running_jobs": _running_count(),
+        "window_seconds": METRIC_WINDOW_SECONDS,
+        "throughput_per_minute": round(len(completed) * 60.0 / METRIC_WINDOW_SECONDS, 2),
+        "latency_p50_seconds": _percentile(latencies, 50),
+        "latency_p95_seconds": _percentile(latencies, 95),
+        "failed_in_window": len(samples) - len(completed),
+        "counters": cache.hgetall(_counters_key()) or {},
+    }
+
+
+def _percentile(values: list[float], pct: int) -> float | None:
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(pct / 100.0 * len(values)) - 1))
+    return round(values[index], 3)
+
+
+def _ocr_queue() -> str:
+    try:
+        from frappe.utils.background_jobs import get_queue_list
+
+        if OCR_QUEUE in get_queue_list():
+            return OCR_QUEUE
+    except Exception:
+        pass
+    return FALLBACK_QUEUE
+
+
+def _max_concurrent_jobs(settings) -> int:
+    return max(1, cint(settings.get("ocr_max_concurrent_jobs") or DEFAULT_MAX_CONCURRENT_JOBS))
+
+
+def _enqueue_job(entry: dict, after_commit: bool = True) -> None:
+    in_test = getattr(frappe.flags, "in_test", False)
+    if after_commit:
+        # A rollback discards the after-commit enqueue; hand the entry back instead of losing it.
+        frappe.db.after_rollback.add(lambda: _return_entry(entry))
+    frappe.enqueue(
+        "imogi_finance.ocr_pipeline.run_job",
+        queue=_ocr_queue(),
+        # Same job_name as before the pipeline so monitoring and stale-job recovery still find it.
+        job_name=f"ocr:{entry['doctype']}:{entry['name']}",
+        timeout=JOB_TIMEOUT_SECONDS,
+        now=in_test,
+        is_async=not in_test,
+        enqueue_after_commit=after_commit,
+        doctype=entry["doctype"],
+        name=entry["name"],
+        provider=entry["provider"],
+        content_hash=entry.get("content_hash"),
+        enqueued_at=entry.get("enqueued_at"),
+        priority=entry.get("priority"),
+    )
+
+
+def _pop_next() -> dict | None:
+    cache = frappe.cache()
+    for priority in PRIORITIES:
+        raw = cache.lpop(_pending_key(priority))
+        if raw:
+            return _decode(raw)
+    return None
+
+
+def _park_duplicate(entry: dict) -> bool:
+    """Hold ``entry`` back while another running job processes identical content."""
+    content_hash = entry.get("content_hash")
+    if not content_hash:
+        return False
+
+    cache = frappe.cache()
+    owner = cache.hget(_inflight_key(), content_hash)
+    key = _job_key(entry["doctype"], entry["name"])
+    if not owner or owner["job"] == key or time.time() - owner["since"] >= STALE_AFTER_SECONDS:
+        return False
+
+    cache.rpush(_waiting_key(content_hash), json.dumps(entry))
+    cache.expire(cache.make_key(_waiting_key(content_hash)), STATE_TTL_SECONDS)
+    _update_doc_state(key, shared_from=owner["job"])
+    _increment_counter("deduplicated")
+    return True
+
+
+def _claim_slot(entry: dict) -> None:
+    cache = frappe.cache()
+    key = _job_key(entry["doctype"], entry["name"])
+    now = time.time()
+    cache.hset(_running_key(), key, {"since": now, "content_hash": entry.get("content_hash")})
+    if entry.get("content_hash"):
+        cache.hset(_inflight_key(), entry["content_hash"], {"job": key, "since": now})
+
+
+def _return_entry(entry: dict) -> None:
+    """Undo ``_claim_slot`` for an entry whose job was never enqueued; it is dispatched next."""
+    _release_slot(_job_key(entry["doctype"], entry["name"]), entry.get("content_hash"))
+    frappe.cache().lpush(_pending_key(entry.get("priority") or PRIORITY_NORMAL), json.dumps(entry))
+
+
+def _release_slot(key: str, content_hash: str | None) -> None:
+    cache = frappe.cache()
+    cache.hdel(_running_key(), key)
+    if not content_hash:
+        return
+
+    owner = cache.hget(_inflight_key(), content_hash)
+    if owner and owner["job"] == key:
+        cache.hdel(_inflight_key(), content_hash)
+    # Waiting duplicates go to the front of the queue: they are served from the OCR cache.
+    while True:
+        raw = cache.lpop(_waiting_key(content_hash))
+        if not raw:
+            break
+        cache.lpush(_pending_key(PRIORITY_HIGH), raw)
+
+
+def _running_count() -> int:
+    cache = frappe.cache()
+    now = time.time()
+    count = 0
+    for key, slot in (cache.hgetall(_running_key()) or {}).items():
+        if now - slot["since"] >= STALE_AFTER_SECONDS:
+            cache.hdel(_running_key(), key)
+            continue
+        count += 1
+    return count
+
+
+def _take_token(provider: str, rate: float) -> float:
+    # Read-modify-write without a lock: concurrent workers can overdraw by at most
+    # one token each, which the provider's 429 handling absorbs.
+    cache = frappe.cache()
+    state, wait = refill_bucket(cache.hget(_bucket_key(), provider), time.time(), rate)
+    cache.hset(_bucket_key(), provider, state)
+    return wait
+
+
+def _record_sample(provider: str, queue_seconds: float, run_seconds: float, ok: bool) -> None:
+    cache = frappe.cache()
+    sample = {
+        "provider": provider,
+        "finished_at": time.time(),
+        "queue_seconds": queue_seconds,
+        "run_seconds": run_seconds,
+        "ok": ok,
+    }
+    cache.rpush(_samples_key(), json.dumps(sample))
+    cache.ltrim(_samples_key(), -MAX_METRIC_SAMPLES, -1)
+    _increment_counter("completed" if ok else "failed")
+
+
+def _increment_counter(name: str, amount: float = 1) -> None:
+    cache = frappe.cache()
+    counters = cache.hget(_counters_key(), name) or 0
+    cache.hset(_counters_key(), name, counters + amount)
+
+
+def _is_superseded(entry: dict) -> bool:
+    state = _get_doc_state(_job_key(entry["doctype"], entry["name"]))
+    return bool(state) and state.get("enqueued_at") != entry.get("enqueued_at")
+
+
+def _get_doc_state(key: str) -> dict | None:
+    return frappe.cache().hget(_docs_key(), key)
+
+
+def _update_doc_state(key: str, **values) -> None:
+    cache = frappe.cache()
+    state = cache.hget(_docs_key(), key) or {"job": key}
+    state.update(values, updated_at=time.time())
+    cache.hset(_docs_key(), key, state)
+    cache.expire(cache.make_key(_docs_key()), STATE_TTL_SECONDS)
+
+
+def _decode(raw) -> dict | None:
+    if not raw:
+        return None
+    return json.loads(raw.decode() if isinstance(raw, bytes) else raw)
+
+
+def _job_key(doctype: str, name: str) -> str:
+    return f"{doctype}:{name}"
+
+
+def _pending_key(priority: str) -> str:
+    return f"{CACHE_PREFIX}pending:{priority}"
+
+
+def _waiting_key(content_hash: str) -> str:
+    return f"{CACHE_PREFIX}waiting:{content_hash}"
+
+
+def _running_key() -> str:
+    return f"{CACHE_PREFIX}running"
+
+
+def _inflight_key() -> str:
+    return f"{CACHE_PREFIX}inflight"
+
+
+def _docs_key() -> str:
+    return f"{CACHE_PREFIX}docs"
+
+
+def _bucket_key() -> str:
+    return f"{CACHE_PREFIX}buckets"
+
+
+def _samples_key() -> str:
+    return f"{CACHE_PREFIX}samples"
+
+
+def _counters_key() -> str:
+    return f"{CACHE_PREFIX}counters"
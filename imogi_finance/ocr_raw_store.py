@@ -0,0 +1,195 @@
+"""Out-of-row storage for raw OCR provider responses.
+
+Google Vision responses carry per-symbol bounding boxes and run to several MB for
+multi-page fakturs. Keeping them inline in ``ocr_raw_json`` bloats every row load,
+so doctypes with an ``ocr_raw_json_file`` column get the payload as a
+gzip-compressed private File attached to the document instead; the row keeps only
+the file URL and a SHA-256 digest of the JSON. ``load`` reads the payload back
+lazily for the layout parser and debug views, falling back to the inline column
+for doctypes without the pointer fields and for rows not migrated yet.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from typing import Any
+
+import frappe
+
+from imogi_finance import tax_invoice_fields
+
+UPLOAD_DOCTYPE = "Tax Invoice OCR Upload"
+MIGRATION_BATCH_SIZE = 200
+
+
+def _fieldname(doctype: str, key: str) -> str:
+    return tax_invoice_fields.get_field_map(doctype).get(key, key)
+
+
+def _has_field(doctype: str, fieldname: str, doc: Any = None) -> bool:
+    if doc is not None and hasattr(doc, fieldname):
+        return True
+    return bool(frappe.db.has_column(doctype, fieldname))
+
+
+def supports_file_storage(doctype: str, doc: Any = None) -> bool:
+    return _has_field(doctype, _fieldname(doctype, "ocr_raw_json_file"), doc)
+
+
+def serialize(raw_json: dict[str, Any]) -> bytes:
+    return json.dumps(raw_json, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def store(doctype: str, name: str, raw_json: dict[str, Any], doc: Any = None) -> dict[str, Any]:
+    """Persist ``raw_json`` for a document and return the field updates to apply.
+
+    The caller applies the returned mapping with ``setattr`` before ``save()`` or
+    passes it to ``db_set``, so the pointer lands in the same write as the rest of
+    the OCR results.
+    """
+    inline_field = _fieldname(doctype, "ocr_raw_json")
+    if not supports_file_storage(doctype, doc):
+        return {inline_field: json.dumps(raw_json, indent=2)}
+
+    file_field = _fieldname(doctype, "ocr_raw_json_file")
+    digest_field = _fieldname(doctype, "ocr_raw_json_digest")
+    data = serialize(raw_json)
+    data_digest = digest(data)
+
+    current = _current_pointer(doctype, name, doc, file_field, digest_field)
+    if current.get("digest") == data_digest and current.get("file_url"):
+        # Re-running OCR on cached output yields the same payload; keep the existing file.
+        return {file_field: current["file_url"], digest_field: data_digest, inline_field: None}
+
+    file_doc = frappe.get_doc(
+        {
+            "doctype": "File",
+            "file_name": f"ocr-raw-{name}.json.gz",
+            "content": gzip.compress(data),
+            "is_private": 1,
+            "attached_to_doctype": doctype,
+            "attached_to_name": name,
+        }
+    )
+    file_doc.save(ignore_permissions=True)
+
+    if current.get("file_url"):
+        _delete_file(current["file_url"], doctype, name)
+
+    return {file_field: file_doc.file_url, digest_field: data_digest, inline_field: None}
+
+
+def has_payload(doc: Any, doctype: str) -> bool:
+    return bool(
+        getattr(doc, _fieldname(doctype, "ocr_raw_json_file"), None)
+        or getattr(doc, _fieldname(doctype, "ocr_raw_json"), None)
+    )
+
+
+def load(doc: Any, doctype: str) -> dict[str, Any] | None:
+    """Raw OCR JSON for ``doc``; reads the compressed attachment only when called."""
+    file_url = getattr(doc, _fieldname(doctype, "ocr_raw_json_file"), None)
+    if file_url:
+        content = _read_file(file_url)
+        if content is not None:
+            return json.loads(gzip.decompress(content))
+
+    inline = getattr(doc, _fieldname(doctype, "ocr_raw_json"), None)
+    if not inline:
+        return None
+    if isinstance(inline, dict):
+        return inline
+    try:
+        return json.loads(inline)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_text(doc: Any, doctype: str) -> str | None:
+    """Pretty-printed raw OCR JSON for debug views."""
+    file_url = getattr(doc, _fieldname(doctype, "ocr_raw_json_file"), None)
+    if not file_url:
+        return getattr(doc, _fieldname(doctype, "ocr_raw_json"), None)
+    payload = load(doc, doctype)
+    return json.dumps(payload, indent=2, ensure_ascii=False) if payload is not None else None
+
+
+def migrate_inline_payloads(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """Move inline ``ocr_raw_json`` of Tax Invoice OCR Upload rows into attachments.
+
+    Rows are walked in name order with a keyset cursor and committed per batch, so
+    a large table is migrated without holding megabytes of JSON per row in one
+    transaction. Rows whose inline value is not valid JSON are left untouched.
+    """
+    if not supports_file_storage(UPLOAD_DOCTYPE):
+        return 0
+
+    migrated = 0
+    last_name = ""
+    while True:
+        rows = frappe.db.sql(
+            """
+            select name, ocr_raw_json
+            from `tabTax Invoice OCR Upload`
+            where name > %(last_name)s
+                and ifnull(ocr_raw_json, '') != ''
+                and ifnull(ocr_raw_json_file, '') = ''
+            order by name
+            limit %(limit)s
+            """,
+            {"last_name": last_name, "limit": batch_size},
+            as_dict=True,
+        )
+        if not rows:
+            break
+
+        for row in rows:
+            last_name = row.name
+            try:
+                raw_json = json.loads(row.ocr_raw_json)
+            except (TypeError, ValueError):
+                frappe.logger().warning(f"[OCR RAW] Skipping {row.name}: ocr_raw_json is not valid JSON")
+                continue
+            updates = store(UPLOAD_DOCTYPE, row.name, raw_json)
+            frappe.db.set_value(UPLOAD_DOCTYPE, row.name, updates, update_modified=False)
+            migrated += 1
+
+        frappe.db.commit()
+
+    return migrated
+
+
+def _current_pointer(doctype: str, name: str, doc: Any, file_field: str, digest_field: str) -> dict[str, Any]:
+    if doc is not None:
+        return {"file_url": getattr(doc, file_field, None), "digest": getattr(doc, digest_field, None)}
+    row = frappe.db.get_value(doctype, name, [file_field, digest_field], as_dict=True) or {}
+    return {"file_url": row.get(file_field), "digest": row.get(digest_field)}
+
+
+def _read_file(file_url: str) -> bytes | None:
+    name = frappe.db.get_value("File", {"file_url": file_url}, "name")
+    if not name:
+        frappe.logger().warning(f"[OCR RAW] Attachment {file_url} not found")
+        return None
+    content = frappe.get_doc("File", name).get_content()
+    return content.encode() if isinstance(content, str) else content
+
+
+def _delete_file(file_url: str, doctype: str, name: str) -> None:
+    try:
+        old = frappe.db.get_value(
+            "File",
+            {"file_url": file_url, "attached_to_doctype": doctype, "attached_to_name": name},
+            "name",
+        )
+        if old:
+            frappe.delete_doc("File", old, ignore_permissions=True)
+    except Exception:
+        # A stale attachment is harmless; never fail an OCR run over it.
+        frappe.logger().warning(f"[OCR RAW] Could not delete previous attachment {file_url}", exc_info=True)
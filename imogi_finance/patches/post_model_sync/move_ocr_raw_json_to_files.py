@@ -0,0 +1,19 @@
+"""
+Move inline OCR raw JSON of Tax Invoice OCR Upload into compressed attachments.
+
+New OCR runs store the Vision response as a gzip private File and keep only a
+pointer and digest in the row. Existing rows are migrated in committed batches so
+list views and document loads stop carrying megabytes of JSON per row.
+"""
+
+import frappe
+
+
+def execute():
+    if not frappe.db.table_exists("Tax Invoice OCR Upload"):
+        return
+
+    from imogi_finance.ocr_raw_store import migrate_inline_payloads
+
+    migrated = migrate_inline_payloads()
+    frappe.logger().info(f"[patch] OCR raw JSON moved to attachments: {migrated} rows")
@@ -0,0 +1,20 @@
+"""
+Build Budget Control Balance from existing Budget Control Entries.
+
+Budget Control Balance is maintained incrementally on entry submit/cancel. Sites
+that already have entries need a one-time rebuild so availability lookups read
+correct running totals from the first request after migrate.
+"""
+
+import frappe
+
+
+def execute():
+    if not frappe.db.table_exists("Budget Control Balance"):
+        return
+
+    from imogi_finance.budget_control.balance import rebuild_balances
+
+    rows = rebuild_balances()
+    frappe.db.commit()
+    frappe.logger().info(f"[patch] Budget Control Balance rebuilt: {rows} rows")
@@ -7,8 +7,9 @@ import frappe
 from frappe import _
 
 # Import helpers for centralized settings access
+from imogi_finance.settings.snapshot import get_settings_snapshot
 from imogi_finance.settings.utils import (
-    get_finance_control_settings,
+    FINANCE_CONTROL_SETTINGS_DOCTYPE,
     get_gl_account,
 )
 from imogi_finance.settings.gl_purposes import (
@@ -42,14 +43,13 @@ def get_receipt_control_settings():
     )
     defaults.update(BRANCH_SETTING_DEFAULTS)
 
-    if not frappe.db.exists("DocType", "Finance Control Settings"):
-        return defaults
-
     try:
-        settings = get_finance_control_settings()
+        settings = get_settings_snapshot(FINANCE_CONTROL_SETTINGS_DOCTYPE)
     except Exception:
         # Avoid breaking desk if single is missing in early migrations
         return defaults
+    if not settings:
+        return defaults
 
     for key in defaults.keys():
         defaults[key] = getattr(settings, key, defaults[key])
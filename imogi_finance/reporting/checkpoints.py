@@ -0,0 +1,247 @@
+"""Daily closing-balance checkpoints for cash/bank reporting.
+
+A checkpoint stores the end-of-day balance of one bank account (Bank Transaction
+based) or cash account (GL Entry based) for one branch. Checkpoints are written when
+a Cash Bank Daily Report is generated or submitted, so the opening balance of any
+later day is the nearest prior checkpoint plus the transactions in between, however
+many days were skipped. Bank Transaction and GL-posting voucher doc_events delete
+checkpoints on or after a backdated posting date so they never go stale.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import date, timedelta
+from typing import Sequence
+
+import frappe
+
+from imogi_finance.reporting.data import (
+    _coerce_list,
+    _parse_date,
+    fetch_bank_opening_balances,
+    fetch_cash_opening_balances,
+)
+
+CHECKPOINT_DOCTYPE = "Cash Bank Balance Checkpoint"
+
+# ``account_doctype`` values: the DocType the ``account`` Dynamic Link points to.
+BANK = "Bank Account"
+CASH = "Account"
+
+
+def checkpoint_key(account_doctype, account, branch, checkpoint_date) -> str:
+    raw = "\x1f".join(str(value or "") for value in (account_doctype, account, branch, checkpoint_date))
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def is_enabled() -> bool:
+    """Checkpoints are used once the DocType table exists (i.e. after migrate)."""
+    db = getattr(frappe, "db", None)
+    table_exists = getattr(db, "table_exists", None)
+    if not callable(table_exists):
+        return False
+    try:
+        return bool(table_exists(CHECKPOINT_DOCTYPE))
+    except Exception:
+        return False
+
+
+def _resolve_scope(bank_account=None, cash_account=None) -> tuple[str, str] | None:
+    """Checkpoints are kept per single account; multi-account filters are not covered."""
+    if cash_account:
+        accounts = _coerce_list(cash_account) or []
+        return (CASH, accounts[0]) if len(accounts) == 1 else None
+    if bank_account:
+        accounts = _coerce_list(bank_account) or []
+        return (BANK, accounts[0]) if len(accounts) == 1 else None
+    return None
+
+
+def get_nearest_checkpoint(account_doctype: str, account: str, before_date: date) -> tuple[date | None, dict[str, float]]:
+    """Return (checkpoint_date, {branch: closing_balance}) of the latest checkpoint before ``before_date``."""
+    params = {"account_doctype": account_doctype, "account": account, "before_date": before_date}
+    rows = frappe.db.sql(
+        f"""
+        select checkpoint_date, branch, closing_balance
+        from `tab{CHECKPOINT_DOCTYPE}`
+        where account_doctype = %(account_doctype)s
+          and account = %(account)s
+          and checkpoint_date = (
+              select max(checkpoint_date)
+              from `tab{CHECKPOINT_DOCTYPE}`
+              where account_doctype = %(account_doctype)s
+                and account = %(account)s
+                and checkpoint_date < %(before_date)s
+          )
+        """,
+        params,
+        as_dict=True,
+    ) or []
+
+    if not rows:
+        return None, {}
+
+    balances = {str(row.get("branch") or "Unassigned"): float(row.get("closing_balance") or 0.0) for row in rows}
+    return _parse_date(rows[0].get("checkpoint_date")), balances
+
+
+def get_latest_checkpoint_date(
+    report_date: date, *, bank_account: str | None = None, cash_account: str | None = None
+) -> date | None:
+    """Date of the latest checkpoint before ``report_date`` for the account, if any."""
+    scope = _resolve_scope(bank_account, cash_account)
+    if not scope or not report_date or not is_enabled():
+        return None
+
+    account_doctype, account = scope
+    rows = frappe.get_all(
+        CHECKPOINT_DOCTYPE,
+        filters={"account_doctype": account_doctype, "account": account, "checkpoint_date": ("<", report_date)},
+        fields=["checkpoint_date"],
+        order_by="checkpoint_date desc",
+        limit=1,
+    )
+    return _parse_date(rows[0].get("checkpoint_date")) if rows else None
+
+
+def _fetch_movements(scope: tuple[str, str], report_date: date, *, from_date=None, branches=None) -> dict[str, float]:
+    account_doctype, account = scope
+    if account_doctype == CASH:
+        return fetch_cash_opening_balances(
+            report_date, branches=branches, cash_accounts=[account], from_date=from_date
+        )
+    return fetch_bank_opening_balances(
+        report_date, branches=branches, bank_accounts=[account], from_date=from_date
+    )
+
+
+def get_opening_balances(
+    report_date: date,
+    *,
+    bank_account: str | None = None,
+    cash_account: str | None = None,
+    branches: Sequence[str] | None = None,
+) -> tuple[dict[str, float], date | None] | None:
+    """Opening balances per branch from the nearest prior checkpoint plus movements since.
+
+    Returns ``(openings, checkpoint_date)``; ``checkpoint_date`` is None when no checkpoint
+    exists and the full history was aggregated. Returns None when checkpoints do not
+    apply (table missing or not exactly one account).
+    """
+    scope = _resolve_scope(bank_account, cash_account)
+    if not scope or not report_date or not is_enabled():
+        return None
+
+    checkpoint_date, balances = get_nearest_checkpoint(*scope, report_date)
+    branch_filter = _coerce_list(branches)
+    if branch_filter:
+        allowed = set(branch_filter)
+        balances = {branch: value for branch, value in balances.items() if branch in allowed}
+
+    from_date = checkpoint_date + timedelta(days=1) if checkpoint_date else None
+    movements = _fetch_movements(scope, report_date, from_date=from_date, branches=branch_filter)
+
+    openings = dict(balances)
+    for branch, amount in movements.items():
+        openings[branch] = openings.get(branch, 0.0) + amount
+    return openings, checkpoint_date
+
+
+def write_checkpoints(
+    report_date,
+    *,
+    bank_account: str | None = None,
+    cash_account: str | None = None,
+    source_report: str | None = None,
+) -> int:
+    """Store end-of-day balances for every branch of the account; returns rows written.
+
+    Balances cover all branches regardless of any branch filter on the report, so
+    later reports with a different filter can reuse them.
+    """
+    report_date = _parse_date(report_date)
+    scope = _resolve_scope(bank_account, cash_account)
+    if not scope or not report_date or not is_enabled():
+        return 0
+
+    result = get_opening_balances(
+        report_date + timedelta(days=1), bank_account=bank_account, cash_account=cash_account
+    )
+    closing = result[0] if result else {}
+
+    account_doctype, account = scope
+    frappe.db.delete(
+        CHECKPOINT_DOCTYPE,
+        {"account_doctype": account_doctype, "account": account, "checkpoint_date": report_date},
+    )
+    if not closing:
+        return 0
+
+    now = frappe.utils.now_datetime()
+    user = getattr(getattr(frappe, "session", None), "user", None) or "Administrator"
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by",
+        "account_doctype", "account", "branch", "checkpoint_date", "closing_balance", "source_report",
+    ]
+    values = [
+        (checkpoint_key(account_doctype, account, branch, report_date), now, now, user, user,
+         account_doctype, account, branch, report_date, amount, source_report)
+        for branch, amount in sorted(closing.items())
+    ]
+    frappe.db.bulk_insert(CHECKPOINT_DOCTYPE, fields=fields, values=values)
+    return len(values)
+
+
+def invalidate_from(account_doctype: str, account: str | None, from_date) -> None:
+    """Delete checkpoints of ``account`` dated on or after ``from_date``."""
+    from_date = _parse_date(from_date)
+    if not account or not from_date or not is_enabled():
+        return
+    frappe.db.delete(
+        CHECKPOINT_DOCTYPE,
+        {"account_doctype": account_doctype, "account": account, "checkpoint_date": (">=", from_date)},
+    )
+
+
+def invalidate_for_bank_transaction(doc, method=None) -> None:
+    """doc_events hook: a Bank Transaction changed on or before existing checkpoints."""
+    targets = {(getattr(doc, "bank_account", None), _parse_date(getattr(doc, "date", None)))}
+    get_doc_before_save = getattr(doc, "get_doc_before_save", None)
+    previous = get_doc_before_save() if callable(get_doc_before_save) else None
+    if previous:
+        targets.add((getattr(previous, "bank_account", None), _parse_date(getattr(previous, "date", None))))
+
+    for bank_account, posting_date in targets:
+        invalidate_from(BANK, bank_account, posting_date)
+
+
+CASH_ACCOUNT_TYPES = ("Cash", "Bank")
+
+
+def invalidate_for_voucher(doc, method=None) -> None:
+    """doc_events hook: a voucher posting GL entries was submitted or cancelled.
+
+    Runs once per voucher (not per GL Entry row; ERPNext v15 cancels by posting
+    reverse entries without GL Entry ``on_cancel``). Only the voucher's Cash/Bank
+    ledger accounts are invalidated, each from its earliest posting date.
+    """
+    voucher_no = getattr(doc, "name", None)
+    if not voucher_no or not is_enabled():
+        return
+
+    rows = frappe.db.sql(
+        """
+        select gle.account, min(gle.posting_date) as from_date
+        from `tabGL Entry` gle
+        inner join `tabAccount` acc on acc.name = gle.account
+        where gle.voucher_type = %(voucher_type)s
+          and gle.voucher_no = %(voucher_no)s
+          and acc.account_type in %(account_types)s
+        group by gle.account
+        """,
+        {"voucher_type": doc.doctype, "voucher_no": voucher_no, "account_types": CASH_ACCOUNT_TYPES},
+        as_dict=True,
+    ) or []
+    for row in rows:
+        invalidate_from(CASH, row["account"], row["from_date"])
@@ -113,8 +113,12 @@ def fetch_bank_transactions(
     *,
     branches: Sequence[str] | None = None,
     bank_accounts: Sequence[str] | None = None,
+    from_date: date | None = None,
 ) -> list[dict[str, object]]:
-    """Fetch bank transactions up to and including the report date."""
+    """Fetch bank transactions up to and including the report date.
+
+    Pass ``from_date`` to restrict the window (e.g. to the report day only).
+    """
 
     if not getattr(frappe, "db", None):
         return []
@@ -124,8 +128,12 @@ def fetch_bank_transactions(
         has_branch_column = frappe.db.has_column("Bank Transaction", "branch")
 
     filters = {}
-    if report_date:
+    if report_date and from_date:
+        filters["date"] = ("between", [from_date, report_date])
+    elif report_date:
         filters["date"] = ("<=", report_date)
+    elif from_date:
+        filters["date"] = (">=", from_date)
     branch_filter = _coerce_list(branches)
     if branch_filter and has_branch_column:
         filters["branch"] = ("in", branch_filter)
@@ -176,8 +184,12 @@ def fetch_cash_ledger_entries(
     *,
     branches: Sequence[str] | None = None,
     cash_accounts: Sequence[str] | None = None,
+    from_date: date | None = None,
 ) -> list[dict[str, object]]:
-    """Fetch cash ledger entries up to and including the report date."""
+    """Fetch cash ledger entries up to and including the report date.
+
+    Pass ``from_date`` to restrict the window (e.g. to the report day only).
+    """
 
     if not getattr(frappe, "db", None):
         return []
@@ -195,8 +207,12 @@ def fetch_cash_ledger_entries(
         has_is_cancelled = frappe.db.has_column("GL Entry", "is_cancelled")
 
     filters = {"account": ("in", account_filter)}
-    if report_date:
+    if report_date and from_date:
+        filters["posting_date"] = ("between", [from_date, report_date])
+    elif report_date:
         filters["posting_date"] = ("<=", report_date)
+    elif from_date:
+        filters["posting_date"] = (">=", from_date)
     if has_is_cancelled:
         filters["is_cancelled"] = 0
     branch_filter = _coerce_list(branches)
@@ -240,6 +256,114 @@ def fetch_cash_ledger_entries(
     return transactions
 
 
+def _has_column(doctype: str, column: str) -> bool:
+    if hasattr(frappe.db, "has_column"):
+        return bool(frappe.db.has_column(doctype, column))
+    return True
+
+
+def _sum_balances_by_branch(query: str, params: Mapping[str, object]) -> dict[str, float]:
+    rows = frappe.db.sql(query, params, as_dict=True) or []
+    openings: dict[str, float] = defaultdict(float)
+    for row in rows:
+        openings[str(row.get("branch") or "Unassigned")] += _as_amount(row.get("balance"))
+    return dict(openings)
+
+
+def fetch_bank_opening_balances(
+    report_date: date,
+    *,
+    branches: Sequence[str] | None = None,
+    bank_accounts: Sequence[str] | None = None,
+    from_date: date | None = None,
+) -> dict[str, float]:
+    """Net Bank Transaction movement per branch before ``report_date`` in one aggregate.
+
+    Signs follow ``fetch_bank_transactions`` + ``derive_opening_balances``: a positive
+    deposit counts in, anything else counts out. ``from_date`` limits the sum to
+    ``[from_date, report_date)`` so it can be added to a known earlier balance.
+    """
+    if not getattr(frappe, "db", None) or not report_date:
+        return {}
+
+    has_branch_column = _has_column("Bank Transaction", "branch")
+    conditions = ["`date` < %(report_date)s"]
+    params: dict[str, object] = {"report_date": report_date}
+    if from_date:
+        conditions.append("`date` >= %(from_date)s")
+        params["from_date"] = from_date
+    branch_filter = _coerce_list(branches)
+    if branch_filter and has_branch_column:
+        conditions.append("branch in %(branches)s")
+        params["branches"] = tuple(branch_filter)
+    bank_filter = _coerce_list(bank_accounts)
+    if bank_filter:
+        conditions.append("bank_account in %(bank_accounts)s")
+        params["bank_accounts"] = tuple(bank_filter)
+
+    branch_column = "branch" if has_branch_column else "null"
+    return _sum_balances_by_branch(
+        f"""
+        select {branch_column} as branch,
+            sum(case
+                when deposit > 0 then deposit
+                when ifnull(deposit, 0) != 0 then -deposit
+                else -ifnull(withdrawal, 0)
+            end) as balance
+        from `tabBank Transaction`
+        where {" and ".join(conditions)}
+        group by {branch_column}
+        """,
+        params,
+    )
+
+
+def fetch_cash_opening_balances(
+    report_date: date,
+    *,
+    branches: Sequence[str] | None = None,
+    cash_accounts: Sequence[str] | None = None,
+    from_date: date | None = None,
+) -> dict[str, float]:
+    """Net cash GL movement per branch before ``report_date`` in one aggregate.
+
+    Signs follow ``fetch_cash_ledger_entries`` + ``derive_opening_balances``: a positive
+    debit counts in, otherwise the credit counts out. ``from_date`` limits the sum to
+    ``[from_date, report_date)``.
+    """
+    if not getattr(frappe, "db", None) or not report_date:
+        return {}
+
+    account_filter = _coerce_list(cash_accounts)
+    if not account_filter:
+        return {}
+
+    has_branch_column = _has_column("GL Entry", "branch")
+    conditions = ["account in %(accounts)s", "posting_date < %(report_date)s"]
+    params: dict[str, object] = {"accounts": tuple(account_filter), "report_date": report_date}
+    if from_date:
+        conditions.append("posting_date >= %(from_date)s")
+        params["from_date"] = from_date
+    if _has_column("GL Entry", "is_cancelled"):
+        conditions.append("is_cancelled = 0")
+    branch_filter = _coerce_list(branches)
+    if branch_filter and has_branch_column:
+        conditions.append("branch in %(branches)s")
+        params["branches"] = tuple(branch_filter)
+
+    branch_column = "branch" if has_branch_column else "null"
+    return _sum_balances_by_branch(
+        f"""
+        select {branch_column} as branch,
+            sum(case when debit > 0 then debit else -ifnull(credit, 0) end) as balance
+        from `tabGL Entry`
+        where {" and ".join(conditions)}
+        group by {branch_column}
+        """,
+        params,
+    )
+
+
 def derive_opening_balances(
     transactions: Iterable[Mapping[str, object]], *, report_date: date | None
 ) -> dict[str, float]:
@@ -325,9 +449,9 @@ def load_daily_inputs(
 ) -> tuple[list[dict[str, object]], dict[str, float]]:
     """Return (transactions_for_day, opening_balances) for daily reporting.
 
-    Opening balances are derived from:
+    Only the report day's rows are loaded. Opening balances are derived from:
     1. Previous day's report closing balances (preferred)
-    2. Cumulative transactions before report_date (fallback)
+    2. A single SQL aggregate over transactions before report_date (fallback)
     """
 
     resolved_date = report_date or date.today()
@@ -335,29 +459,24 @@ def load_daily_inputs(
     bank_filter = _coerce_list(bank_accounts)
 
     if cash_filter:
-        all_transactions = fetch_cash_ledger_entries(
+        day_transactions = fetch_cash_ledger_entries(
             resolved_date,
             branches=branches,
             cash_accounts=cash_filter,
+            from_date=resolved_date,
         )
         account_for_lookup = cash_filter[0] if cash_filter else None
         is_cash = True
     else:
-        all_transactions = fetch_bank_transactions(
+        day_transactions = fetch_bank_transactions(
             resolved_date,
             branches=branches,
             bank_accounts=bank_accounts,
+            from_date=resolved_date,
         )
         account_for_lookup = bank_filter[0] if bank_filter else None
         is_cash = False
 
-    day_transactions: list[dict[str, object]] = []
-    for tx in all_transactions:
-        posting_date = _parse_date(tx.get("posting_date"))
-        if posting_date and posting_date != resolved_date:
-            continue
-        day_transactions.append(tx)
-
     references = [tx.get("reference") for tx in day_transactions if tx.get("reference")]
     reference_names = [str(ref) for ref in references if ref]
 
@@ -406,7 +525,19 @@ def load_daily_inputs(
         tx["deposit"] = amount if direction == "in" else 0.0
         tx["withdrawal"] = amount if direction == "out" else 0.0
 
-    # Try to get opening balances from previous report first
+    # Nearest balance checkpoint + movements since covers skipped days (weekends, gaps)
+    from imogi_finance.reporting.checkpoints import get_opening_balances
+
+    checkpoint = get_opening_balances(
+        resolved_date,
+        bank_account=None if is_cash else bank_filter,
+        cash_account=cash_filter if is_cash else None,
+        branches=branches,
+    )
+    if checkpoint and checkpoint[1]:
+        return day_transactions, checkpoint[0]
+
+    # Then the previous day's report
     openings = None
     if is_cash:
         openings = get_previous_report_closing_balances(
@@ -417,9 +548,18 @@ def load_daily_inputs(
             resolved_date, bank_account=account_for_lookup
         )
 
-    # Fallback: calculate from all transactions if no previous report
+    # Fallback: aggregate all prior transactions in SQL if no previous report
     if openings is None:
-        openings = derive_opening_balances(all_transactions, report_date=resolved_date)
+        if checkpoint:
+            openings = checkpoint[0]
+        elif is_cash:
+            openings = fetch_cash_opening_balances(
+                resolved_date, branches=branches, cash_accounts=cash_filter
+            )
+        else:
+            openings = fetch_bank_opening_balances(
+                resolved_date, branches=branches, bank_accounts=bank_accounts
+            )
         # Log that we're using fallback calculation (informational, not an error)
         frappe.logger().info(
             f"[Cash Bank Report] No previous report found for {resolved_date}, "
@@ -443,18 +583,23 @@ def check_reporting_gaps(
     if not getattr(frappe, "db", None):
         return []
 
+    start_date = report_date - timedelta(days=days_back)
+    filters = {"report_date": ("between", [start_date, report_date - timedelta(days=1)])}
+    if bank_account:
+        filters["bank_account"] = bank_account
+    if cash_account:
+        filters["cash_account"] = cash_account
+
+    # One query for the whole window instead of an exists() per day
+    reported = {
+        _parse_date(row.get("report_date"))
+        for row in frappe.get_all("Cash Bank Daily Report", filters=filters, fields=["report_date"])
+    }
+
     missing_dates = []
     for i in range(1, days_back + 1):
         check_date = report_date - timedelta(days=i)
-
-        filters = {"report_date": check_date}
-        if bank_account:
-            filters["bank_account"] = bank_account
-        if cash_account:
-            filters["cash_account"] = cash_account
-
-        exists = frappe.db.exists("Cash Bank Daily Report", filters)
-        if not exists:
+        if check_date not in reported:
             missing_dates.append(check_date.isoformat())
 
     return missing_dates
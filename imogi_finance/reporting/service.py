@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import csv
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from datetime import date, datetime
 from importlib import util as importlib_util
@@ -58,6 +59,11 @@ def _get_frappe():
 frappe = _get_frappe()
 _ = frappe._
 
+# Maximum distance in days between ledger and statement dates (see ``_is_statement_match``).
+MATCH_WINDOW_DAYS = 3
+# Slack added to the tolerance range lookup; candidates are re-checked exactly.
+_AMOUNT_EPSILON = 1e-6
+
 
 def resolve_signers(
     settings: Mapping[str, str] | None = None, overrides: Mapping[str, str] | None = None
@@ -256,32 +262,18 @@ def build_monthly_reconciliation(
     missing_from_bank: list[dict[str, object]] = []
     missing_from_ledger: list[dict[str, object]] = []
 
-    statements_pool = list(bank_statements)
+    statement_index = _StatementIndex(bank_statements)
     for tx in ledger_transactions:
         amount = _as_amount(tx.get("amount"))
         direction = _normalise_direction(tx.get("direction"))
         signed_amount = amount if direction == "in" else -amount
         tx_date = _parse_date(tx.get("posting_date") or tx.get("date"))
 
-        match_index = next(
-            (
-                idx
-                for idx, statement in enumerate(statements_pool)
-                if _is_statement_match(
-                    signed_amount,
-                    direction,
-                    tx_date,
-                    statement,
-                    tolerance=tolerance,
-                )
-            ),
-            None,
-        )
-        if match_index is None:
+        statement = statement_index.take(signed_amount, direction, tx_date, tolerance=tolerance)
+        if statement is None:
             missing_from_bank.append(dict(tx))
             continue
 
-        statement = statements_pool.pop(match_index)
         matches.append(
             {
                 "ledger": dict(tx),
@@ -290,7 +282,7 @@ def build_monthly_reconciliation(
             }
         )
 
-    missing_from_ledger.extend(statements_pool)
+    missing_from_ledger.extend(statement_index.remaining())
 
     ledger_balance = sum(
         _as_amount(tx.get("amount")) if _normalise_direction(tx.get("direction")) == "in" else -_as_amount(tx.get("amount"))
@@ -352,22 +344,144 @@ def _is_statement_match(
     *,
     tolerance: float = 0.0,
 ) -> bool:
-    statement_amount = _as_amount(statement.get("amount"))
-    raw_direction = statement.get("direction")
-    statement_direction = _normalise_direction(raw_direction)
-    if not raw_direction:
-        statement_direction = "in" if statement_amount >= 0 else "out"
-
+    statement_direction, statement_signed = _statement_signature(statement)
     if ledger_direction != statement_direction:
         return False
 
-    statement_signed = statement_amount if statement_direction == "in" else -statement_amount
     if abs(ledger_signed_amount - statement_signed) > tolerance:
         return False
 
     ledger_dt = ledger_date
     statement_dt = _parse_date(statement.get("posting_date") or statement.get("date"))
-    if ledger_dt and statement_dt and abs((ledger_dt - statement_dt).days) > 3:
+    if ledger_dt and statement_dt and abs((ledger_dt - statement_dt).days) > MATCH_WINDOW_DAYS:
         return False
 
     return True
+
+
+def _statement_signature(statement: Mapping[str, object]) -> tuple[str, float]:
+    """Direction and signed amount of a statement row, as ``_is_statement_match`` sees them."""
+    statement_amount = _as_amount(statement.get("amount"))
+    raw_direction = statement.get("direction")
+    statement_direction = _normalise_direction(raw_direction)
+    if not raw_direction:
+        statement_direction = "in" if statement_amount >= 0 else "out"
+
+    statement_signed = statement_amount if statement_direction == "in" else -statement_amount
+    return statement_direction, statement_signed
+
+
+class _Queue:
+    """Statement positions in ascending order with a cursor past consumed entries."""
+
+    __slots__ = ("items", "cursor")
+
+    def __init__(self):
+        self.items: list[int] = []
+        self.cursor = 0
+
+    def head(self, consumed: list[bool]) -> int | None:
+        items = self.items
+        cursor = self.cursor
+        while cursor < len(items) and consumed[items[cursor]]:
+            cursor += 1
+        self.cursor = cursor
+        return items[cursor] if cursor < len(items) else None
+
+
+class _AmountBucket:
+    """Statements sharing a (direction, signed amount), indexed by posting day."""
+
+    __slots__ = ("ordered", "undated", "by_day")
+
+    def __init__(self):
+        self.ordered = _Queue()
+        self.undated = _Queue()
+        self.by_day: dict[int, _Queue] = {}
+
+    def add(self, position: int, day: int | None) -> None:
+        self.ordered.items.append(position)
+        if day is None:
+            self.undated.items.append(position)
+            return
+        queue = self.by_day.get(day)
+        if queue is None:
+            queue = self.by_day[day] = _Queue()
+        queue.items.append(position)
+
+    def first_match(self, day: int | None, consumed: list[bool]) -> int | None:
+        if day is None:
+            # Undated ledger rows match any date.
+            return self.ordered.head(consumed)
+
+        best = self.undated.head(consumed)
+        for offset in range(-MATCH_WINDOW_DAYS, MATCH_WINDOW_DAYS + 1):
+            queue = self.by_day.get(day + offset)
+            if queue is None:
+                continue
+            position = queue.head(consumed)
+            if position is not None and (best is None or position < best):
+                best = position
+        return best
+
+
+class _StatementIndex:
+    """Remaining bank statement rows indexed for reconciliation lookups.
+
+    Statements are bucketed by (direction, signed amount); the distinct amounts per
+    direction are kept sorted so the tolerance becomes a bisect range, and each bucket
+    is keyed by posting day so the date window is a bounded probe. ``take`` returns the
+    same row a linear scan with ``_is_statement_match`` would: the earliest remaining
+    statement in input order that matches.
+    """
+
+    def __init__(self, statements: Sequence[Mapping[str, object]]):
+        self.statements = statements
+        self.consumed = [False] * len(statements)
+        self.buckets: dict[tuple[str, float], _AmountBucket] = {}
+
+        for position, statement in enumerate(statements):
+            key = _statement_signature(statement)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = _AmountBucket()
+            statement_dt = _parse_date(statement.get("posting_date") or statement.get("date"))
+            bucket.add(position, statement_dt.toordinal() if statement_dt else None)
+
+        amounts: dict[str, list[float]] = defaultdict(list)
+        for direction, signed in self.buckets:
+            amounts[direction].append(signed)
+        self.amounts = {direction: sorted(values) for direction, values in amounts.items()}
+
+    def take(
+        self,
+        ledger_signed_amount: float,
+        ledger_direction: str,
+        ledger_date: date | None,
+        *,
+        tolerance: float = 0.0,
+    ) -> Mapping[str, object] | None:
+        """Consume and return the first remaining matching statement, if any."""
+        amounts = self.amounts.get(ledger_direction)
+        if not amounts:
+            return None
+
+        low = bisect_left(amounts, ledger_signed_amount - tolerance - _AMOUNT_EPSILON)
+        high = bisect_right(amounts, ledger_signed_amount + tolerance + _AMOUNT_EPSILON)
+        day = ledger_date.toordinal() if ledger_date else None
+
+        best = None
+        for statement_signed in amounts[low:high]:
+            if abs(ledger_signed_amount - statement_signed) > tolerance:
+                continue
+            position = self.buckets[(ledger_direction, statement_signed)].first_match(day, self.consumed)
+            if position is not None and (best is None or position < best):
+                best = position
+
+        if best is None:
+            return None
+        self.consumed[best] = True
+        return self.statements[best]
+
+    def remaining(self) -> list[Mapping[str, object]]:
+        return [statement for position, statement in enumerate(self.statements) if not self.consumed[position]]
@@ -6,57 +6,374 @@ daily/monthly reports automatically.
 
 from __future__ import annotations
 
-from datetime import date
+import json
+import time
+from datetime import date, timedelta
 
 import frappe
 from frappe import _
+from frappe.utils import cint
 
+from imogi_finance import roles
 from imogi_finance.reporting.data import load_daily_inputs
-from imogi_finance.reporting.service import build_daily_report, resolve_signers
 from imogi_finance.settings.utils import get_finance_control_settings
 
 
-def run_daily_reporting(branches: list[str] | None = None) -> None:
-    """Generate and store daily cash/bank reports for all companies.
+# Dedicated queue for per-account daily reports; declare it under "workers" in
+# common_site_config.json. Falls back to "long" when it is not configured.
+REPORTING_QUEUE = "imogi_reporting"
+FALLBACK_QUEUE = "long"
+RUN_CACHE_PREFIX = "imogi_finance:daily_reporting:"
+RUN_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_PARALLEL_JOBS = 4
+DEFAULT_MAX_RETRIES = 2
 
-    Called by Frappe scheduler (daily). Can optionally filter by branches.
+JOB_TIMEOUT_SECONDS = 1500
+
+ACTIVE_STATUSES = {"queued", "running", "retrying"}
+# Active entries not updated for this long are treated as lost (e.g. worker restart).
+STALE_AFTER_SECONDS = 2 * 3600
+# A running job is killed by the worker at its timeout, so it is lost well before that.
+LOST_RUNNING_AFTER_SECONDS = JOB_TIMEOUT_SECONDS + 300
+
+
+def run_daily_reporting(branches: list[str] | None = None, report_date: str | None = None) -> dict | None:
+    """Fan out one Cash Bank Daily Report job per bank/cash account.
+
+    Called by Frappe scheduler (daily). At most ``daily_report_max_parallel_jobs``
+    account jobs run at once; each finished job dispatches the next pending account, and
+    ``top_up_daily_reporting`` re-enqueues lost jobs and refills their slots.
+    Job IDs are deterministic per date/account so re-running the task the same day does
+    not enqueue duplicates. Progress and per-account timings are kept in Redis and
+    returned by ``get_daily_reporting_status``.
     """
     try:
-        report_date = date.today()
-
-        # Load settings for signers (use same field names as api/reporting.py)
+        report_date = report_date or date.today().isoformat()
         settings_doc = get_finance_control_settings()
-        signers_dict = {
-            "prepared_by": getattr(settings_doc, "daily_report_preparer", None),
-            "approved_by": getattr(settings_doc, "daily_report_approver", None),
-            "acknowledged_by": getattr(settings_doc, "daily_report_acknowledger", None),
-        }
-        signers = resolve_signers(settings=signers_dict)
+        if getattr(settings_doc, "daily_report_view_only", 0):
+            frappe.logger().info("Daily reporting skipped: Cash/Bank Daily Report is in view-only mode")
+            return None
 
-        # Load transactions and build report
-        transactions, opening_balances = load_daily_inputs(
-            report_date=report_date,
-            branches=branches,
-        )
+        existing = _load_run(report_date)
+        if any(_is_active(entry) for entry in existing.values()):
+            frappe.logger().info(f"Daily reporting for {report_date} is already running")
+            _top_up(report_date, settings_doc)
+            return _summarize_run(report_date, _load_run(report_date))
 
-        bundle = build_daily_report(
-            transactions=transactions,
-            opening_balances=opening_balances,
-            report_date=report_date,
-            signers=signers,
-            allowed_branches=branches,
-            status="published",
-        )
+        accounts = list_reporting_accounts()
+        cache = frappe.cache()
+        run_key = _run_key(report_date)
+        cache.delete_value([run_key, _pending_key(report_date), _summary_key(report_date)])
+
+        for account_field, account in accounts:
+            _update_entry(
+                report_date,
+                account_field,
+                account,
+                status="queued",
+                attempts=0,
+                seconds=None,
+                report=None,
+                error=None,
+                branches=branches,
+                dispatched=False,
+            )
+            cache.rpush(
+                _pending_key(report_date),
+                json.dumps({"account_field": account_field, "account": account, "branches": branches}),
+            )
+        cache.expire(cache.make_key(_pending_key(report_date)), RUN_TTL_SECONDS)
+
+        _top_up(report_date, settings_doc)
 
         frappe.logger().info(
-            f"Daily reporting completed for {report_date.isoformat()}: "
-            f"{len(bundle.branches)} branches, "
-            f"consolidated balance: {bundle.consolidated.closing_balance}"
+            f"Daily reporting for {report_date}: {len(accounts)} accounts queued on {_reporting_queue()}"
         )
+        return {"report_date": report_date, "accounts": len(accounts)}
 
     except Exception as e:
         frappe.logger().error(f"Daily reporting task failed: {e}", exc_info=True)
         # Don't re-raise to avoid stopping scheduler
+        return None
+
+
+def top_up_daily_reporting(report_date: str | None = None) -> None:
+    """Recover lost account jobs and fill free slots from the pending accounts.
+
+    Called by Frappe scheduler (cron) for today's and yesterday's run. The chain in
+    ``generate_account_report`` only moves on when a job reaches its end; a job lost to
+    a worker restart or kill would otherwise hold its slot until the run goes stale.
+    """
+    try:
+        settings_doc = get_finance_control_settings()
+        if getattr(settings_doc, "daily_report_view_only", 0):
+            return
+
+        today = date.today()
+        dates = [report_date] if report_date else [(today - timedelta(days=1)).isoformat(), today.isoformat()]
+        for run_date in dates:
+            if _load_run(run_date):
+                _top_up(run_date, settings_doc)
+
+    except Exception as e:
+        frappe.logger().error(f"Daily reporting top-up failed: {e}", exc_info=True)
+
+
+def list_reporting_accounts() -> list[tuple[str, str]]:
+    """Company bank accounts and cash ledger accounts that get a daily report."""
+    bank_accounts = frappe.get_all(
+        "Bank Account",
+        filters={"is_company_account": 1, "disabled": 0},
+        pluck="name",
+        order_by="name asc",
+    )
+    cash_accounts = frappe.get_all(
+        "Account",
+        filters={"account_type": "Cash", "is_group": 0, "disabled": 0},
+        pluck="name",
+        order_by="name asc",
+    )
+    return [("bank_account", name) for name in bank_accounts] + [("cash_account", name) for name in cash_accounts]
+
+
+def generate_account_report(
+    report_date: str,
+    account_field: str,
+    account: str,
+    branches: list[str] | None = None,
+    attempt: int = 1,
+) -> None:
+    """Background job: create the Cash Bank Daily Report for one account and date."""
+    started = time.monotonic()
+    _update_entry(report_date, account_field, account, status="running", attempts=attempt)
+
+    try:
+        report_name = _ensure_account_report(report_date, account_field, account, branches)
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        elapsed = round(time.monotonic() - started, 3)
+        settings_doc = get_finance_control_settings()
+        if attempt <= _max_retries(settings_doc):
+            _update_entry(
+                report_date, account_field, account, status="retrying", seconds=elapsed, error=str(e)[:500]
+            )
+            # The retry keeps this account's concurrency slot.
+            _enqueue_account_job(report_date, account_field, account, branches, attempt + 1)
+            return
+
+        _update_entry(report_date, account_field, account, status="failed", seconds=elapsed, error=str(e)[:500])
+        frappe.log_error(
+            f"Daily report for {account} on {report_date} failed after {attempt} attempts: {e}",
+            "Daily Reporting",
+        )
+    else:
+        _update_entry(
+            report_date,
+            account_field,
+            account,
+            status="done",
+            seconds=round(time.monotonic() - started, 3),
+            report=report_name,
+            error=None,
+        )
+
+    _dispatch_next(report_date)
+    _finalize_run(report_date)
+
+
+@frappe.whitelist()
+def get_daily_reporting_status(report_date: str | None = None) -> dict:
+    """Run summary with per-account status, attempts and timings for ``report_date``."""
+    frappe.only_for((roles.SYSTEM_MANAGER, roles.ACCOUNTS_MANAGER))
+    report_date = report_date or date.today().isoformat()
+    return _summarize_run(report_date, _load_run(report_date))
+
+
+def _ensure_account_report(report_date: str, account_field: str, account: str, branches=None) -> str:
+    existing = frappe.db.exists("Cash Bank Daily Report", {"report_date": report_date, account_field: account})
+    if existing:
+        return existing
+
+    doc = frappe.get_doc(
+        {
+            "doctype": "Cash Bank Daily Report",
+            "report_date": report_date,
+            account_field: account,
+            "branches": ", ".join(branches) if branches else None,
+        }
+    )
+    doc.insert(ignore_permissions=True)
+    return doc.name
+
+
+def _reporting_queue() -> str:
+    try:
+        from frappe.utils.background_jobs import get_queue_list
+
+        if REPORTING_QUEUE in get_queue_list():
+            return REPORTING_QUEUE
+    except Exception:
+        pass
+    return FALLBACK_QUEUE
+
+
+def _max_parallel_jobs(settings_doc) -> int:
+    return max(1, cint(getattr(settings_doc, "daily_report_max_parallel_jobs", None) or DEFAULT_MAX_PARALLEL_JOBS))
+
+
+def _max_retries(settings_doc) -> int:
+    value = getattr(settings_doc, "daily_report_max_retries", None)
+    return max(0, cint(DEFAULT_MAX_RETRIES if value is None else value))
+
+
+def _job_id(report_date: str, account_field: str, account: str, attempt: int) -> str:
+    return f"imogi-daily-report:{report_date}:{account_field}:{account}:{attempt}"
+
+
+def _enqueue_account_job(report_date: str, account_field: str, account: str, branches, attempt: int) -> None:
+    in_test = getattr(frappe.flags, "in_test", False)
+    frappe.enqueue(
+        "imogi_finance.reporting.tasks.generate_account_report",
+        queue=_reporting_queue(),
+        timeout=JOB_TIMEOUT_SECONDS,
+        job_name=f"Daily Report {account} {report_date}",
+        job_id=_job_id(report_date, account_field, account, attempt),
+        deduplicate=True,
+        now=in_test,
+        is_async=not in_test,
+        report_date=report_date,
+        account_field=account_field,
+        account=account,
+        branches=branches,
+        attempt=attempt,
+    )
+
+
+def _dispatch_next(report_date: str) -> bool:
+    """Enqueue the next pending account, if any; returns whether one was enqueued."""
+    raw = frappe.cache().lpop(_pending_key(report_date))
+    if not raw:
+        return False
+
+    payload = json.loads(raw.decode() if isinstance(raw, bytes) else raw)
+    _update_entry(report_date, payload["account_field"], payload["account"], dispatched=True)
+    _enqueue_account_job(report_date, payload["account_field"], payload["account"], payload.get("branches"), 1)
+    return True
+
+
+def _top_up(report_date: str, settings_doc) -> int:
+    """Re-enqueue lost dispatched jobs, then dispatch pending accounts into free slots.
+
+    Returns the number of pending accounts dispatched.
+    """
+    in_flight = 0
+    for entry in _load_run(report_date).values():
+        if entry.get("status") not in ACTIVE_STATUSES or not entry.get("dispatched"):
+            continue
+        if _is_lost(entry):
+            in_flight += _recover_lost(report_date, entry, settings_doc)
+        else:
+            in_flight += 1
+
+    dispatched = 0
+    while in_flight + dispatched < _max_parallel_jobs(settings_doc) and _dispatch_next(report_date):
+        dispatched += 1
+
+    _finalize_run(report_date)
+    return dispatched
+
+
+def _recover_lost(report_date: str, entry: dict, settings_doc) -> int:
+    """Enqueue the lost job's next attempt; returns 1 if it keeps its slot, 0 if it failed.
+
+    A job lost while queued is enqueued again under the same job ID, so it is not
+    duplicated if the worker still holds it. A job lost while running counts as a
+    failed attempt.
+    """
+    account_field, account = entry["account_field"], entry["account"]
+    attempts = cint(entry.get("attempts"))
+    error = _("Job lost: no progress for {0} seconds").format(int(time.time() - (entry.get("updated_at") or 0)))
+
+    if entry.get("status") == "running" and attempts > _max_retries(settings_doc):
+        _update_entry(report_date, account_field, account, status="failed", error=error)
+        frappe.log_error(
+            f"Daily report for {account} on {report_date} was lost after {attempts} attempts",
+            "Daily Reporting",
+        )
+        return 0
+
+    status = "retrying" if entry.get("status") == "running" else entry.get("status")
+    _update_entry(report_date, account_field, account, status=status, error=error)
+    _enqueue_account_job(report_date, account_field, account, entry.get("branches"), attempts + 1)
+    return 1
+
+
+def _run_key(report_date: str) -> str:
+    return f"{RUN_CACHE_PREFIX}{report_date}"
+
+
+def _pending_key(report_date: str) -> str:
+    return f"{RUN_CACHE_PREFIX}{report_date}:pending"
+
+
+def _summary_key(report_date: str) -> str:
+    return f"{RUN_CACHE_PREFIX}{report_date}:summary"
+
+
+def _load_run(report_date: str) -> dict[str, dict]:
+    return frappe.cache().hgetall(_run_key(report_date)) or {}
+
+
+def _update_entry(report_date: str, account_field: str, account: str, **values) -> None:
+    cache = frappe.cache()
+    field = f"{account_field}:{account}"
+    entry = cache.hget(_run_key(report_date), field) or {"account_field": account_field, "account": account}
+    entry.update(values, updated_at=time.time())
+    cache.hset(_run_key(report_date), field, entry)
+    cache.expire(cache.make_key(_run_key(report_date)), RUN_TTL_SECONDS)
+
+
+def _is_lost(entry: dict) -> bool:
+    limit = LOST_RUNNING_AFTER_SECONDS if entry.get("status") == "running" else STALE_AFTER_SECONDS
+    return time.time() - (entry.get("updated_at") or 0) >= limit
+
+
+def _is_active(entry: dict) -> bool:
+    return entry.get("status") in ACTIVE_STATUSES and not _is_lost(entry)
+
+
+def _summarize_run(report_date: str, entries: dict[str, dict]) -> dict:
+    counts: dict[str, int] = {}
+    for entry in entries.values():
+        counts[entry.get("status")] = counts.get(entry.get("status"), 0) + 1
+    timings = [entry.get("seconds") for entry in entries.values() if entry.get("seconds") is not None]
+    return {
+        "report_date": report_date,
+        "accounts": len(entries),
+        "counts": counts,
+        "total_seconds": round(sum(timings), 3),
+        "slowest": sorted(entries.values(), key=lambda entry: entry.get("seconds") or 0, reverse=True)[:5],
+        "failed": [entry for entry in entries.values() if entry.get("status") == "failed"],
+        "entries": sorted(entries.values(), key=lambda entry: (entry["account_field"], entry["account"])),
+    }
+
+
+def _finalize_run(report_date: str) -> None:
+    entries = _load_run(report_date)
+    if not entries or any(_is_active(entry) for entry in entries.values()):
+        return
+
+    cache = frappe.cache()
+    if cache.get_value(_summary_key(report_date)):
+        return
+
+    summary = _summarize_run(report_date, entries)
+    cache.set_value(_summary_key(report_date), summary, expires_in_sec=RUN_TTL_SECONDS)
+    frappe.logger().info(
+        f"Daily reporting completed for {report_date}: {summary['counts']}, "
+        f"{summary['total_seconds']}s total job time"
+    )
 
 
 def run_monthly_reconciliation() -> None:
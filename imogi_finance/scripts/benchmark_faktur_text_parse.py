@@ -0,0 +1,243 @@
+"""
+Fixture corpus and timing harness for ``tax_invoice_ocr.parse_faktur_pajak_text``.
+
+The corpus covers the OCR text layouts the header/totals parser sees in
+production: Coretax column blocks (labels first, values after the signature),
+inline ``label value`` rows, multi-item tables whose column headers repeat the
+summary labels, DPP Nilai Lain invoices, partial OCR, CRLF line endings and a
+long multi-page item table.
+
+``tests/test_faktur_text_index.py`` checks the parser output for every corpus
+document against ``tests/faktur_text_corpus_expected.json``, which was recorded
+with the parser that re-split and re-scanned the text in every helper.
+
+Run with:
+    bench execute imogi_finance.scripts.benchmark_faktur_text_parse.run
+    bench execute imogi_finance.scripts.benchmark_faktur_text_parse.run --kwargs "{'repeat': 50}"
+"""
+
+import random
+import time
+
+SUMMARY_BLOCK = (
+    "Harga Jual / Penggantian / Uang Muka / Termin\n"
+    "Dikurangi Potongan Harga\n"
+    "Dikurangi Uang Muka yang telah diterima\n"
+    "Dasar Pengenaan Pajak\n"
+    "Jumlah PPN (Pajak Pertambahan Nilai)\n"
+    "Jumlah PPnBM (Pajak Penjualan atas Barang Mewah)\n"
+)
+
+HEADER = (
+    "Faktur Pajak\n"
+    "Kode dan Nomor Seri Faktur Pajak: {fp_no}\n"
+    "Pengusaha Kena Pajak:\n"
+    "Nama : {seller}\n"
+    "Alamat : M GOLD TOWER OFFICE WING LT 12 SUITE ABCGH JL LETKOL\n"
+    "NPWP: {seller_npwp}\n"
+    "Pembeli Barang Kena Pajak/Penerima Jasa Kena Pajak:\n"
+    "Nama : {buyer}\n"
+    "Alamat : GEDUNG AD PREMIER OFFICE PARK LT 9 JL TB SIMATUPANG NO.05,\n"
+    "RAGUNAN, PASAR MINGGU\n"
+    "NPWP : {buyer_npwp}\n"
+)
+
+
+def _idr(value: float) -> str:
+    whole, cents = f"{value:.2f}".split(".")
+    return f"{int(whole):,}".replace(",", ".") + "," + cents
+
+
+def _header(rng: random.Random) -> str:
+    return HEADER.format(
+        fp_no=f"04{rng.randint(0, 9)}.{rng.randint(100, 999)}-{rng.randint(20, 26)}.{rng.randint(10_000_000, 99_999_999)}",
+        seller=rng.choice(["METROPOLITAN LAND TBK", "ASTRA INTERNATIONAL TBK", "PT SUMBER MAKMUR"]),
+        seller_npwp=f"{rng.randint(10**15, 10**16 - 1)}",
+        buyer=rng.choice(["CAKRA ADHIPERKASA OPTIMA", "PT IMOGI FINANCE", "CV MAJU JAYA"]),
+        buyer_npwp=f"{rng.randint(10**15, 10**16 - 1)}",
+    )
+
+
+def _signature(name: str, amounts: list[float], reference: str | None = None) -> str:
+    lines = ["Ditandatangani secara elektronik", name]
+    if reference:
+        lines.append(reference)
+    lines.extend(_idr(amount) for amount in amounts)
+    return "\n".join(lines) + "\n"
+
+
+def _totals(rng: random.Random, rate: float = 0.12) -> tuple[float, float, float]:
+    harga_jual = float(rng.randint(50_000, 90_000_000))
+    dpp = round(harga_jual * 11 / 12, 0)
+    ppn = round(dpp * rate, 0)
+    return harga_jual, dpp, ppn
+
+
+def coretax_column_block(rng: random.Random) -> str:
+    harga_jual, dpp, ppn = _totals(rng)
+    return (
+        _header(rng)
+        + SUMMARY_BLOCK
+        + "Harga Jual / Penggantian /\nUang Muka / Termin\n(Rp)\n"
+        + "\n".join(_idr(v) for v in (harga_jual, harga_jual, 0, dpp, ppn, 0))
+        + "\n"
+    )
+
+
+def inline_summary(rng: random.Random) -> str:
+    harga_jual, dpp, ppn = _totals(rng)
+    return (
+        _header(rng)
+        + "Tanggal Faktur: {0:02d}/{1:02d}/2026\n".format(rng.randint(1, 28), rng.randint(1, 12))
+        + f"Harga Jual / Penggantian / Uang Muka / Termin {_idr(harga_jual)}\n"
+        + "Dikurangi Potongan Harga 0,00\n"
+        + f"Dasar Pengenaan Pajak {_idr(dpp)}\n"
+        + f"Jumlah PPN (Pajak Pertambahan Nilai) {_idr(ppn)}\n"
+        + "Jumlah PPnBM (Pajak Penjualan atas Barang Mewah) 0,00\n"
+        + "Tarif PPN 12%\n"
+    )
+
+
+def same_line_dpp_ppn(rng: random.Random) -> str:
+    harga_jual, dpp, ppn = _totals(rng)
+    return (
+        _header(rng)
+        + f"Harga Jual {_idr(harga_jual)}\n"
+        + f"DPP {_idr(dpp)}  PPN {_idr(ppn)}\n"
+        + "15 Januari 2026\n"
+    )
+
+
+def multi_item_table(rng: random.Random, items: int = 12) -> str:
+    rows = []
+    subtotal = 0.0
+    for idx in range(1, items + 1):
+        price = float(rng.randint(20, 400) * 1_000)
+        subtotal += price
+        rows.append(f"{idx} 000000 Barang {idx}\nRp {_idr(price / 10)} x 10,00 Piece\n{_idr(price)}")
+    dpp = round(subtotal * 11 / 12, 0)
+    ppn = round(dpp * 0.12, 0)
+    return (
+        _header(rng)
+        + "No. Kode Barang Nama Barang/Jasa\n"
+        + "Harga Jual / Penggantian / Uang Muka / Termin (Rp)\n"
+        + "Dasar Pengenaan Pajak\n"
+        + f"{_idr(subtotal / items)}\n"
+        + "PPN\n"
+        + "9.600,00\n"
+        + "\n".join(rows)
+        + "\n"
+        + f"Harga Jual / Penggantian / Uang Muka / Termin\n{_idr(subtotal)}\n"
+        + "Dikurangi Potongan Harga\n0,00\n"
+        + f"Dasar Pengenaan Pajak\n{_idr(dpp)}\n"
+        + f"Jumlah PPN (Pajak Pertambahan Nilai)\n{_idr(ppn)}\n"
+        + "Jumlah PPnBM (Pajak Penjualan atas Barang Mewah)\n0,00\n"
+        + _signature("JOHN DOE", [subtotal, subtotal, 0, dpp, ppn, 0])
+    )
+
+
+def signature_with_reference(rng: random.Random) -> str:
+    harga_jual, dpp, ppn = _totals(rng)
+    return (
+        _header(rng)
+        + SUMMARY_BLOCK
+        + _signature(
+            "SITI RAHAYU",
+            [harga_jual, harga_jual, 0, dpp, ppn, 0],
+            reference=f"(Referensi: INV/{rng.randint(1000, 9999)}/MTLA/2026)",
+        )
+    )
+
+
+def signature_five_amounts(rng: random.Random) -> str:
+    harga_jual, dpp, ppn = _totals(rng)
+    return _header(rng) + SUMMARY_BLOCK + _signature("BUDI SANTOSO", [harga_jual, 0, dpp, ppn, 0])
+
+
+def nilai_lain(rng: random.Random) -> str:
+    _, dpp, ppn = _totals(rng)
+    fraction = rng.choice(["DPP Nilai Lain 11/12", "Penyerahan yang menggunakan DPP Nilai Lain - Faktur Pajak Normal"])
+    return f"Faktur Pajak\n{fraction}\nDasar Pengenaan Pajak\n{_idr(dpp)}\nJumlah PPN (Pajak Pertambahan Nilai)\n{_idr(ppn)}\n"
+
+
+def partial_ocr(rng: random.Random) -> str:
+    _, dpp, ppn = _totals(rng, rate=0.11)
+    return (
+        "Pengusaha Kena Pajak:\nNama : PT PARTIAL OCR\nNPWP: 012345678901234\n"
+        "Pembeli Barang Kena Pajak:\nNama CUSTOMER\nNPWP: 001122334455667\n"
+        f"Jalan Sudirman No. 15 RT 05 RW 09\n{_idr(dpp)}\n{_idr(ppn)}\n"
+    )
+
+
+def crlf_document(rng: random.Random) -> str:
+    return multi_item_table(rng, items=6).replace("\n", "\r\n")
+
+
+def multi_page_table(rng: random.Random) -> str:
+    return multi_item_table(rng, items=250)
+
+
+LAYOUTS = [
+    coretax_column_block,
+    inline_summary,
+    same_line_dpp_ppn,
+    multi_item_table,
+    signature_with_reference,
+    signature_five_amounts,
+    nilai_lain,
+    partial_ocr,
+    crlf_document,
+    multi_page_table,
+]
+
+
+def build_corpus(variants: int = 3, seed: int = 19) -> list[tuple[str, str]]:
+    """``(name, text)`` pairs: ``variants`` documents per layout, deterministic for a given ``seed``."""
+    rng = random.Random(seed)
+    return [
+        (f"{layout.__name__}_{idx}", layout(rng))
+        for layout in LAYOUTS
+        for idx in range(variants)
+    ]
+
+
+def parse_corpus(corpus: list[tuple[str, str]]) -> dict:
+    """Parser output per document, as JSON-serialisable ``[matches, confidence]`` pairs."""
+    from imogi_finance.tax_invoice_ocr import parse_faktur_pajak_text
+
+    return {name: list(parse_faktur_pajak_text(text)) for name, text in corpus}
+
+
+def run(variants: int = 3, repeat: int = 20) -> dict:
+    """Time ``parse_faktur_pajak_text`` over the corpus; returns milliseconds (best of ``repeat``).
+
+    The shared text index and the parsed-amount cache are cleared before every parse,
+    so each timing is a cold parse of a new document.
+    """
+    from imogi_finance import tax_invoice_ocr
+    from imogi_finance.imogi_finance.parsers.text_index import TextIndex
+
+    corpus = build_corpus(variants)
+    per_document = {}
+    for name, text in corpus:
+        best = float("inf")
+        for _ in range(repeat):
+            TextIndex._last = None
+            tax_invoice_ocr._amount_value.cache_clear()
+            started = time.perf_counter()
+            tax_invoice_ocr.parse_faktur_pajak_text(text)
+            best = min(best, time.perf_counter() - started)
+        per_document[name] = round(best * 1000, 3)
+
+    results = {
+        "documents": len(corpus),
+        "corpus_ms": round(sum(per_document.values()), 3),
+        "multi_page_ms": max(v for k, v in per_document.items() if k.startswith("multi_page_table")),
+        "per_document_ms": per_document,
+    }
+    print({key: value for key, value in results.items() if key != "per_document_ms"})
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,154 @@
+"""
+Micro-benchmark for the shared OCR layout index.
+
+Builds a synthetic token set the size of a dense multi-page Google Vision
+response (default 5 pages x 120 rows x 12 tokens = 7,200 tokens) and times:
+
+- row clustering: the previous per-token mean recomputation vs ``cluster_rows``
+- column assignment: checking every ``ColumnRange`` vs ``ColumnIndex``
+- ``LayoutAwareParser`` construction plus ``parse_summary_section``
+
+Run with:
+    bench execute imogi_finance.scripts.benchmark_layout_index.run
+    bench execute imogi_finance.scripts.benchmark_layout_index.run --kwargs "{'pages': 10}"
+"""
+
+import random
+import time
+
+from imogi_finance.imogi_finance.parsers.faktur_pajak_parser import (
+    ColumnRange,
+    Token,
+    assign_tokens_to_columns,
+    cluster_tokens_by_row,
+)
+from imogi_finance.imogi_finance.parsers.layout_aware_parser import (
+    BoundingBox,
+    LayoutAwareParser,
+    OCRToken,
+)
+
+SUMMARY_LABELS = [
+    "Harga Jual / Penggantian / Uang Muka / Termin",
+    "Dikurangi Potongan Harga",
+    "Dasar Pengenaan Pajak",
+    "Jumlah PPN (Pajak Pertambahan Nilai)",
+    "Jumlah PPnBM (Pajak Penjualan atas Barang Mewah)",
+]
+SUMMARY_VALUES = ["4.953.154,00", "247.658,00", "4.313.371,00", "517.605,00", "0,00"]
+
+
+def build_tokens(pages: int = 5, rows_per_page: int = 120, tokens_per_row: int = 12, seed: int = 7) -> list:
+    """PDF-point ``Token`` objects laid out as line-item rows with Y jitter within a row."""
+    rng = random.Random(seed)
+    tokens = []
+    for page_no in range(1, pages + 1):
+        for row in range(rows_per_page):
+            y = 40 + row * 6.5
+            for col in range(tokens_per_row):
+                x0 = 20 + col * 45
+                jitter = rng.uniform(-1.2, 1.2)
+                text = f"{rng.randint(1, 999)}.{rng.randint(100, 999)},00" if col >= tokens_per_row - 3 else "Barang"
+                tokens.append(Token(text, x0, y + jitter, x0 + 40, y + jitter + 5, page_no=page_no))
+    return tokens
+
+
+def build_ocr_tokens(pages: int = 5, rows_per_page: int = 120, tokens_per_row: int = 12, seed: int = 7) -> list:
+    """Normalized ``OCRToken`` objects with a summary block at the bottom of the last page."""
+    rng = random.Random(seed)
+    tokens = []
+    row_height = 0.35 / rows_per_page
+    for page_no in range(1, pages + 1):
+        for row in range(rows_per_page):
+            y = 0.05 + row * row_height
+            for col in range(tokens_per_row):
+                x = 0.02 + col * 0.08
+                jitter = rng.uniform(-0.001, 0.001)
+                tokens.append(
+                    OCRToken(
+                        text=str(rng.randint(1, 99999)),
+                        bbox=BoundingBox(x, y + jitter, x + 0.06, y + jitter + 0.01),
+                        page=page_no,
+                    )
+                )
+    for idx, (label, value) in enumerate(zip(SUMMARY_LABELS, SUMMARY_VALUES)):
+        y = 0.60 + idx * 0.02
+        x = 0.05
+        for word in label.split():
+            tokens.append(OCRToken(text=word, bbox=BoundingBox(x, y, x + 0.04, y + 0.01), page=pages))
+            x += 0.045
+        tokens.append(OCRToken(text=value, bbox=BoundingBox(0.75, y, 0.9, y + 0.01), page=pages))
+    return tokens
+
+
+def quadratic_cluster_tokens_by_row(tokens: list, y_tolerance: float = 3) -> list:
+    """The clustering used before ``cluster_rows``: the row mean is recomputed for every token."""
+    if not tokens:
+        return []
+    sorted_tokens = sorted(tokens, key=lambda t: t.y_mid)
+    rows = []
+    current_row = [sorted_tokens[0]]
+    current_y = sorted_tokens[0].y_mid
+    for token in sorted_tokens[1:]:
+        if abs(token.y_mid - current_y) <= y_tolerance:
+            current_row.append(token)
+            current_y = sum(t.y_mid for t in current_row) / len(current_row)
+        else:
+            rows.append((current_y, current_row))
+            current_row = [token]
+            current_y = token.y_mid
+    rows.append((current_y, current_row))
+    return rows
+
+
+def linear_scan_assign(row_tokens: list, column_ranges: dict) -> dict:
+    """Column assignment by checking every range, as before ``ColumnIndex``."""
+    assignments = {name: [] for name in column_ranges}
+    for token in row_tokens:
+        for name, col in column_ranges.items():
+            if col.contains(token):
+                assignments[name].append(token)
+                break
+    return assignments
+
+
+def _best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def run(pages: int = 5, rows_per_page: int = 120, tokens_per_row: int = 12, repeat: int = 5) -> dict:
+    """Time each step on ``pages x rows_per_page x tokens_per_row`` tokens; returns milliseconds (best of ``repeat``)."""
+    tokens = build_tokens(pages, rows_per_page, tokens_per_row)
+    ocr_tokens = build_ocr_tokens(pages, rows_per_page, tokens_per_row)
+    # A wide tolerance merges every page's line items into long rows, the worst case for the old clustering.
+    wide_tolerance = rows_per_page * 6.5
+    columns = {
+        name: ColumnRange(name, 20 + col * 45, 60 + col * 45)
+        for col, name in enumerate(["harga_jual", "dpp", "ppn"], start=tokens_per_row - 3)
+    }
+    rows = cluster_tokens_by_row(tokens, y_tolerance=3)
+
+    assert [len(r[1]) for r in rows] == [len(r[1]) for r in quadratic_cluster_tokens_by_row(tokens, 3)]
+
+    results = {
+        "tokens": len(tokens),
+        "rows": len(rows),
+        "cluster_quadratic_ms": _best_of(lambda: quadratic_cluster_tokens_by_row(tokens, 3), repeat),
+        "cluster_running_mean_ms": _best_of(lambda: cluster_tokens_by_row(tokens, 3), repeat),
+        "cluster_wide_quadratic_ms": _best_of(lambda: quadratic_cluster_tokens_by_row(tokens, wide_tolerance), 1),
+        "cluster_wide_running_mean_ms": _best_of(lambda: cluster_tokens_by_row(tokens, wide_tolerance), repeat),
+        "assign_linear_ms": _best_of(lambda: [linear_scan_assign(r[1], columns) for r in rows], repeat),
+        "assign_indexed_ms": _best_of(lambda: [assign_tokens_to_columns(r[1], columns) for r in rows], repeat),
+        "layout_parse_ms": _best_of(lambda: LayoutAwareParser(tokens=list(ocr_tokens)).parse_summary_section(), repeat),
+    }
+    print(results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
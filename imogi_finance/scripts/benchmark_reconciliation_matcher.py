@@ -0,0 +1,62 @@
+"""
+Timing harness for the indexed monthly reconciliation matcher.
+
+Builds ledger/bank statement pairs where every ledger row has exactly one statement
+with the same direction and amount, posted up to 3 days apart and shuffled, then times
+``build_monthly_reconciliation`` on each size. The previous linear scan needed minutes
+at 50k rows.
+
+``tests/test_reconciliation_matcher.py`` checks the matched pairs on a small fixture.
+
+Run with:
+    bench execute imogi_finance.scripts.benchmark_reconciliation_matcher.run
+    bench execute imogi_finance.scripts.benchmark_reconciliation_matcher.run --kwargs "{'sizes': [500000]}"
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from imogi_finance.reporting import build_monthly_reconciliation
+
+
+def build_statement_fixture(size: int, seed: int | None = None) -> tuple[list, list]:
+    """Ledger/statement pair of ``size`` rows each; ``L-i`` matches ``S-i`` only."""
+    rng = random.Random(size if seed is None else seed)
+    start = date(2024, 5, 1)
+    ledger, statements = [], []
+    for idx in range(size):
+        # Distinct amounts, so each ledger row has a single candidate statement.
+        amount = round(1 + idx * 7.31, 2)
+        direction = "in" if idx % 3 else "out"
+        day = start + timedelta(days=rng.randint(3, 27))
+        ledger.append({"id": f"L-{idx}", "amount": amount, "direction": direction, "posting_date": day.isoformat()})
+        statements.append(
+            {
+                "id": f"S-{idx}",
+                "amount": amount,
+                "direction": direction,
+                "posting_date": (day + timedelta(days=rng.randint(-3, 3))).isoformat(),
+            }
+        )
+    rng.shuffle(statements)
+    return ledger, statements
+
+
+def run(sizes: tuple = (10_000, 50_000, 200_000), tolerance: float = 0.01) -> dict:
+    """Time one reconciliation per size; returns matches and milliseconds per size."""
+    results = {}
+    for size in sizes:
+        ledger, statements = build_statement_fixture(size)
+        started = time.perf_counter()
+        result = build_monthly_reconciliation(
+            ledger_transactions=ledger, bank_statements=statements, month="2024-05", tolerance=tolerance
+        )
+        elapsed = time.perf_counter() - started
+        results[size] = {"matches": len(result.matches), "ms": round(elapsed * 1000, 1)}
+    print(results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
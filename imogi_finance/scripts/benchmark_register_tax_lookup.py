@@ -0,0 +1,62 @@
+"""
+GL tax lookup for the VAT registers: one query per invoice vs ``get_invoice_tax_amounts``.
+
+Takes up to ``invoices`` submitted invoices of ``voucher_type`` from the site and resolves
+their ``tax_account`` amounts both ways: ``get_tax_amount_from_gl`` per invoice, as the
+registers did before, and the batched lookup (one grouped GL query per
+``GL_BATCH_SIZE`` invoices). Reported per strategy: SQL statements and milliseconds.
+
+Run with:
+    bench execute imogi_finance.scripts.benchmark_register_tax_lookup.run --kwargs "{'tax_account': 'PPN Masukan - TC'}"
+    bench execute imogi_finance.scripts.benchmark_register_tax_lookup.run --kwargs "{'tax_account': 'PPN Keluaran - TC', 'voucher_type': 'Sales Invoice', 'invoices': 50000}"
+"""
+
+import time
+
+import frappe
+
+from imogi_finance.imogi_finance.utils.tax_report_utils import (
+    get_invoice_tax_amounts,
+    get_tax_amount_from_gl,
+)
+
+
+def _measure(func) -> tuple[dict, dict]:
+    sql = frappe.db.sql
+    queries = [0]
+
+    def _counting_sql(*args, **kwargs):
+        queries[0] += 1
+        return sql(*args, **kwargs)
+
+    frappe.db.sql = _counting_sql
+    try:
+        started = time.perf_counter()
+        amounts = func()
+        elapsed = time.perf_counter() - started
+    finally:
+        frappe.db.sql = sql
+    return {"sql": queries[0], "ms": round(elapsed * 1000, 1)}, amounts
+
+
+def run(tax_account: str, voucher_type: str = "Purchase Invoice", invoices: int = 10000) -> dict:
+    """Compare per-invoice and batched GL tax lookups on up to ``invoices`` invoices."""
+    rows = frappe.get_all(
+        voucher_type, filters={"docstatus": 1}, fields=["name", "company"], limit_page_length=invoices
+    )
+
+    per_invoice, expected = _measure(
+        lambda: {
+            row.name: get_tax_amount_from_gl(voucher_type, row.name, tax_account, row.company) for row in rows
+        }
+    )
+    batched, amounts = _measure(lambda: get_invoice_tax_amounts(rows, voucher_type, tax_account))
+
+    results = {
+        "invoices": len(rows),
+        "per_invoice": per_invoice,
+        "batched": batched,
+        "amounts_match": all(abs((amounts.get(name) or 0) - (value or 0)) < 0.005 for name, value in expected.items()),
+    }
+    print(results)
+    return results
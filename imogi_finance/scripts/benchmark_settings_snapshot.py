@@ -0,0 +1,89 @@
+"""
+Settings lookups per simulated doc_event, with and without the snapshot cache.
+
+Each "event" makes the settings reads a Purchase Invoice / Expense Request save does:
+three GL account mappings, Budget Control settings, Tax Invoice OCR settings and the
+receipt defaults from Finance Control Settings.
+
+"before" runs without a request context, so every lookup goes to the loader, which is
+what each call cost before ``imogi_finance.settings.snapshot``. "after" runs every event
+as its own request against a warm worker-process cache. Reported per event: settings
+lookups, loads (snapshot rebuilds), SQL queries and milliseconds.
+
+Run with:
+    bench execute imogi_finance.scripts.benchmark_settings_snapshot.run
+    bench execute imogi_finance.scripts.benchmark_settings_snapshot.run --kwargs "{'events': 500}"
+"""
+
+import time
+from collections import defaultdict
+
+import frappe
+
+from imogi_finance.settings import snapshot
+from imogi_finance.settings.gl_purposes import DEFAULT_PREPAID, DIGITAL_STAMP_EXPENSE, PPN_VARIANCE
+
+
+def _doc_event(company: str | None) -> None:
+    from imogi_finance.budget_control.utils import get_settings as get_budget_settings
+    from imogi_finance.receipt_control.utils import get_receipt_control_settings
+    from imogi_finance.settings.utils import get_gl_account
+    from imogi_finance.tax_invoice_ocr import get_settings as get_ocr_settings
+
+    for purpose in (PPN_VARIANCE, DEFAULT_PREPAID, DIGITAL_STAMP_EXPENSE):
+        get_gl_account(purpose, company=company, required=False)
+    get_budget_settings()
+    get_ocr_settings()
+    get_receipt_control_settings()
+
+
+def _measure(events: int, company: str | None, with_request: bool) -> dict:
+    sql = frappe.db.sql
+    queries = [0]
+
+    def _counting_sql(*args, **kwargs):
+        queries[0] += 1
+        return sql(*args, **kwargs)
+
+    saved_request_cache = getattr(frappe.local, "request_cache", None)
+    before = {doctype: dict(counts) for doctype, counts in snapshot._process_stats.items()}
+    frappe.db.sql = _counting_sql
+    try:
+        started = time.perf_counter()
+        for _ in range(events):
+            frappe.local.request_cache = defaultdict(dict) if with_request else None
+            _doc_event(company)
+        elapsed = time.perf_counter() - started
+    finally:
+        frappe.db.sql = sql
+        frappe.local.request_cache = saved_request_cache
+
+    lookups = loads = 0
+    for doctype, counts in snapshot._process_stats.items():
+        lookups += counts["lookups"] - before.get(doctype, {}).get("lookups", 0)
+        loads += counts["loads"] - before.get(doctype, {}).get("loads", 0)
+    return {
+        "lookups_per_event": round(lookups / events, 2),
+        "loads_per_event": round(loads / events, 2),
+        "sql_per_event": round(queries[0] / events, 2),
+        "ms_per_event": round(elapsed * 1000 / events, 3),
+    }
+
+
+def run(events: int = 200, company: str | None = None) -> dict:
+    """Compare settings cost per doc_event before and after the snapshot cache."""
+    company = company or frappe.defaults.get_user_default("Company")
+
+    # Warm the worker-process cache once, as the first request after a settings save would.
+    _measure(1, company, with_request=True)
+    results = {
+        "events": events,
+        "before": _measure(events, company, with_request=False),
+        "after": _measure(events, company, with_request=True),
+    }
+    print(results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
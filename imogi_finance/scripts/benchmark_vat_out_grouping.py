@@ -0,0 +1,97 @@
+"""
+VAT OUT Batch group assignment: per-invoice ``set_value`` vs chunked CASE UPDATEs.
+
+Inserts ``invoices`` placeholder Sales Invoice rows (default 20,000) spread over
+customers of ``invoices_per_group`` invoices each, then links them to a batch name
+twice: once with the previous ``frappe.db.set_value`` per invoice and once with
+``bulk_assign_groups``. Everything runs in one transaction that is rolled back, so
+the site is left untouched. Reported per strategy: SQL statements and milliseconds.
+
+Run with:
+    bench execute imogi_finance.scripts.benchmark_vat_out_grouping.run
+    bench execute imogi_finance.scripts.benchmark_vat_out_grouping.run --kwargs "{'invoices': 5000}"
+"""
+
+import time
+
+import frappe
+
+from imogi_finance.imogi_finance.doctype.vat_out_batch.vat_out_batch import (
+    GROUP_ASSIGN_CHUNK_SIZE,
+    bulk_assign_groups,
+)
+
+NAME_PREFIX = "BENCH-VOB-"
+BATCH_NAME = "BENCH-VOB-BATCH"
+
+
+def _insert_invoices(invoices: int) -> list:
+    names = [f"{NAME_PREFIX}{idx:06d}" for idx in range(invoices)]
+    now = frappe.utils.now()
+    frappe.db.bulk_insert(
+        "Sales Invoice",
+        fields=["name", "creation", "modified", "docstatus", "out_fp_status"],
+        values=[(name, now, now, 1, "Verified") for name in names],
+        ignore_duplicates=True,
+    )
+    return names
+
+
+def _per_row(assignments: list) -> None:
+    for invoice_name, group_id in assignments:
+        frappe.db.set_value(
+            "Sales Invoice",
+            invoice_name,
+            {"out_fp_batch": BATCH_NAME, "out_fp_group_id": group_id},
+            update_modified=False,
+        )
+
+
+def _measure(func, assignments: list) -> dict:
+    sql = frappe.db.sql
+    queries = [0]
+
+    def _counting_sql(*args, **kwargs):
+        queries[0] += 1
+        return sql(*args, **kwargs)
+
+    frappe.db.sql = _counting_sql
+    try:
+        started = time.perf_counter()
+        func(assignments)
+        elapsed = time.perf_counter() - started
+    finally:
+        frappe.db.sql = sql
+
+    linked = frappe.db.count("Sales Invoice", {"out_fp_batch": BATCH_NAME})
+    frappe.db.sql(
+        "update `tabSales Invoice` set out_fp_batch = null, out_fp_group_id = null where out_fp_batch = %s",
+        BATCH_NAME,
+    )
+    return {"sql": queries[0], "ms": round(elapsed * 1000, 1), "linked": linked}
+
+
+def run(invoices: int = 20000, invoices_per_group: int = 4, chunk_size: int = GROUP_ASSIGN_CHUNK_SIZE) -> dict:
+    """Compare both assignment strategies on ``invoices`` rows; the transaction is rolled back."""
+    frappe.db.rollback()
+    try:
+        names = _insert_invoices(invoices)
+        assignments = [(name, idx // invoices_per_group + 1) for idx, name in enumerate(names)]
+        results = {
+            "invoices": invoices,
+            "groups": assignments[-1][1] if assignments else 0,
+            "chunk_size": chunk_size,
+            "per_row_set_value": _measure(_per_row, assignments),
+            "bulk_case_update": _measure(
+                lambda rows: bulk_assign_groups(BATCH_NAME, rows, chunk_size=chunk_size), assignments
+            ),
+        }
+    finally:
+        frappe.db.rollback()
+
+    print(results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
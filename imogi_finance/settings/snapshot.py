@@ -0,0 +1,231 @@
+"""Process-wide cache of immutable settings snapshots.
+
+Settings DocTypes are read from almost every doc_event, and each read used to cost a
+DocType existence check plus a document load. This module keeps, per worker process,
+a frozen ``SettingsSnapshot`` of each settings DocType and any values derived from it
+(e.g. the ``(purpose, company) -> account`` index behind ``get_gl_account``).
+
+Invalidation is version-stamped: every settings save writes a new token for its DocType
+into a Redis hash (``invalidate_settings_snapshot`` doc_event), once on save and again
+after the save commits. Each request or background job reads that hash once and drops
+process entries whose token no longer matches, so other workers see a change on their
+next request. The second stamp retires anything another worker loaded from the
+still-uncommitted row under the first token. A DocType without a token (e.g. after a
+Redis flush) gets a fresh one on first read, so entries are never matched on a missing
+version.
+
+Entries are keyed by site as well, since a worker serves every site on the bench while
+the version hash is per site.
+
+Without a request context (tests, plain scripts) or without Redis every lookup is a
+pass-through to the loader.
+
+Lookup and load counters are kept per DocType for the request and for the worker
+process and are returned by ``get_settings_cache_stats``; before this cache every
+lookup was a load.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Hashable, Mapping
+
+import frappe
+
+from imogi_finance import roles
+
+VERSION_KEY = "imogi_finance:settings_version"
+REQUEST_KEY = "imogi_settings_snapshot"
+
+SNAPSHOT = "snapshot"
+DOCTYPE_KIND = "doctype_kind"
+
+_process_entries: dict[tuple[str | None, str, Hashable], tuple[Any, Any]] = {}
+_process_stats: dict[str, dict[str, int]] = defaultdict(lambda: {"lookups": 0, "loads": 0})
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """Read-only copy of a settings document.
+
+    Field values are available as attributes, via ``get`` and via ``[]``; child tables
+    are tuples of read-only row mappings.
+    """
+
+    doctype: str
+    values: Mapping[str, Any] = field(default_factory=dict)
+    tables: Mapping[str, tuple] = field(default_factory=dict)
+
+    @classmethod
+    def from_doc(cls, doc) -> "SettingsSnapshot":
+        data = doc.as_dict() if hasattr(doc, "as_dict") else dict(doc)
+        values = {}
+        tables = {}
+        for key, value in data.items():
+            if isinstance(value, (list, tuple)):
+                tables[key] = tuple(MappingProxyType(dict(row)) for row in value)
+            else:
+                values[key] = value
+        return cls(
+            doctype=data.get("doctype") or getattr(doc, "doctype", ""),
+            values=MappingProxyType(values),
+            tables=MappingProxyType(tables),
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.tables:
+            return self.tables[key]
+        return self.values.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.tables:
+            return self.tables[key]
+        return self.values[key]
+
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+
+def _request_store() -> dict | None:
+    local = getattr(frappe, "local", None)
+    request_cache = getattr(local, "request_cache", None) if local is not None else None
+    if request_cache is None:
+        return None
+
+    store = request_cache.get(REQUEST_KEY)
+    if store is None:
+        store = {"versions": None, "stats": defaultdict(lambda: {"lookups": 0, "loads": 0})}
+        request_cache[REQUEST_KEY] = store
+    return store
+
+
+def _redis():
+    cache = getattr(frappe, "cache", None)
+    if not callable(cache):
+        return None
+    try:
+        return cache()
+    except Exception:
+        return None
+
+
+def _versions(store: dict) -> dict | None:
+    """Version tokens per DocType, read from Redis once per request."""
+    if store["versions"] is None:
+        redis = _redis()
+        if redis is None:
+            return None
+        try:
+            store["versions"] = dict(redis.hgetall(VERSION_KEY) or {})
+        except Exception:
+            return None
+    return store["versions"]
+
+
+def _site() -> str | None:
+    return getattr(getattr(frappe, "local", None), "site", None)
+
+
+def _stamp(doctype: str, store: dict | None) -> str:
+    """Write a new version token for ``doctype`` and make it this request's version."""
+    token = f"{time.time():.6f}"
+    redis = _redis()
+    if redis is not None:
+        try:
+            redis.hset(VERSION_KEY, doctype, token)
+        except Exception:
+            pass
+
+    if store is not None and store["versions"] is not None:
+        store["versions"][doctype] = token
+    return token
+
+
+def _count(store: dict | None, doctype: str, outcome: str) -> None:
+    if store is not None:
+        store["stats"][doctype][outcome] += 1
+    _process_stats[doctype][outcome] += 1
+
+
+def memoize(doctype: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+    """Return the process-cached value for ``(doctype, key)``, calling ``loader`` when stale.
+
+    Cached values are shared by every request in the worker and must not be mutated.
+    Exceptions raised by ``loader`` propagate and are not cached.
+    """
+    store = _request_store()
+    _count(store, doctype, "lookups")
+    versions = _versions(store) if store is not None else None
+    if versions is None:
+        _count(store, doctype, "loads")
+        return loader()
+
+    version = versions.get(doctype)
+    if version is None:
+        version = _stamp(doctype, store)
+
+    entry_key = (_site(), doctype, key)
+    cached = _process_entries.get(entry_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    _count(store, doctype, "loads")
+    value = loader()
+    _process_entries[entry_key] = (version, value)
+    return value
+
+
+def _load_snapshot(doctype: str) -> SettingsSnapshot | None:
+    from imogi_finance.settings.utils import get_single_cached
+
+    doc = get_single_cached(doctype)
+    return SettingsSnapshot.from_doc(doc) if doc else None
+
+
+def get_settings_snapshot(doctype: str) -> SettingsSnapshot | None:
+    """Immutable snapshot of a settings DocType, or None if it is not installed or has no record."""
+    return memoize(doctype, SNAPSHOT, lambda: _load_snapshot(doctype))
+
+
+def clear(doctype: str | None = None) -> None:
+    """Drop this process's entries of the current site for ``doctype`` (all when omitted)."""
+    site = _site()
+    for entry_key in list(_process_entries):
+        if entry_key[0] == site and (doctype is None or entry_key[1] == doctype):
+            _process_entries.pop(entry_key, None)
+
+
+def invalidate_settings_snapshot(doc, method=None) -> None:
+    """doc_events hook for settings DocTypes: stamp a new version so every worker reloads.
+
+    The token is written now, so this request sees its own change, and again after
+    commit: until then other workers still read the old row, and whatever they cache
+    under the first token must not outlive the commit.
+    """
+    doctype = getattr(doc, "doctype", None)
+    if not doctype:
+        return
+
+    clear(doctype)
+    _stamp(doctype, _request_store())
+
+    after_commit = getattr(getattr(frappe, "db", None), "after_commit", None)
+    if after_commit is not None:
+        after_commit.add(lambda: _stamp(doctype, None))
+
+
+@frappe.whitelist()
+def get_settings_cache_stats() -> dict:
+    """Lookup/load counters per settings DocType for this request and this worker process."""
+    frappe.only_for((roles.SYSTEM_MANAGER,))
+
+    store = _request_store()
+    request_stats = {doctype: dict(counts) for doctype, counts in (store["stats"] if store else {}).items()}
+    process_stats = {doctype: dict(counts) for doctype, counts in _process_stats.items()}
+    return {"request": request_stats, "process": process_stats}
@@ -12,6 +12,13 @@ from typing import Optional
 import frappe
 from frappe import _
 
+from imogi_finance.settings.snapshot import (
+    DOCTYPE_KIND,
+    SettingsSnapshot,
+    get_settings_snapshot,
+    memoize,
+)
+
 FINANCE_CONTROL_SETTINGS_DOCTYPE = "Finance Control Settings"
 RECEIPT_CONTROL_SETTINGS_DOCTYPE = "Receipt Control Settings"
 TAX_INVOICE_OCR_SETTINGS_DOCTYPE = "Tax Invoice OCR Settings"
@@ -20,17 +27,38 @@ BUDGET_CONTROL_SETTINGS_DOCTYPE = "Budget Control Settings"
 EXPENSE_DEFERRED_SETTINGS_DOCTYPE = "Expense Deferred Settings"
 LETTER_TEMPLATE_SETTINGS_DOCTYPE = "Letter Template Settings"
 
+SETTINGS_DOCTYPES = (
+    FINANCE_CONTROL_SETTINGS_DOCTYPE,
+    RECEIPT_CONTROL_SETTINGS_DOCTYPE,
+    TAX_INVOICE_OCR_SETTINGS_DOCTYPE,
+    TRANSFER_APPLICATION_SETTINGS_DOCTYPE,
+    BUDGET_CONTROL_SETTINGS_DOCTYPE,
+    EXPENSE_DEFERRED_SETTINGS_DOCTYPE,
+    LETTER_TEMPLATE_SETTINGS_DOCTYPE,
+)
+
+GL_ACCOUNT_INDEX = "gl_account_index"
+
 
 def _is_singleton_doctype(doctype: str) -> bool:
     """Check if a DocType is configured as singleton (issingle=1)."""
+    return _doctype_kind(doctype) == "single"
+
+
+def _load_doctype_kind(doctype: str) -> str | None:
     try:
         if not frappe.db.exists("DocType", doctype):
-            return False
+            return None
         # Query DB directly to get issingle value
         is_single = frappe.db.get_value("DocType", doctype, "issingle")
-        return bool(is_single)
+        return "single" if is_single else "multi"
     except Exception:
-        return False
+        return None
+
+
+def _doctype_kind(doctype: str) -> str | None:
+    """``"single"``, ``"multi"`` or None if the DocType is not installed; cached per process."""
+    return memoize(doctype, DOCTYPE_KIND, lambda: _load_doctype_kind(doctype))
 
 
 def get_single_cached(doctype: str) -> frappe.Document | None:
@@ -46,11 +74,12 @@ def get_single_cached(doctype: str) -> frappe.Document | None:
         Document or None if not found
     """
     try:
-        if not frappe.db.exists("DocType", doctype):
+        kind = _doctype_kind(doctype)
+        if not kind:
             return None
         
         # Try singleton first (cached_doc)
-        if _is_singleton_doctype(doctype):
+        if kind == "single":
             return frappe.get_cached_doc(doctype)
         
         # Fallback for non-singleton: get most recent record
@@ -119,6 +148,18 @@ def get_letter_template_settings() -> frappe.Document:
     return doc
 
 
+def _build_gl_account_index(snapshot: SettingsSnapshot) -> dict[tuple[str, str | None], str]:
+    """Map ``(purpose, company)`` to account; rows without company are keyed ``(purpose, None)``.
+
+    The first mapping row with an account wins, as in a top-to-bottom scan of the table.
+    """
+    accounts: dict[tuple[str, str | None], str] = {}
+    for row in snapshot.get("gl_account_mappings") or ():
+        if row.get("account"):
+            accounts.setdefault((row.get("purpose"), row.get("company") or None), row.get("account"))
+    return accounts
+
+
 def get_gl_account(
     purpose: str,
     company: str | None = None,
@@ -143,33 +184,25 @@ def get_gl_account(
     Raises:
         frappe.ValidationError: If required=True and mapping not found
     """
-    try:
-        doc = get_finance_control_settings()
-    except frappe.ValidationError:
+    snapshot = get_settings_snapshot(FINANCE_CONTROL_SETTINGS_DOCTYPE)
+    if not snapshot:
         if not required:
             return None
-        raise
+        frappe.throw(_("Finance Control Settings not configured"))
 
-    rows = doc.get("gl_account_mappings") or []
+    accounts = memoize(
+        FINANCE_CONTROL_SETTINGS_DOCTYPE,
+        GL_ACCOUNT_INDEX,
+        lambda: _build_gl_account_index(snapshot),
+    )
 
     # Strategy 1: exact match by purpose+company
-    if company:
-        for row in rows:
-            row_purpose = row.get("purpose")
-            row_company = row.get("company")
-            row_account = row.get("account")
-            
-            if (row_purpose == purpose) and (row_company == company) and row_account:
-                return row_account
+    if company and (purpose, company) in accounts:
+        return accounts[(purpose, company)]
 
     # Strategy 2: fallback to global default (purpose with no company)
-    for row in rows:
-        row_purpose = row.get("purpose")
-        row_company = row.get("company")
-        row_account = row.get("account")
-        
-        if (row_purpose == purpose) and not row_company and row_account:
-            return row_account
+    if (purpose, None) in accounts:
+        return accounts[(purpose, None)]
 
     # Not found
     if required:
@@ -8,7 +8,8 @@ import re
 import subprocess
 from datetime import datetime
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
-from typing import Any, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
 from urllib.parse import urlparse
 
 import frappe
@@ -25,6 +26,9 @@ from imogi_finance.settings.utils import (
 )
 from imogi_finance.settings.gl_purposes import PPN_VARIANCE
 
+if TYPE_CHECKING:
+    from imogi_finance.imogi_finance.parsers.text_index import TextIndex
+
 background_jobs = getattr(frappe.utils, "background_jobs", None)
 
 SETTINGS_DOCTYPE = "Tax Invoice OCR Settings"
@@ -35,6 +39,15 @@ DEFAULT_SETTINGS = {
     "ocr_max_pages": 5,  # Increase from 2 to 5 to capture all pages
     "ocr_min_confidence": 0.85,
     "ocr_max_retry": 1,
+    "ocr_retry_backoff_seconds": 2,
+    "ocr_max_concurrent_jobs": 2,
+    "ocr_page_workers": 4,
+    "ocr_page_timeout_seconds": 60,
+    "ocr_google_vision_rate_per_minute": 60,
+    "ocr_tesseract_rate_per_minute": 30,
+    "enable_ocr_cache": 1,
+    "ocr_cache_max_age_days": 90,
+    "ocr_cache_max_size_mb": 512,
     "ocr_file_max_mb": 10,
     "store_raw_ocr_json": 1,
     "npwp_normalize": 1,
@@ -56,16 +69,23 @@ def _raise_validation_error(message: str):
         raise ValidationError(message)
 
 
-def get_settings() -> dict[str, Any]:
-    if not frappe.db:
-        return DEFAULT_SETTINGS.copy()
-
+def _load_settings_map() -> dict[str, Any]:
     settings_map = DEFAULT_SETTINGS.copy()
     getter = getattr(getattr(frappe, "db", None), "get_singles_dict", None)
     record = getter(SETTINGS_DOCTYPE) if callable(getter) else {}
     record = record or {}
     settings_map.update(record)
-    settings_obj = frappe._dict(settings_map)
+    return settings_map
+
+
+def get_settings() -> dict[str, Any]:
+    if not frappe.db:
+        return DEFAULT_SETTINGS.copy()
+
+    from imogi_finance.settings.snapshot import memoize
+
+    # The memoized map is shared by the worker process; callers get their own copy.
+    settings_obj = frappe._dict(memoize(SETTINGS_DOCTYPE, "ocr_settings", _load_settings_map))
     if not hasattr(settings_obj, "get"):
         settings_obj.get = lambda key, default=None: getattr(settings_obj, key, default)
     return settings_obj
@@ -155,6 +175,10 @@ FP_DATE_PATTERNS = [
     # Fallback: date near FP number (within same line or next line)
     re.compile(r"(?P<date>\d{1,2}[\-/]\d{1,2}[\-/]\d{4})"),
 ]
+# The labelled FP_DATE_PATTERNS cannot match unless one of these words is in the text;
+# checking for them first saves two full scans of texts without a date label.
+FP_DATE_LABEL_WORDS = ("tanggal", "tgl", "date")
+FP_DATE_LABELLED_PATTERNS = FP_DATE_PATTERNS[:2]
 INDO_DATE_REGEX = re.compile(r"(?P<day>\d{1,2})\s+(?P<month>[A-Za-z]+)\s+(?P<year>\d{4})")
 INDO_MONTHS = {
     "januari": 1,
@@ -171,6 +195,71 @@ INDO_MONTHS = {
     "desember": 12,
 }
 
+# Patterns for the text extractors used by ``parse_faktur_pajak_text``, compiled once.
+SIGNATURE_MARKER = "Ditandatangani secara elektronik"
+SIGNATURE_BLOCK_REGEX = re.compile(
+    r'Ditandatangani\s+secara\s+elektronik\s*\n'  # Marker
+    r'\s*([A-Z][A-Za-z\s\.]+?)\s*\n'              # Nama (must start with uppercase)
+    r'(?:.*?\n){0,5}?'                             # Skip 0-5 lines non-greedy (for references/notes)
+    r'\s*(\d[\d\s\.,]+?)(?=\s*\n)',               # Amount (positive lookahead to stop at newline)
+    re.IGNORECASE | re.MULTILINE
+)
+SIGNATURE_AMOUNT_LINE_REGEX = re.compile(r'^\s*\d[\d\s\.,]+\s*$')
+STANDALONE_AMOUNT_REGEX = re.compile(r'(?:^|\n)\s*(\d[\d\s\.,]+?)(?=\s*\n)')
+PURE_AMOUNT_LINE_REGEX = re.compile(r'^\s*[\d\s\.,]+\s*$')
+DATE_LIKE_REGEX = re.compile(r'^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}$')
+SIGNATURE_SKIP_REGEX = re.compile(
+    '|'.join([
+        # Labels
+        r'harga\s+jual', r'penggantian', r'uang\s+muka', r'termin',
+        r'dikurangi', r'potongan', r'dasar\s+pengenaan', r'pajak',
+        r'jumlah\s+ppn', r'ppnbm', r'barang\s+mewah',
+        r'nilai\s+pertambahan', r'\(rp\)',
+
+        # Reference patterns - CRITICAL FIX for reference lines
+        r'referensi\s*:', r'reference\s*:', r'invoice\s*:',
+        r'\(referensi', r'nomor\s+referensi', r'no\.?\s*ref',
+        r'faktur\s+\d+', r'inv[-/]\d', r'/mtla/', r'/gmm/',
+        r'no\.?\s*inv', r'\binv-', r'\binv/',
+
+        # Warnings/notices
+        r'pemberitahuan\s*:', r'peringatan\s*:',
+        r'sesuai\s+dengan', r'ketentuan',
+
+        # 🔧 CRITICAL: Lines containing BOTH text and numbers (like "Referensi: INV/2024/001")
+        # This catches mixed content that should not be treated as pure amounts
+        r'[a-zA-Z]{2,}.*[:/].*\d',  # Text with : or / and digits
+        r'\d.*[a-zA-Z]{2,}',          # Digits followed by text
+    ]),
+    re.IGNORECASE,
+)
+SUMMARY_MARKER_PATTERNS = [
+    re.compile(r'Harga\s+Jual\s*/\s*Penggantian\s*/\s*Uang\s+Muka\s*/\s*Termin', re.IGNORECASE),
+    re.compile(r'Harga\s+Jual\s*/\s*Penggantian', re.IGNORECASE),
+    re.compile(r'Harga\s+Jual\s*/', re.IGNORECASE),
+]
+SUMMARY_FIELD_PATTERNS = [
+    ('harga_jual', [
+        re.compile(r'Harga\s+Jual\s*/\s*Penggantian', re.IGNORECASE),
+        re.compile(r'Harga\s+Jual', re.IGNORECASE),
+    ]),
+    ('dpp', [
+        re.compile(r'Dasar\s+Pengenaan\s+Pajak', re.IGNORECASE),
+        re.compile(r'DPP', re.IGNORECASE),
+    ]),
+    ('ppn', [
+        re.compile(r'Jumlah\s+PPN', re.IGNORECASE),
+        re.compile(r'PPN\s*\(', re.IGNORECASE),
+        re.compile(r'Pajak\s+Pertambahan\s+Nilai', re.IGNORECASE),
+    ]),
+]
+# Regex pattern to match "nilai lain" followed by fraction (11/12, 12/11, 11:12, etc.)
+NILAI_LAIN_REGEX = re.compile(
+    r"nilai\s*lain.*?(11\s*/\s*12|12\s*/\s*11|11\s*:\s*12|12\s*:\s*11)",
+    re.IGNORECASE
+)
+NILAI_LAIN_CONTEXT_REGEX = re.compile(r"nilai\s*lain", re.IGNORECASE)
+
 
 def extract_fp_number_with_label(text: str) -> Optional[str]:
     """
@@ -233,8 +322,13 @@ def extract_fp_date_with_label(text: str) -> Optional[str]:
 
     from datetime import datetime
 
+    lower_text = text.lower()
+    has_date_label = any(word in lower_text for word in FP_DATE_LABEL_WORDS)
+
     # Try each pattern in order
     for pattern in FP_DATE_PATTERNS:
+        if not has_date_label and pattern in FP_DATE_LABELLED_PATTERNS:
+            continue
         match = pattern.search(text)
         if match:
             date_str = match.group("date")
@@ -289,12 +383,6 @@ def detect_nilai_lain_factor(text: str) -> Optional[float]:
         >>> detect_nilai_lain_factor("Nilai Lain: 12 : 11")
         1.0909
     """
-    # Regex pattern to match "nilai lain" followed by fraction (11/12, 12/11, 11:12, etc.)
-    NILAI_LAIN_REGEX = re.compile(
-        r"nilai\s*lain.*?(11\s*/\s*12|12\s*/\s*11|11\s*:\s*12|12\s*:\s*11)",
-        re.IGNORECASE
-    )
-
     match = NILAI_LAIN_REGEX.search(text or "")
     if not match:
         return None
@@ -774,15 +862,25 @@ def _normalize_ppn_type(ppn_type: str) -> str:
 
 
 
-def _extract_section(text: str, start_label: str, end_label: str | None = None) -> str:
+def _text_index(text: str | TextIndex | None) -> TextIndex:
+    """Shared line index for ``text``; extractors accept either the raw text or an index built by the caller."""
+    from imogi_finance.imogi_finance.parsers.text_index import TextIndex
+
+    if isinstance(text, TextIndex):
+        return text
+    return TextIndex.of(text or "")
+
+
+def _extract_section(text: str | TextIndex, start_label: str, end_label: str | None = None) -> str:
+    index = _text_index(text)
+    text = index.text
     if not text:
         return ""
-    lower_text = text.lower()
-    start_index = lower_text.find(start_label.lower())
+    start_index = index.find(start_label, ignore_case=True)
     if start_index < 0:
         return text
     if end_label:
-        end_index = lower_text.find(end_label.lower(), start_index)
+        end_index = index.lower.find(end_label.lower(), start_index)
         if end_index > start_index:
             return text[start_index:end_index]
     return text[start_index:]
@@ -824,16 +922,31 @@ def _sanitize_amount(value: Any, *, max_abs: float = 9_999_999_999_999.99) -> fl
     return number
 
 
-def _extract_section_lines(text: str, start_label: str, stop_labels: tuple[str, ...]) -> list[str]:
-    lines = text.splitlines()
-    start_idx = next((idx for idx, line in enumerate(lines) if start_label.lower() in line.lower()), None)
+@lru_cache(maxsize=4096)
+def _amount_value(raw: str) -> float | None:
+    """``_sanitize_amount(_parse_idr_amount(raw))``; the same amount strings recur across extractors."""
+    return _sanitize_amount(_parse_idr_amount(raw))
+
+
+@lru_cache(maxsize=256)
+def _label_amount_pattern(label: str) -> re.Pattern:
+    # Normalize label: handle multiple spaces and slash variations
+    normalized_label = re.sub(r'\s+', r'\\s+', label.strip())
+    normalized_label = normalized_label.replace('/', r'\s*/\s*')
+    return re.compile(rf"{normalized_label}\s*[:\-]?\s*(?P<value>.*)", re.IGNORECASE)
+
+
+def _extract_section_lines(text: str | TextIndex, start_label: str, stop_labels: tuple[str, ...]) -> list[str]:
+    index = _text_index(text)
+    start_key = start_label.lower()
+    start_idx = next((idx for idx, line in enumerate(index.lower_lines) if start_key in line), None)
     if start_idx is None:
         return []
 
+    stops = tuple(stop.lower() for stop in stop_labels)
     collected: list[str] = []
-    for line in lines[start_idx:]:
-        normalized = line.lower().strip()
-        if any(normalized.startswith(stop.lower()) for stop in stop_labels):
+    for line, lowered in zip(index.lines[start_idx:], index.lower_lines[start_idx:]):
+        if lowered.strip().startswith(stops):
             break
         collected.append(line.strip())
     return collected
@@ -848,12 +961,12 @@ def _extract_first_after_label(section_lines: list[str], label: str) -> str | No
     return None
 
 
-def _find_amount_after_label(text: str, label: str, max_lines_to_check: int = 5) -> float | None:
+def _find_amount_after_label(text: str | TextIndex, label: str, max_lines_to_check: int = 5) -> float | None:
     """
     Find amount after a label in text.
 
     Args:
-        text: Text to search in
+        text: Text (or its ``TextIndex``) to search in
         label: Label to search for
         max_lines_to_check: Maximum number of non-empty lines to check after label (default: 5)
 
@@ -874,7 +987,7 @@ def _find_amount_after_label(text: str, label: str, max_lines_to_check: int = 5)
         # ONLY match amounts with proper currency format (has decimal separator)
         amount_match = AMOUNT_REGEX.search(line or "")
         if amount_match:
-            amount = _sanitize_amount(_parse_idr_amount(amount_match.group("amount")))
+            amount = _amount_value(amount_match.group("amount"))
             # For Harga Jual, typically should be at least 10,000 IDR
             if amount is not None and amount >= 10000:
                 return amount
@@ -884,16 +997,14 @@ def _find_amount_after_label(text: str, label: str, max_lines_to_check: int = 5)
 
     logger = frappe.logger("tax_invoice_ocr")
 
-    # Normalize label: handle multiple spaces and slash variations
-    normalized_label = re.sub(r'\s+', r'\\s+', label.strip())
-    normalized_label = normalized_label.replace('/', r'\s*/\s*')
-
-    logger.info(f"🔍 _find_amount_after_label: Searching for label '{label}' with pattern: {normalized_label}")
-
-    pattern = re.compile(rf"{normalized_label}\s*[:\-]?\s*(?P<value>.*)", re.IGNORECASE)
-    lines = (text or "").splitlines()
+    index = _text_index(text)
+    pattern = _label_amount_pattern(label)
+    logger.info(f"🔍 _find_amount_after_label: Searching for label '{label}' with pattern: {pattern.pattern}")
 
-    for idx, line in enumerate(lines):
+    lines = index.lines
+    # Only lines containing the label's first word can match.
+    for idx in index.candidate_lines(label):
+        line = lines[idx]
         match = pattern.search(line)
         if not match:
             continue
@@ -906,8 +1017,8 @@ def _find_amount_after_label(text: str, label: str, max_lines_to_check: int = 5)
         # FIX: Return amount immediately AFTER label position (first amount after match.end())
         label_end_pos = match.end()
         all_amounts_in_line = []
-        for amt_match in AMOUNT_REGEX.finditer(line):
-            amt = _sanitize_amount(_parse_idr_amount(amt_match.group("amount")))
+        for amt_match in index.line_matches(AMOUNT_REGEX, idx):
+            amt = _amount_value(amt_match.group("amount"))
             if amt is not None and amt >= 10000:
                 # Store: (amount, start_position, distance_from_label)
                 distance = amt_match.start() - label_end_pos
@@ -937,11 +1048,12 @@ def _find_amount_after_label(text: str, label: str, max_lines_to_check: int = 5)
         # If not found in same line, check next few non-empty lines
         logger.info(f"🔍 _find_amount_after_label: No inline amount, checking next {max_lines_to_check} lines")
         lines_checked = 0
-        for offset, next_line in enumerate(lines[idx + 1 :], start=1):
+        for next_idx in range(idx + 1, len(lines)):
+            next_line = lines[next_idx]
             if not next_line.strip():
                 continue
 
-            logger.info(f"🔍 _find_amount_after_label: Checking line {idx + offset}: '{next_line[:80]}'")
+            logger.info(f"🔍 _find_amount_after_label: Checking line {next_idx}: '{next_line[:80]}'")
 
             next_amount = _extract_amount(next_line)
             if next_amount is not None:
@@ -957,7 +1069,7 @@ def _find_amount_after_label(text: str, label: str, max_lines_to_check: int = 5)
     return None
 
 
-def _extract_harga_jual_from_signature_section(text: str) -> float | None:
+def _extract_harga_jual_from_signature_section(text: str | TextIndex) -> float | None:
     """
     🔧 FIXED VERSION V3: Extract Harga Jual with robust multi-strategy approach.
 
@@ -970,6 +1082,8 @@ def _extract_harga_jual_from_signature_section(text: str) -> float | None:
     logger = frappe.logger("tax_invoice_ocr")
     logger.info("🔍 _extract_harga_jual_from_signature_section: Starting V3 extraction")
 
+    index = _text_index(text)
+    text = index.text
     if not text:
         logger.info("🔍 _extract_harga_jual_from_signature_section: No text provided, returning None")
         return None
@@ -983,7 +1097,7 @@ def _extract_harga_jual_from_signature_section(text: str) -> float | None:
     ]
 
     for pattern in label_patterns:
-        labeled_value = _find_amount_after_label(text, pattern, max_lines_to_check=3)
+        labeled_value = _find_amount_after_label(index, pattern, max_lines_to_check=3)
         if labeled_value and labeled_value >= 10000:
             logger.info(f"🔍 Strategy 0: SUCCESS with pattern '{pattern}': {labeled_value}")
             return labeled_value
@@ -991,16 +1105,8 @@ def _extract_harga_jual_from_signature_section(text: str) -> float | None:
     logger.info("🔍 Strategy 0: Label-based extraction failed, trying signature patterns")
 
     # 🔧 STRATEGY 1: Improved regex pattern
-    signature_pattern = re.compile(
-        r'Ditandatangani\s+secara\s+elektronik\s*\n'  # Marker
-        r'\s*([A-Z][A-Za-z\s\.]+?)\s*\n'              # Nama (must start with uppercase)
-        r'(?:.*?\n){0,5}?'                             # Skip 0-5 lines non-greedy (for references/notes)
-        r'\s*(\d[\d\s\.,]+?)(?=\s*\n)',               # Amount (positive lookahead to stop at newline)
-        re.IGNORECASE | re.MULTILINE
-    )
-
     logger.info("🔍 Strategy 1: Trying improved regex pattern matching")
-    match = signature_pattern.search(text)
+    match = SIGNATURE_BLOCK_REGEX.search(text)
     if match:
         name_captured = match.group(1).strip()
         amount_str = match.group(2).strip()
@@ -1022,14 +1128,13 @@ def _extract_harga_jual_from_signature_section(text: str) -> float | None:
 
     # 🔧 FIX 3: Enhanced line-by-line parsing with better skip keywords
     logger.info("🔍 Strategy 2: Trying line-by-line parsing with enhanced filters")
-    signature_marker_idx = text.find("Ditandatangani secara elektronik")
+    signature_marker_idx = index.find(SIGNATURE_MARKER)
     if signature_marker_idx == -1:
-        signature_marker_idx = text.lower().find("ditandatangani secara elektronik")
+        signature_marker_idx = index.find(SIGNATURE_MARKER, ignore_case=True)
 
     if signature_marker_idx != -1:
         logger.info(f"🔍 Strategy 2: Found signature marker at index {signature_marker_idx}")
-        after_signature = text[signature_marker_idx:]
-        lines = after_signature.split('\n')
+        lines = index.lines_from(signature_marker_idx)
         logger.info(f"🔍 Strategy 2: Split into {len(lines)} lines after signature")
 
         found_name = False
@@ -1065,7 +1170,7 @@ def _extract_harga_jual_from_signature_section(text: str) -> float | None:
                     continue
 
                 # Check if this line contains only a number pattern
-                if re.match(r'^\s*\d[\d\s\.,]+\s*$', line):
+                if SIGNATURE_AMOUNT_LINE_REGEX.match(line):
                     logger.info(f"🔍 Strategy 2: Found amount pattern at line {idx}: '{line}'")
                     parsed = _parse_idr_amount(line)
                     logger.info(f"🔍 Strategy 2: _parse_idr_amount returned: {parsed}")
@@ -1083,18 +1188,16 @@ def _extract_harga_jual_from_signature_section(text: str) -> float | None:
 
     # Strategy 3: Aggressive fallback with better filtering
     logger.info("🔍 Strategy 3: Trying aggressive fallback")
-    signature_marker_idx = text.find("Ditandatangani secara elektronik")
+    signature_marker_idx = index.find(SIGNATURE_MARKER)
     if signature_marker_idx == -1:
-        signature_marker_idx = text.lower().find("ditandatangani secara elektronik")
+        signature_marker_idx = index.find(SIGNATURE_MARKER, ignore_case=True)
 
     if signature_marker_idx != -1:
         logger.info(f"🔍 Strategy 3: Found signature marker at index {signature_marker_idx}")
         after_signature = text[signature_marker_idx:]
 
         # Match standalone amounts - use positive lookahead to stop at newline
-        amount_pattern = re.compile(r'(?:^|\n)\s*(\d[\d\s\.,]+?)(?=\s*\n)')
-
-        matches_found = list(amount_pattern.finditer(after_signature))
+        matches_found = list(STANDALONE_AMOUNT_REGEX.finditer(after_signature))
         logger.info(f"🔍 Strategy 3: Found {len(matches_found)} amount patterns")
 
         for idx, match in enumerate(matches_found):
@@ -1119,7 +1222,7 @@ def _extract_harga_jual_from_signature_section(text: str) -> float | None:
     return None
 
 
-def _extract_amounts_after_signature(text: str) -> list[float] | None:
+def _extract_amounts_after_signature(text: str | TextIndex) -> list[float] | None:
     """
     🔧 FIXED VERSION V2: Extract all amounts from signature section.
 
@@ -1132,48 +1235,22 @@ def _extract_amounts_after_signature(text: str) -> list[float] | None:
     logger = frappe.logger("tax_invoice_ocr")
     logger.info("🔍 _extract_amounts_after_signature: Starting extraction V2")
 
-    if not text:
+    index = _text_index(text)
+    if not index.text:
         return None
 
     # Find signature marker (case-insensitive)
-    signature_marker_idx = text.lower().find("ditandatangani secara elektronik")
+    signature_marker_idx = index.find(SIGNATURE_MARKER, ignore_case=True)
     if signature_marker_idx == -1:
         logger.info("🔍 _extract_amounts_after_signature: Signature marker not found")
         return None
 
-    after_signature = text[signature_marker_idx:]
     logger.info(f"🔍 _extract_amounts_after_signature: Found signature at index {signature_marker_idx}")
 
-    lines = after_signature.split('\n')
+    lines = index.lines_from(signature_marker_idx)
     found_name = False
     amounts = []
 
-    # 🔧 ENHANCED: More comprehensive skip patterns
-    skip_patterns = [
-        # Labels
-        r'harga\s+jual', r'penggantian', r'uang\s+muka', r'termin',
-        r'dikurangi', r'potongan', r'dasar\s+pengenaan', r'pajak',
-        r'jumlah\s+ppn', r'ppnbm', r'barang\s+mewah',
-        r'nilai\s+pertambahan', r'\(rp\)',
-
-        # Reference patterns - CRITICAL FIX for reference lines
-        r'referensi\s*:', r'reference\s*:', r'invoice\s*:',
-        r'\(referensi', r'nomor\s+referensi', r'no\.?\s*ref',
-        r'faktur\s+\d+', r'inv[-/]\d', r'/mtla/', r'/gmm/',
-        r'no\.?\s*inv', r'\binv-', r'\binv/',
-
-        # Warnings/notices
-        r'pemberitahuan\s*:', r'peringatan\s*:',
-        r'sesuai\s+dengan', r'ketentuan',
-
-        # 🔧 CRITICAL: Lines containing BOTH text and numbers (like "Referensi: INV/2024/001")
-        # This catches mixed content that should not be treated as pure amounts
-        r'[a-zA-Z]{2,}.*[:/].*\d',  # Text with : or / and digits
-        r'\d.*[a-zA-Z]{2,}',          # Digits followed by text
-    ]
-
-    # Compile all patterns into one regex
-    skip_regex = re.compile('|'.join(skip_patterns), re.IGNORECASE)
 
     for idx, line in enumerate(lines[1:], start=1):  # Skip first line (marker itself)
         line_stripped = line.strip()
@@ -1204,22 +1281,20 @@ def _extract_amounts_after_signature(text: str) -> list[float] | None:
         # Step 2: After finding name, extract amounts
         if found_name:
             # 🔧 CRITICAL FIX: Skip lines matching any skip pattern
-            if skip_regex.search(line_stripped):
+            if SIGNATURE_SKIP_REGEX.search(line_stripped):
                 logger.info(f"🔍 Line {idx}: ⚠️ SKIPPED - matches skip pattern: '{line_stripped[:50]}'")
                 continue
 
             # 🔧 CRITICAL FIX: Only accept lines that are PURELY amounts
             # Pattern: optional whitespace + digits/commas/dots/spaces + optional whitespace
             # NO letters, colons, slashes, or special chars allowed
-            pure_amount_pattern = r'^\s*[\d\s\.,]+\s*$'
-
-            if not re.match(pure_amount_pattern, line_stripped):
+            if not PURE_AMOUNT_LINE_REGEX.match(line_stripped):
                 logger.info(f"🔍 Line {idx}: ⚠️ SKIPPED - not pure amount (contains text): '{line_stripped[:50]}'")
                 continue
 
             # 🔧 ADDITIONAL CHECK: Ensure it's not a date-like pattern (DD-MM-YYYY or similar)
             # Dates like "30-01-2024" could pass as amounts
-            if re.match(r'^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}$', line_stripped.replace(' ', '')):
+            if DATE_LIKE_REGEX.match(line_stripped.replace(' ', '')):
                 logger.info(f"🔍 Line {idx}: ⚠️ SKIPPED - looks like a date: '{line_stripped}'")
                 continue
 
@@ -1354,7 +1429,7 @@ def _extract_faktur_number_from_json(raw_json: dict[str, Any] | str | None) -> s
     return None
 
 
-def _extract_summary_from_last_section(text: str) -> dict[str, float]:
+def _extract_summary_from_last_section(text: str | TextIndex) -> dict[str, float]:
     """
     Extract summary values from the LAST occurrence of the summary section.
 
@@ -1376,19 +1451,15 @@ def _extract_summary_from_last_section(text: str) -> dict[str, float]:
         if the marker is not found.
     """
     logger = frappe.logger("tax_invoice_ocr")
+    index = _text_index(text)
+    text = index.text
     if not text:
         return {}
 
     # Find the LAST occurrence of the summary section marker
-    summary_markers = [
-        r'Harga\s+Jual\s*/\s*Penggantian\s*/\s*Uang\s+Muka\s*/\s*Termin',
-        r'Harga\s+Jual\s*/\s*Penggantian',
-        r'Harga\s+Jual\s*/',
-    ]
-
     summary_start = -1
-    for marker_re in summary_markers:
-        all_matches = list(re.finditer(marker_re, text, re.IGNORECASE))
+    for marker_re in SUMMARY_MARKER_PATTERNS:
+        all_matches = list(marker_re.finditer(text))
         if all_matches:
             summary_start = all_matches[-1].start()  # LAST occurrence
             logger.info(
@@ -1402,37 +1473,20 @@ def _extract_summary_from_last_section(text: str) -> dict[str, float]:
         return {}
 
     # Only look at text after the LAST marker
-    summary_text = text[summary_start:]
-    lines = summary_text.split('\n')
+    lines = index.lines_from(summary_start)
 
     result: dict[str, float] = {}
 
-    summary_fields = [
-        ('harga_jual', [
-            r'Harga\s+Jual\s*/\s*Penggantian',
-            r'Harga\s+Jual',
-        ]),
-        ('dpp', [
-            r'Dasar\s+Pengenaan\s+Pajak',
-            r'DPP',
-        ]),
-        ('ppn', [
-            r'Jumlah\s+PPN',
-            r'PPN\s*\(',
-            r'Pajak\s+Pertambahan\s+Nilai',
-        ]),
-    ]
-
-    for field_name, label_patterns in summary_fields:
+    for field_name, label_patterns in SUMMARY_FIELD_PATTERNS:
         for lp in label_patterns:
             found = False
             for idx, line in enumerate(lines):
-                if not re.search(lp, line, re.IGNORECASE):
+                if not lp.search(line):
                     continue
 
                 # Found label — look for amount on the same line
                 for amt_match in AMOUNT_REGEX.finditer(line):
-                    amt = _sanitize_amount(_parse_idr_amount(amt_match.group("amount")))
+                    amt = _amount_value(amt_match.group("amount"))
                     if amt is not None and amt >= 1.0:
                         result[field_name] = amt
                         found = True
@@ -1445,7 +1499,7 @@ def _extract_summary_from_last_section(text: str) -> dict[str, float]:
                         if not next_line:
                             continue
                         for amt_match in AMOUNT_REGEX.finditer(next_line):
-                            amt = _sanitize_amount(_parse_idr_amount(amt_match.group("amount")))
+                            amt = _amount_value(amt_match.group("amount"))
                             if amt is not None and amt >= 1.0:
                                 result[field_name] = amt
                                 found = True
@@ -1500,6 +1554,9 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
         For line item extraction, use:
         from imogi_finance.imogi_finance.parsers.faktur_pajak_parser import parse_invoice
 
+    The text is split into lines once (``TextIndex``) and every extractor below
+    works on that shared index instead of re-splitting and rescanning the text.
+
     Args:
         text: Raw OCR text from Google Vision or other OCR provider
 
@@ -1519,36 +1576,39 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
     debug_notes: list[str] = []
     logger = frappe.logger("tax_invoice_ocr")
 
+    index = _text_index(text)
+    text = index.text
+
     seller_section = _extract_section_lines(
-        text or "", "Pengusaha Kena Pajak", ("Pembeli Barang Kena Pajak", "Pembeli Barang Kena Pajak/Penerima Jasa Kena Pajak")
+        index, "Pengusaha Kena Pajak", ("Pembeli Barang Kena Pajak", "Pembeli Barang Kena Pajak/Penerima Jasa Kena Pajak")
     )
     buyer_section = _extract_section_lines(
-        text or "", "Pembeli Barang Kena Pajak", ("No.", "Kode Barang", "Nama Barang", "Harga Jual")
+        index, "Pembeli Barang Kena Pajak", ("No.", "Kode Barang", "Nama Barang", "Harga Jual")
     )
 
     # 🔥 NEW: Use enhanced label-based extraction with multiple patterns
-    fp_no_extracted = extract_fp_number_with_label(text or "")
+    fp_no_extracted = extract_fp_number_with_label(text)
     if fp_no_extracted:
         matches["fp_no"] = fp_no_extracted
         confidence += 0.35  # Higher confidence for label-based match
         logger.info(f"🔍 parse_faktur_pajak_text: ✅ FP Number from label: {fp_no_extracted}")
     else:
         # Fallback to legacy extraction
-        faktur_match = FAKTUR_NO_LABEL_REGEX.search(text or "")
+        faktur_match = FAKTUR_NO_LABEL_REGEX.search(text)
         if faktur_match:
             normalized_fp = _normalize_faktur_number(faktur_match.group("fp"))
             if normalized_fp:
                 matches["fp_no"] = normalized_fp
                 confidence += 0.3
         else:
-            fp_match = TAX_INVOICE_REGEX.search(text or "")
+            fp_match = TAX_INVOICE_REGEX.search(text)
             if fp_match:
                 normalized_fp = _normalize_faktur_number(fp_match.group("fp"))
                 if normalized_fp:
                     matches["fp_no"] = normalized_fp
                     confidence += 0.25
 
-    pkp_section = _extract_section(text or "", "Pengusaha Kena Pajak", "Pembeli")
+    pkp_section = _extract_section(index, "Pengusaha Kena Pajak", "Pembeli")
     seller_npwp = _extract_npwp_with_label(pkp_section) or _extract_npwp_from_text(pkp_section)
     if seller_npwp:
         matches["npwp"] = seller_npwp
@@ -1560,14 +1620,14 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
             confidence += 0.2
 
     # 🔥 NEW: Use enhanced label-based date extraction
-    fp_date_extracted = extract_fp_date_with_label(text or "")
+    fp_date_extracted = extract_fp_date_with_label(text)
     if fp_date_extracted:
         matches["fp_date"] = fp_date_extracted
         confidence += 0.3  # Higher confidence for label-based match
         logger.info(f"🔍 parse_faktur_pajak_text: ✅ FP Date from label: {fp_date_extracted}")
     else:
         # Fallback to legacy extraction
-        parsed_date = _parse_date_from_text(text or "")
+        parsed_date = _parse_date_from_text(text)
         if parsed_date:
             matches["fp_date"] = parsed_date
         confidence += 0.15
@@ -1579,7 +1639,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
     buyer_section_text = "\n".join(buyer_section)
     buyer_npwp = _extract_npwp_with_label(buyer_section_text) or _extract_npwp_from_text(buyer_section_text)
 
-    amounts = [_sanitize_amount(_parse_idr_amount(m.group("amount"))) for m in AMOUNT_REGEX.finditer(text or "")]
+    amounts = [_amount_value(m.group("amount")) for m in AMOUNT_REGEX.finditer(text)]
     amounts = [amt for amt in amounts if amt is not None and amt >= 1.0]
 
     logger.info(f"🔍 parse_faktur_pajak_text: Found {len(amounts)} amounts in text")
@@ -1598,7 +1658,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
     # Extract DPP (Dasar Pengenaan Pajak) from label - try multiple variants
     dpp_labeled = None
     for dpp_label in ["Dasar Pengenaan Pajak", "DPP"]:
-        dpp_labeled = _find_amount_after_label(text or "", dpp_label, max_lines_to_check=3)
+        dpp_labeled = _find_amount_after_label(index, dpp_label, max_lines_to_check=3)
         if dpp_labeled:
             matches["dpp"] = dpp_labeled
             logger.info(f"🔍 parse_faktur_pajak_text: ✅ DPP from label '{dpp_label}': {dpp_labeled}")
@@ -1610,7 +1670,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
     ppn_labeled = None
     dpp_for_validation = matches.get("dpp")
     for ppn_label in ["Jumlah PPN", "PPN", "Pajak Pertambahan Nilai"]:
-        ppn_candidate = _find_amount_after_label(text or "", ppn_label, max_lines_to_check=3)
+        ppn_candidate = _find_amount_after_label(index, ppn_label, max_lines_to_check=3)
         if ppn_candidate:
             # 🔧 BUG FIX: Validate PPN is NOT the same as DPP (this was causing PPN=DPP bug!)
             if dpp_for_validation and ppn_candidate == dpp_for_validation:
@@ -1641,7 +1701,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
     ]
 
     for hj_label in hj_labels_priority:
-        harga_jual_labeled = _find_amount_after_label(text or "", hj_label, max_lines_to_check=2)
+        harga_jual_labeled = _find_amount_after_label(index, hj_label, max_lines_to_check=2)
         if harga_jual_labeled:
             # Validate: Harga Jual must be >= DPP (if DPP already extracted)
             dpp_check = matches.get("dpp")
@@ -1652,7 +1712,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
                 break
             else:
                 logger.info(f"🔍 parse_faktur_pajak_text: ⚠️ Rejected Harga Jual {harga_jual_labeled} < DPP {dpp_check} from label '{hj_label}'")
-    signature_amounts = _extract_amounts_after_signature(text or "")
+    signature_amounts = _extract_amounts_after_signature(index)
     logger.info(f"🔍 parse_faktur_pajak_text: Signature amounts: {signature_amounts}")
 
     if signature_amounts and len(signature_amounts) >= 4:
@@ -1768,17 +1828,17 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
 
         # 🔧 NEW: Try to get DPP and PPN from labels if signature failed completely
         if "dpp" not in matches:
-            dpp_from_label = _find_amount_after_label(text or "", "Dasar Pengenaan Pajak")
+            dpp_from_label = _find_amount_after_label(index, "Dasar Pengenaan Pajak")
             if dpp_from_label is None:
-                dpp_from_label = _find_amount_after_label(text or "", "DPP")
+                dpp_from_label = _find_amount_after_label(index, "DPP")
             if dpp_from_label:
                 matches["dpp"] = dpp_from_label
                 logger.info(f"🔍 parse_faktur_pajak_text: ✓ Found DPP from label: {dpp_from_label}")
 
         if "ppn" not in matches:
-            ppn_from_label = _find_amount_after_label(text or "", "Jumlah PPN")
+            ppn_from_label = _find_amount_after_label(index, "Jumlah PPN")
             if ppn_from_label is None:
-                ppn_from_label = _find_amount_after_label(text or "", "PPN")
+                ppn_from_label = _find_amount_after_label(index, "PPN")
             if ppn_from_label:
                 matches["ppn"] = ppn_from_label
                 logger.info(f"🔍 parse_faktur_pajak_text: ✓ Found PPN from label: {ppn_from_label}")
@@ -1789,7 +1849,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
 
         # Strategy 0: Look for pattern "Nilai Harga Jual dari Faktur Pajak" (from UI field description)
         logger.info("🔍 parse_faktur_pajak_text: Strategy 0: Looking for 'Nilai Harga Jual dari Faktur Pajak'")
-        nilai_hj_from_desc = _find_amount_after_label(text or "", "Nilai Harga Jual dari Faktur Pajak", max_lines_to_check=2)
+        nilai_hj_from_desc = _find_amount_after_label(index, "Nilai Harga Jual dari Faktur Pajak", max_lines_to_check=2)
         if nilai_hj_from_desc and nilai_hj_from_desc >= 10000:
             dpp_check = matches.get("dpp")
             if not dpp_check or nilai_hj_from_desc >= dpp_check:
@@ -1848,7 +1908,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
 
         # Strategy 2: Try focused extraction from signature section
         if "harga_jual" not in matches:
-            labeled_harga_jual = _extract_harga_jual_from_signature_section(text or "")
+            labeled_harga_jual = _extract_harga_jual_from_signature_section(index)
             logger.info(f"🔍 parse_faktur_pajak_text: Strategy 2 (signature with labels): {labeled_harga_jual}")
             if labeled_harga_jual is not None and labeled_harga_jual >= 10000:
                 # Validate against DPP if available
@@ -1865,11 +1925,11 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
         # Strategy 3: Direct label extraction with multiple variants
         if "harga_jual" not in matches:
             logger.info("🔍 parse_faktur_pajak_text: Strategy 3: Direct label extraction")
-            harga_from_label = _find_amount_after_label(text or "", "Harga Jual")
+            harga_from_label = _find_amount_after_label(index, "Harga Jual")
             if harga_from_label is None:
-                harga_from_label = _find_amount_after_label(text or "", "Harga Jual/Penggantian")
+                harga_from_label = _find_amount_after_label(index, "Harga Jual/Penggantian")
             if harga_from_label is None:
-                harga_from_label = _find_amount_after_label(text or "", "Penggantian")
+                harga_from_label = _find_amount_after_label(index, "Penggantian")
 
             logger.info(f"🔍 parse_faktur_pajak_text: Strategy 3 (label): {harga_from_label}")
 
@@ -1973,7 +2033,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
                 f"Re-extracting from bottom summary section."
             )
 
-            bottom = _extract_summary_from_last_section(text or "")
+            bottom = _extract_summary_from_last_section(index)
 
             if bottom:
                 for key in ('harga_jual', 'dpp', 'ppn'):
@@ -2195,7 +2255,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
 
     # Still extract PPN rate from text for verification purposes
     ppn_rate_from_text = None
-    ppn_rate_match = PPN_RATE_REGEX.search(text or "")
+    ppn_rate_match = PPN_RATE_REGEX.search(text) if "%" in text else None
     if ppn_rate_match:
         raw_rate = ppn_rate_match.group("rate").replace(",", ".")
         try:
@@ -2213,7 +2273,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
 
     # 🔥 ERPNext v15+ Feature: Detect "DPP Nilai Lain" pattern (11/12 or 12/11)
     nilai_lain_factor = detect_nilai_lain_factor(text)
-    nilai_lain_context = bool(re.search(r"nilai\s*lain", text or "", re.IGNORECASE))
+    nilai_lain_context = bool(NILAI_LAIN_CONTEXT_REGEX.search(text))
 
     if nilai_lain_context and not nilai_lain_factor:
         inferred_factor, infer_reason = _infer_nilai_lain_factor_from_amounts(matches.get("dpp"), matches.get("ppn"))
@@ -2248,7 +2308,7 @@ def parse_faktur_pajak_text(text: str) -> tuple[dict[str, Any], float]:
             "Harga Jual / Penggantian",
             "Harga Jual",
         ):
-            explicit_hj = _find_amount_after_label(text or "", hj_label, max_lines_to_check=2)
+            explicit_hj = _find_amount_after_label(index, hj_label, max_lines_to_check=2)
             if explicit_hj:
                 break
 
@@ -2674,6 +2734,23 @@ def _load_pdf_content_base64(file_url: str) -> tuple[str | None, str]:
     return None, content_b64
 
 
+def _read_pdf_bytes(file_url: str) -> bytes:
+    """PDF bytes via the File API (🔥 FRAPPE CLOUD SAFE); raises ValidationError when missing or empty."""
+    file_doc = _get_file_doc_by_url(file_url)
+
+    try:
+        pdf_bytes = file_doc.get_content()
+    except Exception as e:
+        raise ValidationError(
+            _("Could not read PDF file: {0}. Error: {1}").format(file_url, str(e))
+        )
+
+    if not pdf_bytes:
+        raise ValidationError(_("PDF content is empty for file: {0}").format(file_url))
+
+    return pdf_bytes
+
+
 def _materialize_pdf_to_tempfile(file_url: str) -> str:
     """
     Write PDF bytes to a temporary file for tools that require file paths (e.g., Tesseract).
@@ -2696,17 +2773,7 @@ def _materialize_pdf_to_tempfile(file_url: str) -> str:
 
     frappe.logger().info(f"[OCR] Materializing PDF to temp file: {file_url}")
 
-    file_doc = _get_file_doc_by_url(file_url)
-
-    try:
-        pdf_bytes = file_doc.get_content()
-    except Exception as e:
-        raise ValidationError(
-            _("Could not read PDF file: {0}. Error: {1}").format(file_url, str(e))
-        )
-
-    if not pdf_bytes:
-        raise ValidationError(_("PDF content is empty for file: {0}").format(file_url))
+    pdf_bytes = _read_pdf_bytes(file_url)
 
     # Write to temp file
     tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf", prefix="ocr_")
@@ -2964,17 +3031,22 @@ def _google_vision_ocr(file_url: str, settings: dict[str, Any]) -> tuple[str, di
     if max_pages and "files:annotate" in endpoint:
         request_body["requests"][0]["pages"] = list(range(1, max_pages + 1))
 
+    from imogi_finance.ocr_pipeline import OCRProviderBusyError, is_retryable_status
+
     try:
         response = requests.post(endpoint, json=request_body, headers=headers, timeout=45)
+    except (requests.ConnectionError, requests.Timeout) as exc:
+        raise OCRProviderBusyError(_("Failed to call Google Vision OCR: {0}").format(exc))
     except Exception as exc:
         raise ValidationError(_("Failed to call Google Vision OCR: {0}").format(exc))
 
     if response.status_code != 200:
-        raise ValidationError(
-            _("Google Vision OCR request failed with status {0}: {1}").format(
-                response.status_code, response.text
-            )
+        message = _("Google Vision OCR request failed with status {0}: {1}").format(
+            response.status_code, response.text
         )
+        if is_retryable_status(response.status_code):
+            raise OCRProviderBusyError(message, status_code=response.status_code)
+        raise ValidationError(message)
 
     data = response.json() if hasattr(response, "json") else {}
     responses = data.get("responses") or []
@@ -3100,12 +3172,14 @@ def _tesseract_ocr(file_url: str, settings: dict[str, Any]) -> tuple[str, dict[s
     """
     Extract text using Tesseract OCR.
 
-    🔥 FRAPPE CLOUD SAFE: Uses temp file from File.get_content() bytes.
-    """
-    import os
+    Pages are rendered and recognised in parallel (see ``imogi_finance.ocr_pages``),
+    each under its own timeout and retry; failed pages are skipped and logged, and
+    the document only fails when no page could be read. Without PyMuPDF the whole
+    file is passed to a single Tesseract run.
 
-    # Materialize PDF to temp file (Cloud-safe)
-    local_path = _materialize_pdf_to_tempfile(file_url)
+    🔥 FRAPPE CLOUD SAFE: Uses File.get_content() bytes.
+    """
+    from imogi_finance import ocr_pages
 
     language = settings.get("ocr_language") or "eng"
     command = settings.get("tesseract_cmd")
@@ -3113,6 +3187,41 @@ def _tesseract_ocr(file_url: str, settings: dict[str, Any]) -> tuple[str, dict[s
     if not command:
         raise ValidationError(_("Tesseract command/path is not configured. Please update Tax Invoice OCR Settings."))
 
+    if not ocr_pages.PYMUPDF_AVAILABLE:
+        return _tesseract_ocr_whole_file(file_url, command, language)
+
+    pdf_bytes = _read_pdf_bytes(file_url)
+    try:
+        pages = ocr_pages.tesseract_pages(pdf_bytes, command, language, settings, source_name=file_url)
+    except ValueError as exc:
+        raise ValidationError(_("Could not split PDF into pages: {0}").format(exc)) from exc
+
+    if not any(page["ok"] for page in pages):
+        errors = [page["error"] for page in pages if page["error"]]
+        if any("No such file" in error for error in errors):
+            raise ValidationError(_("Tesseract command not found: {0}").format(command))
+        raise ValidationError(
+            _("Tesseract OCR failed for file {0}: {1}").format(file_url, errors[0] if errors else _("no pages"))
+        )
+
+    for page in pages:
+        if not page["ok"]:
+            frappe.logger().warning(f"[OCR] Tesseract skipped page {page['page']} of {file_url}: {page['error']}")
+
+    text = "\n".join(page["value"] for page in pages if page["ok"] and page["value"]).strip()
+    if not text:
+        return "", None, 0.0
+
+    return text, None, 0.0
+
+
+def _tesseract_ocr_whole_file(file_url: str, command: str, language: str) -> tuple[str, dict[str, Any] | None, float]:
+    """Single Tesseract run over the whole file, used when PyMuPDF is not installed."""
+    import os
+
+    # Materialize PDF to temp file (Cloud-safe)
+    local_path = _materialize_pdf_to_tempfile(file_url)
+
     try:
         result = subprocess.run(
             [command, local_path, "stdout", "-l", language],
@@ -3145,17 +3254,36 @@ def _tesseract_ocr(file_url: str, settings: dict[str, Any]) -> tuple[str, dict[s
     return text, None, 0.0
 
 
-def ocr_extract_text_from_pdf(file_url: str, provider: str) -> tuple[str, dict[str, Any] | None, float]:
+def ocr_extract_text_from_pdf(
+    file_url: str, provider: str, content_hash: str | None = None
+) -> tuple[str, dict[str, Any] | None, float]:
+    """Run the provider OCR for ``file_url`` under the pipeline's rate limit and retry policy.
+
+    The OCR cache is checked first; ``content_hash`` (SHA-256 of the PDF bytes) is
+    computed from the file when the caller does not pass it.
+    """
+    from imogi_finance import ocr_cache, ocr_pipeline
+
     settings = get_settings()
     _validate_provider_settings(provider, settings)
 
     if provider == "Google Vision":
-        return _google_vision_ocr(file_url, settings)
+        extract = _google_vision_ocr
+    elif provider == "Tesseract":
+        extract = _tesseract_ocr
+    else:
+        raise ValidationError(_("OCR provider {0} is not supported.").format(provider))
 
-    if provider == "Tesseract":
-        return _tesseract_ocr(file_url, settings)
+    if ocr_cache.is_enabled(settings):
+        content_hash = content_hash or ocr_pipeline.compute_content_hash(file_url)
+        cached = ocr_cache.get(content_hash, provider, settings)
+        if cached:
+            frappe.logger().info(f"[OCR] Cache hit for {file_url} ({content_hash[:12]}); provider not called")
+            return cached
 
-    raise ValidationError(_("OCR provider {0} is not supported.").format(provider))
+    result = ocr_pipeline.call_provider(provider, lambda: extract(file_url, settings), settings)
+    ocr_cache.put(content_hash, provider, settings, result)
+    return result
 
 
 def _update_doc_after_ocr(
@@ -3223,10 +3351,14 @@ def _update_doc_after_ocr(
             setattr(doc, notes_field, combined)
 
     # 🔥 FIX: Save ocr_raw_json (Vision API response for line items parsing)
+    # Stored as a compressed private attachment where the doctype has a pointer field.
     if raw_json is not None:
+        from imogi_finance import ocr_raw_store
+
         ocr_raw_json_field = _get_fieldname(doctype, "ocr_raw_json")
         if hasattr(doc, ocr_raw_json_field) or frappe.db.has_column(doctype, ocr_raw_json_field):
-            setattr(doc, ocr_raw_json_field, json.dumps(raw_json, indent=2))
+            for fieldname, value in ocr_raw_store.store(doctype, doc.name, raw_json, doc=doc).items():
+                setattr(doc, fieldname, value)
 
     # 🔥 CRITICAL: Use save() to trigger hooks properly
     # This ensures on_update() is called automatically with correct state
@@ -3259,7 +3391,7 @@ def _update_doc_after_ocr(
 
 
 
-def _run_ocr_job(name: str, target_doctype: str, provider: str):
+def _run_ocr_job(name: str, target_doctype: str, provider: str, content_hash: str | None = None):
     # 🔥 EARLY LOG: Kalau ini tidak muncul → worker crash sebelum function executed
     frappe.logger().info(f"[OCR JOB START] {target_doctype} {name} | Provider: {provider}")
 
@@ -3288,7 +3420,7 @@ def _run_ocr_job(name: str, target_doctype: str, provider: str):
 
         # Extract text from PDF
         frappe.logger().info(f"[OCR] Calling ocr_extract_text_from_pdf...")
-        text, raw_json, confidence = ocr_extract_text_from_pdf(file_url, provider)
+        text, raw_json, confidence = ocr_extract_text_from_pdf(file_url, provider, content_hash=content_hash)
         frappe.logger().info(f"[OCR] Extraction complete | Confidence: {confidence} | Text length: {len(text or '')}")
 
         if not (text or "").strip():
@@ -3300,7 +3432,9 @@ def _run_ocr_job(name: str, target_doctype: str, provider: str):
                 _get_fieldname(target_doctype, error_field): error_msg,
             }
             if raw_json is not None:
-                update_payload[_get_fieldname(target_doctype, "ocr_raw_json")] = json.dumps(raw_json, indent=2)
+                from imogi_finance import ocr_raw_store
+
+                update_payload.update(ocr_raw_store.store(target_doctype, name, raw_json, doc=target_doc))
             target_doc.db_set(update_payload)
             return
 
@@ -3479,14 +3613,17 @@ def _run_ocr_job(name: str, target_doctype: str, provider: str):
         raise
 
 
-def _enqueue_ocr(doc: Any, doctype: str):
-    """Enqueue OCR background job with race condition protection.
+def _enqueue_ocr(doc: Any, doctype: str, priority: str | None = None):
+    """Submit the document to the OCR pipeline with race condition protection.
 
     Uses try-finally to ensure status is set to Failed if enqueue fails,
-    preventing stuck "Queued" status.
+    preventing stuck "Queued" status. The pipeline orders documents by
+    ``priority`` and limits how many OCR jobs run at once.
 
     Job name pattern: "ocr:Tax Invoice OCR Upload:{docname}" for deterministic deduplication.
     """
+    from imogi_finance import ocr_pipeline
+
     settings = get_settings()
     pdf_field = _get_fieldname(doctype, "tax_invoice_pdf")
     _validate_pdf_size(getattr(doc, pdf_field, None), cint(settings.get("ocr_file_max_mb", 10)))
@@ -3499,23 +3636,13 @@ def _enqueue_ocr(doc: Any, doctype: str):
     doc.db_set({status_field: "Queued", error_field_name: None})
 
     provider = settings.get("ocr_provider", "Manual Only")
-    method_path = f"{__name__}._run_ocr_job"
 
     # Deterministic job_name: "ocr:Tax Invoice OCR Upload:{docname}"
     job_name = f"ocr:{doctype}:{doc.name}"
 
     try:
-        frappe.enqueue(
-            method_path,
-            queue="long",
-            job_name=job_name,
-            timeout=300,
-            now=getattr(frappe.flags, "in_test", False),
-            is_async=not getattr(frappe.flags, "in_test", False),
-            enqueue_after_commit=True,  # Ensure Queued status is committed first
-            **{"name": doc.name, "target_doctype": doctype, "provider": provider},
-        )
-        frappe.logger().info(f"[OCR ENQUEUE] Job queued: {job_name}")
+        ocr_pipeline.submit(doctype, doc.name, provider, getattr(doc, pdf_field, None), priority=priority)
+        frappe.logger().info(f"[OCR ENQUEUE] Job submitted to OCR pipeline: {job_name} ({priority or 'normal'})")
     except Exception as enqueue_err:
         # Rollback: if enqueue fails, set status to Failed to avoid stuck Queued
         frappe.logger().error(f"[OCR ENQUEUE FAILED] {job_name}: {enqueue_err}")
@@ -3743,9 +3870,11 @@ def verify_tax_invoice(doc: Any, *, doctype: str, force: bool = False) -> dict[s
     return {"status": _get_value(doc, doctype, "status"), "notes": notes}
 
 
-def run_ocr(docname: str, doctype: str):
+def run_ocr(docname: str, doctype: str, priority: str | None = None):
     """Run OCR for Tax Invoice OCR Upload document.
 
+    ``priority`` ("high", "normal" or "low") orders the document in the OCR pipeline.
+
     Race condition guards:
     - Only allows doctype "Tax Invoice OCR Upload" (hard guard)
     - Returns early if ocr_status is already "Queued" or "Processing"
@@ -3774,7 +3903,7 @@ def run_ocr(docname: str, doctype: str):
             "status": current_status
         }
 
-    _enqueue_ocr(doc, doctype)
+    _enqueue_ocr(doc, doctype, priority=priority)
     return {"queued": True}
 
 
@@ -3834,6 +3963,8 @@ def _format_job_info(job_info: dict[str, Any] | None, job_name: str) -> dict[str
 
 
 def get_tax_invoice_ocr_monitoring(docname: str, doctype: str) -> dict[str, Any]:
+    from imogi_finance import ocr_raw_store
+
     if doctype not in tax_invoice_fields.get_supported_doctypes():
         raise ValidationError(_("Doctype {0} is not supported for Tax Invoice OCR.").format(doctype))
 
@@ -3878,8 +4009,8 @@ def get_tax_invoice_ocr_monitoring(docname: str, doctype: str) -> dict[str, Any]
         "duplicate_flag": _get_value(source_doc, source_doctype, "duplicate_flag"),
         "npwp_match": _get_value(source_doc, source_doctype, "npwp_match"),
         "tax_invoice_pdf": getattr(source_doc, pdf_field, None),
-        "ocr_raw_json": _get_value(source_doc, source_doctype, "ocr_raw_json"),
-        "ocr_raw_json_present": bool(_get_value(source_doc, source_doctype, "ocr_raw_json")),
+        "ocr_raw_json": ocr_raw_store.load_text(source_doc, source_doctype),
+        "ocr_raw_json_present": ocr_raw_store.has_payload(source_doc, source_doctype),
     }
 
     status_fieldname = _get_fieldname(source_doctype, "ocr_status")
@@ -3906,9 +4037,24 @@ def get_tax_invoice_ocr_monitoring(docname: str, doctype: str) -> dict[str, Any]
         "job_name": job_name,
         "provider": settings.get("ocr_provider"),
         "max_retry": settings.get("ocr_max_retry"),
+        "pipeline": _get_pipeline_info(source_doctype, source_doc.name),
     }
 
 
+def _get_pipeline_info(doctype: str, name: str) -> dict[str, Any] | None:
+    try:
+        from imogi_finance import ocr_cache, ocr_pipeline
+
+        return {
+            "doc": ocr_pipeline.get_doc_pipeline_state(doctype, name),
+            "metrics": ocr_pipeline.get_pipeline_metrics(),
+            "cache": ocr_cache.get_cache_stats(),
+        }
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), "Tax Invoice OCR pipeline metrics failed")
+        return None
+
+
 # ============================================================================
 # DIAGNOSTIC FUNCTIONS (FOR DEBUGGING)
 # ============================================================================
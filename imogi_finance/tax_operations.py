@@ -5,14 +5,15 @@ from __future__ import annotations
 import csv
 import io
 import json
+import os
+import tempfile
 from datetime import date
 from typing import Iterable
 
 import frappe
 from frappe import _, bold
 from frappe.model.document import Document
-from frappe.utils import add_days, flt, get_first_day, get_last_day, getdate, nowdate
-from frappe.utils.xlsxutils import make_xlsx
+from frappe.utils import add_days, cint, flt, get_first_day, get_last_day, getdate, nowdate
 
 from imogi_finance import roles, tax_invoice_fields
 
@@ -94,7 +95,12 @@ def _get_gl_total(company: str, accounts: list[str], date_from: date | str | Non
     return credit_total - debit_total
 
 
-def build_register_snapshot(company: str, date_from: date | str | None, date_to: date | str | None) -> dict:
+def build_register_snapshot(
+	company: str,
+	date_from: date | str | None,
+	date_to: date | str | None,
+	use_daily_aggregates: bool = True
+) -> dict:
 	"""
 	Build tax register snapshot using modern register reports with verification filtering.
 
@@ -105,10 +111,15 @@ def build_register_snapshot(company: str, date_from: date | str | None, date_to:
 
 	Only includes verified/validated transactions that are properly posted to GL.
 
+	When ``use_daily_aggregates`` is set and Tax Daily Aggregate rows are available,
+	the snapshot is rolled up from per-day totals and only changed days are
+	recomputed (see ``imogi_finance.tax_period_aggregates``).
+
 	Args:
 		company: Company name
 		date_from: Period start date
 		date_to: Period end date
+		use_daily_aggregates: Roll up daily aggregates instead of a full recompute
 
 	Returns:
 		Snapshot dict with VAT totals, PPh totals, PB1, BPJS, and metadata
@@ -120,6 +131,13 @@ def build_register_snapshot(company: str, date_from: date | str | None, date_to:
 
 	profile = _get_tax_profile(company)
 
+	if use_daily_aggregates:
+		from imogi_finance.tax_period_aggregates import build_snapshot
+
+		snapshot = build_snapshot(company, date_from, date_to, profile)
+		if snapshot is not None:
+			return snapshot
+
 	# Get PPh accounts for withholding register
 	pph_accounts = [row.payable_account for row in getattr(profile, "pph_accounts", []) or [] if row.payable_account]
 
@@ -132,7 +150,9 @@ def build_register_snapshot(company: str, date_from: date | str | None, date_to:
 			from_date=date_from,
 			to_date=date_to,
 			verification_status=None,
-			withholding_accounts=pph_accounts if pph_accounts else None
+			withholding_accounts=pph_accounts if pph_accounts else None,
+			# Only totals and counts are needed; keep the snapshot in constant memory
+			aggregate_only=True
 		)
 	except RegisterIntegrationError as e:
 		frappe.log_error(
@@ -354,34 +374,73 @@ def validate_tax_period_lock(doc: Document, posting_date_field: str = "posting_d
     )
 
 
-def _serialize_rows(rows: list[list[object]], headers: list[str], file_format: str, filename: str) -> str:
+CORETAX_EXPORT_CHUNK_SIZE = 2000
+
+
+def _write_coretax_part(path: str, headers: list[str], rows: Iterable[list[object]], file_format: str) -> None:
     if file_format == "XLSX":
-        xlsx_file = make_xlsx(rows, "CoreTax Export", headers)
-        filedata = xlsx_file.getvalue()
-        file_name = f"{filename}.xlsx"
-        file_doc = frappe.get_doc(
-            {
-                "doctype": "File",
-                "file_name": file_name,
-                "content": filedata,
-                "is_private": 1,
-            }
-        )
-    else:
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
+        _write_xlsx_streaming(path, [("CoreTax Export", headers, rows)])
+        return
+
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
         writer.writerow(headers)
         writer.writerows(rows)
-        file_name = f"{filename}.csv"
-        file_doc = frappe.get_doc(
-            {
-                "doctype": "File",
-                "file_name": file_name,
-                "content": buffer.getvalue(),
-                "is_private": 1,
-            }
-        )
 
+
+def _serialize_rows(
+    rows: Iterable[list[object]],
+    headers: list[str],
+    file_format: str,
+    filename: str,
+    *,
+    max_rows_per_file: int = 0,
+) -> str:
+    """Stream ``rows`` into a private CSV/XLSX File and return its URL.
+
+    With ``max_rows_per_file`` the rows are split into numbered parts of at most that
+    many rows, each with the header, bundled into one ZIP file.
+    """
+    import itertools
+    import zipfile
+
+    extension = "xlsx" if file_format == "XLSX" else "csv"
+    rows = iter(rows)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        parts = []
+        while True:
+            part_rows = itertools.islice(rows, max_rows_per_file) if max_rows_per_file else rows
+            first = next(part_rows, None)
+            if first is None and parts:
+                break
+
+            path = os.path.join(tmpdir, f"{filename}-{len(parts) + 1}.{extension}")
+            _write_coretax_part(path, headers, itertools.chain([] if first is None else [first], part_rows), file_format)
+            parts.append(path)
+            if not max_rows_per_file:
+                break
+
+        if len(parts) == 1:
+            file_name = f"{filename}.{extension}"
+            source = parts[0]
+        else:
+            file_name = f"{filename}.zip"
+            source = os.path.join(tmpdir, file_name)
+            with zipfile.ZipFile(source, "w", zipfile.ZIP_DEFLATED) as archive:
+                for path in parts:
+                    archive.write(path, os.path.basename(path))
+
+        with open(source, "rb") as handle:
+            filedata = handle.read()
+
+    file_doc = frappe.get_doc(
+        {
+            "doctype": "File",
+            "file_name": file_name,
+            "content": filedata,
+            "is_private": 1,
+        }
+    )
     file_doc.save(ignore_permissions=True)
     return file_doc.file_url
 
@@ -505,18 +564,100 @@ def validate_coretax_required_mappings(settings: Document) -> None:
         )
 
 
+def _coretax_party_field(party_type: str) -> str:
+    return "supplier" if party_type == "Supplier" else "customer"
+
+
+def _existing_columns(doctype: str, fields: list[str]) -> list[str]:
+    """``fields`` that are standard or DocType columns; mappings to anything else resolve to None."""
+    valid = set(frappe.get_meta(doctype).get_valid_columns())
+    return [field for field in fields if field in valid]
+
+
+def _coretax_export_fields(settings: Document, direction: str, party_type: str) -> list[str]:
+    """Invoice columns referenced by ``settings.column_mappings``, instead of ``fields="*"``."""
+    prefix = "ti" if direction == "Input" else "out"
+    computed = {
+        "Computed DPP": f"{prefix}_fp_dpp",
+        "Computed PPN": f"{prefix}_fp_ppn",
+        "Tax Invoice Number": f"{prefix}_fp_no",
+        "Tax Invoice Date": f"{prefix}_fp_date",
+    }
+    fields = ["name", _coretax_party_field(party_type)]
+    for mapping in settings.column_mappings:
+        source_type = getattr(mapping, "source_type", None)
+        field = mapping.source if source_type == "Document Field" else computed.get(source_type)
+        if field and field not in fields:
+            fields.append(field)
+    doctype = "Purchase Invoice" if direction == "Input" else "Sales Invoice"
+    return _existing_columns(doctype, fields)
+
+
+def _coretax_party_fields(settings: Document) -> list[str]:
+    fields = []
+    for mapping in settings.column_mappings:
+        if getattr(mapping, "source_type", None) == "Party Field" and mapping.source and mapping.source not in fields:
+            fields.append(mapping.source)
+    return fields
+
+
+def _prefetch_parties(party_type: str, party_names: Iterable[str], fields: list[str]) -> dict[str, dict]:
+    """Party Field values for ``party_names`` from one query."""
+    names = sorted({name for name in party_names if name})
+    if not names or not fields:
+        return {}
+    fields = _existing_columns(party_type, ["name", *fields])
+    rows = frappe.get_all(party_type, filters={"name": ["in", names]}, fields=fields)
+    return {row.name: row for row in rows}
+
+
+def _iter_coretax_invoices(
+    doctype: str,
+    filters: dict[str, object],
+    fields: list[str],
+    chunk_size: int,
+) -> Iterable[list]:
+    """Matching invoices in chunks of ``chunk_size``, paginated by name (keyset, no OFFSET)."""
+    last_name = None
+    while True:
+        page_filters = dict(filters)
+        if last_name:
+            page_filters["name"] = [">", last_name]
+        chunk = frappe.get_list(
+            doctype,
+            filters=page_filters,
+            fields=fields,
+            order_by="name asc",
+            limit_page_length=chunk_size,
+        )
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_name = chunk[-1].name
+
+
 def generate_coretax_rows(
     invoices: list[Document],
     settings: Document,
     *,
     party_type: str,
+    parties: dict[str, dict] | None = None,
 ) -> tuple[list[str], list[list[object]]]:
+    """CoreTax headers and rows for ``invoices``.
+
+    ``parties`` maps party name to prefetched Party Field values; without it each party
+    is loaded with ``get_cached_doc``.
+    """
     headers = [mapping.label or mapping.source for mapping in settings.column_mappings]
     rows: list[list[object]] = []
     for doc in invoices:
         party_doc = None
-        party_name = getattr(doc, "supplier", None) if party_type == "Supplier" else getattr(doc, "customer", None)
-        if party_name:
+        party_name = getattr(doc, _coretax_party_field(party_type), None)
+        if party_name and parties is not None:
+            party_doc = parties.get(party_name)
+        elif party_name:
             try:
                 party_doc = frappe.get_cached_doc(party_type, party_name)
             except Exception:
@@ -538,7 +679,15 @@ def generate_coretax_export(
     direction: str,
     settings_name: str,
     filename: str,
+    chunk_size: int = CORETAX_EXPORT_CHUNK_SIZE,
+    progress_callback=None,
 ) -> str:
+    """Build the CoreTax file for verified invoices in the period and return its URL.
+
+    Invoices are read ``chunk_size`` at a time with only the mapped columns, and each
+    chunk's parties are fetched in one query. ``progress_callback(done, total)`` is
+    called after every chunk.
+    """
     settings = frappe.get_cached_doc("CoreTax Export Settings", settings_name)
 
     if getattr(settings, "direction", None) and settings.direction != direction:
@@ -559,15 +708,39 @@ def generate_coretax_export(
 
     if direction == "Input":
         filters["ti_verification_status"] = "Verified"
-        invoices = frappe.get_list("Purchase Invoice", filters=filters, fields="*")
+        doctype = "Purchase Invoice"
         party_type = "Supplier"
     else:
         filters["out_fp_status"] = "Verified"
-        invoices = frappe.get_list("Sales Invoice", filters=filters, fields="*")
+        doctype = "Sales Invoice"
         party_type = "Customer"
 
-    headers, rows = generate_coretax_rows(invoices, settings, party_type=party_type)
-    return _serialize_rows(rows, headers, settings.file_format or "CSV", filename)
+    fields = _coretax_export_fields(settings, direction, party_type)
+    party_fields = _coretax_party_fields(settings)
+    party_field = _coretax_party_field(party_type)
+    total = frappe.db.count(doctype, filters) if progress_callback else 0
+    headers = [mapping.label or mapping.source for mapping in settings.column_mappings]
+
+    def rows():
+        parties: dict[str, dict] = {}
+        fetched: set[str] = set()
+        done = 0
+        for chunk in _iter_coretax_invoices(doctype, filters, fields, chunk_size):
+            missing = {getattr(inv, party_field, None) for inv in chunk} - fetched
+            parties.update(_prefetch_parties(party_type, missing, party_fields))
+            fetched |= missing
+            yield from generate_coretax_rows(chunk, settings, party_type=party_type, parties=parties)[1]
+            done += len(chunk)
+            if progress_callback:
+                progress_callback(done, max(total, done))
+
+    return _serialize_rows(
+        rows(),
+        headers,
+        settings.file_format or "CSV",
+        filename,
+        max_rows_per_file=cint(getattr(settings, "max_rows_per_file", 0)),
+    )
 
 
 def compute_tax_totals(company: str, date_from: date | str | None, date_to: date | str | None) -> dict:
@@ -825,6 +998,68 @@ def create_vat_netting_entry(
     return je.name
 
 
+VAT_OUT_ITEM_CHUNK_SIZE = 1000
+
+
+def _get_item_descriptions(invoice_names: list[str]) -> dict[str, str]:
+    """Comma-joined item names per Sales Invoice, in item order, from one query per chunk.
+
+    Chunked ``IN`` lookups are used instead of ``GROUP_CONCAT`` so long item lists are
+    not cut at ``group_concat_max_len``.
+    """
+    descriptions: dict[str, list[str]] = {}
+    for start in range(0, len(invoice_names), VAT_OUT_ITEM_CHUNK_SIZE):
+        chunk = tuple(invoice_names[start:start + VAT_OUT_ITEM_CHUNK_SIZE])
+        items = frappe.db.sql(
+            """
+            select parent, item_name, item_code
+            from `tabSales Invoice Item`
+            where parenttype = 'Sales Invoice' and parent in %(names)s
+            order by parent, idx
+            """,
+            {"names": chunk},
+            as_dict=True,
+        )
+        for item in items:
+            descriptions.setdefault(item.parent, []).append(item.item_name or item.item_code)
+
+    return {name: ", ".join(filter(None, names)) for name, names in descriptions.items()}
+
+
+def _iter_vat_out_detail_rows(groups_map: dict) -> Iterable[list[object]]:
+    """DetailFaktur rows (1 per invoice), fetching item descriptions a chunk of invoices at a time."""
+    invoices = [inv for gid in sorted(groups_map) for inv in groups_map[gid]["invoices"]]
+    for start in range(0, len(invoices), VAT_OUT_ITEM_CHUNK_SIZE):
+        chunk = invoices[start:start + VAT_OUT_ITEM_CHUNK_SIZE]
+        descriptions = _get_item_descriptions([inv.name for inv in chunk])
+        for inv in chunk:
+            yield [
+                inv.out_fp_group_id or 0,
+                inv.name,
+                inv.posting_date,
+                descriptions.get(inv.name, ""),
+                inv.out_fp_dpp or 0,
+                inv.out_fp_ppn or 0,
+                inv.grand_total,
+            ]
+
+
+def _write_xlsx_streaming(path: str, sheets: list[tuple[str, list[str], Iterable[list[object]]]]) -> None:
+    """Write ``(sheet name, headers, rows)`` sheets with openpyxl's write-only mode.
+
+    Rows are flushed to disk as they are appended, so the workbook is never held in memory.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, headers, rows in sheets:
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(headers)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
 def generate_vat_out_batch_excel(
     batch_name: str,
     *,
@@ -870,60 +1105,27 @@ def generate_vat_out_batch_excel(
         groups_map[gid]["total_ppn"] += inv.out_fp_ppn or 0
         groups_map[gid]["invoices"].append(inv)
 
-    # Build data structure
     # Faktur sheet: 1 row per group
-    faktur_data = []
-    for gid in sorted(groups_map.keys()):
-        group = groups_map[gid]
-
-        faktur_row = {
-            "Group ID": group["group_id"],
-            "Customer": group["customer_name"] or group["customer"],
-            "Customer NPWP": group["customer_npwp"] or "",
-            "Total DPP": group["total_dpp"],
-            "Total PPN": group["total_ppn"],
-        }
-
-        if include_fp_numbers:
-            faktur_row["FP No Seri"] = group["fp_no_seri"]
-            faktur_row["FP No Faktur"] = group["fp_no_faktur"]
-            faktur_row["FP Date"] = group["fp_date"]
-
-        faktur_data.append(faktur_row)
+    faktur_headers = ["Group ID", "Customer", "Customer NPWP", "Total DPP", "Total PPN"]
+    if include_fp_numbers:
+        faktur_headers += ["FP No Seri", "FP No Faktur", "FP Date"]
+
+    def faktur_rows():
+        for gid in sorted(groups_map.keys()):
+            group = groups_map[gid]
+            row = [
+                group["group_id"],
+                group["customer_name"] or group["customer"],
+                group["customer_npwp"] or "",
+                group["total_dpp"],
+                group["total_ppn"],
+            ]
+            if include_fp_numbers:
+                row += [group["fp_no_seri"], group["fp_no_faktur"], group["fp_date"]]
+            yield row
 
     # DetailFaktur sheet: 1 row per invoice
-    detail_data = []
-    for gid in sorted(groups_map.keys()):
-        group = groups_map[gid]
-
-        for inv in group["invoices"]:
-            # Get item descriptions
-            si_doc = frappe.get_doc("Sales Invoice", inv.name)
-            item_desc = ", ".join([
-                item.item_name or item.item_code
-                for item in si_doc.items
-            ])
-
-            detail_row = {
-                "Group ID": group["group_id"],
-                "Sales Invoice": inv.name,
-                "Invoice Date": inv.posting_date,
-                "Item Description": item_desc,
-                "DPP": inv.out_fp_dpp or 0,
-                "PPN": inv.out_fp_ppn or 0,
-                "Grand Total": inv.grand_total
-            }
-
-            detail_data.append(detail_row)
-
-    # Create Excel file
-    from frappe.utils.xlsxutils import make_xlsx
-
-    # Prepare sheets
-    sheets = {
-        "Faktur": faktur_data,
-        "DetailFaktur": detail_data
-    }
+    detail_headers = ["Group ID", "Sales Invoice", "Invoice Date", "Item Description", "DPP", "PPN", "Grand Total"]
 
     # Generate filename
     if for_upload:
@@ -931,17 +1133,20 @@ def generate_vat_out_batch_excel(
     else:
         filename = f"reconciliation-vat-out-{batch.company}-{batch.date_from}-{batch.date_to}"
 
-    # Create XLSX
-    xlsx_data = {}
-    for sheet_name, data in sheets.items():
-        if data:
-            headers = list(data[0].keys())
-            rows = [[row[h] for h in headers] for row in data]
-            xlsx_data[sheet_name] = {"columns": headers, "data": rows}
-
-    # Serialize
-    xlsx_file = make_xlsx(xlsx_data, sheet_name="Faktur")
-    filedata = xlsx_file.getvalue()
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        _write_xlsx_streaming(
+            path,
+            [
+                ("Faktur", faktur_headers, faktur_rows()),
+                ("DetailFaktur", detail_headers, _iter_vat_out_detail_rows(groups_map)),
+            ],
+        )
+        with open(path, "rb") as handle:
+            filedata = handle.read()
+    finally:
+        os.remove(path)
 
     # Save as File
     file_doc = frappe.get_doc({
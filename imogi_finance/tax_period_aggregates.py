@@ -0,0 +1,496 @@
+"""Per-day tax aggregates backing incremental Tax Period Closing snapshots.
+
+Each day and company gets one ``Tax Daily Aggregate`` row for Input VAT and Output
+VAT (invoice count and GL tax, same rules as the verified registers) and one row per
+tracked tax account (PPh, PB1, BPJS, PPN Input) with GL debit/credit totals. A period
+snapshot is the roll-up of those rows; days without rows are recomputed and stored
+first (the delta). Voucher doc_events (invoices, Payment Entry, Journal Entry, Expense
+Claim) delete the rows of the posting day once per voucher, so the next refresh
+recomputes only the days that changed.
+
+Every row also stores the day's GL watermark (entry count and latest ``modified`` of
+the GL Entries on the VAT and tracked accounts), read before the totals. A day whose
+live watermark differs is recomputed, which covers postings by any other voucher type
+(Repost Accounting Ledger, Asset, ...) and vouchers committed while the day was being
+computed.
+
+The Input VAT carry-forward is cached as a ``Balance`` row for the day before the
+period and cleared by any posting on or before that day.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import date, timedelta
+
+import frappe
+from frappe.utils import flt, getdate
+
+AGGREGATE_DOCTYPE = "Tax Daily Aggregate"
+
+INPUT_VAT = "Input VAT"
+OUTPUT_VAT = "Output VAT"
+ACCOUNT = "Account"
+BALANCE = "Balance"
+
+# Snapshot values compared by verify_register_snapshot.
+VERIFIED_KEYS = (
+    "input_vat_total",
+    "input_vat_carry_forward",
+    "effective_input_vat",
+    "output_vat_total",
+    "vat_net",
+    "pph_total",
+    "pb1_total",
+    "bpjs_total",
+    "input_invoice_count",
+    "output_invoice_count",
+    "withholding_entry_count",
+)
+VERIFY_TOLERANCE = 0.005
+
+
+def aggregate_key(company, posting_date, component, account=None) -> str:
+    raw = "\x1f".join(str(value or "") for value in (company, posting_date, component, account))
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def is_enabled() -> bool:
+    """Aggregates are used once the DocType table exists (i.e. after migrate)."""
+    db = getattr(frappe, "db", None)
+    table_exists = getattr(db, "table_exists", None)
+    if not callable(table_exists):
+        return False
+    try:
+        return bool(table_exists(AGGREGATE_DOCTYPE))
+    except Exception:
+        return False
+
+
+def _iter_days(date_from: date, date_to: date):
+    day = date_from
+    while day <= date_to:
+        yield day
+        day += timedelta(days=1)
+
+
+def get_tracked_accounts(profile) -> dict:
+    """Tax Profile accounts whose daily GL totals are aggregated, grouped by purpose."""
+    pph_accounts = [
+        row.payable_account for row in getattr(profile, "pph_accounts", []) or [] if row.payable_account
+    ]
+
+    pb1_accounts = {}
+    if getattr(profile, "enable_pb1_multi_branch", 0) and getattr(profile, "pb1_account_mappings", None):
+        for mapping in profile.pb1_account_mappings or []:
+            branch = getattr(mapping, "branch", None)
+            account = getattr(mapping, "pb1_payable_account", None)
+            if branch and account:
+                pb1_accounts[branch] = account
+
+        # Default account is reported separately when no mapping covers it
+        default_account = getattr(profile, "pb1_payable_account", None)
+        mapped_accounts = {getattr(m, "pb1_payable_account", None) for m in profile.pb1_account_mappings or []}
+        if default_account and default_account not in mapped_accounts:
+            pb1_accounts["_default"] = default_account
+    elif getattr(profile, "pb1_payable_account", None):
+        pb1_accounts[None] = profile.pb1_payable_account
+
+    bpjs_account = getattr(profile, "bpjs_payable_account", None)
+
+    return {
+        "pph": pph_accounts,
+        "pb1": pb1_accounts,
+        "bpjs": bpjs_account,
+        "ppn_input": getattr(profile, "ppn_input_account", None),
+    }
+
+
+def _account_set(tracked: dict) -> set[str]:
+    accounts = set(tracked["pph"]) | set(tracked["pb1"].values())
+    accounts.update(account for account in (tracked["bpjs"], tracked["ppn_input"]) if account)
+    return accounts
+
+
+def _watermark_accounts(ppn_accounts: tuple[str, str], accounts: set[str]) -> set[str]:
+    return set(accounts) | {account for account in ppn_accounts if account}
+
+
+def _load_rows(company: str, date_from: date, date_to: date) -> list[dict]:
+    return frappe.get_all(
+        AGGREGATE_DOCTYPE,
+        filters={
+            "company": company,
+            "component": ("in", [INPUT_VAT, OUTPUT_VAT, ACCOUNT]),
+            "posting_date": ("between", [date_from, date_to]),
+        },
+        fields=[
+            "posting_date", "component", "account", "document_count", "amount", "debit", "credit", "gl_watermark",
+        ],
+    )
+
+
+def _fetch_gl_watermarks(company: str, accounts: set[str], date_from: date, date_to: date) -> dict[date, str]:
+    """``"<entry count>:<latest modified>"`` of the GL Entries on ``accounts`` per day; one grouped query.
+
+    Counts include cancelled entries: a cancellation adds reverse entries and updates
+    the originals, so it changes the watermark as well.
+    """
+    if not accounts:
+        return {}
+
+    rows = frappe.db.sql(
+        """
+        select posting_date, count(*) as entry_count, max(modified) as last_modified
+        from `tabGL Entry`
+        where company = %(company)s
+            and account in %(accounts)s
+            and posting_date between %(date_from)s and %(date_to)s
+        group by posting_date
+        """,
+        {"company": company, "accounts": tuple(sorted(accounts)), "date_from": date_from, "date_to": date_to},
+        as_dict=True,
+    ) or []
+    return {
+        getdate(row.get("posting_date")): f"{int(row.get('entry_count') or 0)}:{row.get('last_modified')}"
+        for row in rows
+    }
+
+
+def _complete_days(
+    rows: list[dict], ppn_accounts: tuple[str, str], accounts: set[str], watermarks: dict[date, str]
+) -> set[date]:
+    """Days whose stored rows cover every current account and match the day's GL watermark."""
+    input_account, output_account = ppn_accounts
+    per_day: dict[date, set] = {}
+    stale: set[date] = set()
+    for row in rows:
+        day = getdate(row.get("posting_date"))
+        per_day.setdefault(day, set()).add((row.get("component"), row.get("account")))
+        if (row.get("gl_watermark") or "") != watermarks.get(day, ""):
+            stale.add(day)
+
+    required = {(INPUT_VAT, input_account), (OUTPUT_VAT, output_account)}
+    required.update((ACCOUNT, account) for account in accounts)
+    return {day for day, keys in per_day.items() if required <= keys and day not in stale}
+
+
+def _fetch_account_totals(company: str, accounts: set[str], days: list[date]) -> dict:
+    if not accounts or not days:
+        return {}
+
+    rows = frappe.db.sql(
+        """
+        select posting_date, account, count(*) as entry_count,
+            coalesce(sum(debit), 0) as debit, coalesce(sum(credit), 0) as credit
+        from `tabGL Entry`
+        where company = %(company)s
+            and is_cancelled = 0
+            and account in %(accounts)s
+            and posting_date in %(days)s
+        group by posting_date, account
+        """,
+        {"company": company, "accounts": tuple(sorted(accounts)), "days": tuple(days)},
+        as_dict=True,
+    ) or []
+    return {(getdate(row.get("posting_date")), row.get("account")): row for row in rows}
+
+
+def _fetch_vat_totals(company: str, doctype: str, tax_account: str, days: list[date]) -> dict:
+    from imogi_finance.imogi_finance.utils.tax_report_utils import get_invoice_register_daily_totals
+
+    is_input = doctype == "Purchase Invoice"
+    totals = get_invoice_register_daily_totals(
+        doctype,
+        tax_account,
+        # No verification filter: Tax Period Closing captures all submitted invoices.
+        {"company": company, "from_date": min(days), "to_date": max(days), "verification_status": None},
+        party_field="supplier" if is_input else "customer",
+        dpp_field="ti_fp_dpp" if is_input else "out_fp_dpp",
+        status_field="ti_verification_status" if is_input else "out_fp_status",
+        absolute_tax=is_input,
+    )
+    wanted = set(days)
+    return {day: value for day, value in totals.items() if day in wanted}
+
+
+def compute_days(
+    company: str,
+    days: list[date],
+    ppn_accounts: tuple[str, str],
+    accounts: set[str],
+    watermarks: dict[date, str] | None = None,
+) -> list[dict]:
+    """Recompute and store the aggregate rows of ``days``; returns the new rows.
+
+    ``watermarks`` must be read before this call, so a voucher committed while the
+    totals are read leaves a stale watermark behind and the day is recomputed later.
+    """
+    days = sorted(set(days))
+    if not days:
+        return []
+    if watermarks is None:
+        watermarks = _fetch_gl_watermarks(company, _watermark_accounts(ppn_accounts, accounts), days[0], days[-1])
+
+    input_account, output_account = ppn_accounts
+    input_totals = _fetch_vat_totals(company, "Purchase Invoice", input_account, days)
+    output_totals = _fetch_vat_totals(company, "Sales Invoice", output_account, days)
+    account_totals = _fetch_account_totals(company, accounts, days)
+
+    rows = []
+    for day in days:
+        for component, account, totals in (
+            (INPUT_VAT, input_account, input_totals.get(day) or {}),
+            (OUTPUT_VAT, output_account, output_totals.get(day) or {}),
+        ):
+            rows.append({
+                "posting_date": day,
+                "component": component,
+                "account": account,
+                "document_count": totals.get("invoice_count", 0),
+                "amount": flt(totals.get("total_ppn")),
+                "debit": 0.0,
+                "credit": 0.0,
+                "gl_watermark": watermarks.get(day, ""),
+            })
+        for account in sorted(accounts):
+            totals = account_totals.get((day, account)) or {}
+            rows.append({
+                "posting_date": day,
+                "component": ACCOUNT,
+                "account": account,
+                "document_count": int(totals.get("entry_count") or 0),
+                "amount": flt(totals.get("credit")) - flt(totals.get("debit")),
+                "debit": flt(totals.get("debit")),
+                "credit": flt(totals.get("credit")),
+                "gl_watermark": watermarks.get(day, ""),
+            })
+
+    frappe.db.delete(
+        AGGREGATE_DOCTYPE,
+        {"company": company, "component": ("in", [INPUT_VAT, OUTPUT_VAT, ACCOUNT]), "posting_date": ("in", days)},
+    )
+    _insert_rows(company, rows)
+    return rows
+
+
+def _insert_rows(company: str, rows: list[dict]) -> None:
+    if not rows:
+        return
+
+    now = frappe.utils.now_datetime()
+    user = getattr(getattr(frappe, "session", None), "user", None) or "Administrator"
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by",
+        "company", "posting_date", "component", "account", "document_count", "amount", "debit", "credit",
+        "gl_watermark",
+    ]
+    values = [
+        (aggregate_key(company, row["posting_date"], row["component"], row["account"]), now, now, user, user,
+         company, row["posting_date"], row["component"], row["account"], row["document_count"],
+         row["amount"], row["debit"], row["credit"], row.get("gl_watermark"))
+        for row in rows
+    ]
+    frappe.db.bulk_insert(AGGREGATE_DOCTYPE, fields=fields, values=values, ignore_duplicates=True)
+
+
+def get_period_rows(
+    company: str, date_from, date_to, ppn_accounts: tuple[str, str], accounts: set[str]
+) -> tuple[list[dict], list[date]]:
+    """Stored rows of the period plus freshly computed rows for missing or stale days.
+
+    Returns ``(rows, recomputed_days)``.
+    """
+    date_from, date_to = getdate(date_from), getdate(date_to)
+    watermarks = _fetch_gl_watermarks(company, _watermark_accounts(ppn_accounts, accounts), date_from, date_to)
+    rows = _load_rows(company, date_from, date_to)
+    complete = _complete_days(rows, ppn_accounts, accounts, watermarks)
+    missing = [day for day in _iter_days(date_from, date_to) if day not in complete]
+    if not missing:
+        return rows, []
+
+    # Rows of incomplete days are replaced wholesale by the recompute.
+    missing_set = set(missing)
+    rows = [row for row in rows if getdate(row.get("posting_date")) not in missing_set]
+    rows.extend(compute_days(company, missing, ppn_accounts, accounts, watermarks))
+    return rows, missing
+
+
+def get_input_vat_balance(company: str, input_account: str, as_of_date) -> float:
+    """Net debit balance of the Input VAT account up to ``as_of_date``, cached per day."""
+    as_of_date = getdate(as_of_date)
+    name = aggregate_key(company, as_of_date, BALANCE, input_account)
+    cached = frappe.db.get_value(AGGREGATE_DOCTYPE, name, "amount")
+    if cached is not None:
+        return flt(cached)
+
+    aggregates = frappe.get_all(
+        "GL Entry",
+        filters=[
+            ["company", "=", company],
+            ["account", "=", input_account],
+            ["is_cancelled", "=", 0],
+            ["posting_date", "<=", as_of_date],
+        ],
+        fields=["sum(debit) as debit_total", "sum(credit) as credit_total"],
+    )
+    totals = aggregates[0] if aggregates else {}
+    debit, credit = flt(totals.get("debit_total")), flt(totals.get("credit_total"))
+    _insert_rows(company, [{
+        "posting_date": as_of_date,
+        "component": BALANCE,
+        "account": input_account,
+        "document_count": 0,
+        "amount": debit - credit,
+        "debit": debit,
+        "credit": credit,
+    }])
+    return debit - credit
+
+
+def build_snapshot(company: str, date_from, date_to, profile) -> dict | None:
+    """Tax Period Closing snapshot rolled up from daily aggregates.
+
+    Returns the same structure as ``tax_operations.build_register_snapshot``, or None
+    when aggregates do not apply (table missing, open-ended period, incomplete Tax
+    Profile) so the caller falls back to the full register recompute.
+    """
+    if not date_from or not date_to or not is_enabled():
+        return None
+
+    from imogi_finance.settings.utils import get_ppn_accounts
+
+    try:
+        ppn_accounts = get_ppn_accounts(company)
+    except Exception:
+        return None
+
+    tracked = get_tracked_accounts(profile)
+    if not tracked["pph"]:
+        # The Withholding register falls back to validated profile accounts or fails.
+        return None
+
+    rows, recomputed = get_period_rows(company, date_from, date_to, ppn_accounts, _account_set(tracked))
+
+    input_total = output_total = 0.0
+    input_count = output_count = 0
+    by_account: dict[str, dict] = {}
+    for row in rows:
+        component = row.get("component")
+        if component == INPUT_VAT:
+            input_total += flt(row.get("amount"))
+            input_count += int(row.get("document_count") or 0)
+        elif component == OUTPUT_VAT:
+            output_total += flt(row.get("amount"))
+            output_count += int(row.get("document_count") or 0)
+        elif component == ACCOUNT:
+            totals = by_account.setdefault(row.get("account"), {"amount": 0.0, "count": 0})
+            totals["amount"] += flt(row.get("amount"))
+            totals["count"] += int(row.get("document_count") or 0)
+
+    withholding_by_account = {
+        account: by_account[account]["amount"]
+        for account in tracked["pph"]
+        if by_account.get(account, {}).get("count")
+    }
+    pph_total = sum(withholding_by_account.values())
+    withholding_count = sum(by_account.get(account, {}).get("count", 0) for account in set(tracked["pph"]))
+
+    pb1_breakdown = {}
+    pb1_total = 0.0
+    for branch, account in tracked["pb1"].items():
+        amount = by_account.get(account, {}).get("amount", 0.0)
+        if branch is not None:
+            pb1_breakdown[branch] = amount
+        pb1_total += amount
+
+    bpjs_total = by_account.get(tracked["bpjs"], {}).get("amount", 0.0) if tracked["bpjs"] else 0.0
+
+    input_vat_carry_forward = 0.0
+    if tracked["ppn_input"]:
+        balance = get_input_vat_balance(company, tracked["ppn_input"], getdate(date_from) - timedelta(days=1))
+        input_vat_carry_forward = max(balance, 0.0)
+
+    effective_input_vat = input_total + input_vat_carry_forward
+    register_net = output_total - input_total
+
+    snapshot = {
+        "input_vat_total": input_total,
+        "input_vat_carry_forward": input_vat_carry_forward,
+        "effective_input_vat": effective_input_vat,
+        "output_vat_total": output_total,
+        "vat_net": output_total - effective_input_vat,
+        "pph_total": pph_total,
+        "pb1_total": pb1_total,
+        "bpjs_total": bpjs_total,
+        "input_invoice_count": input_count,
+        "output_invoice_count": output_count,
+        "withholding_entry_count": withholding_count,
+        "verification_status": None,
+        "vat_net_direction": "payable" if register_net > 0 else "receivable" if register_net < 0 else "zero",
+        "withholding_by_account": withholding_by_account,
+        "meta": {
+            "company": company,
+            "date_from": str(date_from),
+            "date_to": str(date_to),
+            "profile": profile.name,
+            "generated_at": frappe.utils.now(),
+            "generated_by": getattr(getattr(frappe, "session", None), "user", None),
+            "data_source": "daily_aggregates",
+            "register_version": "v15+",
+            "recomputed_days": len(recomputed),
+        },
+    }
+
+    if pb1_breakdown:
+        snapshot["pb1_breakdown"] = pb1_breakdown
+
+    return snapshot
+
+
+def verify_register_snapshot(company: str, date_from, date_to) -> dict:
+    """Diff the daily-aggregate roll-up against a full register recompute."""
+    from imogi_finance.tax_operations import _get_tax_profile, build_register_snapshot
+
+    incremental = build_snapshot(company, date_from, date_to, _get_tax_profile(company))
+    full = build_register_snapshot(company, date_from, date_to, use_daily_aggregates=False)
+    if incremental is None:
+        return {"matches": None, "differences": {}, "full": full, "incremental": None}
+
+    differences = {}
+    for key in VERIFIED_KEYS:
+        if abs(flt(incremental.get(key)) - flt(full.get(key))) > VERIFY_TOLERANCE:
+            differences[key] = {"incremental": incremental.get(key), "full": full.get(key)}
+
+    for key in ("withholding_by_account", "pb1_breakdown"):
+        left, right = incremental.get(key) or {}, full.get(key) or {}
+        for name in set(left) | set(right):
+            if abs(flt(left.get(name)) - flt(right.get(name))) > VERIFY_TOLERANCE:
+                differences[f"{key}.{name}"] = {"incremental": left.get(name), "full": right.get(name)}
+
+    return {"matches": not differences, "differences": differences, "full": full, "incremental": incremental}
+
+
+def invalidate_day(company: str | None, posting_date) -> None:
+    """Delete the aggregates of ``posting_date`` and carry-forward balances from that day on."""
+    posting_date = getdate(posting_date) if posting_date else None
+    if not company or not posting_date or not is_enabled():
+        return
+
+    frappe.db.delete(
+        AGGREGATE_DOCTYPE,
+        {"company": company, "component": ("in", [INPUT_VAT, OUTPUT_VAT, ACCOUNT]), "posting_date": posting_date},
+    )
+    frappe.db.delete(
+        AGGREGATE_DOCTYPE,
+        {"company": company, "component": BALANCE, "posting_date": (">=", posting_date)},
+    )
+
+
+def invalidate_for_voucher(doc, method=None) -> None:
+    """doc_events hook: an invoice/voucher was submitted or cancelled.
+
+    Hooked per voucher rather than per GL Entry row, so a many-line voucher clears its
+    day once; ERPNext cancels by posting reverse entries without GL Entry events anyway.
+    """
+    invalidate_day(getattr(doc, "company", None), getattr(doc, "posting_date", None))
@@ -0,0 +1,250 @@
+import sys
+import types
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+
+from imogi_finance.budget_control import availability, ledger, utils  # noqa: E402
+
+
+class _CountingDB:
+    """In-memory stand-in for frappe.db that records every round trip."""
+
+    def __init__(self, budgets, gl_rows, bce_rows):
+        self.budgets = budgets
+        self.gl_rows = gl_rows
+        self.bce_rows = bce_rows
+        self.queries = 0
+        self.params = []
+
+    def sql(self, query, params=None, as_dict=False):
+        self.queries += 1
+        self.params.append(params)
+        if "`tabBudget`" in query:
+            return list(self.budgets)
+        if "`tabGL Entry`" in query:
+            return list(self.gl_rows)
+        if "`tabBudget Control Entry`" in query:
+            return list(self.bce_rows)
+        return []
+
+    def get_value(self, doctype, name, fields=None, as_dict=False):
+        self.queries += 1
+        return {"year_start_date": "2024-01-01", "year_end_date": "2024-12-31"}
+
+
+def _build_scope(cost_center_count, account_count):
+    budgets, gl_rows, bce_rows = [], [], []
+    for cc_idx in range(cost_center_count):
+        cost_center = f"CC-{cc_idx}"
+        for acc_idx in range(account_count):
+            account = f"5{acc_idx:03d}"
+            budgets.append(
+                {
+                    "budget": f"BUD-{cc_idx}",
+                    "cost_center": cost_center,
+                    "docstatus": 1,
+                    "account": account,
+                    "budget_amount": 1000,
+                }
+            )
+            gl_rows.append({"cost_center": cost_center, "account": account, "balance": 100})
+            bce_rows.extend(
+                [
+                    {"cost_center": cost_center, "account": account, "entry_type": "RESERVATION", "direction": "OUT", "amount": 300},
+                    {"cost_center": cost_center, "account": account, "entry_type": "CONSUMPTION", "direction": "IN", "amount": 50},
+                    {"cost_center": cost_center, "account": account, "entry_type": "SUPPLEMENT", "direction": "IN", "amount": 20},
+                ]
+            )
+    return _CountingDB(budgets, gl_rows, bce_rows)
+
+
+@pytest.mark.parametrize("cost_centers, accounts", [(1, 1), (10, 5), (300, 40)])
+def test_availability_map_query_count_is_constant(monkeypatch, cost_centers, accounts):
+    db = _build_scope(cost_centers, accounts)
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+
+    rows = availability.get_availability_map("TC", "2024", submitted_only=True)
+
+    assert len(rows) == cost_centers * accounts
+    # Budget + Budget Account, Fiscal Year, GL Entry, Budget Control Entry.
+    assert db.queries == 4
+
+
+def test_availability_map_computes_reserved_and_breakdown(monkeypatch):
+    monkeypatch.setattr(frappe, "db", _build_scope(2, 2), raising=False)
+
+    row = availability.get_availability_map("TC", "2024")[("CC-1", "5001")]
+
+    assert row.allocated == pytest.approx(1000)
+    assert row.actual == pytest.approx(100)
+    assert row.reserved == pytest.approx(250)
+    assert row.available == pytest.approx(650)
+    assert row.breakdown["reservation"] == pytest.approx(300)
+    assert row.breakdown["consumption"] == pytest.approx(-50)
+    assert row.breakdown["supplement"] == pytest.approx(-20)
+
+
+def _install_get_all(monkeypatch, db):
+    """``frappe.get_all`` over ``db.budgets`` for the single-dimension Budget lookups."""
+    calls = []
+
+    def _get_all(doctype, filters=None, fields=None, limit=None):
+        calls.append((doctype, dict(filters)))
+        if doctype == "Budget":
+            budgets = {
+                row["budget"]: {"name": row["budget"], "cost_center": row["cost_center"]}
+                for row in db.budgets
+                if filters.get("cost_center") in (None, row["cost_center"])
+            }
+            return list(budgets.values())
+        return [
+            {"name": row["budget"], "budget_amount": row["budget_amount"]}
+            for row in db.budgets
+            if row["budget"] == filters["parent"] and row["account"] == filters["account"]
+        ][:limit]
+
+    monkeypatch.setattr(frappe, "get_all", _get_all, raising=False)
+    return calls
+
+
+def test_get_availability_reads_only_the_requested_dimension(monkeypatch):
+    db = _build_scope(3, 3)
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    # Only the requested dimension's usage rows match the narrowed GL / control queries.
+    db.gl_rows = [row for row in db.gl_rows if row["cost_center"] == "CC-2" and row["account"] == "5000"]
+    db.bce_rows = [row for row in db.bce_rows if row["cost_center"] == "CC-2" and row["account"] == "5000"]
+    calls = _install_get_all(monkeypatch, db)
+    dims = utils.Dimensions(company="TC", fiscal_year="2024", cost_center="CC-2", account="5000")
+
+    snapshot = ledger.get_availability(dims)
+
+    assert snapshot == {"allocated": 1000.0, "actual": 100.0, "reserved": 250.0, "available": 650.0}
+    assert calls == [
+        ("Budget", {"company": "TC", "fiscal_year": "2024", "cost_center": "CC-2"}),
+        ("Budget Account", {"parent": "BUD-2", "account": "5000"}),
+    ]
+    usage_params = [params for params in db.params if params and "cost_centers" in params]
+    assert len(usage_params) == 2
+    assert all(p["cost_centers"] == ("CC-2",) and p["accounts"] == ("5000",) for p in usage_params)
+
+
+def test_single_company_budget_is_used_when_cost_center_has_none(monkeypatch):
+    db = _CountingDB(
+        [{"budget": "BUD-ALL", "cost_center": None, "docstatus": 1, "account": "5000", "budget_amount": 500}],
+        [],
+        [],
+    )
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    _install_get_all(monkeypatch, db)
+    dims = utils.Dimensions(company="TC", fiscal_year="2024", cost_center="CC-X", account="5000")
+
+    assert ledger.get_availability(dims)["allocated"] == pytest.approx(500)
+
+
+def _lock_enabled(monkeypatch):
+    settings = utils.DEFAULT_SETTINGS.copy()
+    settings["enable_budget_lock"] = 1
+    monkeypatch.setattr(ledger, "get_settings", lambda: settings)
+
+
+def test_batch_check_uses_constant_queries_for_many_slices(monkeypatch):
+    _lock_enabled(monkeypatch)
+    db = _build_scope(60, 1)
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    slices = [
+        (utils.Dimensions(company="TC", fiscal_year="2024", cost_center=f"CC-{idx}", account="5000"), 100)
+        for idx in range(60)
+    ]
+
+    results = ledger.check_budget_available_batch(slices)
+
+    assert len(results) == 60
+    assert all(result["ok"] for result in results)
+    assert db.queries == 4
+
+
+def test_batch_check_validates_duplicate_slices_together(monkeypatch):
+    _lock_enabled(monkeypatch)
+    monkeypatch.setattr(frappe, "db", _build_scope(1, 1), raising=False)
+    dims = utils.Dimensions(company="TC", fiscal_year="2024", cost_center="CC-0", account="5000")
+
+    # 650 available; each slice fits alone but not combined.
+    results = ledger.check_budget_available_batch([(dims, 400), (dims, 400)])
+
+    assert [result["ok"] for result in results] == [False, False]
+
+
+def test_batch_check_bypasses_dimensions_without_budget(monkeypatch):
+    _lock_enabled(monkeypatch)
+    monkeypatch.setattr(frappe, "db", _CountingDB([], [], []), raising=False)
+    dims = utils.Dimensions(company="TC", fiscal_year="2024", cost_center="CC-0", account="5000")
+
+    (result,) = ledger.check_budget_available_batch([(dims, 10_000)])
+
+    assert result["ok"] is True
+    assert result["available"] is None
+
+
+def _install_entry_naming(monkeypatch):
+    naming = sys.modules.setdefault("frappe.model.naming", types.ModuleType("frappe.model.naming"))
+    series = []
+
+    def _make_autoname(key, doctype=None):
+        series.append((key, doctype))
+        return "BCE-2024-{0:05d}".format(41 + len(series))
+
+    monkeypatch.setattr(naming, "make_autoname", _make_autoname, raising=False)
+    monkeypatch.setattr(
+        frappe, "get_meta", lambda doctype: types.SimpleNamespace(autoname="BCE-.YYYY.-.#####"), raising=False
+    )
+    return series
+
+
+def test_post_entries_inserts_all_rows_in_one_statement(monkeypatch):
+    _lock_enabled(monkeypatch)
+    series = _install_entry_naming(monkeypatch)
+    inserts = []
+
+    class _InsertDB:
+        def bulk_insert(self, doctype, fields, values):
+            inserts.append((doctype, fields, values))
+
+    monkeypatch.setattr(frappe, "db", _InsertDB(), raising=False)
+    monkeypatch.setattr(frappe, "utils", types.SimpleNamespace(now_datetime=lambda: "2024-01-01 00:00:00"), raising=False)
+    slices = [
+        (utils.Dimensions(company="TC", fiscal_year="2024", cost_center=f"CC-{idx}", account="5000"), 10 + idx)
+        for idx in range(3)
+    ]
+
+    names = ledger.post_entries("RESERVATION", slices, "OUT", ref_doctype="Expense Request", ref_name="ER-1")
+
+    assert len(inserts) == 1
+    assert names == ["BCE-2024-00042", "BCE-2024-00043", "BCE-2024-00044"]
+    assert series == [("BCE-.YYYY.-.#####", "Budget Control Entry")] * 3
+    doctype, fields, values = inserts[0]
+    assert doctype == "Budget Control Entry"
+    assert [row[fields.index("amount")] for row in values] == [10.0, 11.0, 12.0]
+    assert all(row[fields.index("docstatus")] == 1 for row in values)
+
+
+def test_post_entries_rejects_invalid_combination(monkeypatch):
+    _lock_enabled(monkeypatch)
+    series = _install_entry_naming(monkeypatch)
+
+    class _Thrown(Exception):
+        pass
+
+    def _throw(msg, *args, **kwargs):
+        raise _Thrown(msg)
+
+    monkeypatch.setattr(frappe, "throw", _throw, raising=False)
+    monkeypatch.setattr(frappe, "db", types.SimpleNamespace(), raising=False)
+    dims = utils.Dimensions(company="TC", fiscal_year="2024", cost_center="CC-0", account="5000")
+
+    with pytest.raises(_Thrown, match="Invalid combination: CONSUMPTION must have direction IN"):
+        ledger.post_entries("CONSUMPTION", [(dims, 10)], "OUT", ref_doctype="Expense Request", ref_name="ER-1")
+    assert series == []
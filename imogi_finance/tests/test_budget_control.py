@@ -250,8 +250,20 @@ def test_reserve_budget_for_request(monkeypatch):
     posted = []
     monkeypatch.setattr(utils, "resolve_company_from_cost_center", lambda cc: "TC", raising=False)
     monkeypatch.setattr(utils, "resolve_fiscal_year", lambda fy: "2024", raising=False)
-    monkeypatch.setattr(service, "check_budget_available", lambda dims, amount: service.BudgetCheckResult(True, "ok", available=1000, snapshot={}), raising=False)
-    monkeypatch.setattr(ledger, "post_entry", lambda *args, **kwargs: posted.append({"entry_type": args[0], "amount": args[2]}) or "BCE-1", raising=False)
+    monkeypatch.setattr(
+        service,
+        "check_budget_available_batch",
+        lambda slices, **kw: [service.BudgetCheckResult(True, "ok", available=1000, snapshot={}) for _ in slices],
+        raising=False,
+    )
+    monkeypatch.setattr(
+        ledger,
+        "post_entries",
+        lambda entry_type, rows, direction, **kwargs: [
+            posted.append({"entry_type": entry_type, "amount": amount}) or "BCE-1" for _dims, amount in rows
+        ],
+        raising=False,
+    )
 
     er.db_set = lambda field, value: setattr(er, field, value)
 
@@ -287,7 +299,12 @@ def test_budget_workflow_state_transitions(monkeypatch):
 
     monkeypatch.setattr(utils, "resolve_company_from_cost_center", lambda cc: "TC", raising=False)
     monkeypatch.setattr(utils, "resolve_fiscal_year", lambda fy: "2024", raising=False)
-    monkeypatch.setattr(service, "check_budget_available", lambda dims, amount: service.BudgetCheckResult(True, "ok", available=1000, snapshot={}), raising=False)
+    monkeypatch.setattr(
+        service,
+        "check_budget_available_batch",
+        lambda slices, **kw: [service.BudgetCheckResult(True, "ok", available=1000, snapshot={}) for _ in slices],
+        raising=False,
+    )
     posted = []
 
     def _post_entry(entry_type, dims, amount, direction, **kwargs):
@@ -323,6 +340,14 @@ def test_budget_workflow_state_transitions(monkeypatch):
         return "BCE-LOG"
 
     monkeypatch.setattr(ledger, "post_entry", _post_entry, raising=False)
+    monkeypatch.setattr(
+        ledger,
+        "post_entries",
+        lambda entry_type, rows, direction, **kwargs: [
+            _post_entry(entry_type, dims, amount, direction, **kwargs) for dims, amount in rows
+        ],
+        raising=False,
+    )
 
     def _fake_entries(ref_doctype, ref_name, entry_type=None):
         if ref_doctype == "Purchase Invoice" and (entry_type in {None, "CONSUMPTION"}):
@@ -0,0 +1,136 @@
+import sys
+import types
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+
+from imogi_finance.budget_control import balance, ledger, utils  # noqa: E402
+
+
+class _DuplicateEntryError(Exception):
+    pass
+
+
+class _BalanceDB:
+    """Keeps Budget Control Balance rows in memory and serves the balance queries."""
+
+    def __init__(self, entries=None):
+        self.rows = {}
+        self.entries = entries or []
+
+    def table_exists(self, doctype):
+        return doctype == balance.BALANCE_DOCTYPE
+
+    def exists(self, doctype, name):
+        return name in self.rows
+
+    def sql(self, query, params=None, as_dict=False):
+        params = params or {}
+        if query.strip().startswith("update"):
+            column = query.split("`")[3]
+            self.rows[params["name"]][column] += params["amount"]
+            return []
+        if "`tabBudget Control Entry`" in query:
+            return list(self.entries)
+        if "group by cost_center, account" in query:
+            grouped = {}
+            for row in self.rows.values():
+                if row["company"] != params["company"] or row["fiscal_year"] != params["fiscal_year"]:
+                    continue
+                if params.get("cost_centers") and row["cost_center"] not in params["cost_centers"]:
+                    continue
+                if params.get("accounts") and row["account"] not in params["accounts"]:
+                    continue
+                target = grouped.setdefault(
+                    (row["cost_center"], row["account"]),
+                    {"cost_center": row["cost_center"], "account": row["account"], **dict.fromkeys(balance.BALANCE_COLUMNS.values(), 0.0)},
+                )
+                for column in balance.BALANCE_COLUMNS.values():
+                    target[column] += row.get(column) or 0.0
+            return list(grouped.values())
+        return [{"name": name, **row} for name, row in self.rows.items()]
+
+
+def _install_db(monkeypatch, db):
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    monkeypatch.setattr(frappe, "DuplicateEntryError", _DuplicateEntryError, raising=False)
+    monkeypatch.setattr(
+        frappe,
+        "utils",
+        types.SimpleNamespace(now_datetime=lambda: "2024-01-01 00:00:00", cint=lambda v: int(v or 0)),
+        raising=False,
+    )
+
+    def _get_doc(data):
+        doc = types.SimpleNamespace(**data)
+
+        def _insert(**_kwargs):
+            name = balance.balance_key(*(data.get(field) for field in balance.DIMENSION_FIELDS))
+            row = {field: data.get(field) for field in balance.DIMENSION_FIELDS}
+            row.update({column: data.get(column, 0.0) for column in balance.BALANCE_COLUMNS.values()})
+            db.rows[name] = row
+
+        doc.insert = _insert
+        return doc
+
+    monkeypatch.setattr(frappe, "get_doc", _get_doc, raising=False)
+
+
+def _entry(entry_type, direction, amount, **dims):
+    values = {"company": "TC", "fiscal_year": "2024", "cost_center": "CC-1", "account": "5000"}
+    values.update(dims)
+    return types.SimpleNamespace(entry_type=entry_type, direction=direction, amount=amount, project=None, branch=None, **values)
+
+
+def test_apply_entry_creates_then_increments_balance(monkeypatch):
+    db = _BalanceDB()
+    _install_db(monkeypatch, db)
+
+    balance.apply_entry(_entry("RESERVATION", "OUT", 300))
+    balance.apply_entry(_entry("RESERVATION", "OUT", 200))
+    balance.apply_entry(_entry("CONSUMPTION", "IN", 120))
+
+    (row,) = db.rows.values()
+    assert row["reservation_out"] == pytest.approx(500)
+    assert row["consumption_in"] == pytest.approx(120)
+
+
+def test_cancel_reverses_balance_and_reserved_total_reads_store(monkeypatch):
+    db = _BalanceDB()
+    _install_db(monkeypatch, db)
+
+    reservation = _entry("RESERVATION", "OUT", 400)
+    balance.apply_entry(reservation)
+    balance.apply_entry(_entry("CONSUMPTION", "IN", 100))
+    balance.apply_entry(_entry("RESERVATION", "OUT", 50))
+    balance.apply_entry(_entry("RESERVATION", "OUT", 50), sign=-1)
+
+    dims = utils.Dimensions(company="TC", fiscal_year="2024", cost_center="CC-1", account="5000")
+    assert ledger.get_reserved_total(dims) == pytest.approx(300)
+
+
+def test_verify_balances_reports_drift(monkeypatch):
+    entries = [
+        {"company": "TC", "fiscal_year": "2024", "cost_center": "CC-1", "account": "5000", "project": None,
+         "branch": None, "entry_type": "RESERVATION", "direction": "OUT", "amount": 250},
+    ]
+    db = _BalanceDB(entries)
+    _install_db(monkeypatch, db)
+    balance.apply_entry(_entry("RESERVATION", "OUT", 200))
+
+    mismatches = balance.verify_balances("TC", "2024")
+
+    assert len(mismatches) == 1
+    assert mismatches[0]["differences"]["reservation_out"] == {"expected": 250.0, "stored": 200.0}
+
+
+def test_unknown_combination_is_ignored(monkeypatch):
+    db = _BalanceDB()
+    _install_db(monkeypatch, db)
+
+    balance.apply_entry(_entry("RELEASE", "IN", 100))
+
+    assert db.rows == {}
@@ -0,0 +1,89 @@
+import sys
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+
+from imogi_finance.budget_control import dimension_cache, utils  # noqa: E402
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = value
+
+    def delete_value(self, name):
+        self.hashes.pop(name, None)
+
+
+def _new_request(monkeypatch, *, shared=False, redis=None):
+    monkeypatch.setattr(frappe, "local", types.SimpleNamespace(request_cache={}), raising=False)
+    monkeypatch.setattr(frappe, "cache", (lambda: redis) if redis else None, raising=False)
+    monkeypatch.setattr(frappe, "only_for", lambda *args, **kwargs: None, raising=False)
+    monkeypatch.setattr(utils, "get_settings", lambda: {"enable_shared_dimension_cache": int(shared)})
+
+
+def _counting_db(monkeypatch):
+    calls = []
+
+    def _get_value(doctype, name, fields=None, as_dict=False):
+        calls.append((doctype, name))
+        if doctype == "Cost Center":
+            return "TC"
+        return {"year_start_date": "2024-01-01", "year_end_date": "2024-12-31"}
+
+    monkeypatch.setattr(frappe, "db", types.SimpleNamespace(get_value=_get_value), raising=False)
+    return calls
+
+
+def test_request_scope_memoizes_cost_center_and_fiscal_year(monkeypatch):
+    _new_request(monkeypatch)
+    calls = _counting_db(monkeypatch)
+
+    for _ in range(5):
+        assert utils.resolve_company_from_cost_center("CC-1") == "TC"
+        assert utils.get_fiscal_year_dates("2024") == ("2024-01-01", "2024-12-31")
+
+    assert calls == [("Cost Center", "CC-1"), ("Fiscal Year", "2024")]
+    stats = dimension_cache.get_cache_stats()["request"]
+    assert stats[dimension_cache.COST_CENTER_COMPANY] == {"hits": 4, "misses": 1}
+
+
+def test_without_request_context_lookups_are_not_cached(monkeypatch):
+    monkeypatch.setattr(frappe, "local", types.SimpleNamespace(), raising=False)
+    calls = _counting_db(monkeypatch)
+
+    utils.resolve_company_from_cost_center("CC-1")
+    utils.resolve_company_from_cost_center("CC-1")
+
+    assert len(calls) == 2
+
+
+def test_invalidation_clears_request_and_shared_cache(monkeypatch):
+    redis = _FakeRedis()
+    _new_request(monkeypatch, shared=True, redis=redis)
+    calls = _counting_db(monkeypatch)
+
+    utils.resolve_company_from_cost_center("CC-1")
+    dimension_cache.invalidate_dimension_cache(types.SimpleNamespace(doctype="Cost Center"))
+    utils.resolve_company_from_cost_center("CC-1")
+
+    assert len(calls) == 2
+
+
+def test_shared_cache_serves_next_request(monkeypatch):
+    redis = _FakeRedis()
+    _new_request(monkeypatch, shared=True, redis=redis)
+    calls = _counting_db(monkeypatch)
+    utils.get_fiscal_year_dates("2024")
+
+    _new_request(monkeypatch, shared=True, redis=redis)
+    assert utils.get_fiscal_year_dates("2024") == ("2024-01-01", "2024-12-31")
+
+    assert len(calls) == 1
@@ -0,0 +1,146 @@
+import io
+import sys
+import types
+import zipfile
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = getattr(frappe, "_", lambda msg, *args, **kwargs: msg)
+
+from imogi_finance import tax_operations  # noqa: E402
+
+
+class _Row(dict):
+    __getattr__ = dict.get
+
+
+STANDARD_COLUMNS = ["name", "owner", "creation", "modified", "modified_by", "docstatus", "idx"]
+COLUMNS = {
+    "Sales Invoice": STANDARD_COLUMNS + ["customer", "out_fp_customer_npwp", "out_fp_dpp", "out_fp_ppn", "out_fp_date"],
+    "Customer": STANDARD_COLUMNS + ["customer_name"],
+}
+
+
+def _mapping(label, source_type, source=None):
+    return types.SimpleNamespace(
+        label=label, source_type=source_type, source=source, fixed_value=None, default_value=None
+    )
+
+
+def _coretax_settings(max_rows_per_file=0):
+    return types.SimpleNamespace(
+        name="CT-0001",
+        title="Output",
+        direction="Output",
+        file_format="CSV",
+        max_rows_per_file=max_rows_per_file,
+        column_mappings=[
+            _mapping("NPWP", "Document Field", "out_fp_customer_npwp"),
+            _mapping("DPP", "Computed DPP"),
+            _mapping("PPN", "Computed PPN"),
+            _mapping("Tanggal Faktur", "Tax Invoice Date", "out_fp_date"),
+            _mapping("Customer Name", "Party Field", "customer_name"),
+            _mapping("Invoice", "Document Field", "name"),
+        ],
+    )
+
+
+def _install_coretax(monkeypatch, settings, invoice_count):
+    invoices = [
+        _Row(
+            name=f"SI-{idx:03d}",
+            customer=f"C{idx % 3}",
+            out_fp_customer_npwp="0123",
+            out_fp_dpp=100,
+            out_fp_ppn=11,
+            out_fp_date="2026-01-31",
+        )
+        for idx in range(invoice_count)
+    ]
+    pages = []
+    party_queries = []
+    saved = []
+
+    def _get_list(doctype, filters=None, fields=None, order_by=None, limit_page_length=None):
+        pages.append((filters.get("name"), fields))
+        after = filters["name"][1] if "name" in filters else ""
+        return [inv for inv in invoices if inv.name > after][:limit_page_length]
+
+    def _get_all(doctype, filters=None, fields=None):
+        party_queries.append(sorted(filters["name"][1]))
+        assert fields == ["name", "customer_name"]
+        return [_Row(name=name, customer_name=f"Customer {name}") for name in filters["name"][1]]
+
+    def _get_meta(doctype):
+        return types.SimpleNamespace(get_valid_columns=lambda: COLUMNS[doctype])
+
+    def _get_doc(data):
+        doc = types.SimpleNamespace(file_url="/private/files/" + data["file_name"], **data)
+        doc.save = lambda **kwargs: saved.append(doc)
+        return doc
+
+    monkeypatch.setattr(frappe, "get_cached_doc", lambda *args, **kwargs: settings, raising=False)
+    monkeypatch.setattr(frappe, "get_list", _get_list, raising=False)
+    monkeypatch.setattr(frappe, "get_all", _get_all, raising=False)
+    monkeypatch.setattr(frappe, "get_meta", _get_meta, raising=False)
+    monkeypatch.setattr(frappe, "get_doc", _get_doc, raising=False)
+    monkeypatch.setattr(frappe, "db", types.SimpleNamespace(count=lambda doctype, filters: invoice_count), raising=False)
+    return pages, party_queries, saved
+
+
+def _export(**kwargs):
+    return tax_operations.generate_coretax_export(
+        company="TC",
+        date_from="2026-01-01",
+        date_to="2026-01-31",
+        direction="Output",
+        settings_name="CT-0001",
+        filename="coretax-output",
+        **kwargs,
+    )
+
+
+def test_coretax_export_pages_by_name_with_mapped_columns_only(monkeypatch):
+    pages, party_queries, saved = _install_coretax(monkeypatch, _coretax_settings(), 5)
+    progress = []
+
+    url = _export(chunk_size=2, progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert url == "/private/files/coretax-output.csv"
+    assert [after for after, _fields in pages] == [None, [">", "SI-001"], [">", "SI-003"]]
+    assert pages[0][1] == ["name", "customer", "out_fp_customer_npwp", "out_fp_dpp", "out_fp_ppn", "out_fp_date"]
+    # Parties are fetched once per chunk, and only those not seen before.
+    assert party_queries == [["C0", "C1"], ["C2"]]
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+
+    lines = saved[0].content.decode().splitlines()
+    assert lines[0] == "NPWP,DPP,PPN,Tanggal Faktur,Customer Name,Invoice"
+    assert lines[1] == "0123,100,11,2026-01-31,Customer C0,SI-000"
+    assert len(lines) == 6
+
+
+def test_coretax_export_splits_into_zipped_parts(monkeypatch):
+    _, _, saved = _install_coretax(monkeypatch, _coretax_settings(max_rows_per_file=2), 5)
+
+    url = _export(chunk_size=3)
+
+    assert url == "/private/files/coretax-output.zip"
+    archive = zipfile.ZipFile(io.BytesIO(saved[0].content))
+    names = archive.namelist()
+    assert names == ["coretax-output-1.csv", "coretax-output-2.csv", "coretax-output-3.csv"]
+    assert [len(archive.read(name).decode().splitlines()) for name in names] == [3, 3, 2]
+
+
+def test_coretax_export_skips_columns_missing_from_meta(monkeypatch):
+    settings = _coretax_settings()
+    settings.column_mappings += [
+        _mapping("Legacy Ref", "Document Field", "custom_legacy_ref"),
+        _mapping("Customer Group", "Party Field", "custom_removed_field"),
+    ]
+    pages, _, saved = _install_coretax(monkeypatch, settings, 1)
+
+    _export()
+
+    assert "custom_legacy_ref" not in pages[0][1]
+    lines = saved[0].content.decode().splitlines()
+    assert lines[0].endswith(",Invoice,Legacy Ref,Customer Group")
+    assert lines[1] == "0123,100,11,2026-01-31,Customer C0,SI-000,,"
@@ -0,0 +1,54 @@
+import json
+import os
+
+import pytest
+
+from imogi_finance.tests.test_tax_invoice_ocr import _load_tax_invoice_ocr_module
+
+EXPECTED_PATH = os.path.join(os.path.dirname(__file__), "faktur_text_corpus_expected.json")
+
+
+@pytest.fixture()
+def ocr_module(monkeypatch):
+    return _load_tax_invoice_ocr_module(monkeypatch)
+
+
+def test_parser_output_matches_recorded_corpus(ocr_module):
+    from imogi_finance.scripts import benchmark_faktur_text_parse
+
+    with open(EXPECTED_PATH, encoding="utf-8") as fh:
+        expected = json.load(fh)
+
+    actual = json.loads(json.dumps(benchmark_faktur_text_parse.parse_corpus(benchmark_faktur_text_parse.build_corpus())))
+
+    assert sorted(actual) == sorted(expected)
+    for name in expected:
+        assert actual[name] == expected[name], name
+
+
+def test_text_index_lookups():
+    from imogi_finance.imogi_finance.parsers.text_index import TextIndex
+
+    text = "Faktur Pajak\r\nDASAR Pengenaan Pajak 4.313.371,00\nJumlah PPN\n517.605,00\nDıtandatangani secara elektronik"
+    index = TextIndex(text)
+
+    assert index.lines == text.splitlines()
+    assert index.nl_lines == text.split("\n")
+    assert index.lines_with("dasar") == [1]
+    assert list(index.candidate_lines("Jumlah PPN")) == [2]
+    assert list(index.candidate_lines("(Rp)")) == list(range(5))
+    # "ı" matches "i" under re.IGNORECASE, so the prefilter must not drop that line.
+    assert index.lines_with("ditandatangani") == [4]
+    assert index.nl_line_of(text.index("517.605")) == 3
+    assert index.nl_line_of(0) == 0
+    assert index.find("jumlah ppn", ignore_case=True) == text.index("Jumlah PPN")
+    assert index.lines_from(text.index("Jumlah")) == ["Jumlah PPN", "517.605,00", "Dıtandatangani secara elektronik"]
+
+
+def test_text_index_of_reuses_last_index_for_same_text():
+    from imogi_finance.imogi_finance.parsers.text_index import TextIndex
+
+    first = TextIndex.of("Dasar Pengenaan Pajak\n1.000,00")
+    assert TextIndex.of("Dasar Pengenaan Pajak\n" + "1.000,00") is first
+    assert TextIndex.of("other text") is not first
+    assert TextIndex.of(None).text == ""
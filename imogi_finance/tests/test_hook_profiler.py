@@ -0,0 +1,139 @@
+import sys
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+frappe_utils = sys.modules.setdefault("frappe.utils", types.ModuleType("frappe.utils"))
+frappe_utils.cint = getattr(frappe_utils, "cint", lambda value: int(value or 0))
+
+from imogi_finance import hook_profiler  # noqa: E402
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = value
+
+    def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    def make_key(self, name):
+        return name
+
+    def expire(self, name, seconds):
+        pass
+
+    def delete_value(self, name):
+        self.hashes.pop(name, None)
+
+
+def _install(monkeypatch, *, enabled=True, budget_ms=50):
+    redis = _FakeRedis()
+    warnings = []
+    logger = types.SimpleNamespace(warning=lambda msg, *a, **k: warnings.append(msg))
+    settings = {"enabled": enabled, "budget_ms": budget_ms, "window_hours": 24}
+    monkeypatch.setattr(frappe, "cache", lambda: redis, raising=False)
+    monkeypatch.setattr(frappe, "local", types.SimpleNamespace(), raising=False)
+    monkeypatch.setattr(frappe, "logger", lambda *a, **k: logger, raising=False)
+    monkeypatch.setattr(hook_profiler, "get_settings", lambda: settings)
+    monkeypatch.setattr(hook_profiler, "_installed", False)
+    monkeypatch.setattr(hook_profiler, "_patch_sql", lambda: None)
+    return redis, warnings, settings
+
+
+def _events_module(monkeypatch, clock):
+    module = types.ModuleType("imogi_finance.events.fake_events")
+
+    def validate(doc, method=None):
+        clock[0] += 0.004
+        hook_profiler.count_query([("row",)] * 3)
+        hook_profiler.count_query(None)
+
+    def on_submit(doc, method=None):
+        clock[0] += 0.120
+        module.nested(types.SimpleNamespace(doctype="GL Entry"), "on_submit")
+
+    def nested(doc, method=None):
+        clock[0] += 0.001
+        hook_profiler.count_query([("row",)])
+
+    module.validate = validate
+    module.on_submit = on_submit
+    module.nested = nested
+    modules = {"imogi_finance.events.fake_events": module, "erpnext.fake": types.ModuleType("erpnext.fake")}
+    monkeypatch.setattr(frappe, "get_module", lambda name: modules[name], raising=False)
+    monkeypatch.setattr(hook_profiler.time, "perf_counter", lambda: clock[0])
+    monkeypatch.setattr(
+        frappe,
+        "get_hooks",
+        lambda name: {
+            "Purchase Invoice": {
+                "validate": ["imogi_finance.events.fake_events.validate", "erpnext.fake.validate"],
+                "on_submit": "imogi_finance.events.fake_events.on_submit",
+            },
+            "GL Entry": {"on_submit": ["imogi_finance.events.fake_events.nested"]},
+        },
+        raising=False,
+    )
+    return module
+
+
+def test_install_wraps_imogi_handlers_and_records_calls(monkeypatch):
+    _install(monkeypatch)
+    clock = [0.0]
+    module = _events_module(monkeypatch, clock)
+
+    hook_profiler.install()
+    hook_profiler.install()
+    assert module.validate._imogi_profiled and module.validate.__name__ == "validate"
+
+    doc = types.SimpleNamespace(doctype="Purchase Invoice")
+    for _ in range(3):
+        module.validate(doc, "validate")
+    module.on_submit(doc, "on_submit")
+
+    rows = {(row["doctype"], row["event"]): row for row in hook_profiler.get_profile(hours=1)}
+    validate = rows[("Purchase Invoice", "validate")]
+    assert validate["calls"] == 3 and validate["handler"] == "imogi_finance.events.fake_events.validate"
+    assert validate["avg_queries"] == 2 and validate["avg_rows"] == 3
+    assert validate["p95_ms"] == 5.0
+
+    # Queries of nested hooks count towards the outer handler too.
+    on_submit = rows[("Purchase Invoice", "on_submit")]
+    assert on_submit["avg_queries"] == 1 and on_submit["p95_ms"] == 250.0
+    assert rows[("GL Entry", "on_submit")]["calls"] == 1
+
+    assert [row["event"] for row in hook_profiler.get_profile(hours=1)][0] == "on_submit"
+    assert [row["doctype"] for row in hook_profiler.get_profile(hours=1, doctype="GL Entry")] == ["GL Entry"]
+
+
+def test_calls_over_budget_are_logged_and_counted(monkeypatch):
+    _, warnings, _ = _install(monkeypatch, budget_ms=100)
+
+    hook_profiler.record("Payment Entry", "on_submit", "imogi_finance.events.payment_entry.on_submit", 140.0, 12, 40)
+    hook_profiler.record("Payment Entry", "on_submit", "imogi_finance.events.payment_entry.on_submit", 20.0, 2, 4)
+
+    assert len(warnings) == 1 and "140.0 ms" in warnings[0]
+    row = hook_profiler.get_profile(hours=1)[0]
+    assert row["calls"] == 2 and row["over_budget"] == 1 and row["max_ms"] == 140.0
+
+
+def test_disabled_profiler_passes_through(monkeypatch):
+    redis, _, settings = _install(monkeypatch, enabled=False)
+    clock = [0.0]
+    module = _events_module(monkeypatch, clock)
+
+    hook_profiler.install()
+    assert not getattr(module.validate, "_imogi_profiled", False)
+
+    settings["enabled"] = True
+    hook_profiler.install()
+    settings["enabled"] = False
+    module.validate(types.SimpleNamespace(doctype="Purchase Invoice"), "validate")
+    assert redis.hashes == {}
@@ -0,0 +1,85 @@
+import re
+import sys
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+
+from imogi_finance.imogi_finance.parsers.layout_index import (  # noqa: E402
+    ColumnIndex,
+    LayoutIndex,
+    cluster_rows,
+)
+
+Tok = types.SimpleNamespace
+
+
+def _tok(text, x, y):
+    return Tok(text=text, x=x, y=y)
+
+
+def _install(monkeypatch):
+    logger = types.SimpleNamespace(info=lambda *a, **k: None, debug=lambda *a, **k: None, warning=lambda *a, **k: None)
+    monkeypatch.setattr(frappe, "logger", lambda *a, **k: logger, raising=False)
+    monkeypatch.setattr(frappe, "log_error", lambda *a, **k: None, raising=False)
+
+
+def test_cluster_rows_uses_running_mean_and_keeps_y_order():
+    tokens = [_tok("B", 30, 102), _tok("A", 10, 100), _tok("C", 50, 150), _tok("D", 70, 148), _tok("E", 90, 200)]
+
+    rows = cluster_rows(tokens, 5, lambda t: t.y)
+
+    assert [[t.text for t in row] for _, row in rows] == [["A", "B"], ["D", "C"], ["E"]]
+    assert [y for y, _ in rows] == [101.0, 149.0, 200.0]
+    assert cluster_rows([], 5, lambda t: t.y) == []
+
+
+def test_layout_index_lookups():
+    tokens = [
+        _tok("Dasar", 10, 100), _tok("Pengenaan", 20, 100), _tok("Pajak", 30, 100), _tok("4.313.371,00", 80, 100),
+        _tok("Jumlah", 10, 120), _tok("PPN", 20, 120), _tok("517.605,00", 80, 121),
+        _tok("Dasar", 10, 300), _tok("Pengenaan", 20, 300), _tok("Pajak", 30, 300),
+    ]
+    index = LayoutIndex.build(tokens, 3, lambda t: t.y, lambda t: t.x)
+
+    assert len(index) == 3
+    assert list(index.row_range(110, 400)) == [1, 2]
+    assert index.nearest_row(118) == 1
+    assert index.find_row(re.compile(r"Dasar\s+Pengenaan")) == 0
+    assert index.find_row(re.compile(r"Dasar\s+Pengenaan"), reverse=True) == 2
+    assert [t.text for t in index.rows[1].tokens_between_x(50, 100)] == ["517.605,00"]
+    assert index.rows[0].text == "Dasar Pengenaan Pajak 4.313.371,00"
+
+
+def test_column_index_matches_first_overlapping_range_in_caller_order():
+    ranges = {
+        "ppn": types.SimpleNamespace(x_min=440, x_max=540),
+        "harga_jual": types.SimpleNamespace(x_min=200, x_max=300),
+        "dpp": types.SimpleNamespace(x_min=280, x_max=420),
+    }
+    index = ColumnIndex(ranges)
+
+    assert index.assign(220, 280) == "harga_jual"
+    # Overlaps harga_jual and dpp; harga_jual comes first in the caller's order.
+    assert index.assign(285, 300) == "harga_jual"
+    assert index.assign(460, 520) == "ppn"
+    assert index.assign(10, 100) is None
+    # 10 of 60 px inside the range is 16.7% overlap, above the 10% minimum.
+    assert index.assign(530, 590) == "ppn"
+    assert index.assign(535, 600) is None
+
+
+def test_layout_parser_and_benchmark_on_real_size_token_set(monkeypatch):
+    _install(monkeypatch)
+    from imogi_finance.scripts import benchmark_layout_index
+
+    results = benchmark_layout_index.run(pages=2, rows_per_page=60, tokens_per_row=12, repeat=1)
+    # Clustering is page-agnostic, so both pages share the same 60 row positions.
+    assert results["tokens"] == 1440 and results["rows"] == 60
+
+    from imogi_finance.imogi_finance.parsers.layout_aware_parser import LayoutAwareParser
+
+    parser = LayoutAwareParser(tokens=benchmark_layout_index.build_ocr_tokens(pages=2, rows_per_page=60))
+    summary = parser.parse_summary_section()
+    assert summary["dpp"] == 4313371.0
+    assert summary["ppn"] == 517605.0
@@ -0,0 +1,148 @@
+import pickle
+import sys
+import types
+from datetime import datetime, timedelta
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+
+from imogi_finance import ocr_cache  # noqa: E402
+
+NOW = datetime(2026, 10, 16, 9, 0, 0)
+SETTINGS = {"ocr_language": "id", "ocr_max_pages": 5}
+
+
+class _Row(dict):
+    __getattr__ = dict.get
+
+
+class _CacheDB:
+    def __init__(self):
+        self.rows = {}
+
+    def get_value(self, doctype, name, fields, as_dict=False):
+        row = self.rows.get(name)
+        return _Row({field: row[field] for field in fields}) if row else None
+
+    def sql(self, query, params=None):
+        row = self.rows[params["name"]]
+        row["hit_count"] += 1
+        row["last_used_at"] = params["now"]
+
+    def delete(self, doctype, filters):
+        names = filters["name"][1]
+        self.rows = {name: row for name, row in self.rows.items() if name not in names}
+
+    def commit(self):
+        return None
+
+
+class _Redis:
+    def __init__(self):
+        self.hashes = {}
+
+    def hget(self, name, key):
+        value = self.hashes.get(name, {}).get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = pickle.dumps(value)
+
+    def hgetall(self, name):
+        return {key: pickle.loads(value) for key, value in self.hashes.get(name, {}).items()}
+
+
+def _install(monkeypatch, settings=None):
+    db = _CacheDB()
+    redis = _Redis()
+
+    def _get_doc(values):
+        def _insert(ignore_permissions=False, ignore_if_duplicate=False):
+            name = ocr_cache.cache_key(values["content_hash"], values["provider"], values["language"], values["max_pages"])
+            db.rows.setdefault(name, dict(values, name=name))
+
+        return types.SimpleNamespace(insert=_insert)
+
+    def _get_all(doctype, filters=None, fields=None, order_by=None, limit=None, pluck=None):
+        rows = list(db.rows.values())
+        if filters:
+            rows = [row for row in rows if row["last_used_at"] < filters["last_used_at"][1]]
+        if pluck:
+            return [row[pluck] for row in rows]
+        if fields and fields[0].startswith("count("):
+            return [{"entries": len(rows), "size_bytes": sum(row["size_bytes"] for row in rows)}]
+        if fields and fields[0].startswith("sum("):
+            return [{"size_bytes": sum(row["size_bytes"] for row in rows)}]
+        rows.sort(key=lambda row: row["last_used_at"])
+        return [{"name": row["name"], "size_bytes": row["size_bytes"]} for row in rows[:limit]]
+
+    logger = types.SimpleNamespace(info=lambda *a, **k: None, warning=lambda *a, **k: None, error=lambda *a, **k: None)
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    monkeypatch.setattr(frappe, "cache", lambda: redis, raising=False)
+    monkeypatch.setattr(frappe, "get_doc", _get_doc, raising=False)
+    monkeypatch.setattr(frappe, "get_all", _get_all, raising=False)
+    monkeypatch.setattr(frappe, "logger", lambda *a, **k: logger, raising=False)
+    monkeypatch.setattr(ocr_cache, "now_datetime", lambda: NOW)
+    monkeypatch.setattr(ocr_cache, "add_days", lambda value, days: value + timedelta(days=days))
+    monkeypatch.setitem(
+        sys.modules,
+        "imogi_finance.tax_invoice_ocr",
+        types.SimpleNamespace(get_settings=lambda: settings or {}),
+    )
+    return db
+
+
+def test_round_trip_and_hit_rate(monkeypatch):
+    db = _install(monkeypatch)
+    raw_json = {"responses": [{"fullTextAnnotation": {"text": "Faktur Pajak " * 500}}]}
+
+    assert ocr_cache.get("abc", "Google Vision", SETTINGS) is None
+    ocr_cache.put("abc", "Google Vision", SETTINGS, ("Faktur Pajak", raw_json, 0.97))
+    cached = ocr_cache.get("abc", "Google Vision", SETTINGS)
+
+    assert cached == ("Faktur Pajak", raw_json, 0.97)
+    row = next(iter(db.rows.values()))
+    assert row["hit_count"] == 1
+    # Raw JSON is stored gzip-compressed.
+    assert row["size_bytes"] < len(str(raw_json))
+
+    stats = ocr_cache.get_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 50.0
+    assert stats["entries"] == 1
+
+
+def test_key_covers_provider_language_and_pages(monkeypatch):
+    _install(monkeypatch)
+    ocr_cache.put("abc", "Google Vision", SETTINGS, ("text", None, 0.9))
+
+    assert ocr_cache.get("abc", "Tesseract", SETTINGS) is None
+    assert ocr_cache.get("abc", "Google Vision", dict(SETTINGS, ocr_language="en")) is None
+    assert ocr_cache.get("abc", "Google Vision", dict(SETTINGS, ocr_max_pages=2)) is None
+    assert ocr_cache.get("abc", "Google Vision", SETTINGS) == ("text", None, 0.9)
+
+
+def test_empty_text_and_disabled_cache_are_skipped(monkeypatch):
+    db = _install(monkeypatch)
+    ocr_cache.put("abc", "Google Vision", SETTINGS, ("   ", None, 0.0))
+    assert db.rows == {}
+
+    disabled = dict(SETTINGS, enable_ocr_cache=0)
+    ocr_cache.put("abc", "Google Vision", disabled, ("text", None, 0.9))
+    assert db.rows == {}
+    assert ocr_cache.get("abc", "Google Vision", disabled) is None
+
+
+def test_eviction_drops_expired_then_least_recently_used(monkeypatch):
+    db = _install(monkeypatch, settings={"ocr_cache_max_age_days": 30, "ocr_cache_max_size_mb": 1})
+    megabyte = 1024 * 1024
+    for idx, (age_days, size) in enumerate([(40, 10), (5, megabyte // 2), (3, megabyte // 2), (1, megabyte // 2)]):
+        db.rows[f"entry-{idx}"] = {
+            "name": f"entry-{idx}",
+            "size_bytes": size,
+            "last_used_at": NOW - timedelta(days=age_days),
+        }
+
+    result = ocr_cache.evict_ocr_cache()
+
+    assert result == {"expired": 1, "evicted": 1}
+    assert sorted(db.rows) == ["entry-2", "entry-3"]
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+
+from imogi_finance import ocr_pages  # noqa: E402
+
+SETTINGS = {"ocr_page_workers": 4, "ocr_page_timeout_seconds": 1, "ocr_max_retry": 1}
+
+
+def _page_worker(page_index, suffix):
+    # Page 2 fails on every attempt; page 3 is slower so pages finish out of order.
+    if page_index == 1:
+        raise RuntimeError("unreadable page")
+    if page_index == 2:
+        time.sleep(0.2)
+    return f"page {page_index + 1}{suffix}"
+
+
+def _hanging_worker(page_index):
+    if page_index == 0:
+        time.sleep(5)
+    return page_index
+
+
+def _pid_worker(page_index):
+    return os.getpid()
+
+
+def _install(monkeypatch):
+    logger = types.SimpleNamespace(info=lambda *a, **k: None, warning=lambda *a, **k: None)
+    monkeypatch.setattr(frappe, "logger", lambda *a, **k: logger, raising=False)
+    monkeypatch.setattr(frappe, "flags", types.SimpleNamespace(), raising=False)
+    monkeypatch.setattr(ocr_pages.os, "cpu_count", lambda: 4)
+
+
+def test_pool_merges_in_page_order_and_isolates_failed_page(monkeypatch):
+    _install(monkeypatch)
+
+    with ocr_pages.page_pool():
+        results = ocr_pages.run_pages(_page_worker, b"%PDF", 4, ("!",), SETTINGS)
+
+    assert [result["page"] for result in results] == [1, 2, 3, 4]
+    assert [result["value"] for result in results] == ["page 1!", None, "page 3!", "page 4!"]
+    failed = results[1]
+    assert not failed["ok"] and failed["attempts"] == 2 and "unreadable page" in failed["error"]
+
+    stats = ocr_pages.pop_page_stats()
+    assert [stat["ok"] for stat in stats] == [True, False, True, True]
+    assert all("value" not in stat and stat["seconds"] >= 0 for stat in stats)
+    assert ocr_pages.pop_page_stats() is None
+
+
+def test_single_worker_runs_inline_with_retries(monkeypatch):
+    _install(monkeypatch)
+
+    results = ocr_pages.run_pages(_page_worker, b"%PDF", 2, ("",), dict(SETTINGS, ocr_page_workers=1))
+
+    assert [result["value"] for result in results] == ["page 1", None]
+    assert results[1]["attempts"] == 2
+
+
+def test_page_timeout_does_not_fail_other_pages(monkeypatch):
+    _install(monkeypatch)
+
+    started = time.monotonic()
+    with ocr_pages.page_pool():
+        results = ocr_pages.run_pages(_hanging_worker, b"%PDF", 3, (), dict(SETTINGS, ocr_max_retry=0))
+
+    assert time.monotonic() - started < 4
+    assert not results[0]["ok"] and "timed out" in results[0]["error"]
+    assert [result["value"] for result in results[1:]] == [1, 2]
+
+
+def test_timed_out_page_is_retried_on_a_fresh_pool(monkeypatch):
+    _install(monkeypatch)
+
+    started = time.monotonic()
+    with ocr_pages.page_pool():
+        results = ocr_pages.run_pages(_hanging_worker, b"%PDF", 2, (), SETTINGS)
+
+    # Two 1s attempts; the retry does not wait for the first attempt's 5s sleep.
+    assert time.monotonic() - started < 4
+    assert results[0]["attempts"] == 2 and "timed out" in results[0]["error"]
+    assert results[1]["ok"] and results[1]["value"] == 1
+
+
+def test_pages_run_in_process_outside_page_pool(monkeypatch):
+    _install(monkeypatch)
+
+    results = ocr_pages.run_pages(_pid_worker, b"%PDF", 4, (), SETTINGS)
+
+    assert [result["value"] for result in results] == [os.getpid()] * 4
+    assert not ocr_pages.pool_enabled()
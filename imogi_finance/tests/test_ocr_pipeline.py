@@ -0,0 +1,296 @@
+import pickle
+import sys
+import types
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+exceptions = sys.modules.setdefault("frappe.exceptions", types.ModuleType("frappe.exceptions"))
+exceptions.ValidationError = getattr(exceptions, "ValidationError", type("ValidationError", (Exception,), {}))
+
+from imogi_finance import ocr_pipeline  # noqa: E402
+
+
+class _FakeCache:
+    """Subset of frappe's RedisWrapper used by the OCR pipeline."""
+
+    def __init__(self):
+        self.hashes, self.lists, self.values = {}, {}, {}
+
+    def make_key(self, key):
+        return key
+
+    def expire(self, key, seconds):
+        return None
+
+    def hget(self, name, key):
+        value = self.hashes.get(name, {}).get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = pickle.dumps(value)
+
+    def hdel(self, name, key):
+        self.hashes.get(name, {}).pop(key, None)
+
+    def hgetall(self, name):
+        return {key: pickle.loads(value) for key, value in self.hashes.get(name, {}).items()}
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value.encode() if isinstance(value, str) else value)
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value.encode() if isinstance(value, str) else value)
+
+    def lpop(self, key):
+        items = self.lists.get(key) or []
+        return items.pop(0) if items else None
+
+    def llen(self, key):
+        return len(self.lists.get(key) or [])
+
+    def lrange(self, key, start, end):
+        items = self.lists.get(key) or []
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:] if end == -1 else self.lists.get(key, [])[start:end + 1]
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.values[key] = value
+
+
+class _Callbacks(list):
+    add = list.append
+
+    def run(self):
+        while self:
+            self.pop(0)()
+
+
+class _FakeDB:
+    """Commit/rollback callbacks the way frappe.db runs them."""
+
+    def __init__(self):
+        self.after_commit, self.after_rollback = _Callbacks(), _Callbacks()
+
+    def commit(self):
+        self.after_rollback.clear()
+        self.after_commit.run()
+
+    def rollback(self):
+        self.after_commit.clear()
+        self.after_rollback.run()
+
+
+class _Pipeline:
+    def __init__(self, monkeypatch, *, concurrency=2, contents=None):
+        self.cache = _FakeCache()
+        self.db = _FakeDB()
+        self.enqueued = []
+        self.ocr_calls = []
+        self.failing = set()
+        self.ocr_results = {}
+        self.contents = contents or {}
+        self.settings = {"ocr_max_concurrent_jobs": concurrency, "ocr_max_retry": 2}
+
+        def _enqueue(method, enqueue_after_commit=False, **kwargs):
+            assert method == "imogi_finance.ocr_pipeline.run_job"
+            if enqueue_after_commit:
+                self.db.after_commit.add(lambda: self.enqueued.append(kwargs))
+            else:
+                self.enqueued.append(kwargs)
+
+        def _run_ocr_job(name, target_doctype, provider, content_hash=None):
+            # Stands in for the OCR cache: identical content is only sent to the provider once.
+            cached = content_hash in self.ocr_results
+            self.ocr_calls.append((name, cached))
+            if name in self.failing:
+                raise ocr_pipeline.OCRProviderBusyError("quota exhausted", 429)
+            if content_hash:
+                self.ocr_results[content_hash] = ("text", None, 0.9)
+
+        def _file_doc(file_url):
+            return types.SimpleNamespace(get_content=lambda: self.contents[file_url])
+
+        logger = types.SimpleNamespace(info=lambda *a, **k: None, warning=lambda *a, **k: None)
+        monkeypatch.setattr(frappe, "cache", lambda: self.cache, raising=False)
+        monkeypatch.setattr(frappe, "enqueue", _enqueue, raising=False)
+        monkeypatch.setattr(frappe, "db", self.db, raising=False)
+        monkeypatch.setattr(frappe, "flags", types.SimpleNamespace(in_test=False), raising=False)
+        monkeypatch.setattr(frappe, "logger", lambda *a, **k: logger, raising=False)
+        monkeypatch.setattr(ocr_pipeline, "_ocr_queue", lambda: ocr_pipeline.OCR_QUEUE)
+        monkeypatch.setitem(
+            sys.modules,
+            "imogi_finance.tax_invoice_ocr",
+            types.SimpleNamespace(
+                get_settings=lambda: self.settings,
+                _run_ocr_job=_run_ocr_job,
+                _get_file_doc_by_url=_file_doc,
+            ),
+        )
+
+    def submit(self, name, priority=None, file_url=None, commit=True):
+        entry = ocr_pipeline.submit("Tax Invoice OCR Upload", name, "Google Vision", file_url, priority=priority)
+        if commit:
+            self.db.commit()
+        return entry
+
+    def finish_next(self):
+        # Like frappe's execute_job: commit on success, roll back and re-raise on failure.
+        job = self.enqueued.pop(0)
+        try:
+            ocr_pipeline.run_job(
+                job["doctype"], job["name"], job["provider"], job["content_hash"], job["enqueued_at"], job["priority"]
+            )
+        except Exception:
+            self.db.rollback()
+            raise
+        self.db.commit()
+        return job["name"]
+
+
+def test_concurrency_limit_and_priority_order(monkeypatch):
+    pipeline = _Pipeline(monkeypatch, concurrency=2)
+    for name, priority in [("A", "low"), ("B", "low"), ("C", "low"), ("D", "high"), ("E", None)]:
+        pipeline.submit(name, priority)
+
+    assert [job["name"] for job in pipeline.enqueued] == ["A", "B"]
+    assert all(job["queue"] == ocr_pipeline.OCR_QUEUE for job in pipeline.enqueued)
+    assert all(job["job_name"] == f"ocr:Tax Invoice OCR Upload:{job['name']}" for job in pipeline.enqueued)
+
+    finished = [pipeline.finish_next() for _ in range(5)]
+
+    assert finished == ["A", "B", "D", "E", "C"]
+    assert ocr_pipeline.get_pipeline_metrics()["running_jobs"] == 0
+
+
+def test_failed_job_still_dispatches_next_document(monkeypatch):
+    pipeline = _Pipeline(monkeypatch, concurrency=1)
+    pipeline.failing.add("A")
+    pipeline.submit("A")
+    pipeline.submit("B")
+
+    with pytest.raises(ocr_pipeline.OCRProviderBusyError):
+        pipeline.finish_next()
+
+    assert [job["name"] for job in pipeline.enqueued] == ["B"]
+    assert pipeline.finish_next() == "B"
+    assert ocr_pipeline.get_doc_pipeline_state("Tax Invoice OCR Upload", "A")["status"] == "failed"
+    assert ocr_pipeline.get_pipeline_metrics()["running_jobs"] == 0
+
+
+def test_rolled_back_submit_returns_claimed_entry(monkeypatch):
+    pipeline = _Pipeline(monkeypatch, concurrency=1)
+    pipeline.submit("A", commit=False)
+    pipeline.db.rollback()
+
+    assert pipeline.enqueued == []
+    assert ocr_pipeline.get_pipeline_metrics()["running_jobs"] == 0
+
+    pipeline.submit("B")
+
+    assert [job["name"] for job in pipeline.enqueued] == ["A"]
+
+
+def test_resubmitted_document_runs_once(monkeypatch):
+    pipeline = _Pipeline(monkeypatch, concurrency=1)
+    pipeline.submit("A")
+    pipeline.submit("B", "low")
+    pipeline.submit("B", "high")
+
+    finished = [pipeline.finish_next() for _ in range(len(pipeline.enqueued) + 1)]
+
+    assert finished == ["A", "B"]
+    assert pipeline.enqueued == []
+    assert ocr_pipeline.get_doc_pipeline_state("Tax Invoice OCR Upload", "B")["priority"] == "high"
+
+
+def test_identical_content_waits_and_reuses_result(monkeypatch):
+    pipeline = _Pipeline(
+        monkeypatch,
+        concurrency=3,
+        contents={"/files/a.pdf": b"%PDF same", "/files/b.pdf": b"%PDF same", "/files/c.pdf": b"%PDF other"},
+    )
+    pipeline.submit("A", file_url="/files/a.pdf")
+    pipeline.submit("B", file_url="/files/b.pdf")
+    pipeline.submit("C", file_url="/files/c.pdf")
+
+    assert [job["name"] for job in pipeline.enqueued] == ["A", "C"]
+    assert ocr_pipeline.get_doc_pipeline_state("Tax Invoice OCR Upload", "B")["shared_from"] == "Tax Invoice OCR Upload:A"
+
+    while pipeline.enqueued:
+        pipeline.finish_next()
+
+    assert pipeline.ocr_calls == [("A", False), ("C", False), ("B", True)]
+    assert ocr_pipeline.get_pipeline_metrics()["counters"]["deduplicated"] == 1
+
+
+def test_busy_provider_is_retried_with_backoff(monkeypatch):
+    pipeline = _Pipeline(monkeypatch)
+    sleeps = []
+    monkeypatch.setattr(ocr_pipeline.time, "sleep", sleeps.append)
+    monkeypatch.setattr(ocr_pipeline.random, "uniform", lambda low, high: 0.0)
+    responses = [ocr_pipeline.OCRProviderBusyError("quota", 429), ocr_pipeline.OCRProviderBusyError("down", 503)]
+
+    def _call():
+        if responses:
+            raise responses.pop(0)
+        return ("text", None, 1.0)
+
+    settings = dict(pipeline.settings, ocr_retry_backoff_seconds=1.5, ocr_google_vision_rate_per_minute=0)
+    assert ocr_pipeline.call_provider("Google Vision", _call, settings) == ("text", None, 1.0)
+    assert sleeps == [1.5, 3.0]
+
+    responses.extend(ocr_pipeline.OCRProviderBusyError("quota", 429) for _ in range(3))
+    with pytest.raises(ocr_pipeline.OCRProviderBusyError):
+        ocr_pipeline.call_provider("Google Vision", _call, settings)
+    assert ocr_pipeline.get_pipeline_metrics()["counters"]["retries"] == 4
+
+
+def test_non_retryable_errors_are_not_retried(monkeypatch):
+    _Pipeline(monkeypatch)
+    calls = []
+
+    def _call():
+        calls.append(1)
+        raise ValueError("bad credentials")
+
+    with pytest.raises(ValueError):
+        ocr_pipeline.call_provider("Tesseract", _call, {"ocr_max_retry": 3, "ocr_tesseract_rate_per_minute": 0})
+    assert calls == [1]
+    assert ocr_pipeline.is_retryable_status(429) and not ocr_pipeline.is_retryable_status(400)
+
+
+def test_token_bucket_allows_burst_then_paces_calls():
+    state, now, waits = None, 1000.0, []
+    for _ in range(11):
+        state, wait = ocr_pipeline.refill_bucket(state, now, rate=60)
+        waits.append(wait)
+
+    # 60/minute with a 10 second burst: ten immediate calls, then one per second.
+    assert waits[:10] == [0.0] * 10
+    assert waits[10] == pytest.approx(1.0)
+    state, wait = ocr_pipeline.refill_bucket(state, now + 1.0, rate=60)
+    assert wait == 0.0
+
+
+def test_metrics_report_throughput_and_latency(monkeypatch):
+    pipeline = _Pipeline(monkeypatch, concurrency=4)
+    clock = iter(float(tick) for tick in range(100, 200))
+    monkeypatch.setattr(ocr_pipeline.time, "time", lambda: next(clock))
+    for name in ("A", "B", "C"):
+        pipeline.submit(name)
+    while pipeline.enqueued:
+        pipeline.finish_next()
+
+    metrics = ocr_pipeline.get_pipeline_metrics()
+
+    assert metrics["queue_depth"] == {"high": 0, "normal": 0, "low": 0}
+    assert metrics["counters"]["submitted"] == 3 and metrics["counters"]["completed"] == 3
+    assert metrics["throughput_per_minute"] == round(3 * 60 / ocr_pipeline.METRIC_WINDOW_SECONDS, 2)
+    assert 0 < metrics["latency_p50_seconds"] <= metrics["latency_p95_seconds"]
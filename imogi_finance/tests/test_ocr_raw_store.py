@@ -0,0 +1,156 @@
+import json
+import sys
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+
+from imogi_finance import ocr_raw_store  # noqa: E402
+
+RAW_JSON = {"responses": [{"fullTextAnnotation": {"text": "Faktur Pajak " * 500, "pages": [{"width": 1000}]}}]}
+
+
+class _Row(dict):
+    __getattr__ = dict.get
+
+
+class _FileStore:
+    def __init__(self):
+        self.files = {}
+        self.deleted = []
+
+    def get_doc(self, values_or_doctype, name=None):
+        if isinstance(values_or_doctype, dict):
+            values = values_or_doctype
+            store = self
+
+            def _save(ignore_permissions=False):
+                file_name = f"FILE-{len(store.files) + 1}"
+                doc.file_url = f"/private/files/{file_name}-{values['file_name']}"
+                store.files[file_name] = dict(values, name=file_name, file_url=doc.file_url)
+
+            doc = types.SimpleNamespace(save=_save, file_url=None)
+            return doc
+        row = self.files[name]
+        return types.SimpleNamespace(get_content=lambda: row["content"])
+
+    def find(self, filters):
+        for name, row in self.files.items():
+            if all(row.get(key) == value for key, value in filters.items()):
+                return name
+        return None
+
+    def delete_doc(self, doctype, name, ignore_permissions=False):
+        self.deleted.append(name)
+        self.files.pop(name, None)
+
+
+class _DB:
+    def __init__(self, files, columns, uploads=None):
+        self.files = files
+        self.columns = columns
+        self.uploads = uploads or {}
+        self.commits = 0
+
+    def has_column(self, doctype, fieldname):
+        return fieldname in self.columns.get(doctype, ())
+
+    def get_value(self, doctype, filters, fields, as_dict=False):
+        if doctype == "File":
+            return self.files.find(filters)
+        row = self.uploads.get(filters, {})
+        return _Row({field: row.get(field) for field in fields})
+
+    def sql(self, query, params=None, as_dict=False):
+        rows = [
+            _Row(name=name, ocr_raw_json=row["ocr_raw_json"])
+            for name, row in sorted(self.uploads.items())
+            if name > params["last_name"] and row.get("ocr_raw_json") and not row.get("ocr_raw_json_file")
+        ]
+        return rows[: params["limit"]]
+
+    def set_value(self, doctype, name, values, update_modified=True):
+        self.uploads[name].update(values)
+
+    def commit(self):
+        self.commits += 1
+
+
+def _install(monkeypatch, uploads=None):
+    files = _FileStore()
+    db = _DB(
+        files,
+        {"Tax Invoice OCR Upload": {"ocr_raw_json", "ocr_raw_json_file", "ocr_raw_json_digest"}},
+        uploads,
+    )
+    logger = types.SimpleNamespace(info=lambda *a, **k: None, warning=lambda *a, **k: None)
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    monkeypatch.setattr(frappe, "get_doc", files.get_doc, raising=False)
+    monkeypatch.setattr(frappe, "delete_doc", files.delete_doc, raising=False)
+    monkeypatch.setattr(frappe, "logger", lambda *a, **k: logger, raising=False)
+    return db, files
+
+
+def test_store_writes_compressed_attachment_and_load_reads_it(monkeypatch):
+    _, files = _install(monkeypatch)
+    doc = types.SimpleNamespace(name="TI-UP-1", ocr_raw_json=None, ocr_raw_json_file=None, ocr_raw_json_digest=None)
+
+    updates = ocr_raw_store.store("Tax Invoice OCR Upload", "TI-UP-1", RAW_JSON, doc=doc)
+    for fieldname, value in updates.items():
+        setattr(doc, fieldname, value)
+
+    assert doc.ocr_raw_json is None
+    assert doc.ocr_raw_json_digest == ocr_raw_store.digest(ocr_raw_store.serialize(RAW_JSON))
+    stored = next(iter(files.files.values()))
+    assert stored["is_private"] == 1 and stored["attached_to_name"] == "TI-UP-1"
+    assert len(stored["content"]) < len(json.dumps(RAW_JSON)) / 10
+
+    assert ocr_raw_store.has_payload(doc, "Tax Invoice OCR Upload")
+    assert ocr_raw_store.load(doc, "Tax Invoice OCR Upload") == RAW_JSON
+    assert json.loads(ocr_raw_store.load_text(doc, "Tax Invoice OCR Upload")) == RAW_JSON
+
+
+def test_same_payload_reuses_file_and_new_payload_replaces_it(monkeypatch):
+    _, files = _install(monkeypatch)
+    doc = types.SimpleNamespace(name="TI-UP-1", ocr_raw_json=None, ocr_raw_json_file=None, ocr_raw_json_digest=None)
+
+    for payload in (RAW_JSON, RAW_JSON):
+        for fieldname, value in ocr_raw_store.store("Tax Invoice OCR Upload", "TI-UP-1", payload, doc=doc).items():
+            setattr(doc, fieldname, value)
+    assert len(files.files) == 1
+
+    for fieldname, value in ocr_raw_store.store("Tax Invoice OCR Upload", "TI-UP-1", {"responses": []}, doc=doc).items():
+        setattr(doc, fieldname, value)
+    assert files.deleted == ["FILE-1"]
+    assert ocr_raw_store.load(doc, "Tax Invoice OCR Upload") == {"responses": []}
+
+
+def test_doctype_without_pointer_field_keeps_inline_json(monkeypatch):
+    _, files = _install(monkeypatch)
+    doc = types.SimpleNamespace(name="PI-1", ti_ocr_raw_json=None)
+
+    updates = ocr_raw_store.store("Purchase Invoice", "PI-1", RAW_JSON, doc=doc)
+
+    assert list(updates) == ["ti_ocr_raw_json"]
+    assert files.files == {}
+    doc.ti_ocr_raw_json = updates["ti_ocr_raw_json"]
+    assert ocr_raw_store.load(doc, "Purchase Invoice") == RAW_JSON
+
+
+def test_migration_moves_inline_rows_in_batches(monkeypatch):
+    uploads = {
+        "TI-UP-1": {"ocr_raw_json": json.dumps(RAW_JSON, indent=2)},
+        "TI-UP-2": {"ocr_raw_json": "not json"},
+        "TI-UP-3": {"ocr_raw_json": json.dumps({"responses": []})},
+        "TI-UP-4": {"ocr_raw_json": None},
+    }
+    db, files = _install(monkeypatch, uploads)
+
+    assert ocr_raw_store.migrate_inline_payloads(batch_size=2) == 2
+
+    assert db.commits == 2
+    assert uploads["TI-UP-1"]["ocr_raw_json"] is None and uploads["TI-UP-1"]["ocr_raw_json_file"]
+    assert uploads["TI-UP-2"]["ocr_raw_json"] == "not json"
+    assert len(files.files) == 2
+    doc = types.SimpleNamespace(**uploads["TI-UP-1"])
+    assert ocr_raw_store.load(doc, "Tax Invoice OCR Upload") == RAW_JSON
@@ -0,0 +1,119 @@
+import datetime
+import sys
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe_utils = sys.modules.setdefault("frappe.utils", types.ModuleType("frappe.utils"))
+for _name in ("date_diff", "getdate", "now_datetime", "get_datetime"):
+    if not hasattr(frappe_utils, _name):
+        setattr(frappe_utils, _name, lambda *args, **kwargs: None)
+
+from imogi_finance.imogi_finance.report.outstanding_approvals_dashboard import (  # noqa: E402
+    outstanding_approvals_dashboard as dashboard,
+)
+
+
+class _ApprovalsDB:
+    """Serves pending documents per doctype and counts every round trip."""
+
+    def __init__(self, rows_per_doctype):
+        self.rows_per_doctype = rows_per_doctype
+        self.queries = []
+
+    def sql(self, query, params=None, as_dict=False):
+        doctype = query.split("`tab")[1].split("`")[0]
+        self.queries.append(doctype)
+        return [dict(row) for row in self.rows_per_doctype.get(doctype, [])]
+
+
+def _install(monkeypatch, rows_per_doctype, level_fields):
+    db = _ApprovalsDB(rows_per_doctype)
+    get_all_calls = []
+
+    def _get_all(doctype, filters=None, fields=None, **kwargs):
+        get_all_calls.append(doctype)
+        if doctype == "DocField":
+            return [
+                {"parent": parent, "fieldname": f"level_{level}_user"}
+                for parent, levels in level_fields.items()
+                if parent in filters["parent"][1]
+                for level in levels
+            ]
+        if doctype == "User":
+            return [{"name": name, "full_name": name.split("@")[0].title()} for name in filters["name"][1]]
+        return []
+
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    monkeypatch.setattr(frappe, "get_all", _get_all, raising=False)
+    monkeypatch.setattr(frappe, "log_error", lambda *args, **kwargs: None, raising=False)
+    monkeypatch.setattr(dashboard, "getdate", lambda value=None: value or datetime.date(2024, 3, 31))
+    monkeypatch.setattr(dashboard, "date_diff", lambda a, b: (a - b).days)
+    monkeypatch.setattr(frappe, "local", types.SimpleNamespace(request_cache={}), raising=False)
+    return db, get_all_calls
+
+
+def _pending(count, level):
+    return [
+        {
+            "name": f"ER-{level}-{idx}",
+            "creation": datetime.date(2024, 3, 1),
+            "modified": datetime.date(2024, 3, 1 + idx % 28),
+            "owner": "requester@example.com",
+            "workflow_state": "Pending Review",
+            "current_approval_level": level,
+            "approver_user": "approver@example.com",
+            "amount": 100,
+            "cost_center": "CC-1",
+            "branch": "HQ",
+        }
+        for idx in range(count)
+    ]
+
+
+def test_get_data_issues_one_query_per_doctype_and_one_user_lookup(monkeypatch):
+    rows = _pending(5000, 1) + _pending(5000, 2)
+    db, get_all_calls = _install(
+        monkeypatch,
+        {"Expense Request": rows},
+        {"Expense Request": (1, 2, 3), "Additional Budget Request": (1,)},
+    )
+
+    data = dashboard.get_data({"user": "approver@example.com"})
+
+    assert len(data) == 10_000
+    assert db.queries == ["Expense Request", "Additional Budget Request"]
+    assert get_all_calls == ["DocField", "User"]
+    assert data[0]["approver"] == "Approver"
+    assert data[0]["days_pending"] == 30
+    assert data[0]["aging_category"] == "15-30 days"
+
+
+def test_schema_checks_are_cached_per_request(monkeypatch):
+    db, get_all_calls = _install(monkeypatch, {}, {"Expense Request": (1,)})
+
+    dashboard.get_data({"user": "approver@example.com"})
+    dashboard.get_data({"user": "approver@example.com"})
+
+    assert get_all_calls.count("DocField") == 1
+    assert db.queries == ["Expense Request", "Expense Request"]
+
+    # A new request re-reads the schema, e.g. after migrate added a level field.
+    frappe.local.request_cache = {}
+    dashboard.get_data({"user": "approver@example.com"})
+
+    assert get_all_calls.count("DocField") == 2
+
+
+def test_approval_level_filter_limits_level_conditions(monkeypatch):
+    captured = []
+    db, _calls = _install(monkeypatch, {}, {"Expense Request": (1, 2, 3)})
+    monkeypatch.setattr(
+        db, "sql", lambda query, params=None, as_dict=False: captured.append(query) or [], raising=False
+    )
+
+    dashboard.get_data({"user": "approver@example.com", "approval_level": "2"})
+
+    (query,) = captured
+    assert "`level_2_user` = %(user)s" in query
+    assert "level_1_user" not in query and "level_3_user" not in query
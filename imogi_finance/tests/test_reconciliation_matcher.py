@@ -0,0 +1,82 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from imogi_finance.reporting import build_monthly_reconciliation
+from imogi_finance.reporting import service
+
+
+def _linear_reconciliation(ledger_transactions, bank_statements, tolerance):
+    """The original O(n*m) scan, kept as the reference for match equivalence."""
+    pool = list(bank_statements)
+    matches, missing_from_bank = [], []
+    for tx in ledger_transactions:
+        amount = service._as_amount(tx.get("amount"))
+        direction = service._normalise_direction(tx.get("direction"))
+        signed_amount = amount if direction == "in" else -amount
+        tx_date = service._parse_date(tx.get("posting_date") or tx.get("date"))
+        index = next(
+            (
+                idx
+                for idx, statement in enumerate(pool)
+                if service._is_statement_match(signed_amount, direction, tx_date, statement, tolerance=tolerance)
+            ),
+            None,
+        )
+        if index is None:
+            missing_from_bank.append(tx)
+            continue
+        matches.append((tx["id"], pool.pop(index)["id"]))
+    return matches, [tx["id"] for tx in missing_from_bank], [row["id"] for row in pool]
+
+
+def _random_rows(rng, count, prefix, start=date(2024, 5, 1)):
+    rows = []
+    for idx in range(count):
+        row = {"id": f"{prefix}-{idx}", "amount": rng.choice([10, 10.5, 11, 25, 100, 100.01, 250])}
+        roll = rng.random()
+        if roll < 0.1:
+            row["direction"] = None
+            row["amount"] = -row["amount"] if rng.random() < 0.5 else row["amount"]
+        else:
+            row["direction"] = rng.choice(["in", "out", "Credit", "DR"])
+        if rng.random() > 0.05:
+            row["posting_date"] = (start + timedelta(days=rng.randint(0, 30))).isoformat()
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("tolerance", [0.0, 0.01, 0.6])
+def test_indexed_matcher_reproduces_linear_scan(seed, tolerance):
+    rng = random.Random(seed)
+    ledger = _random_rows(rng, 400, "L")
+    statements = _random_rows(rng, 400, "S")
+
+    result = build_monthly_reconciliation(
+        ledger_transactions=ledger, bank_statements=statements, month="2024-05", tolerance=tolerance
+    )
+
+    expected_matches, expected_missing_bank, expected_missing_ledger = _linear_reconciliation(
+        ledger, statements, tolerance
+    )
+    assert [(m["ledger"]["id"], m["statement"]["id"]) for m in result.matches] == expected_matches
+    assert [row["id"] for row in result.missing_from_bank] == expected_missing_bank
+    assert [row["id"] for row in result.missing_from_ledger] == expected_missing_ledger
+
+
+def test_reconciliation_matches_statement_fixture():
+    from imogi_finance.scripts.benchmark_reconciliation_matcher import build_statement_fixture
+
+    ledger, statements = build_statement_fixture(300)
+
+    result = build_monthly_reconciliation(
+        ledger_transactions=ledger, bank_statements=statements, month="2024-05", tolerance=0.01
+    )
+
+    assert [(m["ledger"]["id"], m["statement"]["id"]) for m in result.matches] == [
+        (f"L-{idx}", f"S-{idx}") for idx in range(300)
+    ]
+    assert {m["ledger"]["direction"] for m in result.matches} == {"in", "out"}
+    assert result.missing_from_bank == [] and result.missing_from_ledger == []
@@ -0,0 +1,132 @@
+import sys
+import types
+from datetime import date
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+
+query_builder = sys.modules.setdefault("frappe.query_builder", types.ModuleType("frappe.query_builder"))
+query_builder.DocType = getattr(query_builder, "DocType", lambda name: None)
+query_builder.Criterion = getattr(query_builder, "Criterion", object)
+functions = sys.modules.setdefault(
+    "frappe.query_builder.functions", types.ModuleType("frappe.query_builder.functions")
+)
+for _name in ("Count", "Sum", "Coalesce"):
+    setattr(functions, _name, getattr(functions, _name, lambda *args, **kwargs: None))
+
+from imogi_finance.imogi_finance.report.vat_input_register_verified import (  # noqa: E402
+    vat_input_register_verified as vat_input,
+)
+from imogi_finance.imogi_finance.utils import tax_report_utils  # noqa: E402
+from imogi_finance.imogi_finance.utils_register import register_integration  # noqa: E402
+
+
+INVOICES = [
+    {"name": f"PI-{idx:04d}", "posting_date": date(2024, 1, 1 + idx // 10), "ti_fp_dpp": 100.0}
+    for idx in range(23)
+]
+
+
+def _paged_get_data(calls):
+    def _get_data(filters, account, page_size=None, after=None):
+        calls.append(after)
+        rows = [row for row in INVOICES if not after or (row["posting_date"], row["name"]) > after]
+        return rows[:page_size]
+
+    return _get_data
+
+
+def test_iter_data_pages_with_keyset(monkeypatch):
+    calls = []
+    monkeypatch.setattr(vat_input, "get_ppn_input_account", lambda filters: "PPN Masukan")
+    monkeypatch.setattr(vat_input, "get_data", _paged_get_data(calls))
+
+    pages = list(vat_input.iter_data({"company": "IMOGI"}, page_size=10))
+
+    assert [len(page) for page in pages] == [10, 10, 3]
+    assert [row["name"] for page in pages for row in page] == [row["name"] for row in INVOICES]
+    assert calls == [None, (date(2024, 1, 1), "PI-0009"), (date(2024, 1, 2), "PI-0019")]
+
+
+def test_iter_register_rows_dispatches_to_report(monkeypatch):
+    calls = []
+    monkeypatch.setattr(vat_input, "get_ppn_input_account", lambda filters: "PPN Masukan")
+    monkeypatch.setattr(vat_input, "get_data", _paged_get_data(calls))
+    monkeypatch.setattr(frappe, "get_module", lambda path: sys.modules[path], raising=False)
+    monkeypatch.setattr(register_integration, "getdate", lambda value: value)
+
+    pages = register_integration.iter_register_rows(
+        "vat_input", "IMOGI", date(2024, 1, 1), date(2024, 1, 31), page_size=20
+    )
+
+    assert sum(len(page) for page in pages) == len(INVOICES)
+
+
+def test_unknown_register_is_rejected():
+    with pytest.raises(register_integration.RegisterIntegrationError):
+        list(register_integration.iter_register_rows("pb1", "IMOGI", "2024-01-01", "2024-01-31"))
+
+
+def test_invoice_totals_are_aggregated_in_sql(monkeypatch):
+    queries = []
+
+    def _sql(query, params=None, as_dict=False):
+        queries.append((query, params))
+        return [{"invoice_count": 3, "total_dpp": 300.0, "total_ppn": 33.0}]
+
+    monkeypatch.setattr(
+        frappe,
+        "db",
+        types.SimpleNamespace(sql=_sql, get_value=lambda *args, **kwargs: "Asset"),
+        raising=False,
+    )
+    monkeypatch.setattr(tax_report_utils, "getdate", lambda value: value)
+
+    totals = tax_report_utils.get_invoice_register_totals(
+        "Purchase Invoice",
+        "PPN Masukan",
+        {"company": "IMOGI", "from_date": "2024-01-01", "to_date": "2024-01-31", "verification_status": None},
+        party_field="supplier",
+        dpp_field="ti_fp_dpp",
+        status_field="ti_verification_status",
+        absolute_tax=True,
+    )
+
+    assert totals == {"invoice_count": 3, "total_dpp": 300.0, "total_ppn": 33.0}
+    query, params = queries[0]
+    assert len(queries) == 1
+    assert "abs(register.tax_amount)" in query
+    assert "gl.debit - gl.credit" in query
+    assert "ti_verification_status" not in query
+    assert params["company"] == "IMOGI" and params["voucher_type"] == "Purchase Invoice"
+
+
+def test_aggregate_mode_skips_report_rows(monkeypatch):
+    def _fail(*args, **kwargs):
+        raise AssertionError("register rows must not be loaded in aggregate mode")
+
+    totals = {
+        "vat_input": {"invoice_count": 2, "total_dpp": 200.0, "total_ppn": 22.0},
+        "vat_output": {"invoice_count": 5, "total_dpp": 500.0, "total_ppn": 55.0},
+        "withholding": {"totals_by_account": {"PPh 23": 4.0}, "total_amount": 4.0, "entry_count": 1},
+    }
+    for register, module_path in register_integration.REGISTER_REPORT_MODULES.items():
+        module = types.SimpleNamespace(execute=_fail, get_totals=lambda filters, register=register: totals[register])
+        monkeypatch.setitem(sys.modules, module_path, module)
+    monkeypatch.setattr(register_integration, "getdate", lambda value: value)
+    monkeypatch.setattr(
+        frappe, "utils", types.SimpleNamespace(now=lambda: "2024-02-01 00:00:00"), raising=False
+    )
+    monkeypatch.setattr(frappe, "session", types.SimpleNamespace(user="Administrator"), raising=False)
+
+    data = register_integration.get_all_register_data(
+        "IMOGI", "2024-01-01", "2024-01-31", aggregate_only=True
+    )
+
+    assert data["summary"]["vat_net"] == 33.0
+    assert data["summary"]["input_invoice_count"] == 2
+    assert data["summary"]["withholding_total"] == 4.0
+    assert data["vat_input"]["invoices"] == [] and data["withholding"]["entries"] == []
@@ -0,0 +1,158 @@
+import types
+from datetime import date
+
+import pytest
+
+from imogi_finance.reporting import checkpoints, data
+
+
+class _CheckpointDB:
+    """Keeps checkpoint rows in memory; movements come from a per-day ledger."""
+
+    def __init__(self, movements):
+        # {date: {branch: net amount}}
+        self.movements = movements
+        self.rows = []
+        self.aggregate_windows = []
+        # [(account, account_type, posting_date)] GL entries of the voucher under test
+        self.voucher_gl = []
+
+    def table_exists(self, doctype):
+        return doctype == checkpoints.CHECKPOINT_DOCTYPE
+
+    def has_column(self, doctype, column):
+        return True
+
+    def sql(self, query, params=None, as_dict=False):
+        if "`tabGL Entry` gle" in query:
+            earliest = {}
+            for account, account_type, posting_date in self.voucher_gl:
+                if account_type in params["account_types"]:
+                    earliest[account] = min(earliest.get(account, posting_date), posting_date)
+            return [{"account": account, "from_date": day} for account, day in earliest.items()]
+
+        if checkpoints.CHECKPOINT_DOCTYPE in query:
+            prior = [
+                row for row in self.rows
+                if row["account"] == params["account"] and row["checkpoint_date"] < params["before_date"]
+            ]
+            if not prior:
+                return []
+            latest = max(row["checkpoint_date"] for row in prior)
+            return [row for row in prior if row["checkpoint_date"] == latest]
+
+        self.aggregate_windows.append((params.get("from_date"), params["report_date"]))
+        totals = {}
+        for day, per_branch in self.movements.items():
+            if day >= params["report_date"] or (params.get("from_date") and day < params["from_date"]):
+                continue
+            for branch, amount in per_branch.items():
+                totals[branch] = totals.get(branch, 0.0) + amount
+        return [{"branch": branch, "balance": amount} for branch, amount in totals.items()]
+
+    def delete(self, doctype, filters):
+        def _matches(row):
+            for field, value in filters.items():
+                if isinstance(value, tuple):
+                    if not row[field] >= value[1]:
+                        return False
+                elif row[field] != value:
+                    return False
+            return True
+
+        self.rows = [row for row in self.rows if not _matches(row)]
+
+    def bulk_insert(self, doctype, fields, values):
+        for value in values:
+            self.rows.append(dict(zip(fields, value)))
+
+
+def _install(monkeypatch, movements):
+    db = _CheckpointDB(movements)
+    monkeypatch.setattr(checkpoints.frappe, "db", db, raising=False)
+    monkeypatch.setattr(data.frappe, "db", db, raising=False)
+    monkeypatch.setattr(
+        checkpoints.frappe, "utils", types.SimpleNamespace(now_datetime=lambda: "2024-05-01 00:00:00"), raising=False
+    )
+    return db
+
+
+MOVEMENTS = {
+    date(2024, 5, 1): {"HQ": 1000.0, "Branch A": 200.0},
+    date(2024, 5, 2): {"HQ": -300.0},
+    date(2024, 5, 6): {"Branch A": 50.0},
+}
+
+
+def test_opening_uses_nearest_checkpoint_plus_movements_across_gap(monkeypatch):
+    db = _install(monkeypatch, MOVEMENTS)
+
+    assert checkpoints.write_checkpoints(date(2024, 5, 2), bank_account="BCA", source_report="CBDR-1") == 2
+    db.aggregate_windows.clear()
+
+    # Weekend gap: no report for 3-5 May.
+    openings, checkpoint_date = checkpoints.get_opening_balances(date(2024, 5, 7), bank_account="BCA")
+
+    assert checkpoint_date == date(2024, 5, 2)
+    assert openings == {"HQ": pytest.approx(700.0), "Branch A": pytest.approx(250.0)}
+    assert db.aggregate_windows == [(date(2024, 5, 3), date(2024, 5, 7))]
+
+
+def test_backdated_transaction_invalidates_later_checkpoints(monkeypatch):
+    db = _install(monkeypatch, MOVEMENTS)
+    checkpoints.write_checkpoints(date(2024, 5, 1), bank_account="BCA")
+    checkpoints.write_checkpoints(date(2024, 5, 2), bank_account="BCA")
+
+    backdated = types.SimpleNamespace(bank_account="BCA", date="2024-05-02", get_doc_before_save=lambda: None)
+    checkpoints.invalidate_for_bank_transaction(backdated)
+
+    assert {row["checkpoint_date"] for row in db.rows} == {date(2024, 5, 1)}
+
+
+def test_voucher_invalidation_only_touches_its_cash_checkpoints(monkeypatch):
+    db = _install(monkeypatch, MOVEMENTS)
+    checkpoints.write_checkpoints(date(2024, 5, 2), bank_account="Kas")
+    checkpoints.write_checkpoints(date(2024, 5, 2), cash_account="Kas")
+    checkpoints.write_checkpoints(date(2024, 5, 2), cash_account="Biaya")
+    deletes = []
+    delete = db.delete
+    monkeypatch.setattr(db, "delete", lambda doctype, filters: deletes.append(filters) or delete(doctype, filters))
+    db.voucher_gl = [
+        ("Kas", "Cash", date(2024, 5, 2)),
+        ("Kas", "Cash", date(2024, 5, 1)),
+        ("Biaya", "Expense Account", date(2024, 5, 1)),
+    ]
+
+    checkpoints.invalidate_for_voucher(types.SimpleNamespace(doctype="Journal Entry", name="JV-1"))
+
+    # One DELETE for the cash account from its earliest line; the expense account is skipped.
+    assert deletes == [
+        {"account_doctype": checkpoints.CASH, "account": "Kas", "checkpoint_date": (">=", date(2024, 5, 1))}
+    ]
+    assert {(row["account_doctype"], row["account"]) for row in db.rows} == {
+        (checkpoints.BANK, "Kas"),
+        (checkpoints.CASH, "Biaya"),
+    }
+
+
+def test_multi_account_filters_are_not_checkpointed(monkeypatch):
+    _install(monkeypatch, MOVEMENTS)
+
+    assert checkpoints.get_opening_balances(date(2024, 5, 7), bank_account=["BCA", "BNI"]) is None
+    assert checkpoints.write_checkpoints(date(2024, 5, 2), bank_account=["BCA", "BNI"]) == 0
+
+
+def test_check_reporting_gaps_uses_single_query(monkeypatch):
+    calls = []
+
+    def _get_all(doctype, filters=None, fields=None, **kwargs):
+        calls.append(filters)
+        return [{"report_date": date(2024, 5, 6)}, {"report_date": "2024-05-04"}]
+
+    monkeypatch.setattr(data.frappe, "db", types.SimpleNamespace(), raising=False)
+    monkeypatch.setattr(data.frappe, "get_all", _get_all, raising=False)
+
+    missing = data.check_reporting_gaps(date(2024, 5, 7), bank_account="BCA", days_back=4)
+
+    assert missing == ["2024-05-05", "2024-05-03"]
+    assert len(calls) == 1
@@ -0,0 +1,84 @@
+import types
+from datetime import date
+
+from imogi_finance.reporting import data
+
+
+class _ReportingDB:
+    """Records get_all filters and answers opening-balance aggregates."""
+
+    def __init__(self, aggregate_rows):
+        self.aggregate_rows = aggregate_rows
+        self.sql_calls = []
+
+    def has_column(self, doctype, column):
+        return True
+
+    def sql(self, query, params=None, as_dict=False):
+        self.sql_calls.append((query, params))
+        return list(self.aggregate_rows)
+
+
+def _install(monkeypatch, aggregate_rows, previous_report=None):
+    db = _ReportingDB(aggregate_rows)
+    get_all_calls = []
+
+    def _get_all(doctype, filters=None, fields=None, **kwargs):
+        get_all_calls.append((doctype, filters))
+        if doctype == "Cash Bank Daily Report":
+            return [previous_report] if previous_report else []
+        if doctype == "GL Entry":
+            return [
+                {"name": "GLE-1", "branch": "HQ", "account": "Cash", "posting_date": date(2024, 5, 10),
+                 "debit": 100, "credit": 0, "voucher_no": "JV-1"},
+            ]
+        return []
+
+    monkeypatch.setattr(data.frappe, "db", db, raising=False)
+    monkeypatch.setattr(data.frappe, "get_all", _get_all, raising=False)
+    monkeypatch.setattr(
+        data.frappe, "logger", lambda *args, **kwargs: types.SimpleNamespace(info=lambda *a, **k: None), raising=False
+    )
+    return db, get_all_calls
+
+
+def test_load_daily_inputs_fetches_only_report_day(monkeypatch):
+    db, get_all_calls = _install(
+        monkeypatch, [{"branch": "HQ", "balance": 900}, {"branch": None, "balance": -50}]
+    )
+
+    transactions, openings = data.load_daily_inputs(date(2024, 5, 10), cash_accounts=["Cash"])
+
+    (gl_filters,) = [filters for doctype, filters in get_all_calls if doctype == "GL Entry"]
+    assert gl_filters["posting_date"] == ("between", [date(2024, 5, 10), date(2024, 5, 10)])
+    assert [tx["reference"] for tx in transactions] == ["JV-1"]
+    assert transactions[0]["deposit"] == 100
+    assert openings == {"HQ": 900.0, "Unassigned": -50.0}
+
+    (query, params), = db.sql_calls
+    assert "`tabGL Entry`" in query and "group by branch" in query
+    assert params["report_date"] == date(2024, 5, 10)
+    assert params["accounts"] == ("Cash",)
+
+
+def test_previous_report_skips_opening_aggregate(monkeypatch):
+    previous = {"name": "CBDR-1", "snapshot_json": '{"branches": [{"branch": "HQ", "closing_balance": 750}]}'}
+    db, _calls = _install(monkeypatch, [], previous_report=previous)
+
+    _transactions, openings = data.load_daily_inputs(date(2024, 5, 10), bank_accounts=["BCA"])
+
+    assert openings == {"HQ": 750.0}
+    assert db.sql_calls == []
+
+
+def test_bank_opening_aggregate_supports_delta_window(monkeypatch):
+    db, _calls = _install(monkeypatch, [{"branch": "HQ", "balance": 25}])
+
+    openings = data.fetch_bank_opening_balances(
+        date(2024, 5, 10), bank_accounts="BCA", from_date=date(2024, 5, 8)
+    )
+
+    (query, params), = db.sql_calls
+    assert "`date` >= %(from_date)s" in query and "`date` < %(report_date)s" in query
+    assert params["bank_accounts"] == ("BCA",)
+    assert openings == {"HQ": 25.0}
@@ -0,0 +1,179 @@
+import pickle
+import sys
+import time
+import types
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+
+from imogi_finance.reporting import tasks  # noqa: E402
+
+
+class _FakeCache:
+    """Subset of frappe's RedisWrapper used by the reporting fan-out."""
+
+    def __init__(self):
+        self.hashes, self.lists, self.values = {}, {}, {}
+
+    def make_key(self, key):
+        return key
+
+    def expire(self, key, seconds):
+        return None
+
+    def hget(self, name, key):
+        value = self.hashes.get(name, {}).get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = pickle.dumps(value)
+
+    def hgetall(self, name):
+        return {key: pickle.loads(value) for key, value in self.hashes.get(name, {}).items()}
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value.encode())
+
+    def lpop(self, key):
+        items = self.lists.get(key) or []
+        return items.pop(0) if items else None
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.values[key] = value
+
+    def delete_value(self, keys):
+        for key in keys if isinstance(keys, list) else [keys]:
+            self.hashes.pop(key, None)
+            self.lists.pop(key, None)
+            self.values.pop(key, None)
+
+
+class _Harness:
+    def __init__(self, monkeypatch, *, accounts, parallel=2, retries=1, failures=None):
+        self.cache = _FakeCache()
+        self.queue = []
+        self.job_ids = []
+        self.running = 0
+        self.max_running = 0
+        self.failures = dict(failures or {})
+        self.created = []
+        settings = types.SimpleNamespace(
+            daily_report_view_only=0,
+            daily_report_max_parallel_jobs=parallel,
+            daily_report_max_retries=retries,
+        )
+
+        def _enqueue(method, **kwargs):
+            self.job_ids.append(kwargs.pop("job_id"))
+            for key in ("queue", "timeout", "job_name", "deduplicate", "now", "is_async"):
+                kwargs.pop(key)
+            self.queue.append(kwargs)
+
+        def _ensure(report_date, account_field, account, branches=None):
+            if self.failures.get(account, 0) > 0:
+                self.failures[account] -= 1
+                raise RuntimeError(f"{account} unavailable")
+            self.created.append(account)
+            return f"CBDR-{account}"
+
+        logger = types.SimpleNamespace(info=lambda *a, **k: None, error=lambda *a, **k: None)
+        monkeypatch.setattr(frappe, "cache", lambda: self.cache, raising=False)
+        monkeypatch.setattr(frappe, "enqueue", _enqueue, raising=False)
+        monkeypatch.setattr(frappe, "flags", types.SimpleNamespace(in_test=False), raising=False)
+        monkeypatch.setattr(frappe, "logger", lambda *a, **k: logger, raising=False)
+        monkeypatch.setattr(frappe, "log_error", lambda *a, **k: None, raising=False)
+        monkeypatch.setattr(frappe, "only_for", lambda *a, **k: None, raising=False)
+        monkeypatch.setattr(
+            frappe, "db", types.SimpleNamespace(commit=lambda: None, rollback=lambda: None), raising=False
+        )
+        monkeypatch.setattr(tasks, "get_finance_control_settings", lambda: settings)
+        monkeypatch.setattr(tasks, "list_reporting_accounts", lambda: list(accounts))
+        monkeypatch.setattr(tasks, "_reporting_queue", lambda: "imogi_reporting")
+        monkeypatch.setattr(tasks, "_ensure_account_report", _ensure)
+
+    def drain(self):
+        """Run queued jobs like a worker pool, tracking how many were in flight."""
+        while self.queue:
+            self.max_running = max(self.max_running, len(self.queue))
+            tasks.generate_account_report(**self.queue.pop(0))
+
+
+ACCOUNTS = [("bank_account", f"BANK-{idx}") for idx in range(5)] + [("cash_account", "Kas Kecil")]
+
+
+def test_fan_out_is_bounded_and_records_summary(monkeypatch):
+    harness = _Harness(monkeypatch, accounts=ACCOUNTS, parallel=2)
+
+    tasks.run_daily_reporting(report_date="2024-05-10")
+    assert len(harness.queue) == 2
+
+    harness.drain()
+
+    assert harness.max_running == 2
+    assert sorted(harness.created) == sorted(account for _field, account in ACCOUNTS)
+    summary = tasks.get_daily_reporting_status("2024-05-10")
+    assert summary["counts"] == {"done": 6}
+    assert all(entry["seconds"] is not None for entry in summary["entries"])
+    assert harness.cache.get_value(tasks._summary_key("2024-05-10"))["accounts"] == 6
+
+
+def test_failed_account_is_retried_then_marked_failed(monkeypatch):
+    harness = _Harness(
+        monkeypatch, accounts=ACCOUNTS[:3], parallel=3, retries=1, failures={"BANK-0": 1, "BANK-1": 5}
+    )
+
+    tasks.run_daily_reporting(report_date="2024-05-10")
+    harness.drain()
+
+    entries = {entry["account"]: entry for entry in tasks.get_daily_reporting_status("2024-05-10")["entries"]}
+    assert entries["BANK-0"]["status"] == "done" and entries["BANK-0"]["attempts"] == 2
+    assert entries["BANK-1"]["status"] == "failed" and entries["BANK-1"]["attempts"] == 2
+    assert "imogi-daily-report:2024-05-10:bank_account:BANK-1:2" in harness.job_ids
+
+
+def test_rerun_while_active_does_not_enqueue_again(monkeypatch):
+    harness = _Harness(monkeypatch, accounts=ACCOUNTS, parallel=2)
+
+    tasks.run_daily_reporting(report_date="2024-05-10")
+    result = tasks.run_daily_reporting(report_date="2024-05-10")
+
+    assert len(harness.job_ids) == 2
+    assert result["counts"] == {"queued": 6}
+
+
+def test_lost_jobs_are_recovered_and_their_slots_refilled(monkeypatch):
+    harness = _Harness(monkeypatch, accounts=ACCOUNTS, parallel=2, retries=1)
+    tasks.run_daily_reporting(report_date="2024-05-10")
+
+    # Both workers are killed mid-job, so neither reaches the dispatch at the end.
+    harness.queue.clear()
+    lost_at = time.time() - tasks.LOST_RUNNING_AFTER_SECONDS - 1
+    for account, attempts in (("BANK-0", 2), ("BANK-1", 1)):
+        run_key, field = tasks._run_key("2024-05-10"), f"bank_account:{account}"
+        entry = harness.cache.hget(run_key, field)
+        entry.update(status="running", attempts=attempts, updated_at=lost_at)
+        harness.cache.hset(run_key, field, entry)
+
+    tasks.top_up_daily_reporting("2024-05-10")
+
+    # BANK-0 used its last attempt and fails; its slot goes to the next pending account.
+    assert [(job["account"], job["attempt"]) for job in harness.queue] == [("BANK-1", 2), ("BANK-2", 1)]
+    harness.drain()
+
+    assert harness.max_running == 2
+    summary = tasks.get_daily_reporting_status("2024-05-10")
+    assert summary["counts"] == {"failed": 1, "done": 5}
+    assert harness.cache.get_value(tasks._summary_key("2024-05-10"))["accounts"] == 6
+
+
+@pytest.mark.parametrize("attempt", [1, 3])
+def test_job_ids_are_deterministic(attempt):
+    assert tasks._job_id("2024-05-10", "cash_account", "Kas", attempt) == (
+        f"imogi-daily-report:2024-05-10:cash_account:Kas:{attempt}"
+    )
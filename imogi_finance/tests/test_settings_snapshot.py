@@ -0,0 +1,187 @@
+import sys
+import types
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+
+from imogi_finance.settings import snapshot, utils  # noqa: E402
+
+MAPPINGS = [
+    {"purpose": "ppn_variance", "company": "TC", "account": "PPN Var TC"},
+    {"purpose": "ppn_variance", "company": "", "account": "PPN Var Default"},
+    {"purpose": "ppn_variance", "company": "", "account": "PPN Var Second"},
+    {"purpose": "default_prepaid", "company": "TC", "account": ""},
+    {"purpose": "default_prepaid", "company": None, "account": "Prepaid Default"},
+]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = value
+
+
+class _SettingsDoc:
+    doctype = utils.FINANCE_CONTROL_SETTINGS_DOCTYPE
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def as_dict(self):
+        return {"doctype": self.doctype, "name": self.doctype, "receipt_mode": "OFF", "gl_account_mappings": self.rows}
+
+
+class _ValidationError(Exception):
+    pass
+
+
+class _Callbacks(list):
+    add = list.append
+
+    def run(self):
+        while self:
+            self.pop(0)()
+
+
+def _install(monkeypatch, rows, redis=None):
+    loads = []
+
+    def _get_cached_doc(doctype):
+        loads.append(doctype)
+        return _SettingsDoc(rows)
+
+    db = types.SimpleNamespace(
+        exists=lambda doctype, name: name == utils.FINANCE_CONTROL_SETTINGS_DOCTYPE,
+        get_value=lambda doctype, name, field: 1,
+        after_commit=_Callbacks(),
+    )
+
+    def _throw(msg, title=None):
+        raise _ValidationError(msg)
+
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    monkeypatch.setattr(frappe, "get_cached_doc", _get_cached_doc, raising=False)
+    monkeypatch.setattr(frappe, "throw", _throw, raising=False)
+    monkeypatch.setattr(frappe, "only_for", lambda *args, **kwargs: None, raising=False)
+    monkeypatch.setattr(frappe, "DoesNotExistError", type("DoesNotExistError", (Exception,), {}), raising=False)
+    monkeypatch.setattr(frappe, "PermissionError", type("PermissionError", (Exception,), {}), raising=False)
+    monkeypatch.setattr(frappe, "cache", (lambda: redis) if redis else None, raising=False)
+    monkeypatch.setattr(snapshot, "_process_entries", {})
+    _new_request(monkeypatch)
+    return loads
+
+
+def _new_request(monkeypatch):
+    monkeypatch.setattr(frappe, "local", types.SimpleNamespace(request_cache={}), raising=False)
+
+
+def test_gl_account_lookup_matches_table_scan_and_loads_once(monkeypatch):
+    loads = _install(monkeypatch, MAPPINGS, redis=_FakeRedis())
+
+    for _ in range(3):
+        assert utils.get_gl_account("ppn_variance", company="TC") == "PPN Var TC"
+        assert utils.get_gl_account("ppn_variance", company="Other") == "PPN Var Default"
+        assert utils.get_gl_account("ppn_variance") == "PPN Var Default"
+        assert utils.get_gl_account("default_prepaid", company="TC") == "Prepaid Default"
+        assert utils.get_gl_account("missing", required=False) is None
+        with pytest.raises(_ValidationError):
+            utils.get_gl_account("missing", company="TC")
+
+    assert loads == [utils.FINANCE_CONTROL_SETTINGS_DOCTYPE]
+    stats = snapshot.get_settings_cache_stats()["request"][utils.FINANCE_CONTROL_SETTINGS_DOCTYPE]
+    # One DocType kind check, one snapshot and one account index were loaded.
+    assert stats["loads"] == 3
+    assert stats["lookups"] > 30
+
+
+def test_snapshot_is_read_only():
+    snap = snapshot.SettingsSnapshot.from_doc(_SettingsDoc(MAPPINGS))
+
+    assert snap.receipt_mode == "OFF" and snap.get("missing", 1) == 1
+    assert snap.gl_account_mappings[0]["account"] == "PPN Var TC"
+    with pytest.raises(Exception):
+        snap.receipt_mode = "ON"
+    with pytest.raises(TypeError):
+        snap.gl_account_mappings[0]["account"] = "Other"
+    with pytest.raises(AttributeError):
+        snap.missing
+
+
+def test_version_bump_invalidates_other_workers_on_next_request(monkeypatch):
+    redis = _FakeRedis()
+    rows = [dict(MAPPINGS[1])]
+    loads = _install(monkeypatch, rows, redis=redis)
+    assert utils.get_gl_account("ppn_variance") == "PPN Var Default"
+
+    # Another process saves the settings: only the Redis version changes here.
+    rows[0]["account"] = "PPN Var New"
+    redis.hset(snapshot.VERSION_KEY, utils.FINANCE_CONTROL_SETTINGS_DOCTYPE, "v2")
+    assert utils.get_gl_account("ppn_variance") == "PPN Var Default"
+
+    _new_request(monkeypatch)
+    assert utils.get_gl_account("ppn_variance") == "PPN Var New"
+
+    # A save in this request is visible immediately.
+    rows[0]["account"] = "PPN Var Local"
+    snapshot.invalidate_settings_snapshot(types.SimpleNamespace(doctype=utils.FINANCE_CONTROL_SETTINGS_DOCTYPE))
+    assert utils.get_gl_account("ppn_variance") == "PPN Var Local"
+    assert len(loads) == 3
+
+
+def test_without_request_context_or_redis_lookups_pass_through(monkeypatch):
+    loads = _install(monkeypatch, MAPPINGS)
+
+    utils.get_gl_account("ppn_variance")
+    utils.get_gl_account("ppn_variance")
+    assert len(loads) == 2
+
+    monkeypatch.setattr(frappe, "local", types.SimpleNamespace(), raising=False)
+    monkeypatch.setattr(frappe, "cache", lambda: _FakeRedis(), raising=False)
+    utils.get_gl_account("ppn_variance")
+    assert len(loads) == 3
+
+
+def test_entries_are_isolated_per_site_without_version_tokens(monkeypatch):
+    redis = _FakeRedis()
+    rows = [dict(MAPPINGS[1])]
+    loads = _install(monkeypatch, rows, redis=redis)
+
+    monkeypatch.setattr(frappe, "local", types.SimpleNamespace(site="a.local", request_cache={}), raising=False)
+    assert utils.get_gl_account("ppn_variance") == "PPN Var Default"
+    # The first read stamps a token, so a missing version is never matched.
+    assert redis.hashes[snapshot.VERSION_KEY][utils.FINANCE_CONTROL_SETTINGS_DOCTYPE]
+
+    rows[0]["account"] = "PPN Var Site B"
+    redis.hashes.clear()
+    monkeypatch.setattr(frappe, "local", types.SimpleNamespace(site="b.local", request_cache={}), raising=False)
+    assert utils.get_gl_account("ppn_variance") == "PPN Var Site B"
+    assert len(loads) == 2
+
+
+def test_load_before_commit_is_dropped_after_commit(monkeypatch):
+    redis = _FakeRedis()
+    rows = [dict(MAPPINGS[1])]
+    loads = _install(monkeypatch, rows, redis=redis)
+    assert utils.get_gl_account("ppn_variance") == "PPN Var Default"
+
+    # The save stamps a token in on_update; its new row is not committed yet.
+    snapshot.invalidate_settings_snapshot(types.SimpleNamespace(doctype=utils.FINANCE_CONTROL_SETTINGS_DOCTYPE))
+
+    # Another request reads the old committed row under the new token.
+    _new_request(monkeypatch)
+    assert utils.get_gl_account("ppn_variance") == "PPN Var Default"
+
+    rows[0]["account"] = "PPN Var Committed"
+    frappe.db.after_commit.run()
+
+    _new_request(monkeypatch)
+    assert utils.get_gl_account("ppn_variance") == "PPN Var Committed"
+    assert len(loads) == 3
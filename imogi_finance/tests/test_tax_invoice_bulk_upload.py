@@ -0,0 +1,156 @@
+import importlib
+import sys
+import types
+import zipfile
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = getattr(frappe, "_", lambda msg, *args, **kwargs: msg)
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+frappe_utils = sys.modules.setdefault("frappe.utils", types.ModuleType("frappe.utils"))
+file_manager = sys.modules.setdefault("frappe.utils.file_manager", types.ModuleType("frappe.utils.file_manager"))
+file_manager.get_file_path = getattr(file_manager, "get_file_path", lambda url: url)
+file_manager.save_file = getattr(file_manager, "save_file", lambda **kwargs: None)
+
+API_MODULE = "imogi_finance.imogi_finance.doctype.tax_invoice_upload.tax_invoice_upload_api"
+FP_NUMBERS = [f"0100002600000{idx:03d}" for idx in range(1, 6)]
+
+
+@pytest.fixture()
+def api(monkeypatch):
+    # Record creation itself is replaced per test; only the sync hook import is stubbed here.
+    service = types.ModuleType("imogi_finance.services.tax_invoice_service")
+    service.sync_tax_invoice_with_sales = lambda doc, fail_silently=False: None
+    monkeypatch.setitem(sys.modules, "imogi_finance.services.tax_invoice_service", service)
+    sys.modules.pop(API_MODULE, None)
+    module = importlib.import_module(API_MODULE)
+    yield module
+    sys.modules.pop(API_MODULE, None)
+
+
+class _Cache:
+    def __init__(self):
+        self.values = {}
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.values[key] = value
+
+    def delete_value(self, key):
+        self.values.pop(key, None)
+
+
+class _DB:
+    def __init__(self, fail_on_commit=None):
+        self.commits = 0
+        self.fail_on_commit = fail_on_commit
+
+    def commit(self):
+        self.commits += 1
+        if self.commits == self.fail_on_commit:
+            raise RuntimeError("worker killed")
+
+
+def _write_files(tmp_path, missing_pdf_row=True):
+    zip_path = tmp_path / "faktur.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for fp in FP_NUMBERS:
+            zf.writestr(f"pdfs/{fp[:3]}.{fp[3:6]}-{fp[6:8]}.{fp[8:]}.pdf", b"%PDF-" + fp.encode())
+        zf.writestr("pdfs/9999999999999999.pdf", b"%PDF-unmatched")
+        zf.writestr("readme.txt", b"not a pdf")
+
+    rows = ["fp_number,sales_invoice,dpp,ppn,fp_date,customer_npwp"]
+    rows += [f"{fp},SINV-{idx},1000,120,2026-01-15,0123456789012345" for idx, fp in enumerate(FP_NUMBERS, 1)]
+    if missing_pdf_row:
+        rows.append("0100002600000999,SINV-99,1000,120,2026-01-15,0123456789012345")
+    csv_path = tmp_path / "faktur.csv"
+    csv_path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return str(zip_path), str(csv_path)
+
+
+def _install(api, monkeypatch, db):
+    cache = _Cache()
+    created = []
+
+    def _create(row_data, batch_name, overwrite_existing):
+        assert row_data["pdf_content"] == b"%PDF-" + row_data["fp16"].encode()
+        created.append(row_data["fp16"])
+        return {"action": "created", "doc_info": {"fp_number": row_data["fp16"], "vat_out_batch": batch_name}}
+
+    monkeypatch.setattr(frappe, "cache", lambda: cache, raising=False)
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    monkeypatch.setattr(api, "get_file_path", lambda url: url)
+    monkeypatch.setattr(api, "_create_or_update_tax_invoice_upload", _create)
+    return cache, created
+
+
+def test_index_zip_pdfs_keeps_members_not_contents(api, tmp_path):
+    zip_path, _ = _write_files(tmp_path)
+
+    with zipfile.ZipFile(zip_path) as zf:
+        index = api._index_zip_pdfs(zf)
+
+    assert sorted(index) == sorted(FP_NUMBERS + ["9999999999999999"])
+    assert all(isinstance(info, zipfile.ZipInfo) for info in index.values())
+
+
+def test_bulk_creation_commits_in_chunks_and_reports_progress(api, tmp_path, monkeypatch):
+    zip_path, csv_path = _write_files(tmp_path)
+    db = _DB()
+    cache, created = _install(api, monkeypatch, db)
+
+    result = api._process_bulk_creation("VOB-1", zip_path, csv_path, chunk_size=2)
+
+    assert created == FP_NUMBERS
+    assert result["status"] == "partial"
+    assert (result["created"], result["updated"], result["skipped"]) == (5, 0, 1)
+    assert result["row_errors"] == [{"row": 7, "fp_number": "0100002600000999", "reason": "PDF not found in ZIP"}]
+    assert result["csv_missing_pdf"] == ["0100002600000999"]
+    assert result["pdf_unmatched"] == ["9999999999999999"]
+    # Chunks after rows 2, 4 and 6, plus the final commit.
+    assert db.commits == 4
+
+    progress = api._get_bulk_progress(api._bulk_import_id("VOB-1", zip_path, csv_path))
+    assert progress["status"] == "finished"
+    assert progress["next_row"] == progress["total"] == 6
+
+
+def test_bulk_creation_resumes_after_last_committed_chunk(api, tmp_path, monkeypatch):
+    zip_path, csv_path = _write_files(tmp_path, missing_pdf_row=False)
+    cache, created = _install(api, monkeypatch, _DB(fail_on_commit=2))
+
+    with pytest.raises(RuntimeError):
+        api._process_bulk_creation("VOB-1", zip_path, csv_path, chunk_size=2)
+
+    import_id = api._bulk_import_id("VOB-1", zip_path, csv_path)
+    progress = api._get_bulk_progress(import_id)
+    assert progress["status"] == "failed"
+    assert progress["next_row"] == 2 and progress["created"] == 2
+
+    monkeypatch.setattr(frappe, "db", _DB(), raising=False)
+    del created[:]
+    result = api._process_bulk_creation("VOB-1", zip_path, csv_path, chunk_size=2)
+
+    assert created == FP_NUMBERS[2:]
+    assert result["created"] == 5
+    assert [doc["fp_number"] for doc in result["created_docs"]] == FP_NUMBERS
+
+
+def test_job_status_reports_committed_rows(api, monkeypatch):
+    cache = _Cache()
+    monkeypatch.setattr(frappe, "cache", lambda: cache, raising=False)
+    job = types.SimpleNamespace(get_status=lambda: "started")
+    background_jobs = types.ModuleType("frappe.utils.background_jobs")
+    background_jobs.get_job = lambda job_id: job
+    monkeypatch.setitem(sys.modules, "frappe.utils.background_jobs", background_jobs)
+    monkeypatch.setattr(frappe_utils, "background_jobs", background_jobs, raising=False)
+
+    api._set_bulk_progress("imp-1", {"status": "processing", "total": 400, "next_row": 150})
+
+    status = api.get_bulk_job_status("job-1", "imp-1")
+    assert status["progress_pct"] == 37
+    assert (status["processed"], status["total"]) == (150, 400)
+    assert api.get_bulk_job_status("job-1")["progress_pct"] == 0
@@ -350,7 +350,7 @@ def test_t7_coretax_export_includes_verified_only(monkeypatch):
     monkeypatch.setattr(frappe, "get_cached_doc", lambda *_args, **_kwargs: settings)
     captured_filters = {}
 
-    def fake_get_list(doctype, filters=None, fields=None):
+    def fake_get_list(doctype, filters=None, fields=None, **kwargs):
         nonlocal captured_filters
         captured_filters = filters or {}
         return [
@@ -370,7 +370,10 @@ def test_t7_coretax_export_includes_verified_only(monkeypatch):
     monkeypatch.setattr(
         tax_operations,
         "_serialize_rows",
-        lambda rows, headers, file_format, filename: captured_rows.update({"rows": rows, "headers": headers}) or "file-url",
+        lambda rows, headers, file_format, filename, **kwargs: captured_rows.update(
+            {"rows": list(rows), "headers": headers}
+        )
+        or "file-url",
     )
 
     url = tax_operations.generate_coretax_export(
@@ -0,0 +1,259 @@
+import sys
+import types
+from datetime import date, timedelta
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+
+from imogi_finance import tax_period_aggregates as aggregates  # noqa: E402
+from imogi_finance.settings import utils as settings_utils  # noqa: E402
+
+
+class _AggregateDB:
+    """Aggregate rows in memory; GL totals come from a per-day ledger."""
+
+    def __init__(self, ledger):
+        # [(date, account, debit, credit)]
+        self.ledger = list(ledger)
+        self.rows = {}
+        self.gl_queries = []
+        self.watermark_queries = 0
+
+    def table_exists(self, doctype):
+        return doctype == aggregates.AGGREGATE_DOCTYPE
+
+    def post(self, day, account, debit, credit):
+        """A GL posting made outside the hooked vouchers."""
+        self.ledger.append((day, account, debit, credit))
+
+    def sql(self, query, params=None, as_dict=False):
+        if "max(modified)" in query:
+            self.watermark_queries += 1
+            per_day = {}
+            for seq, (day, account, _debit, _credit) in enumerate(self.ledger):
+                if params["date_from"] <= day <= params["date_to"] and account in params["accounts"]:
+                    row = per_day.setdefault(day, {"posting_date": day, "entry_count": 0})
+                    row["entry_count"] += 1
+                    row["last_modified"] = f"2024-02-01 00:00:{seq:02d}"
+            return list(per_day.values())
+
+        self.gl_queries.append(params["days"])
+        totals = {}
+        for day, account, debit, credit in self.ledger:
+            if day in params["days"] and account in params["accounts"]:
+                row = totals.setdefault((day, account), {"posting_date": day, "account": account,
+                                                         "entry_count": 0, "debit": 0.0, "credit": 0.0})
+                row["entry_count"] += 1
+                row["debit"] += debit
+                row["credit"] += credit
+        return list(totals.values())
+
+    def get_value(self, doctype, name, field):
+        row = self.rows.get(name)
+        return row[field] if row else None
+
+    def _matches(self, row, filters):
+        for field, value in filters.items():
+            if isinstance(value, tuple):
+                op, operand = value
+                if op == "in" and row[field] not in operand:
+                    return False
+                if op == ">=" and not row[field] >= operand:
+                    return False
+                if op == "between" and not operand[0] <= row[field] <= operand[1]:
+                    return False
+            elif row[field] != value:
+                return False
+        return True
+
+    def delete(self, doctype, filters):
+        self.rows = {name: row for name, row in self.rows.items() if not self._matches(row, filters)}
+
+    def bulk_insert(self, doctype, fields, values, ignore_duplicates=False):
+        for value in values:
+            row = dict(zip(fields, value))
+            self.rows[row["name"]] = row
+
+
+LEDGER = [
+    (date(2024, 1, 3), "PPh 23 - I", 0.0, 200.0),
+    (date(2024, 1, 3), "PPh 21 - I", 0.0, 50.0),
+    (date(2024, 1, 10), "PB1 Jakarta - I", 0.0, 30.0),
+    (date(2024, 1, 10), "PB1 Default - I", 0.0, 5.0),
+    (date(2024, 1, 20), "BPJS - I", 0.0, 70.0),
+    (date(2023, 12, 15), "PPN Masukan - I", 400.0, 0.0),
+    (date(2023, 12, 31), "PPN Masukan - I", 0.0, 100.0),
+]
+INVOICE_TAX = {
+    "Purchase Invoice": {date(2024, 1, 3): (2, 110.0), date(2024, 1, 20): (1, 40.0)},
+    "Sales Invoice": {date(2024, 1, 10): (3, 330.0)},
+}
+
+PROFILE = types.SimpleNamespace(
+    name="TP-IMOGI",
+    ppn_input_account="PPN Masukan - I",
+    pph_accounts=[types.SimpleNamespace(payable_account="PPh 23 - I"), types.SimpleNamespace(payable_account="PPh 21 - I")],
+    enable_pb1_multi_branch=1,
+    pb1_account_mappings=[types.SimpleNamespace(branch="Jakarta", pb1_payable_account="PB1 Jakarta - I")],
+    pb1_payable_account="PB1 Default - I",
+    bpjs_payable_account="BPJS - I",
+)
+
+
+def _install(monkeypatch):
+    db = _AggregateDB(LEDGER)
+    vat_queries = []
+
+    def _vat_totals(company, doctype, tax_account, days):
+        vat_queries.append((doctype, tuple(days)))
+        return {
+            day: {"invoice_count": count, "total_dpp": 0.0, "total_ppn": amount}
+            for day, (count, amount) in INVOICE_TAX[doctype].items()
+            if day in days
+        }
+
+    def _get_all(doctype, filters=None, fields=None, **kwargs):
+        if doctype == "GL Entry":
+            as_of = filters[-1][2]
+            debit = sum(d for day, account, d, c in LEDGER if account == "PPN Masukan - I" and day <= as_of)
+            credit = sum(c for day, account, d, c in LEDGER if account == "PPN Masukan - I" and day <= as_of)
+            return [{"debit_total": debit, "credit_total": credit}]
+        return [dict(row) for row in db.rows.values() if db._matches(row, filters)]
+
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    monkeypatch.setattr(frappe, "get_all", _get_all, raising=False)
+    monkeypatch.setattr(
+        frappe, "utils",
+        types.SimpleNamespace(now_datetime=lambda: "2024-02-01 00:00:00", now=lambda: "2024-02-01 00:00:00"),
+        raising=False,
+    )
+    monkeypatch.setattr(aggregates, "getdate", lambda value: value)
+    monkeypatch.setattr(aggregates, "_fetch_vat_totals", _vat_totals)
+    monkeypatch.setattr(settings_utils, "get_ppn_accounts", lambda company: ("PPN Masukan - I", "PPN Keluaran - I"))
+    return db, vat_queries
+
+
+def _snapshot():
+    return aggregates.build_snapshot("IMOGI", date(2024, 1, 1), date(2024, 1, 31), PROFILE)
+
+
+def test_snapshot_rolls_up_daily_rows(monkeypatch):
+    _install(monkeypatch)
+
+    snapshot = _snapshot()
+
+    assert snapshot["input_vat_total"] == 150.0 and snapshot["input_invoice_count"] == 3
+    assert snapshot["output_vat_total"] == 330.0 and snapshot["output_invoice_count"] == 3
+    assert snapshot["withholding_by_account"] == {"PPh 23 - I": 200.0, "PPh 21 - I": 50.0}
+    assert snapshot["pph_total"] == 250.0 and snapshot["withholding_entry_count"] == 2
+    assert snapshot["pb1_breakdown"] == {"Jakarta": 30.0, "_default": 5.0}
+    assert snapshot["pb1_total"] == 35.0
+    assert snapshot["bpjs_total"] == 70.0
+    assert snapshot["input_vat_carry_forward"] == 300.0
+    assert snapshot["vat_net"] == pytest.approx(330.0 - 450.0)
+    assert snapshot["meta"]["recomputed_days"] == 31
+
+
+def test_refresh_only_recomputes_invalidated_days(monkeypatch):
+    db, vat_queries = _install(monkeypatch)
+    _snapshot()
+    db.gl_queries.clear()
+    vat_queries.clear()
+
+    assert _snapshot()["meta"]["recomputed_days"] == 0
+    assert db.gl_queries == [] and vat_queries == []
+    assert db.watermark_queries == 2
+
+    aggregates.invalidate_for_voucher(types.SimpleNamespace(company="IMOGI", posting_date=date(2024, 1, 10)))
+    snapshot = _snapshot()
+
+    assert snapshot["meta"]["recomputed_days"] == 1
+    assert db.gl_queries == [(date(2024, 1, 10),)]
+    assert snapshot["output_vat_total"] == 330.0
+
+
+def test_non_invoice_gl_posting_recomputes_its_day(monkeypatch):
+    db, vat_queries = _install(monkeypatch)
+    _snapshot()
+    db.gl_queries.clear()
+
+    # e.g. Repost Accounting Ledger or an Asset voucher: no invalidation hook runs.
+    db.post(date(2024, 1, 17), "PPh 23 - I", 0.0, 25.0)
+    snapshot = _snapshot()
+
+    assert snapshot["meta"]["recomputed_days"] == 1
+    assert db.gl_queries == [(date(2024, 1, 17),)]
+    assert snapshot["withholding_by_account"]["PPh 23 - I"] == 225.0
+
+
+def test_posting_committed_during_compute_is_picked_up_next_refresh(monkeypatch):
+    db, _vat_queries = _install(monkeypatch)
+    fetch_totals = aggregates._fetch_account_totals
+
+    def _racing_fetch(company, accounts, days):
+        totals = fetch_totals(company, accounts, days)
+        # Another voucher commits after the totals were read, before the rows are stored.
+        if len(db.ledger) == len(LEDGER):
+            db.post(date(2024, 1, 20), "BPJS - I", 0.0, 10.0)
+        return totals
+
+    monkeypatch.setattr(aggregates, "_fetch_account_totals", _racing_fetch)
+    assert _snapshot()["bpjs_total"] == 70.0
+
+    snapshot = _snapshot()
+
+    assert snapshot["meta"]["recomputed_days"] == 1
+    assert snapshot["bpjs_total"] == 80.0
+
+
+def test_backdated_posting_clears_carry_forward_balance(monkeypatch):
+    db, _vat_queries = _install(monkeypatch)
+    _snapshot()
+    balance_rows = [row for row in db.rows.values() if row["component"] == aggregates.BALANCE]
+    assert [row["posting_date"] for row in balance_rows] == [date(2023, 12, 31)]
+
+    aggregates.invalidate_for_voucher(types.SimpleNamespace(company="IMOGI", posting_date=date(2023, 12, 1)))
+
+    assert not [row for row in db.rows.values() if row["component"] == aggregates.BALANCE]
+
+
+def test_new_profile_account_marks_days_incomplete(monkeypatch):
+    _install(monkeypatch)
+    _snapshot()
+
+    profile = types.SimpleNamespace(**vars(PROFILE))
+    profile.pph_accounts = PROFILE.pph_accounts + [types.SimpleNamespace(payable_account="PPh 4(2) - I")]
+    snapshot = aggregates.build_snapshot("IMOGI", date(2024, 1, 1), date(2024, 1, 31), profile)
+
+    assert snapshot["meta"]["recomputed_days"] == 31
+
+
+def test_verify_reports_differences_against_full_recompute(monkeypatch):
+    _install(monkeypatch)
+    full = dict(_snapshot(), output_vat_total=331.0)
+    monkeypatch.setitem(
+        sys.modules,
+        "imogi_finance.tax_operations",
+        types.SimpleNamespace(
+            _get_tax_profile=lambda company: PROFILE,
+            build_register_snapshot=lambda *args, **kwargs: full,
+        ),
+    )
+
+    result = aggregates.verify_register_snapshot("IMOGI", date(2024, 1, 1), date(2024, 1, 31))
+
+    assert result["matches"] is False
+    assert result["differences"] == {"output_vat_total": {"incremental": 330.0, "full": 331.0}}
+
+
+def test_open_ended_period_falls_back_to_full_recompute(monkeypatch):
+    _install(monkeypatch)
+
+    assert aggregates.build_snapshot("IMOGI", None, date(2024, 1, 31), PROFILE) is None
+
+
+def test_day_range_helper():
+    days = list(aggregates._iter_days(date(2024, 2, 27), date(2024, 3, 1)))
+    assert days == [date(2024, 2, 27) + timedelta(days=offset) for offset in range(4)]
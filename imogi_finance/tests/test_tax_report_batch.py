@@ -0,0 +1,185 @@
+import sys
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+
+query_builder = sys.modules.setdefault("frappe.query_builder", types.ModuleType("frappe.query_builder"))
+query_builder.DocType = getattr(query_builder, "DocType", lambda name: None)
+query_builder.Criterion = getattr(query_builder, "Criterion", object)
+functions = sys.modules.setdefault(
+    "frappe.query_builder.functions", types.ModuleType("frappe.query_builder.functions")
+)
+functions.Sum = getattr(functions, "Sum", lambda field: field)
+functions.Coalesce = getattr(functions, "Coalesce", lambda field, default: field)
+
+from imogi_finance.imogi_finance.utils import tax_report_utils  # noqa: E402
+
+
+class _Row(dict):
+    __getattr__ = dict.get
+
+
+class _Field:
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, value):
+        return ("eq", self.name, value)
+
+    def isin(self, values):
+        return ("in", self.name, set(values))
+
+
+class _Sum:
+    def __init__(self, field):
+        self.field = field.name
+        self.alias = None
+
+    def as_(self, alias):
+        self.alias = alias
+        return self
+
+
+class _Table:
+    def __getattr__(self, name):
+        return _Field(name)
+
+
+class _Query:
+    """Grouped GL query over in-memory rows, recording each executed IN list."""
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.conditions = []
+        self.sums = []
+
+    def select(self, *columns):
+        self.sums = [column for column in columns if isinstance(column, _Sum)]
+        return self
+
+    def where(self, condition):
+        self.conditions.append(condition)
+        return self
+
+    def groupby(self, *fields):
+        return self
+
+    def _matches(self, row):
+        for op, field, value in self.conditions:
+            if op == "eq" and row[field] != value:
+                return False
+            if op == "in" and row[field] not in value:
+                return False
+        return True
+
+    def run(self, as_dict=False):
+        self.ledger.queries.append(
+            next(len(value) for op, field, value in self.conditions if op == "in" and field == "voucher_no")
+        )
+        groups = {}
+        for row in self.ledger.rows:
+            if not self._matches(row):
+                continue
+            key = (row["voucher_type"], row["voucher_no"])
+            group = groups.setdefault(key, _Row(voucher_type=key[0], voucher_no=key[1]))
+            for total in self.sums:
+                group[total.alias] = group.get(total.alias, 0.0) + row[total.field]
+        return list(groups.values())
+
+
+class _Ledger:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def from_(self, table):
+        return _Query(self)
+
+
+def _install(monkeypatch, rows, root_type="Asset"):
+    ledger = _Ledger(rows)
+    monkeypatch.setattr(tax_report_utils, "DocType", lambda name: _Table())
+    monkeypatch.setattr(tax_report_utils, "Sum", _Sum)
+    monkeypatch.setattr(tax_report_utils, "Coalesce", lambda total, default: total)
+    monkeypatch.setattr(frappe, "qb", ledger, raising=False)
+    monkeypatch.setattr(
+        frappe, "db", types.SimpleNamespace(get_value=lambda *args, **kwargs: root_type), raising=False
+    )
+    return ledger
+
+
+def _gl(voucher_no, debit=0.0, credit=0.0, account="PPN Masukan", voucher_type="Purchase Invoice", **extra):
+    row = {
+        "voucher_type": voucher_type,
+        "voucher_no": voucher_no,
+        "account": account,
+        "company": "IMOGI",
+        "is_cancelled": 0,
+        "debit": debit,
+        "credit": credit,
+    }
+    row.update(extra)
+    return row
+
+
+def _invoices(count):
+    return [_Row(name=f"PI-{idx:06d}", company="IMOGI") for idx in range(count)]
+
+
+def test_batch_is_chunked_and_matches_per_voucher_amounts(monkeypatch):
+    rows = [
+        _gl("PI-000000", debit=110.0),
+        _gl("PI-000000", credit=10.0),
+        _gl("PI-000001", debit=50.0, account="Expense"),
+        _gl("PI-000002", debit=70.0, is_cancelled=1),
+        _gl("PI-000003", debit=30.0),
+        # Same voucher number on another voucher type must not leak into the result.
+        _gl("PI-000003", debit=999.0, voucher_type="Journal Entry"),
+    ]
+    ledger = _install(monkeypatch, rows)
+
+    amounts = tax_report_utils.get_invoice_tax_amounts(
+        _invoices(5), "Purchase Invoice", "PPN Masukan", chunk_size=2
+    )
+
+    assert amounts == {
+        "PI-000000": 100.0,
+        "PI-000001": 0.0,
+        "PI-000002": 0.0,
+        "PI-000003": 30.0,
+        "PI-000004": 0.0,
+    }
+    assert ledger.queries == [2, 2, 1]
+
+
+def test_liability_accounts_use_credit_minus_debit(monkeypatch):
+    _install(monkeypatch, [_gl("SI-1", credit=11.0, debit=1.0, account="PPN Keluaran", voucher_type="Sales Invoice")],
+             root_type="Liability")
+
+    amounts = tax_report_utils.get_tax_amounts_batch([("Sales Invoice", "SI-1")], "PPN Keluaran", "IMOGI")
+
+    assert amounts == {("Sales Invoice", "SI-1"): 10.0}
+
+
+def test_invoices_are_grouped_by_company(monkeypatch):
+    ledger = _install(monkeypatch, [_gl("PI-1", debit=5.0), _gl("PI-2", debit=7.0, company="OTHER")])
+    invoices = [_Row(name="PI-1", company="IMOGI"), _Row(name="PI-2", company="OTHER")]
+
+    amounts = tax_report_utils.get_invoice_tax_amounts(invoices, "Purchase Invoice", "PPN Masukan")
+
+    assert amounts == {"PI-1": 5.0, "PI-2": 7.0}
+    assert ledger.queries == [1, 1]
+
+
+def test_default_chunking_issues_one_query_per_gl_batch(monkeypatch):
+    size = 2 * tax_report_utils.GL_BATCH_SIZE + 1
+    rows = [_gl(f"PI-{idx:06d}", debit=float(idx % 97)) for idx in range(size)]
+    ledger = _install(monkeypatch, rows)
+
+    amounts = tax_report_utils.get_invoice_tax_amounts(_invoices(size), "Purchase Invoice", "PPN Masukan")
+
+    # One grouped query per GL_BATCH_SIZE invoices instead of one query per invoice.
+    assert ledger.queries == [tax_report_utils.GL_BATCH_SIZE, tax_report_utils.GL_BATCH_SIZE, 1]
+    assert amounts["PI-000096"] == 96.0
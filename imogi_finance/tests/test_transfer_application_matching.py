@@ -0,0 +1,122 @@
+import sys
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = lambda msg, *args, **kwargs: msg
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+
+# Payment Entry creation needs ERPNext; matching only calls it on auto-create.
+sys.modules.setdefault(
+    "imogi_finance.transfer_application.payment_entries",
+    types.SimpleNamespace(create_payment_entry_for_transfer_application=lambda *args, **kwargs: None),
+)
+
+from imogi_finance.transfer_application import matching  # noqa: E402
+
+
+class _Row(dict):
+    __getattr__ = dict.get
+
+
+class _MatchingDB:
+    def __init__(self, applications):
+        self.applications = applications
+        self.sql_calls = []
+        self.updates = {}
+
+    def sql(self, query, params=None, as_dict=False):
+        self.sql_calls.append(params)
+        return [
+            _Row(app) for app in self.applications
+            if params["low"] <= (app["expected_amount"] or app["amount"]) <= params["high"]
+        ]
+
+    def set_value(self, doctype, name, values, update_modified=True):
+        self.updates[name] = values
+
+
+def _install(monkeypatch, applications, items):
+    db = _MatchingDB(applications)
+    item_queries = []
+
+    def _get_all(doctype, filters=None, fields=None, **kwargs):
+        assert doctype == "Transfer Application Item"
+        item_queries.append(list(filters["parent"][1]))
+        return [_Row(item) for item in items if item["parent"] in filters["parent"][1]]
+
+    settings = types.SimpleNamespace(
+        enable_bank_txn_matching=1, enable_auto_create_payment_entry_on_strong_match=0, matching_amount_tolerance=1
+    )
+    monkeypatch.setattr(frappe, "db", db, raising=False)
+    monkeypatch.setattr(frappe, "get_all", _get_all, raising=False)
+    monkeypatch.setattr(frappe, "flags", types.SimpleNamespace(in_transfer_application_matching=False), raising=False)
+    monkeypatch.setattr(frappe, "only_for", lambda *args, **kwargs: None, raising=False)
+    monkeypatch.setattr(
+        frappe,
+        "get_doc",
+        lambda doctype, name: types.SimpleNamespace(add_comment=lambda *args, **kwargs: None, payment_entry=None),
+        raising=False,
+    )
+    monkeypatch.setattr(matching, "get_transfer_application_settings", lambda: settings)
+    monkeypatch.setattr(matching, "get_amount_tolerance", lambda _settings: 1.0)
+    return db, item_queries
+
+
+def _bank_transaction(name, withdrawal, description):
+    return types.SimpleNamespace(
+        name=name,
+        docstatus=1,
+        status="Unreconciled",
+        withdrawal=withdrawal,
+        description=description,
+        reference_number=None,
+        party=None,
+        transaction_id=None,
+        transfer_application=None,
+        add_comment=lambda *args, **kwargs: None,
+    )
+
+
+APPLICATIONS = [
+    {"name": f"TA-{idx:04d}", "amount": 1000 + idx, "expected_amount": None, "bank_reference_hint": None}
+    for idx in range(500)
+]
+ITEMS = [
+    {"parent": f"TA-{idx:04d}", "account_number": f"99{idx:06d}", "beneficiary_name": f"Vendor {idx}"}
+    for idx in range(500)
+]
+
+
+def test_single_transaction_uses_range_query_and_one_item_query(monkeypatch):
+    db, item_queries = _install(monkeypatch, APPLICATIONS, ITEMS)
+
+    matching.handle_bank_transaction(_bank_transaction("BT-1", 1100, "TRF 99000100"))
+
+    assert db.sql_calls == [{"statuses": tuple(matching.OPEN_STATUSES), "low": 1099.0, "high": 1101.0}]
+    assert item_queries == [["TA-0099", "TA-0100", "TA-0101"]]
+    assert db.updates["BT-1"]["transfer_application"] == "TA-0100"
+    assert db.updates["BT-1"]["match_confidence"] == "Strong"
+
+
+def test_batch_matching_shares_candidate_state(monkeypatch):
+    db, item_queries = _install(monkeypatch, APPLICATIONS, ITEMS)
+    transactions = [
+        _bank_transaction(f"BT-{idx}", 1000 + idx, f"TRF 99{idx:06d}") for idx in range(0, 500, 5)
+    ]
+
+    result = matching.match_bank_transactions(transactions)
+
+    assert result["processed"] == 100
+    assert len(db.sql_calls) == 1
+    # Each application's items are read at most once across the batch.
+    loaded = [name for query in item_queries for name in query]
+    assert len(loaded) == len(set(loaded))
+    assert all(db.updates[f"BT-{idx}"]["transfer_application"] == f"TA-{idx:04d}" for idx in range(0, 500, 5))
+
+
+def test_amount_outside_tolerance_is_not_a_candidate(monkeypatch):
+    db, _item_queries = _install(monkeypatch, APPLICATIONS[:1], ITEMS[:1])
+
+    matching.handle_bank_transaction(_bank_transaction("BT-1", 1002.5, "TRF 99000000"))
+
+    assert db.updates == {}
@@ -0,0 +1,111 @@
+import sys
+import types
+
+import pytest
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = getattr(frappe, "_", lambda msg, *args, **kwargs: msg)
+
+from imogi_finance import tax_operations  # noqa: E402
+
+
+class _Row(dict):
+    __getattr__ = dict.get
+
+
+def _invoice(name, group_id, dpp):
+    return _Row(
+        name=name,
+        posting_date="2026-01-05",
+        customer="CUST",
+        customer_name="Customer",
+        grand_total=dpp * 1.11,
+        out_fp_no=None,
+        out_fp_no_seri="010",
+        out_fp_no_faktur="010.000-26.00000001",
+        out_fp_date="2026-01-31",
+        out_fp_dpp=dpp,
+        out_fp_ppn=dpp * 0.11,
+        out_fp_group_id=group_id,
+        out_fp_customer_npwp="0123",
+        out_fp_combine=1,
+    )
+
+
+ITEMS = {
+    "SI-1": [("Widget", "W-1"), (None, "W-2")],
+    "SI-2": [("Gadget", "G-1")],
+    "SI-3": [],
+}
+
+
+def _install(monkeypatch, invoices):
+    queries = []
+    saved = []
+
+    def _sql(query, values=None, as_dict=False):
+        queries.append(values["names"])
+        return [
+            _Row(parent=name, item_name=item_name, item_code=item_code)
+            for name in values["names"]
+            for item_name, item_code in ITEMS.get(name, [])
+        ]
+
+    batch = types.SimpleNamespace(
+        company="TC", date_from="2026-01-01", date_to="2026-01-31", get_batch_invoices=lambda: invoices
+    )
+
+    def _get_doc(doctype, name=None):
+        if doctype == "VAT OUT Batch":
+            return batch
+        doc = types.SimpleNamespace(file_url="/private/files/" + doctype["file_name"], **doctype)
+        doc.save = lambda **kwargs: saved.append(doc)
+        return doc
+
+    monkeypatch.setattr(frappe, "db", types.SimpleNamespace(sql=_sql), raising=False)
+    monkeypatch.setattr(frappe, "get_doc", _get_doc, raising=False)
+    return queries, saved
+
+
+def test_detail_rows_join_items_with_one_query_per_chunk(monkeypatch):
+    monkeypatch.setattr(tax_operations, "VAT_OUT_ITEM_CHUNK_SIZE", 2)
+    invoices = [_invoice("SI-2", 2, 200), _invoice("SI-1", 1, 100), _invoice("SI-3", 2, 300)]
+    queries, _ = _install(monkeypatch, invoices)
+    written = {}
+
+    def _write(path, sheets):
+        for sheet_name, headers, rows in sheets:
+            written[sheet_name] = [headers] + list(rows)
+        with open(path, "wb") as handle:
+            handle.write(b"xlsx")
+
+    monkeypatch.setattr(tax_operations, "_write_xlsx_streaming", _write)
+
+    url = tax_operations.generate_vat_out_batch_excel("VOB-1", include_fp_numbers=True)
+
+    assert url == "/private/files/coretax-vat-out-TC-2026-01-01-2026-01-31.xlsx"
+    assert queries == [("SI-1", "SI-2"), ("SI-3",)]
+    assert written["Faktur"][0][-1] == "FP Date"
+    assert [row[0] for row in written["Faktur"][1:]] == [1, 2]
+    assert written["Faktur"][2][3] == 500
+    assert [row[1:4] for row in written["DetailFaktur"][1:]] == [
+        ["SI-1", "2026-01-05", "Widget, W-2"],
+        ["SI-2", "2026-01-05", "Gadget"],
+        ["SI-3", "2026-01-05", ""],
+    ]
+
+
+def test_streaming_workbook_round_trips(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = str(tmp_path / "out.xlsx")
+
+    rows = ([idx, f"SI-{idx}"] for idx in range(1, 1001))
+    tax_operations._write_xlsx_streaming(
+        path,
+        [("Faktur", ["Group ID"], iter([[1]])), ("DetailFaktur", ["Group ID", "Sales Invoice"], rows)],
+    )
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ["Faktur", "DetailFaktur"]
+    assert workbook.active.title == "Faktur"
+    assert workbook["DetailFaktur"].max_row == 1001
@@ -0,0 +1,112 @@
+import sys
+import types
+
+frappe = sys.modules.setdefault("frappe", types.ModuleType("frappe"))
+frappe._ = getattr(frappe, "_", lambda msg, *args, **kwargs: msg)
+frappe.whitelist = getattr(frappe, "whitelist", lambda *args, **kwargs: (lambda fn: fn))
+naming = sys.modules.setdefault("frappe.model.naming", types.ModuleType("frappe.model.naming"))
+naming.make_autoname = getattr(naming, "make_autoname", lambda *args, **kwargs: "")
+frappe_utils = sys.modules.setdefault("frappe.utils", types.ModuleType("frappe.utils"))
+frappe_utils.now = getattr(frappe_utils, "now", lambda: "")
+
+from imogi_finance.imogi_finance.doctype.vat_out_batch import vat_out_batch  # noqa: E402
+
+
+def _invoice(name, customer, batch=None, group_id=None):
+    return types.SimpleNamespace(
+        name=name,
+        posting_date="2026-01-01",
+        customer=customer,
+        customer_name=customer,
+        grand_total=111,
+        out_fp_no_faktur=None,
+        out_fp_ppn=11,
+        out_fp_dpp=100,
+        out_fp_combine=1,
+        out_fp_customer_npwp=f"NPWP-{customer}",
+        out_fp_batch=batch,
+        out_fp_group_id=group_id,
+    )
+
+
+def _batch(invoices):
+    batch = vat_out_batch.VATOUTBatch.__new__(vat_out_batch.VATOUTBatch)
+    batch.name = "VOB-0001"
+    batch.doctype = "VAT OUT Batch"
+    batch._get_available_invoice_rows = lambda: invoices
+    return batch
+
+
+def _install(monkeypatch):
+    statements = []
+    enqueued = []
+    monkeypatch.setattr(
+        frappe, "db", types.SimpleNamespace(sql=lambda query, values=None: statements.append((query, values))),
+        raising=False,
+    )
+    monkeypatch.setattr(
+        frappe, "enqueue", lambda method, **kwargs: enqueued.append((method, kwargs)) or types.SimpleNamespace(name="job-1"),
+        raising=False,
+    )
+    monkeypatch.setattr(frappe, "msgprint", lambda *args, **kwargs: None, raising=False)
+    return statements, enqueued
+
+
+def _assigned(statements):
+    pairs = {}
+    for _query, values in statements:
+        for key, value in values.items():
+            if key.startswith("n"):
+                pairs[value] = values["g" + key[1:]]
+    return pairs
+
+
+def test_assignment_is_chunked_and_preserves_manual_edits(monkeypatch):
+    statements, _ = _install(monkeypatch)
+    monkeypatch.setattr(vat_out_batch, "GROUP_ASSIGN_CHUNK_SIZE", 2)
+    invoices = [
+        _invoice("SI-1", "A"),
+        _invoice("SI-2", "A", batch="VOB-0001", group_id=7),
+        _invoice("SI-3", "B"),
+        _invoice("SI-4", "B"),
+        _invoice("SI-5", "C", batch="VOB-0001"),
+    ]
+
+    result = _batch(invoices).get_available_invoices()
+
+    assert result["total_invoices"] == 5 and result["total_groups"] == 3
+    assert [g["group_id"] for g in result["groups"]] == [1, 2, 3]
+    # SI-2 keeps its manual group; SI-5 has no group yet and is assigned.
+    assert len(statements) == 2
+    assert _assigned(statements) == {"SI-1": 1, "SI-3": 2, "SI-4": 2, "SI-5": 3}
+    query, values = statements[0]
+    assert "case name when %(n0)s then %(g0)s when %(n1)s then %(g1)s end" in query
+    assert "where name in (%(n0)s, %(n1)s)" in query and values["batch"] == "VOB-0001"
+
+    statements.clear()
+    _batch(invoices).get_available_invoices(force_rebuild=True)
+    assert _assigned(statements)["SI-2"] == 1 and len(statements) == 3
+
+
+def test_large_batches_are_grouped_in_background(monkeypatch):
+    statements, enqueued = _install(monkeypatch)
+    monkeypatch.setattr(vat_out_batch, "BACKGROUND_GROUPING_THRESHOLD", 2)
+    invoices = [_invoice(f"SI-{idx}", "A") for idx in range(3)]
+
+    result = _batch(invoices).get_available_invoices(force_rebuild=True)
+
+    assert result == {"queued": 1, "job_id": "job-1", "total_invoices": 3}
+    method, kwargs = enqueued[0]
+    assert method.endswith("vat_out_batch.run_group_assignment")
+    assert kwargs["queue"] == "long" and kwargs["batch_name"] == "VOB-0001" and kwargs["force_rebuild"] == 1
+    assert statements == []
+
+    progress = []
+    done = []
+    monkeypatch.setattr(frappe, "get_doc", lambda doctype, name: _batch(invoices), raising=False)
+    monkeypatch.setattr(frappe, "publish_progress", lambda percent, **kwargs: progress.append(percent), raising=False)
+    monkeypatch.setattr(frappe, "publish_realtime", lambda event, message, **kwargs: done.append(message), raising=False)
+
+    assert vat_out_batch.run_group_assignment("VOB-0001", force_rebuild=1) == {"total_invoices": 3, "total_groups": 1}
+    assert progress == [100] and done[0]["batch_name"] == "VOB-0001"
+    assert len(statements) == 1
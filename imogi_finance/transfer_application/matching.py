@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from typing import List, Sequence
 
 import frappe
@@ -7,6 +8,7 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import flt
 
+from imogi_finance import roles
 from imogi_finance.transfer_application.payment_entries import (
     create_payment_entry_for_transfer_application,
 )
@@ -17,6 +19,10 @@ from imogi_finance.transfer_application.settings import (
     normalize_text,
 )
 
+# Slack added to the tolerance range lookup; candidates are re-checked exactly.
+AMOUNT_EPSILON = 1e-6
+OPEN_STATUSES = ["Approved for Transfer", "Awaiting Bank Confirmation"]
+
 
 def handle_bank_transaction(doc: Document, method=None):
     if frappe.flags.in_transfer_application_matching:
@@ -36,53 +42,152 @@ def handle_bank_transaction(doc: Document, method=None):
         frappe.flags.in_transfer_application_matching = False
 
 
-def _match_transfer_application(doc: Document, *, settings):
+@frappe.whitelist()
+def match_bank_transactions(bank_transactions: Sequence[str | Document] | str) -> dict:
+    """Match many submitted Bank Transactions against open Transfer Applications in one pass.
+
+    Open applications for the whole amount range are loaded once and their items are
+    fetched in one query; applications that get paid along the way are dropped from the
+    shared candidate index so later transactions do not see them.
+    """
+    frappe.only_for((roles.ACCOUNTS_MANAGER, roles.SYSTEM_MANAGER))
+
+    if isinstance(bank_transactions, str):
+        bank_transactions = frappe.parse_json(bank_transactions)
+
+    settings = get_transfer_application_settings()
+    if not settings.enable_bank_txn_matching:
+        return {"processed": 0}
+
+    docs = [
+        frappe.get_doc("Bank Transaction", item) if isinstance(item, str) else item
+        for item in bank_transactions or []
+    ]
+    docs = [doc for doc in docs if doc.docstatus == 1 and _is_matchable(doc)]
+
+    tolerance = get_amount_tolerance(settings)
+    index = _CandidateIndex.load([_get_transaction_amount(doc) for doc in docs], tolerance)
+
+    frappe.flags.in_transfer_application_matching = True
+    try:
+        for doc in docs:
+            _match_transfer_application(doc, settings=settings, index=index)
+    finally:
+        frappe.flags.in_transfer_application_matching = False
+
+    return {"processed": len(docs), "candidates": len(index)}
+
+
+class _CandidateIndex:
+    """Open Transfer Applications sorted by expected amount, with items loaded in bulk."""
+
+    def __init__(self, candidates: Sequence[dict], tolerance: float):
+        self.tolerance = tolerance
+        keyed = sorted(
+            ((flt(candidate.expected_amount or candidate.amount), candidate) for candidate in candidates),
+            key=lambda pair: pair[0],
+        )
+        self.expected = [pair[0] for pair in keyed]
+        self.candidates = [pair[1] for pair in keyed]
+        self.closed: set[str] = set()
+        self.items: dict[str, list[dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    @classmethod
+    def load(cls, amounts: Sequence[float], tolerance: float) -> "_CandidateIndex":
+        amounts = [amount for amount in amounts if amount]
+        if not amounts:
+            return cls([], tolerance)
+
+        # Range filter on the effective expected amount; exact checks happen in find().
+        candidates = frappe.db.sql(
+            """
+            select name, amount, expected_amount, bank_reference_hint
+            from `tabTransfer Application`
+            where docstatus < 2
+              and ifnull(payment_entry, '') = ''
+              and status in %(statuses)s
+              and if(ifnull(expected_amount, 0) != 0, expected_amount, amount)
+                  between %(low)s and %(high)s
+            order by modified desc
+            """,
+            {
+                "statuses": tuple(OPEN_STATUSES),
+                "low": min(amounts) - tolerance,
+                "high": max(amounts) + tolerance,
+            },
+            as_dict=True,
+        )
+        return cls(candidates, tolerance)
+
+    def find(self, amount: float) -> list[dict]:
+        low = bisect_left(self.expected, amount - self.tolerance - AMOUNT_EPSILON)
+        high = bisect_right(self.expected, amount + self.tolerance + AMOUNT_EPSILON)
+        matches = [
+            candidate
+            for expected, candidate in zip(self.expected[low:high], self.candidates[low:high])
+            if abs(amount - expected) <= self.tolerance and candidate.name not in self.closed
+        ]
+        self._load_items([candidate.name for candidate in matches])
+        return matches
+
+    def get_items(self, name: str) -> list[dict]:
+        if name not in self.items:
+            self._load_items([name])
+        return self.items.get(name, [])
+
+    def close(self, name: str) -> None:
+        self.closed.add(name)
+
+    def _load_items(self, names: Sequence[str]) -> None:
+        missing = [name for name in names if name not in self.items]
+        if not missing:
+            return
+
+        for name in missing:
+            self.items[name] = []
+        rows = frappe.get_all(
+            "Transfer Application Item",
+            filters={"parent": ("in", missing)},
+            fields=["parent", "account_number", "beneficiary_name"],
+        )
+        for row in rows:
+            self.items[row.get("parent")].append(row)
+
+
+def _is_matchable(doc: Document) -> bool:
     if getattr(doc, "transfer_application", None):
-        return
+        return False
 
     txn_status = getattr(doc, "status", None)
     if txn_status and txn_status not in {"Unreconciled", "Pending Reconciliation"}:
-        return
+        return False
 
-    amount = _get_transaction_amount(doc)
-    if not amount:
+    return bool(_get_transaction_amount(doc))
+
+
+def _match_transfer_application(doc: Document, *, settings, index: _CandidateIndex | None = None):
+    if not _is_matchable(doc):
         return
 
+    amount = _get_transaction_amount(doc)
     remark_text = _build_remark_text(doc)
-    tolerance = get_amount_tolerance(settings)
+    if index is None:
+        index = _CandidateIndex.load([amount], get_amount_tolerance(settings))
 
     # Note: Now beneficiary details are in items, so matching is simplified
     # We match primarily by amount and bank_reference_hint
-    candidates = frappe.get_all(
-        "Transfer Application",
-        filters={
-            "docstatus": ("<", 2),
-            "payment_entry": ("is", "not set"),
-            "status": ("in", ["Approved for Transfer", "Awaiting Bank Confirmation"]),
-        },
-        fields=[
-            "name",
-            "amount",
-            "expected_amount",
-            "bank_reference_hint",
-        ],
-    )
+    candidates = index.find(amount)
 
     strong_matches: List[dict] = []
     medium_matches: List[dict] = []
     weak_matches: List[dict] = []
 
     for candidate in candidates:
-        expected = flt(candidate.expected_amount or candidate.amount)
-        if abs(amount - expected) > tolerance:
-            continue
-
         # Check items for account number and beneficiary name matches
-        items = frappe.get_all(
-            "Transfer Application Item",
-            filters={"parent": candidate.name},
-            fields=["account_number", "beneficiary_name"]
-        )
+        items = index.get_items(candidate.name)
 
         account_match = False
         name_match = False
@@ -104,7 +209,12 @@ def _match_transfer_application(doc: Document, *, settings):
             weak_matches.append(candidate)
 
     if len(strong_matches) == 1:
-        _apply_strong_match(doc, strong_matches[0], amount, remark_text, settings=settings)
+        payment_entry = _apply_strong_match(
+            doc, strong_matches[0], amount, remark_text, settings=settings, items=index.get_items(strong_matches[0].name)
+        )
+        if payment_entry:
+            # Paid applications are no longer open for the rest of a batch.
+            index.close(strong_matches[0].name)
     elif len(strong_matches) > 1:
         _flag_manual_review(doc, strong_matches, confidence="Manual")
     elif medium_matches:
@@ -113,16 +223,20 @@ def _match_transfer_application(doc: Document, *, settings):
         _flag_manual_review(doc, weak_matches, confidence="Weak")
 
 
-def _apply_strong_match(doc: Document, candidate: dict, amount: float, remark_text: str, *, settings):
+def _apply_strong_match(
+    doc: Document, candidate: dict, amount: float, remark_text: str, *, settings, items: Sequence[dict] | None = None
+) -> str | None:
+    """Link the Bank Transaction; returns the auto-created Payment Entry name, if any."""
     transfer_application = candidate.name
     note_parts = [_("Matched Transfer Application {0}").format(transfer_application)]
 
     # Get items to check matches
-    items = frappe.get_all(
-        "Transfer Application Item",
-        filters={"parent": candidate.name},
-        fields=["account_number", "beneficiary_name"]
-    )
+    if items is None:
+        items = frappe.get_all(
+            "Transfer Application Item",
+            filters={"parent": candidate.name},
+            fields=["account_number", "beneficiary_name"]
+        )
 
     account_found = False
     beneficiary_found = False
@@ -158,11 +272,11 @@ def _apply_strong_match(doc: Document, candidate: dict, amount: float, remark_te
     )
 
     if not settings.enable_auto_create_payment_entry_on_strong_match:
-        return
+        return None
 
     if getattr(doc, "payment_entry", None) or getattr(doc, "payment_document", None):
         _append_match_note(doc, _("Skipped auto Payment Entry because a payment link already exists."))
-        return
+        return None
 
     if ta_doc.payment_entry:
         existing_status = frappe.db.get_value("Payment Entry", ta_doc.payment_entry, "docstatus")
@@ -173,7 +287,7 @@ def _apply_strong_match(doc: Document, candidate: dict, amount: float, remark_te
                     "Skipped auto Payment Entry because Transfer Application already links to {0}."
                 ).format(ta_doc.payment_entry),
             )
-            return
+            return None
 
     try:
         payment_entry = create_payment_entry_for_transfer_application(
@@ -185,7 +299,7 @@ def _apply_strong_match(doc: Document, candidate: dict, amount: float, remark_te
         )
     except Exception:
         _append_match_note(doc, _("Auto Payment Entry failed; see error log."))
-        return
+        return None
 
     ta_doc.reload()
     ta_doc.db_set(
@@ -212,6 +326,7 @@ def _apply_strong_match(doc: Document, candidate: dict, amount: float, remark_te
             "Auto-created Payment Entry {0} from Transfer Application {1}."
         ).format(payment_entry.name, ta_doc.name),
     )
+    return payment_entry.name
 
 
 def _flag_manual_review(doc: Document, matches: Sequence[dict], *, confidence: str):